@@ -0,0 +1,99 @@
+"""
+对局档案库基准：同一批对局分别存为散落的 .dat 文件与档案库，比较
+- 写入：逐个 write_save vs Archive.append
+- 筛选：按账户+棋类查询（散文件需逐个读取解析，档案库只扫索引）
+- 随机读取：按编号取某一局的步序
+- 打开档案库（含恢复检查）的耗时
+运行: python -m chess_platform.benchmarks.bench_archive [--games 2000] [--moves 40] [--accounts 50]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from chess_platform.benchmarks.common import play_random
+from chess_platform.games import savefile
+from chess_platform.games.archive import Archive
+
+
+def make_games(count: int, moves: int, accounts: int, seed: int = 0):
+    """随机对局的存档数据字典（少量不同局面轮换使用，账户随机分配）"""
+    rnd = random.Random(seed)
+    base = [play_random("Gomoku", 15, moves, seed=i).to_save_data() for i in range(min(count, 50))]
+    games = []
+    for i in range(count):
+        data = dict(base[i % len(base)])
+        data["players_account"] = [f"user{rnd.randrange(accounts)}", f"user{rnd.randrange(accounts)}"]
+        data["players_name"] = list(data["players_account"])
+        games.append(data)
+    return games
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--moves", type=int, default=40)
+    parser.add_argument("--accounts", type=int, default=50)
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+    games = make_games(args.games, args.moves, args.accounts)
+    rnd = random.Random(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        loose_dir = os.path.join(tmp, "loose")
+        os.makedirs(loose_dir)
+        t = time.perf_counter()
+        paths = []
+        for i, data in enumerate(games):
+            path = os.path.join(loose_dir, f"game{i}.dat")
+            savefile.write_save(path, data)
+            paths.append(path)
+        t_loose_write = time.perf_counter() - t
+
+        archive = Archive(os.path.join(tmp, "archive"))
+        t = time.perf_counter()
+        for data in games:
+            archive.append(data, rnd.choice(["Black", "White", "Draw"]), sync=False)
+        t_archive_write = time.perf_counter() - t
+        archive.close()
+
+        t = time.perf_counter()
+        archive = Archive(os.path.join(tmp, "archive"))
+        t_open = time.perf_counter() - t
+
+        target = "user7"
+        t = time.perf_counter()
+        loose_hits = [p for p in paths
+                      if target in (savefile.read_save(p, replay=False)["players_account"] or [])]
+        t_loose_query = time.perf_counter() - t
+        t = time.perf_counter()
+        hits = archive.find(account=target, game_type="Gomoku", limit=None)
+        t_archive_query = time.perf_counter() - t
+        assert len(hits) == len(loose_hits)
+
+        ids = [rnd.randrange(len(games)) for _ in range(args.lookups)]
+        t = time.perf_counter()
+        for i in ids:
+            savefile.read_save(paths[i], replay=False)["move_log"]
+        t_loose_read = (time.perf_counter() - t) / len(ids)
+        t = time.perf_counter()
+        for i in ids:
+            archive.moves(i + 1)
+        t_archive_read = (time.perf_counter() - t) / len(ids)
+
+        archive_bytes = sum(os.path.getsize(os.path.join(archive.directory, n))
+                            for n in os.listdir(archive.directory))
+        loose_bytes = sum(os.path.getsize(p) for p in paths)
+        archive.close()
+
+    print(f"{args.games} games, {args.moves} moves each, {len(hits)} games for {target}")
+    print(f"{'':>14} {'loose .dat':>12} {'archive':>12}")
+    print(f"{'write s':>14} {t_loose_write:>12.3f} {t_archive_write:>12.3f}")
+    print(f"{'query ms':>14} {t_loose_query * 1e3:>12.2f} {t_archive_query * 1e3:>12.2f}")
+    print(f"{'read ms/game':>14} {t_loose_read * 1e3:>12.3f} {t_archive_read * 1e3:>12.3f}")
+    print(f"{'bytes':>14} {loose_bytes:>12} {archive_bytes:>12}")
+    print(f"archive open {t_open * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
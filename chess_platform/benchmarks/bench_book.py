@@ -0,0 +1,82 @@
+"""
+开局库基准：载入开销、单次查询耗时，以及前 N 手 AI 思考时间（查库 vs 不查库）
+运行: python -m chess_platform.benchmarks.bench_book [--moves 8] [--games 3] [--ai ai-mcts]
+"""
+import argparse
+import random
+import subprocess
+import sys
+import time
+
+from chess_platform.games import book as book_mod
+from chess_platform.games.ai import create_ai
+from chess_platform.games.logic import GameFactory
+
+
+def load_cost(game_type: str, size: int) -> float:
+    """冷进程中打开开局库并完成首次查询的耗时（ms），不含解释器启动"""
+    code = ("import time; t=time.perf_counter(); "
+            "from chess_platform.games.book import default_book; "
+            "from chess_platform.games.logic import GameFactory; "
+            f"g=GameFactory.create_game({game_type!r},{size}); g.start(); "
+            f"default_book({game_type!r},{size}).probe(g); "
+            "print((time.perf_counter()-t)*1e3)")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(out.stdout)
+
+
+def opening_time(mode: str, game_type: str, size: int, moves: int, games: int, use_book: bool):
+    """双方同为 mode，返回 (前 moves 手总思考秒数, 命中库的手数)"""
+    total = 0.0
+    hits = 0
+    bk = book_mod.default_book(game_type, size)
+    for seed in range(games):
+        random.seed(seed)
+        game = GameFactory.create_game(game_type, size)
+        game.record_results = False
+        game.start()
+        players = [create_ai(mode, game_type), create_ai(mode, game_type)]
+        for ai in players:
+            ai.use_book = use_book
+        while len(game.move_log) < moves and not game.is_game_over:
+            ai = players[game.current_player_idx]
+            if use_book and bk is not None and bk.probe(game) is not None:
+                hits += 1
+            t = time.perf_counter()
+            move = ai.select_move(game)
+            total += time.perf_counter() - t
+            game.make_move(*move)
+    return total, hits
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--game", default="Gomoku")
+    parser.add_argument("--size", type=int, default=15)
+    parser.add_argument("--moves", type=int, default=8)
+    parser.add_argument("--games", type=int, default=3)
+    parser.add_argument("--ai", default="ai-mcts")
+    args = parser.parse_args()
+    bk = book_mod.default_book(args.game, args.size)
+    if bk is None:
+        print(f"no book at {book_mod.default_path(args.game, args.size)}")
+        return
+    game = GameFactory.create_game(args.game, args.size)
+    game.start()
+    n = 2000
+    t = time.perf_counter()
+    for _ in range(n):
+        bk.probe(game)
+    probe_us = (time.perf_counter() - t) / n * 1e6
+    print(f"book: {len(bk)} entries, cold open + first probe {load_cost(args.game, args.size):.2f}ms, "
+          f"probe {probe_us:.0f}us")
+    base, _ = opening_time(args.ai, args.game, args.size, args.moves, args.games, False)
+    with_book, hits = opening_time(args.ai, args.game, args.size, args.moves, args.games, True)
+    total = args.moves * args.games
+    print(f"{args.ai} first {args.moves} moves x {args.games} games: "
+          f"no book {base:.2f}s, with book {with_book:.2f}s ({hits}/{total} book moves), "
+          f"saved {base - with_book:.2f}s ({(1 - with_book / base) * 100 if base else 0:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+黑白棋残局求解基准：随机对局走到剩 N 个空格，统计精确求解的耗时与节点数
+运行: python -m chess_platform.benchmarks.bench_endgame [--size 8] [--empties 8 10 12 14] [--positions 6]
+"""
+import argparse
+import time
+
+from chess_platform.benchmarks.common import play_random
+from chess_platform.games.ai import legal_moves
+from chess_platform.games.endgame import EndgameSolver
+
+
+def positions(size: int, empties: int, count: int):
+    """生成 count 个恰好剩 empties 个空格、当前方有子可下的局面"""
+    result = []
+    seed = 0
+    while len(result) < count and seed < count * 20:
+        game = play_random("Othello", size, size * size - 4 - empties, seed=1000 * empties + seed)
+        seed += 1
+        left = sum(1 for row in game.board._grid for p in row if p is None)
+        if left == empties and not game.is_game_over and legal_moves(game):
+            result.append(game)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=8)
+    parser.add_argument("--empties", type=int, nargs="+", default=[8, 10, 12, 14])
+    parser.add_argument("--positions", type=int, default=6)
+    args = parser.parse_args()
+    print(f"{'empties':>7} {'avg_s':>8} {'max_s':>8} {'avg_nodes':>10} {'knodes/s':>9}")
+    for empties in args.empties:
+        times, nodes = [], []
+        for game in positions(args.size, empties, args.positions):
+            # 每个局面用新的求解器，不受前一局面置换表影响
+            solver = EndgameSolver(empties)
+            t = time.perf_counter()
+            solver.solve(game)
+            times.append(time.perf_counter() - t)
+            nodes.append(solver.nodes)
+        if not times:
+            print(f"{empties:>7} (no positions)")
+            continue
+        print(f"{empties:>7} {sum(times) / len(times):>8.3f} {max(times):>8.3f} "
+              f"{sum(nodes) // len(nodes):>10} {sum(nodes) / sum(times) / 1e3:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+开局浏览器基准：向临时档案库写入 N 局五子棋（近中心的随机着法，开局大量换序/对称重复），
+统计全量构建索引的速度、单局增量收录耗时与局面查询延迟
+运行: python -m chess_platform.benchmarks.bench_explorer [--games 100000] [--moves 40]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from chess_platform.games.archive import Archive
+from chess_platform.games.explorer import Explorer, game_positions
+from chess_platform.games.logic import GameFactory
+
+
+def random_log(rnd: random.Random, size: int, moves: int):
+    """从天元附近开始、每手贴着已有棋子落下的随机步序"""
+    center = size // 2
+    taken = set()
+    log = []
+    x, y = center, center
+    for i in range(moves):
+        if i:
+            while (x, y) in taken:
+                near = rnd.choice(log[-4:] if rnd.random() < 0.8 else log)
+                x = max(0, min(size - 1, near["x"] + rnd.randint(-2, 2)))
+                y = max(0, min(size - 1, near["y"] + rnd.randint(-2, 2)))
+        taken.add((x, y))
+        log.append({"x": x, "y": y, "color": "Black" if i % 2 == 0 else "White"})
+    return log
+
+
+def fill_archive(archive: Archive, games: int, size: int, moves: int, seed: int = 0):
+    rnd = random.Random(seed)
+    empty = {"size": size, "grid": [[None] * size for _ in range(size)], "last_move": None}
+    for _ in range(games):
+        data = {"type": "Gomoku", "size": size, "snapshot": empty, "current_player": 0,
+                "players_name": ["Black", "White"], "players_role": ["human", "human"],
+                "players_account": [None, None],
+                "move_log": random_log(rnd, size, rnd.randint(moves // 2, moves))}
+        archive.append(data, rnd.choice(["Black", "White", "Draw"]), sync=False)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--moves", type=int, default=40)
+    parser.add_argument("--size", type=int, default=15)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--incremental", type=int, default=2000, help="逐局增量收录的局数")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = Archive(os.path.join(tmp, "archive"))
+        t = time.perf_counter()
+        fill_archive(archive, args.games, args.size, args.moves)
+        print(f"archive: {args.games} games written in {time.perf_counter() - t:.1f}s")
+
+        explorer = Explorer(os.path.join(tmp, "explorer"), "Gomoku", args.size)
+        stats = explorer.rebuild(archive)
+        idx_bytes = os.path.getsize(explorer.idx_path)
+        print(f"build: {stats['games']} games, {stats['positions']} positions -> {stats['entries']} entries "
+              f"({idx_bytes / 2 ** 20:.1f} MiB, {stats['runs']} spill runs) in {stats['elapsed']:.1f}s = "
+              f"{stats['games'] / stats['elapsed']:.0f} games/s, "
+              f"{stats['positions'] / stats['elapsed'] / 1e3:.1f}k positions/s")
+
+        # 单局增量收录（写日志）；收录量跨过 COMPACT_ENTRIES，归并在后台进行，看单局的最大耗时
+        rnd = random.Random(1)
+        logs = [random_log(rnd, args.size, args.moves) for _ in range(args.incremental)]
+        times = []
+        for log in logs:
+            t = time.perf_counter()
+            explorer.add_game(explorer.last_game_id + 1, log, "Black")
+            times.append(time.perf_counter() - t)
+        pending = explorer.pending_entries
+        t = time.perf_counter()
+        explorer.compact()
+        times.sort()
+        print(f"incremental: {len(logs)} games, mean {sum(times) / len(times) * 1e3:.2f} ms/game, "
+              f"max {times[-1] * 1e3:.2f} ms ({pending} entries pending at the end)")
+        print(f"compact: {pending} pending entries merged into {explorer.count} in {time.perf_counter() - t:.2f}s")
+
+        # 查询：沿若干随机对局的前 12 手逐手查询（开局局面命中率高，深处多为空）
+        game = GameFactory.create_game("Gomoku", args.size)
+        game.record_results = False
+        times, hits = [], 0
+        rnd = random.Random(2)
+        while len(times) < args.queries:
+            game.start()
+            for step in random_log(rnd, args.size, 12):
+                t = time.perf_counter()
+                rows = explorer.lookup_game(game)
+                times.append(time.perf_counter() - t)
+                hits += bool(rows)
+                game.make_move(step["x"], step["y"])
+        times.sort()
+        print(f"query: {len(times)} positions, hit {hits / len(times):.0%}, "
+              f"median {times[len(times) // 2] * 1e3:.3f} ms, p99 {times[int(len(times) * 0.99)] * 1e3:.3f} ms")
+        # 全量构建中单局重放 + 哈希的开销
+        log = logs[0]
+        t = time.perf_counter()
+        for _ in range(50):
+            for _ in game_positions("Gomoku", args.size, log, "Black"):
+                pass
+        print(f"replay+hash: {(time.perf_counter() - t) / 50 / len(log) * 1e6:.1f} us/position")
+        explorer.close()
+        archive.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+围棋 playout 基准：从空棋盘出发按走子策略下到终局，报告每秒 playout 数、平均手数、
+每手耗时与黑胜率（贴 7.5 目），策略为 heavy（提子 / 逃跑 / 3x3 模式 / 不填眼）与 light（随机 + 不填眼）；
+并给出经 GoRule（is_valid_move + post_move_action）逐手落子的每手耗时作对照
+运行: python -m chess_platform.benchmarks.bench_goplayout [--sizes 9 19] [--seconds 5]
+"""
+import argparse
+import random
+import time
+
+from chess_platform.benchmarks.common import play_random
+from chess_platform.games.goplayout import GoBoard
+
+
+def measure(size: int, heavy: bool, seconds: float, seed: int):
+    rng = random.Random(seed)
+    root = GoBoard(size)
+    playouts = moves = black_wins = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        board = root.copy()
+        black_wins += board.playout(rng, heavy=heavy) > 0
+        playouts += 1
+        moves += board.moves
+    elapsed = time.perf_counter() - start
+    return playouts / elapsed, moves / playouts, elapsed / moves * 1e6, black_wins / playouts
+
+
+def rule_move_cost(size: int, seed: int) -> float:
+    """经 GameContext + GoRule 随机下 size^2 手的每手耗时（含逐点求合法着法）"""
+    start = time.perf_counter()
+    game = play_random("Go", size, size * size, seed=seed)
+    return (time.perf_counter() - start) / max(len(game.move_log), 1) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[9, 19])
+    parser.add_argument("--seconds", type=float, default=5.0, help="time per size and policy")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(f"{'size':>4} {'policy':>6} {'playouts/s':>11} {'moves':>6} {'us/move':>8} {'black':>6}")
+    for size in args.sizes:
+        for heavy in (True, False):
+            rate, length, per_move, black = measure(size, heavy, args.seconds, args.seed)
+            print(f"{size:>4} {'heavy' if heavy else 'light':>6} {rate:>11.0f} {length:>6.0f} "
+                  f"{per_move:>8.1f} {black:>6.0%}")
+        print(f"{size:>4} {'GoRule':>6} {'':>11} {'':>6} {rule_move_cost(size, args.seed):>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+自动存档日志基准：对比每步整盘存档与日志追加在界面线程上的开销，
+统计写线程的组提交效果（每次 fsync 覆盖的记录数）与长日志的恢复耗时
+运行: python -m chess_platform.benchmarks.bench_journal [--moves 200] [--burst 2000]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from chess_platform.games import journal as jn
+from chess_platform.games.logic import GameFactory
+
+
+def random_moves(size: int, count: int, seed: int = 0):
+    cells = [(x, y) for x in range(size) for y in range(size)]
+    random.Random(seed).shuffle(cells)
+    return cells[:count]
+
+
+def per_move(game_type: str, size: int, moves, hook) -> list:
+    """逐步落子，返回每步（make_move + hook）的耗时"""
+    game = GameFactory.create_game(game_type, size)
+    game.record_results = False
+    game.start()
+    hook(game, None)
+    times = []
+    for x, y in moves:
+        t = time.perf_counter()
+        game.make_move(x, y)
+        hook(game, (x, y))
+        times.append(time.perf_counter() - t)
+        if game.is_game_over:
+            break
+    return times
+
+
+def report(label: str, times: list, base: float = 0.0):
+    med = statistics.median(times)
+    p99 = sorted(times)[int(len(times) * 0.99)]
+    extra = f", +{(med - base) * 1e6:.1f} us over baseline" if base else ""
+    print(f"{label:<28} median {med * 1e6:8.1f} us, p99 {p99 * 1e6:8.1f} us{extra}")
+    return med
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=19)
+    parser.add_argument("--moves", type=int, default=200)
+    parser.add_argument("--burst", type=int, default=2000)
+    args = parser.parse_args()
+    # 用 Go 避免随机着法过早连五结束对局
+    moves = random_moves(args.size, args.moves)
+    with tempfile.TemporaryDirectory() as tmp:
+        base = report("make_move only", per_move("Go", args.size, moves, lambda g, m: None))
+
+        writer = jn.JournalWriter()
+
+        def with_journal(game, move):
+            if move is None:
+                jn.Journal.create(game, tmp, writer)
+        report("make_move + journal", per_move("Go", args.size, moves, with_journal), base)
+        writer.flush()
+
+        path = os.path.join(tmp, "full.sav")
+
+        def with_save(game, move):
+            if move is not None:
+                game.save_game(path)
+        report("make_move + save_game", per_move("Go", args.size, moves, with_save), base)
+
+        # 单条记录入队（界面线程上的全部开销）
+        j = jn.Journal(os.path.join(tmp, "raw.jnl"), writer)
+        n = 20000
+        t = time.perf_counter()
+        for i in range(n):
+            j.move(i % args.size, i // args.size % args.size, "Black")
+        print(f"journal.move enqueue: {(time.perf_counter() - t) / n * 1e6:.2f} us/record")
+        writer.flush()
+        j.close(discard=True)
+
+        # 突发落子：看组提交把多少条记录合并进一次 fsync
+        game = GameFactory.create_game("Gomoku", 15)
+        game.record_results = False
+        game.start()
+        j = jn.Journal.create(game, tmp, writer)
+        writer.flush()
+        commits, fsyncs = writer.commits, writer.fsyncs
+        t = time.perf_counter()
+        for i in range(args.burst):
+            j.move(i % 15, i // 15 % 15, "Black" if i % 2 == 0 else "White")
+        writer.flush()
+        elapsed = time.perf_counter() - t
+        c, f = writer.commits - commits, writer.fsyncs - fsyncs
+        print(f"burst: {args.burst} records durable in {elapsed * 1e3:.1f} ms, {c} commits, {f} fsyncs "
+              f"({args.burst / max(f, 1):.1f} records/fsync)")
+
+        # 恢复：整局（含悔棋）按日志重放
+        game = GameFactory.create_game("Go", args.size)
+        game.record_results = False
+        game.start()
+        j = jn.Journal.create(game, tmp, writer)
+        for i, (x, y) in enumerate(random_moves(args.size, args.size * args.size, seed=1)):
+            if game.make_move(x, y) and i % 10 == 9:
+                game.undo_move()
+        writer.flush()
+        t = time.perf_counter()
+        recovered = jn.recover(j.path)
+        print(f"recover: {j.seq} records -> {len(recovered.move_log)} moves in "
+              f"{(time.perf_counter() - t) * 1e3:.1f} ms ({os.path.getsize(j.path)} bytes)")
+        j.close(discard=True)
+        writer.flush()
+
+
+if __name__ == "__main__":
+    main()
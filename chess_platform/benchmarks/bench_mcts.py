@@ -0,0 +1,97 @@
+"""
+MCTS 棋力基准：两个引擎配置（默认 PUCT 对经典 UCT）在同等每步思考时间（或模拟次数）下对局，
+双方轮流执黑，每局用固定随机种子，开局库关闭；报告胜/和/负、得分率、Elo 差与每步模拟次数
+引擎写法: puct / uct，可加 +rave，@N 单独指定该引擎的每步模拟次数（如 puct+rave@200）
+运行: python -m chess_platform.benchmarks.bench_mcts [--games 20] [--time 0.5] [--size 15]
+      python -m chess_platform.benchmarks.bench_mcts --sims 400   # 按模拟次数，结果逐局可复现
+      python -m chess_platform.benchmarks.bench_mcts --sims 200 puct+rave@100 puct
+"""
+import argparse
+import math
+import random
+import time
+
+from chess_platform.games.ai import GomokuMCTS
+from chess_platform.games.logic import GameFactory
+
+
+def make_engine(spec: str, args) -> GomokuMCTS:
+    kind, _, sims = spec.lower().partition("@")
+    flags = kind.split("+")
+    if flags[0] not in ("puct", "uct") or not set(flags[1:]) <= {"rave"}:
+        raise ValueError(f"bad engine spec: {spec}")
+    fixed = int(sims) if sims else args.sims
+    ai = GomokuMCTS(simulations=fixed or 400, puct=flags[0] == "puct", rave="rave" in flags,
+                    time_limit=None if fixed else args.time, name=spec)
+    ai.use_book = False
+    return ai
+
+
+def play(black: GomokuMCTS, white: GomokuMCTS, size: int, seed: int):
+    """一局对弈，返回 (胜方颜色或 "Draw", 手数)"""
+    random.seed(seed)
+    game = GameFactory.create_game("Gomoku", size)
+    game.record_results = False
+    game.start()
+    engines = [black, white]
+    for ai in engines:
+        ai.reset()
+    while not game.is_game_over and len(game.move_log) < size * size:
+        move = engines[game.current_player_idx].select_move(game)
+        if move is None:
+            break
+        game.make_move(*move)
+    return (game.winner or "Draw") if game.is_game_over else "Draw", len(game.move_log)
+
+
+def elo(score: float, games: int):
+    """得分率对应的 Elo 差及约 95% 置信半宽"""
+    p = min(max(score, 0.5 / games), 1 - 0.5 / games)
+    diff = -400 * math.log10(1 / p - 1)
+    se = math.sqrt(p * (1 - p) / games)
+    slope = 400 / math.log(10) / (p * (1 - p))
+    return diff, 1.96 * se * slope
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--size", type=int, default=15)
+    parser.add_argument("--time", type=float, default=0.5, help="seconds per move")
+    parser.add_argument("--sims", type=int, default=0, help="fixed simulations per move instead of time")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("engines", nargs="*", default=["puct", "uct"], help="two engine specs (A is scored)")
+    args = parser.parse_args()
+    if len(args.engines) != 2:
+        parser.error("give exactly two engine specs")
+    eng_a, eng_b = make_engine(args.engines[0], args), make_engine(args.engines[1], args)
+    budget = f"{args.sims} sims/move" if args.sims else f"{args.time}s/move"
+    print(f"{eng_a.name} vs {eng_b.name}, {args.size}x{args.size} Gomoku, {budget}, {args.games} games")
+    wins = draws = losses = 0
+    moves = {id(eng_a): 0, id(eng_b): 0}
+    start = time.perf_counter()
+    for i in range(args.games):
+        black, white = (eng_a, eng_b) if i % 2 == 0 else (eng_b, eng_a)
+        before = eng_a.simulations_done, eng_b.simulations_done
+        result, length = play(black, white, args.size, args.seed + i // 2)
+        moves[id(black)] += (length + 1) // 2
+        moves[id(white)] += length // 2
+        a_color = "Black" if black is eng_a else "White"
+        if result == "Draw":
+            draws += 1
+        elif result == a_color:
+            wins += 1
+        else:
+            losses += 1
+        print(f"game {i + 1:3d}: A as {a_color:<5} -> {result:<5} in {length:3d} moves "
+              f"(sims A {eng_a.simulations_done - before[0]}, B {eng_b.simulations_done - before[1]})")
+    score = (wins + 0.5 * draws) / args.games
+    diff, margin = elo(score, args.games)
+    print(f"{eng_a.name} +{wins} ={draws} -{losses}, score {score:.1%}, Elo {diff:+.0f} ± {margin:.0f}")
+    for ai in (eng_a, eng_b):
+        print(f"{ai.name}: {ai.simulations_done / max(moves[id(ai)], 1):.0f} simulations/move")
+    print(f"elapsed {time.perf_counter() - start:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+单局内存占用基准：每个活跃对局（含悔棋历史与录像）的字节数，
+以及被 SessionManager 换出后每局保留的存档字节数
+运行: python -m chess_platform.benchmarks.bench_memory
+"""
+import gc
+import tracemalloc
+
+from chess_platform.benchmarks.common import play_random
+from chess_platform.games.savefile import encode
+
+CASES = [
+    ("Gomoku", 15, 100),
+    ("Go", 19, 200),
+    ("Othello", 8, 60),
+]
+
+
+def bytes_per_game(game_type: str, size: int, moves: int, count: int = 50) -> float:
+    # 先建一局预热（加载模块、享元对象等不计入）
+    play_random(game_type, size, moves, seed=0)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    games = [play_random(game_type, size, moves, seed=i) for i in range(count)]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    played = sum(len(g.move_log) for g in games) / count
+    return (after - before) / count, played
+
+
+def bytes_per_evicted(game_type: str, size: int, moves: int, count: int = 20) -> float:
+    blobs = [encode(play_random(game_type, size, moves, seed=i).to_save_data()) for i in range(count)]
+    return sum(len(b) for b in blobs) / count
+
+
+def main():
+    for game_type, size, moves in CASES:
+        per_game, played = bytes_per_game(game_type, size, moves)
+        evicted = bytes_per_evicted(game_type, size, moves)
+        print(f"{game_type:<8} {size}x{size} ~{played:.0f} moves: {per_game / 1024:8.1f} KiB per active game, "
+              f"{evicted:6.0f} B per evicted session")
+
+
+if __name__ == "__main__":
+    main()
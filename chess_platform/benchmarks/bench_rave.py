@@ -0,0 +1,77 @@
+"""
+RAVE 基准：在测试局面集上比较开/关 RAVE（UCT 与 PUCT 两种选点各测一遍，每组若干随机种子）
+- 每个局面跑一次 budget 次模拟的搜索，每 chunk 次检查一次访问最多的着法：
+  各模拟次数下选中正解的比例，以及解出所需的模拟次数（从该次数起到预算用完一直选中正解，
+  预算内没有解出的不计入中位数）
+- 只测 MCTS 本身：关掉开局库与走子前的 VCF/VCT 威胁搜索。默认引擎的威胁搜索在 MCTS 之前就把
+  这些战术题直接解掉，开不开 RAVE 都是 100%
+- 局面集：tactical 为一两步的战术题（GOMOKU_POSITIONS），PUCT 的模式先验几乎一眼看出；
+  hard 为中局里化解对方 VCF 与多步 VCF（GOMOKU_HARD_POSITIONS），默认的 PUCT 在几百次模拟内也解不稳
+运行: python -m chess_platform.benchmarks.bench_rave [--budget 800] [--chunk 25] [--seeds 3]
+"""
+import argparse
+import random
+import statistics
+import time
+from typing import List, Optional
+
+from chess_platform.benchmarks.positions import GOMOKU_HARD_POSITIONS, GOMOKU_POSITIONS, Position, setup
+from chess_platform.games.ai import GomokuMCTS
+
+ENGINES = (("UCT", False, False), ("UCT+RAVE", False, True), ("PUCT", True, False), ("PUCT+RAVE", True, True))
+
+
+def solve_curve(pos: Position, puct: bool, rave: bool, seed: int, budget: int, chunk: int) -> List[bool]:
+    """每 chunk 次模拟后访问最多的着法是否为正解"""
+    random.seed(seed)
+    ai = GomokuMCTS(puct=puct, rave=rave)
+    ai.use_book = False
+    ai.threat_nodes = 0
+    return [bool(infos) and infos[0].move in pos.solutions
+            for infos in ai.analyze_iter(setup(pos), top_k=1, budget=budget, chunk=chunk)]
+
+
+def sims_to_solve(curve: List[bool], chunk: int) -> Optional[int]:
+    """从哪次模拟起一直选中正解；最后一次检查仍未选中为 None"""
+    solved = None
+    for i, hit in enumerate(curve):
+        if not hit:
+            solved = None
+        elif solved is None:
+            solved = (i + 1) * chunk
+    return solved
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget", type=int, default=800, help="simulations per search")
+    parser.add_argument("--chunk", type=int, default=25, help="check the best move every chunk simulations")
+    parser.add_argument("--seeds", type=int, default=3)
+    args = parser.parse_args()
+    checks = args.budget // args.chunk
+    # 表中列出的模拟次数：chunk 起逐次翻倍
+    columns = []
+    n = args.chunk
+    while n <= args.budget:
+        columns.append(n)
+        n *= 2
+    print(f"accuracy by simulations per move; sims to solve = simulations from which the best move stays "
+          f"correct up to {args.budget} ({args.seeds} seeds, book and threat search off)")
+    for suite, positions in (("tactical", GOMOKU_POSITIONS), ("hard", GOMOKU_HARD_POSITIONS)):
+        print(f"\n{suite}: {len(positions)} positions")
+        print(f"{'engine':<10}" + "".join(f"{b:>6}" for b in columns)
+              + f"{'solved':>8}{'median':>8}{'mean':>7}")
+        for label, puct, rave in ENGINES:
+            t = time.perf_counter()
+            curves = [solve_curve(pos, puct, rave, seed, checks * args.chunk, args.chunk)
+                      for pos in positions for seed in range(args.seeds)]
+            accs = [sum(c[b // args.chunk - 1] for c in curves) / len(curves) for b in columns]
+            solved = [s for s in (sims_to_solve(c, args.chunk) for c in curves) if s is not None]
+            median = f"{statistics.median(solved):.0f}" if solved else "-"
+            mean = f"{statistics.mean(solved):.0f}" if solved else "-"
+            print(f"{label:<10}" + "".join(f"{a:>6.0%}" for a in accs)
+                  + f"{len(solved) / len(curves):>8.0%}{median:>8}{mean:>7}   ({time.perf_counter() - t:.0f}s)")
+
+
+if __name__ == "__main__":
+    main()
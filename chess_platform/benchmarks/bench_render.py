@@ -0,0 +1,354 @@
+"""
+GUI 棋盘重绘基准：旧版整盘重建 vs 增量渲染；
+以及 AI 对 AI（无走子间隔）时旧版（Tk 线程上搜索、每个通知同步重绘）vs 现在（后台线程搜索、按帧合并重绘）
+的走子速度、绘制次数、每秒绘制次数与事件循环的最长停顿
+运行: python -m chess_platform.benchmarks.bench_render [--headless]
+没有图形显示环境（或指定 --headless）时换用记录画布操作的 tkinter 替身：绘制逻辑照常执行，
+ms 只含 Python 侧耗时，items 为本应发给 Tk 的画布对象操作数（新建 / 删除 / 修改 / 移动的对象个数）
+"""
+import argparse
+import heapq
+import random
+import time
+import tkinter as tk
+import tkinter.constants
+import types
+
+from chess_platform.games.ai import RandomAI
+from chess_platform.games.logic import GameFactory
+from chess_platform.ui.gui import ChessGUI
+
+HEARTBEAT_MS = 10
+from chess_platform.games.rules import PASS
+
+
+# ============ 无显示环境：记录画布操作的 tkinter 替身 ============
+def _ignore(*args, **kwargs):
+    return None
+
+
+class HeadlessWidget:
+    """接受任何构造参数与配置、布局调用的控件"""
+    def __init__(self, master=None, *args, **kwargs):
+        self.master = master
+
+    def __getattr__(self, name):
+        return _ignore
+
+
+class HeadlessVar:
+    def __init__(self, master=None, value=None, **kwargs):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class HeadlessCanvas(HeadlessWidget):
+    """记录画布对象的 Canvas：items 累计被新建 / 删除 / 修改 / 移动的对象个数"""
+    def __init__(self, master=None, *args, **kwargs):
+        super().__init__(master)
+        self.objects = {}
+        self.next_id = 0
+        self.items = 0
+
+    def _create(self, *coords, tags=(), **kwargs):
+        self.next_id += 1
+        self.objects[self.next_id] = {tags} if isinstance(tags, str) else set(tags)
+        self.items += 1
+        return self.next_id
+
+    create_line = create_oval = create_rectangle = create_text = _create
+
+    def _find(self, tag):
+        if tag == "all":
+            return list(self.objects)
+        if isinstance(tag, int):
+            return [tag] if tag in self.objects else []
+        return [item for item, tags in self.objects.items() if tag in tags]
+
+    def delete(self, *tags):
+        for tag in tags:
+            for item in self._find(tag):
+                del self.objects[item]
+                self.items += 1
+
+    def itemconfig(self, tag, **kwargs):
+        self.items += len(self._find(tag))
+
+    def coords(self, tag, *coords):
+        self.items += len(self._find(tag))
+
+
+class HeadlessToplevel(HeadlessWidget):
+    """顶层窗口：定时器交给主窗口的事件循环"""
+    def __getattr__(self, name):
+        if name in ("after", "after_idle", "after_cancel", "update"):
+            return getattr(self.master, name)
+        return _ignore
+
+
+class HeadlessRoot(HeadlessWidget):
+    """按到期时间依次执行 after 回调的事件循环"""
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self.timers = []
+        self.cancelled = set()
+        self.next_id = 0
+        self.stopped = False
+
+    def after(self, ms, func, *args):
+        self.next_id += 1
+        heapq.heappush(self.timers, (time.perf_counter() + ms / 1000, self.next_id, func, args))
+        return self.next_id
+
+    def after_idle(self, func, *args):
+        return self.after(0, func, *args)
+
+    def after_cancel(self, after_id):
+        self.cancelled.add(after_id)
+
+    def mainloop(self):
+        self.stopped = False
+        while self.timers and not self.stopped:
+            due, after_id, func, args = heapq.heappop(self.timers)
+            if after_id in self.cancelled:
+                self.cancelled.discard(after_id)
+                continue
+            wait = due - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            func(*args)
+
+    def update(self):
+        """执行已到期的回调"""
+        while self.timers and self.timers[0][0] <= time.perf_counter():
+            due, after_id, func, args = heapq.heappop(self.timers)
+            if after_id in self.cancelled:
+                self.cancelled.discard(after_id)
+            else:
+                func(*args)
+
+    def quit(self):
+        self.stopped = True
+
+
+HEADLESS_TK = types.SimpleNamespace(
+    **{name: value for name, value in vars(tkinter.constants).items() if name.isupper()},
+    TclError=tk.TclError, Tk=HeadlessRoot, Toplevel=HeadlessToplevel, Canvas=HeadlessCanvas,
+    StringVar=HeadlessVar, IntVar=HeadlessVar, BooleanVar=HeadlessVar, DoubleVar=HeadlessVar,
+    **{name: HeadlessWidget for name in ("Frame", "LabelFrame", "Label", "Button", "Entry",
+                                         "OptionMenu", "Radiobutton", "Checkbutton", "Scale", "Listbox",
+                                         "Scrollbar", "Text")})
+
+
+def use_headless():
+    """本模块与 GUI 模块改用 tkinter 替身"""
+    global tk
+    from chess_platform.ui import gui
+    tk = gui.tk = HEADLESS_TK
+
+
+def canvas_items(canvas) -> int:
+    """替身画布上累计的对象操作数；真实 Tk 画布不统计"""
+    return getattr(canvas, "items", 0)
+
+
+def legacy_draw_pieces(gui: ChessGUI):
+    """复现旧版 draw_pieces：删除全部棋子后为每个落子点新建椭圆"""
+    gui.canvas.delete("piece")
+    gui.canvas.delete("marker")
+    board = gui.game.board
+    for r in range(board.size):
+        for c in range(board.size):
+            piece = board.get_piece(r, c)
+            if piece:
+                x = gui.margin + c * gui.cell_size
+                y = gui.margin + r * gui.cell_size
+                color = "black" if piece.color_name == "Black" else "white"
+                gui.canvas.create_oval(x - gui.piece_radius, y - gui.piece_radius,
+                                       x + gui.piece_radius, y + gui.piece_radius,
+                                       fill=color, outline="black", tags="piece")
+
+
+def make_view(root, game) -> ChessGUI:
+    """在独立的顶层窗口里构建完整的 ChessGUI（不弹登录框、不恢复/开新局），显示 game"""
+    gui = ChessGUI(tk.Toplevel(root), startup=False)
+    gui.set_game(game)
+    return gui
+
+
+def close_view(gui: ChessGUI):
+    """停止 AI 与待绘的帧，处理完已排入的空闲回调后关闭窗口"""
+    gui.game.board.detach(gui)
+    gui.cancel_ai()
+    gui.render.cancel()
+    gui.root.update()
+    gui.root.destroy()
+
+
+def fill_board(game, fraction: float, seed: int = 0):
+    rnd = random.Random(seed)
+    size = game.board.size
+    for r in range(size):
+        for c in range(size):
+            if rnd.random() < fraction:
+                game.board._put(r, c, game.players[rnd.randrange(2)])
+
+
+def bench(root, size: int, moves: int = 200):
+    game = GameFactory.create_game("Gomoku", size)
+    game.start()
+    fill_board(game, 0.8)
+    gui = make_view(root, game)
+    empties = [(r, c) for r in range(size) for c in range(size) if game.board.get_piece(r, c) is None]
+    rnd = random.Random(1)
+
+    t_old = t_new = 0.0
+    n_old = n_new = 0
+    for _ in range(moves):
+        r, c = rnd.choice(empties)
+        piece = game.players[rnd.randrange(2)]
+        game.board._put(r, c, piece)
+        game.board.last_move = (r, c)
+
+        t = time.perf_counter()
+        n = canvas_items(gui.canvas)
+        legacy_draw_pieces(gui)
+        root.update_idletasks()
+        t_old += time.perf_counter() - t
+        n_old += canvas_items(gui.canvas) - n
+        # 恢复为增量渲染维护的画布
+        gui.draw_board()
+
+        game.board._put(r, c, None)
+        gui.draw_pieces()
+        game.board._put(r, c, piece)
+        t = time.perf_counter()
+        n = canvas_items(gui.canvas)
+        gui.draw_cells([(r, c)])
+        root.update_idletasks()
+        t_new += time.perf_counter() - t
+        n_new += canvas_items(gui.canvas) - n
+        game.board._put(r, c, None)
+    print(f"{size}x{size} 80% full: legacy {t_old / moves * 1e3:7.3f}ms/move {n_old / moves:6.0f} items"
+          f"  incremental {t_new / moves * 1e3:7.3f}ms/move {n_new / moves:6.0f} items")
+    close_view(gui)
+
+
+def bench_ai_game(root, game_type: str, size: int, inline: bool, engine: str = "ai-rand", max_moves: int = 200):
+    """
+    AI 对 AI 下 max_moves 手。inline=True 复现旧版：AI 在 Tk 线程上搜索，每个棋盘通知立刻重绘；
+    否则走 ChessGUI 自己的流程：双方都是 AI 时不停顿（ai_vs_ai_delay_ms=0），后台线程搜索，按帧合并重绘。
+    另有每 HEARTBEAT_MS 一次的心跳，记录事件循环两次心跳间的最长间隔（界面卡住的时长）。
+    返回 (每秒步数, 通知数, 绘制次数, 合并掉的次数, 绘制总耗时, 每秒绘制次数, 最长间隔)
+    """
+    from chess_platform.games.ai import create_ai
+    random.seed(0)
+    game = GameFactory.create_game(game_type, size)
+    game.record_results = False
+    game.start()
+    gui = make_view(root, game)
+    gui.show_winner_alert = lambda: None
+    render = gui.render
+    painted = [0.0]
+
+    def timed_paint(cells, full):
+        t = time.perf_counter()
+        gui._paint(cells, full)
+        painted[0] += time.perf_counter() - t
+
+    render.paint = timed_paint
+    players = [create_ai(engine, game_type), create_ai(engine, game_type)]
+    for ai in players:
+        # 随机 AI 不进残局求解，测的是界面而不是引擎
+        if isinstance(ai, RandomAI):
+            ai.endgame_empties = 0
+
+    def done() -> bool:
+        return game.is_game_over or game.passes >= 2 or len(game.move_log) >= max_moves
+
+    if inline:
+        mark = render.mark
+
+        def mark_and_paint(*args, **kwargs):
+            mark(*args, **kwargs)
+            render.flush()
+
+        render.mark = mark_and_paint
+
+        def step():
+            if done():
+                return
+            move = players[game.current_player_idx].select_move(game)
+            if move is None:
+                if game.game_type != "Othello":
+                    return
+                game.pass_turn()
+            elif move == PASS:
+                game.pass_turn()
+            else:
+                game.make_move(*move)
+            root.after(0, step)
+
+        root.after(0, step)
+    else:
+        game.controllers[:] = players
+        gui.schedule_ai()
+
+    beat = [time.perf_counter(), 0.0]
+
+    def heartbeat():
+        now = time.perf_counter()
+        beat[1] = max(beat[1], now - beat[0])
+        beat[0] = now
+        # 对局结束、到达手数或 AI 不再走子（无步可走）时退出
+        stalled = not inline and gui.ai_after_id is None and gui.ai_poll_id is None
+        if done() or stalled:
+            root.quit()
+            return
+        root.after(HEARTBEAT_MS, heartbeat)
+
+    root.after(HEARTBEAT_MS, heartbeat)
+    t = time.perf_counter()
+    root.mainloop()
+    render.flush()
+    elapsed = time.perf_counter() - t
+    moves = len(game.move_log)
+    close_view(gui)
+    return (moves / elapsed, render.events, render.paints, render.skipped, painted[0], render.paints / elapsed,
+            beat[1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--headless", action="store_true", help="不用图形显示，改用记录画布操作的替身")
+    args = parser.parse_args()
+    if args.headless:
+        use_headless()
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"no display available, using the headless canvas: {e}")
+        use_headless()
+        root = tk.Tk()
+    for size in (15, 19):
+        bench(root, size)
+    print(f"\n{'AI vs AI':<18} {'mode':<6} {'moves/s':>8} {'events':>7} {'paints':>7} {'skipped':>8} "
+          f"{'paint_ms':>9} {'paints/s':>9} {'stall_ms':>9}")
+    for game_type, size, engine, max_moves in (("Othello", 8, "ai-rand", 200), ("Go", 19, "ai-rand", 200),
+                                               ("Gomoku", 15, "ai-rand", 200), ("Go", 9, "ai-mcts", 4)):
+        for inline in (True, False):
+            rate, events, paints, skipped, painted, paint_rate, stall = bench_ai_game(
+                root, game_type, size, inline, engine, max_moves)
+            print(f"{f'{game_type} {size} {engine}':<18} {'inline' if inline else 'gui':<6} {rate:>8.1f} "
+                  f"{events:>7} {paints:>7} {skipped:>8} {painted * 1e3:>9.0f} {paint_rate:>9.1f} "
+                  f"{stall * 1e3:>9.0f}")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
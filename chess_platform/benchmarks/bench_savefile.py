@@ -0,0 +1,69 @@
+"""
+存档格式基准：旧版 pickle vs 紧凑二进制格式
+运行: python -m chess_platform.benchmarks.bench_savefile
+"""
+import glob
+import os
+import pickle
+import tempfile
+
+from chess_platform.benchmarks.common import play_random, timeit
+from chess_platform.games import savefile
+
+
+def legacy_save(game, filepath: str):
+    """复现旧版 save_game：pickle 整个数据字典"""
+    data = {
+        "type": game.game_type,
+        "size": game.board.size,
+        "snapshot": game.board.get_snapshot(),
+        "current_player": game.current_player_idx,
+        "history_len": len(game.history),
+        "players_name": game.players_name,
+        "players_role": game.players_role,
+        "players_account": game.players_account,
+        "move_log": game.move_log,
+    }
+    with open(filepath, "wb") as f:
+        pickle.dump(data, f)
+
+
+def legacy_load(filepath: str):
+    with open(filepath, "rb") as f:
+        return pickle.load(f)
+
+
+def bench_game(label: str, game, tmpdir: str):
+    old_path = os.path.join(tmpdir, "old.dat")
+    new_path = os.path.join(tmpdir, "new.dat")
+    kf_path = os.path.join(tmpdir, "kf.dat")
+    t_old_save = timeit(lambda: legacy_save(game, old_path))
+    t_old_load = timeit(lambda: legacy_load(old_path))
+    t_new_save = timeit(lambda: game.save_game(new_path))
+    t_new_load = timeit(lambda: savefile.read_save(new_path))
+    t_meta_load = timeit(lambda: savefile.read_save(new_path, replay=False))
+    game.save_game(kf_path, keyframe_interval=32)
+    print(f"{label:<22} moves={len(game.move_log):<4}"
+          f" size: pickle {os.path.getsize(old_path):>6}B  compact {os.path.getsize(new_path):>5}B"
+          f"  (+kf32 {os.path.getsize(kf_path):>5}B)")
+    print(f"{'':<22} save: pickle {t_old_save*1e3:7.3f}ms  compact {t_new_save*1e3:7.3f}ms")
+    print(f"{'':<22} load: pickle {t_old_load*1e3:7.3f}ms  compact {t_new_load*1e3:7.3f}ms"
+          f"  (meta only {t_meta_load*1e3:.3f}ms)")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        bench_game("Gomoku 15x15", play_random("Gomoku", 15, 120, seed=1), tmpdir)
+        bench_game("Go 19x19", play_random("Go", 19, 200, seed=2), tmpdir)
+        bench_game("Othello 8x8", play_random("Othello", 8, 60, seed=3), tmpdir)
+
+    saves = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "cundang", "*.dat")))
+    for path in saves:
+        data = savefile.read_save(path)
+        raw = savefile.encode(data)
+        print(f"legacy {os.path.basename(path)}: {os.path.getsize(path)}B -> compact {len(raw)}B"
+              f"{' (final position stored)' if not data['move_log'] else ''}")
+
+
+if __name__ == "__main__":
+    main()
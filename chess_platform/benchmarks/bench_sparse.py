@@ -0,0 +1,76 @@
+"""
+稀疏棋盘基准：同样的对局在不同名义路数下的每手开销（稠密 vs 稀疏）
+每局由二级 AI（启发式）双方对弈固定手数，分别统计 AI 选点、落子（规则校验+胜负判断）、
+CLI 视口渲染的平均耗时，以及棋盘对象占用的内存
+运行: python -m chess_platform.benchmarks.bench_sparse [--moves 40] [--sizes 15 50 100 1000 0]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from chess_platform.games.ai import GomokuHeuristicAI
+from chess_platform.games.logic import GameFactory
+from chess_platform.ui.cli import VIEW_SIZE, ScreenBuilder
+
+
+def board_memory(size: int, sparse: bool) -> int:
+    tracemalloc.start()
+    game = GameFactory.create_game("Gomoku", size, sparse=sparse)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del game
+    return current
+
+
+def run(size: int, sparse: bool, moves: int, seed: int = 0):
+    """返回 (手数, AI 每手秒数, 落子每手秒数, 渲染每手秒数)"""
+    random.seed(seed)
+    game = GameFactory.create_game("Gomoku", size, sparse=sparse)
+    game.record_results = False
+    game.start()
+    ai = GomokuHeuristicAI()
+    ai.use_book = False
+    t_ai = t_move = t_render = 0.0
+    n = 0
+    while n < moves and not game.is_game_over:
+        t = time.perf_counter()
+        move = ai.select_move(game)
+        t_ai += time.perf_counter() - t
+        t = time.perf_counter()
+        game.make_move(*move)
+        t_move += time.perf_counter() - t
+        t = time.perf_counter()
+        board = game.board
+        view = min(board.size, VIEW_SIZE)
+        r, c = board.last_move
+        limit = board.size - view
+        builder = ScreenBuilder()
+        builder.add_board(board, (max(0, min(limit, r - view // 2)), max(0, min(limit, c - view // 2))), view)
+        builder.build()
+        t_render += time.perf_counter() - t
+        n += 1
+    return n, t_ai / n, t_move / n, t_render / n
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--moves", type=int, default=40)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[15, 50, 100, 1000, 0],
+                        help="0 表示无限棋盘（只测稀疏）")
+    parser.add_argument("--dense-max", type=int, default=100, help="稠密棋盘只测到该路数")
+    args = parser.parse_args()
+    print(f"{'size':>7} {'board':>6} {'moves':>5} {'ai_ms':>8} {'move_ms':>8} {'render_ms':>9} {'board_KiB':>10}")
+    for size in args.sizes:
+        for sparse in (False, True):
+            if not sparse and (size <= 0 or size > args.dense_max):
+                continue
+            n, ai, move, render = run(size, sparse, args.moves)
+            mem = board_memory(size, sparse) / 1024
+            label = "inf" if size <= 0 else str(size)
+            print(f"{label:>7} {'sparse' if sparse else 'dense':>6} {n:>5} {ai * 1e3:>8.3f} {move * 1e3:>8.3f} "
+                  f"{render * 1e3:>9.3f} {mem:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+启动开销基准：冷解释器下各入口的导入耗时（基于 python -X importtime）
+运行: python -m chess_platform.benchmarks.bench_startup
+"""
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ENTRY_POINTS = [
+    ("interpreter", "pass"),
+    ("cli", "import chess_platform.main; from chess_platform.ui.cli import ConsoleUI"),
+    ("library", "from chess_platform.games.logic import GameFactory"),
+    ("benchmarks", "import chess_platform.benchmarks.common"),
+]
+
+
+def run_importtime(code: str):
+    """返回 (总耗时 ms, [(累计 us, 模块名)], 已加载模块集合)"""
+    probe = code + "; import sys; print('\\n'.join(sys.modules))"
+    t = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", probe],
+                          cwd=ROOT, capture_output=True, text=True)
+    wall = (time.perf_counter() - t) * 1e3
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cum_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cum_us), name.strip()))
+    return wall, rows, set(proc.stdout.split())
+
+
+def main():
+    for label, code in ENTRY_POINTS:
+        best_wall = None
+        for _ in range(5):
+            wall, rows, modules = run_importtime(code)
+            best_wall = wall if best_wall is None else min(best_wall, wall)
+        top = sorted((r for r in rows if r[1].startswith("chess_platform") or r[0] > 2000), reverse=True)[:5]
+        print(f"{label:<12} wall {best_wall:6.1f}ms  tkinter loaded: {'tkinter' in modules}")
+        for cum, name in top:
+            print(f"{'':<12} {cum / 1e3:6.2f}ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+终端渲染基准：旧版每次通知整盘打印 vs 合并通知 + 差量重绘
+运行: python -m chess_platform.benchmarks.bench_terminal
+"""
+import io
+import random
+
+from chess_platform.core.patterns import Observer
+from chess_platform.games import ai
+from chess_platform.games.logic import GameFactory
+from chess_platform.ui.cli import ScreenBuilder
+from chess_platform.ui.term import TerminalRenderer
+
+
+class LegacyConsole(Observer):
+    """复现旧版 ConsoleUI.update：每次棋盘通知都整盘打印"""
+    def __init__(self, game, out):
+        self.game = game
+        self.out = out
+
+    def update(self, subject, *args, **kwargs):
+        builder = ScreenBuilder()
+        builder.add_header(self.game)
+        builder.add_board(self.game.board)
+        builder.add_instructions(True)
+        self.out.write(builder.build() + "\n")
+
+
+def frame(game) -> str:
+    builder = ScreenBuilder()
+    builder.add_header(game)
+    builder.add_board(game.board)
+    builder.add_instructions(True)
+    return builder.build()
+
+
+def run(game_type: str, size: int, max_moves: int, seed: int = 0):
+    rnd = random.Random(seed)
+    game = GameFactory.create_game(game_type, size)
+    legacy_out = io.StringIO()
+    game.board.attach(LegacyConsole(game, legacy_out))
+    game.start()
+    renderers = {"ansi": TerminalRenderer(io.StringIO(), ansi=True),
+                 "plain": TerminalRenderer(io.StringIO(), ansi=False)}
+    for r in renderers.values():
+        r.draw(frame(game))
+    base_legacy = len(legacy_out.getvalue().encode("utf-8"))
+    base = {k: r.bytes_written for k, r in renderers.items()}
+
+    moves = 0
+    while not game.is_game_over and moves < max_moves:
+        legal = ai.legal_moves(game)
+        if not legal:
+            game.switch_player()
+            if not ai.legal_moves(game):
+                break
+            continue
+        game.make_move(*rnd.choice(legal))
+        moves += 1
+        # 新实现：一手棋只渲染一次
+        for r in renderers.values():
+            r.draw(frame(game))
+    legacy = (len(legacy_out.getvalue().encode("utf-8")) - base_legacy) / moves
+    ansi = (renderers["ansi"].bytes_written - base["ansi"]) / moves
+    plain = (renderers["plain"].bytes_written - base["plain"]) / moves
+    print(f"{game_type:<8} {size}x{size} moves={moves:<4} bytes/move: legacy {legacy:9.0f}"
+          f"  plain(coalesced) {plain:7.0f}  ansi(diff) {ansi:6.0f}  ({legacy / ansi:.0f}x less)")
+
+
+def main():
+    run("Othello", 8, 60)
+    run("Gomoku", 15, 100)
+    run("Go", 19, 200)
+
+
+if __name__ == "__main__":
+    main()
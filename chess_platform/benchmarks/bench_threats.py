@@ -0,0 +1,133 @@
+"""
+威胁空间搜索基准：
+1. 固定测试局面集（benchmarks/positions.py）：求解器给出的着法是否在正解集合内、耗时
+2. 生成局面：启发式 AI（关闭威胁搜索、掺入随机着法）自对弈，逐手取局面，
+   先用大预算求解器确定"己方 VCF / 己方 VCT / 须化解对方 VCF / 须化解对方 VCT"的局面，
+   再统计默认预算（各 AI 等级的节点上限）下的解出率与延迟；
+   己方必胜的主变（守方取被迫/第一个应对）在真实棋盘上按规则重放到成五，
+   化解着法用大预算求解器复核对方已无同类必胜
+运行: python -m chess_platform.benchmarks.bench_threats [--games 10] [--seed 0]
+"""
+import argparse
+import random
+import time
+from collections import defaultdict
+
+from chess_platform.benchmarks.positions import GOMOKU_POSITIONS, setup
+from chess_platform.games.ai import GomokuHeuristicAI, GomokuMCTS, RandomAI, legal_moves
+from chess_platform.games.logic import GameFactory
+from chess_platform.games.threats import ThreatSolver
+
+REFERENCE = dict(max_nodes=100_000, time_limit=5.0)
+
+
+def generate(games: int, size: int, seed: int):
+    """自对弈产生的局面（每个为可独立使用的对局副本）"""
+    rnd = random.Random(seed)
+    random.seed(seed)
+    ai = GomokuHeuristicAI()
+    ai.threat_nodes = 0
+    ai.use_book = False
+    positions = []
+    for _ in range(games):
+        game = GameFactory.create_game("Gomoku", size)
+        game.record_results = False
+        game.start()
+        while not game.is_game_over and len(game.move_log) < size * size:
+            moves = legal_moves(game)
+            if rnd.random() < 0.25 and game.move_log:
+                last = game.move_log[-1]
+                near = [m for m in moves if abs(m[0] - last["x"]) <= 2 and abs(m[1] - last["y"]) <= 2]
+                move = rnd.choice(near or moves)
+            else:
+                move = ai.select_move(game)
+            game.make_move(*move)
+            if len(game.move_log) >= 6 and not game.is_game_over:
+                positions.append(game.clone_position())
+    return positions
+
+
+def replay_wins(game, pv) -> bool:
+    """在真实对局上按规则重放主变，核对以当前方成五结束"""
+    trial = game.clone_position()
+    me = trial.current_player.color_name
+    for x, y in pv:
+        if not trial.make_move(x, y):
+            return False
+    return trial.is_game_over and trial.winner == me
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--size", type=int, default=15)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print("fixed suite:")
+    for pos in GOMOKU_POSITIONS:
+        solver = ThreatSolver()
+        game = setup(pos)
+        t = time.perf_counter()
+        move, kind = solver.solve(game)
+        ms = (time.perf_counter() - t) * 1e3
+        print(f"  {pos.name:<26} {str(move):<9} {kind:<11} {'ok' if move in pos.solutions else 'MISS':<4} "
+              f"{solver.nodes:>5} nodes {ms:6.2f} ms")
+
+    t = time.perf_counter()
+    positions = generate(args.games, args.size, args.seed)
+    print(f"\ngenerated {len(positions)} positions from {args.games} games in {time.perf_counter() - t:.0f}s")
+    reference = ThreatSolver(**REFERENCE)
+    classes = defaultdict(list)
+    for game in positions:
+        move, kind = reference.solve(game)
+        if kind in ("vcf", "vct", "defend-vcf", "defend-vct"):
+            classes[kind].append(game)
+        elif not kind:
+            classes["quiet"].append(game)
+    print("reference: " + ", ".join(f"{k} {len(v)}" for k, v in sorted(classes.items())))
+
+    levels = [("RandomAI", RandomAI.threat_nodes), ("HeuristicAI", GomokuHeuristicAI.threat_nodes),
+              ("MCTS", GomokuMCTS.threat_nodes)]
+    print(f"\n{'level':<12} {'nodes':>6} {'class':<11} {'solved':>12} {'verified':>9} "
+          f"{'median ms':>9} {'p95 ms':>8} {'max ms':>8}")
+    for label, nodes in levels:
+        for kind in ("vcf", "vct", "defend-vcf", "defend-vct", "quiet"):
+            games = classes.get(kind, [])
+            if not games:
+                continue
+            solved = verified = 0
+            times = []
+            for game in games:
+                solver = ThreatSolver(nodes)
+                t = time.perf_counter()
+                move, got = solver.solve(game)
+                times.append((time.perf_counter() - t) * 1e3)
+                if kind == "quiet":
+                    # 安静局面：不应报出必胜/化解
+                    solved += got == ""
+                    verified += got == ""
+                    continue
+                if got != kind:
+                    continue
+                solved += 1
+                if kind in ("vcf", "vct"):
+                    pv = ThreatSolver(**REFERENCE).find_win(game)
+                    verified += bool(pv) and replay_wins(game, pv)
+                else:
+                    trial = game.clone_position()
+                    trial.make_move(*move)
+                    check = ThreatSolver(**REFERENCE)
+                    verified += check.find_win(trial, vct=kind == "defend-vct") is None
+            print(f"{label:<12} {nodes:>6} {kind:<11} {solved:>5}/{len(games):<4} ({solved / len(games):4.0%}) "
+                  f"{verified:>5}/{solved:<3} {percentile(times, 0.5):>9.2f} {percentile(times, 0.95):>8.2f} "
+                  f"{max(times):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
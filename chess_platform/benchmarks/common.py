@@ -0,0 +1,39 @@
+import random
+import time
+from typing import Callable
+
+from chess_platform.games.logic import GameFactory, GameContext
+from chess_platform.games import ai
+
+# 基准测试公共工具：无界面地生成对局、计时
+
+
+def play_random(game_type: str, size: int, max_moves: int, seed: int = 0) -> GameContext:
+    """随机合法落子生成一局（不接 UI），Othello 无步时自动换手"""
+    rnd = random.Random(seed)
+    game = GameFactory.create_game(game_type, size)
+    game.record_results = False
+    game.start()
+    passes = 0
+    while not game.is_game_over and len(game.move_log) < max_moves:
+        moves = ai.legal_moves(game)
+        if not moves:
+            passes += 1
+            if passes >= 2:
+                break
+            game.switch_player()
+            continue
+        passes = 0
+        x, y = rnd.choice(moves)
+        game.make_move(x, y)
+    return game
+
+
+def timeit(fn: Callable, repeat: int = 20) -> float:
+    """返回单次调用的最佳耗时（秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best
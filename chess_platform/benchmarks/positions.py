@@ -0,0 +1,95 @@
+"""
+五子棋测试局面集（15 路）：每个局面给出黑白棋子、执子方与可接受的着法集合，
+供搜索类基准按"选中正解的比例"衡量着法质量；GOMOKU_POSITIONS 为一两步的战术题，
+GOMOKU_HARD_POSITIONS 为中局里化解对方必胜的防守题
+"""
+from typing import List, NamedTuple, Set, Tuple
+
+from chess_platform.games.logic import GameContext, GameFactory
+
+Move = Tuple[int, int]
+
+
+class Position(NamedTuple):
+    name: str
+    black: List[Move]
+    white: List[Move]
+    to_move: int  # 0 黑 / 1 白
+    solutions: Set[Move]
+
+
+GOMOKU_POSITIONS: List[Position] = [
+    Position("win-in-1 row", [(7, 4), (7, 5), (7, 6), (7, 7)], [(7, 3), (6, 4), (8, 5), (2, 12)], 0, {(7, 8)}),
+    Position("block four row", [(7, 4), (7, 5), (7, 6), (7, 7), (3, 3)], [(7, 3), (6, 6), (8, 8), (9, 9)], 1,
+             {(7, 8)}),
+    Position("block open three", [(7, 5), (7, 6), (7, 7)], [(6, 6), (8, 7)], 1, {(7, 4), (7, 8)}),
+    Position("make open four", [(7, 5), (7, 6), (7, 7)], [(6, 6), (8, 7), (3, 11)], 0, {(7, 4), (7, 8)}),
+    Position("win-in-1 diagonal", [(3, 3), (4, 4), (5, 5), (6, 6)], [(2, 2), (3, 4), (4, 5), (9, 1)], 0,
+             {(7, 7)}),
+    Position("block split four", [(3, 3), (4, 4), (6, 6), (7, 7), (10, 2)], [(2, 2), (5, 6), (8, 1), (1, 12)], 1,
+             {(5, 5)}),
+    Position("win-in-1 split column", [(3, 7), (4, 7), (6, 7), (7, 7)], [(2, 7), (5, 6), (5, 8), (12, 12)], 0,
+             {(5, 7)}),
+    Position("win before defending", [(10, 2), (4, 4), (4, 5), (4, 6), (1, 1)],
+             [(10, 3), (10, 4), (10, 5), (10, 6)], 1, {(10, 7)}),
+    Position("four-three", [(7, 7), (7, 8), (7, 9), (8, 10), (9, 10)],
+             [(7, 6), (5, 5), (12, 3), (13, 13), (0, 14)], 0, {(7, 10)}),
+    Position("block open three column", [(5, 9), (6, 9), (7, 9), (12, 1)], [(6, 8), (8, 10), (1, 1)], 1,
+             {(4, 9), (8, 9)}),
+    Position("win against open four", [(2, 2), (2, 3), (2, 4), (2, 5), (9, 9)],
+             [(2, 1), (11, 4), (11, 5), (11, 6), (11, 7)], 0, {(2, 6)}),
+]
+
+# 中局的防守题：对方（若轮到其走）有 VCF/VCT 必胜，执子方自己没有冲四与必胜。取自启发式 AI 与随机落子
+# 的对局，正解为落下后对方不再有 VCF/VCT 的全部着法（经 games/threats.py 逐点验证）。
+# 一眼看去的好点往往不是正解，PUCT 的模式先验帮不上忙，几十到几百次模拟都未必选得稳
+GOMOKU_HARD_POSITIONS: List[Position] = [
+    Position("stop forcing win 1", [(6, 5), (7, 5), (7, 6), (7, 7), (8, 5)], [(6, 6), (7, 4), (8, 6),
+             (8, 7)], 1, {(5, 5)}),
+    Position("stop forcing win 2", [(6, 5), (7, 7), (7, 8), (8, 6), (8, 8)], [(5, 7), (6, 6), (7, 5), (7, 6),
+             (8, 7)], 0, {(4, 8), (8, 4)}),
+    Position("stop forcing win 3", [(5, 6), (6, 6), (7, 5), (7, 7), (8, 4), (8, 7)], [(6, 5), (6, 7), (7, 6),
+             (8, 6), (9, 7)], 1, {(5, 7)}),
+    Position("stop forcing win 4", [(5, 7), (7, 6), (7, 7), (7, 8), (8, 8), (9, 7), (9, 8)], [(6, 6), (6, 7),
+             (8, 6), (8, 7), (9, 6), (10, 8)], 1, {(7, 9)}),
+    Position("stop forcing win 5", [(3, 8), (4, 6), (5, 7), (5, 8), (6, 5), (6, 7), (7, 7)], [(4, 7), (5, 6),
+             (6, 6), (6, 8), (7, 6), (7, 8), (8, 7)], 0, {(6, 9), (8, 6), (9, 6), (10, 5)}),
+    Position("stop forcing win 6", [(5, 7), (5, 8), (5, 9), (6, 6), (6, 10), (7, 7), (7, 8), (7, 9)], [(4, 6),
+             (5, 6), (6, 7), (6, 8), (6, 9), (7, 6), (8, 8)], 1, {(7, 11)}),
+    Position("stop forcing win 7", [(6, 6), (7, 7), (8, 4), (8, 5), (8, 7), (9, 5), (9, 7), (10, 6)], [(6, 7),
+             (7, 5), (7, 6), (8, 6), (8, 8), (9, 4), (9, 6)], 1, {(11, 7)}),
+    Position("stop forcing win 8", [(5, 7), (6, 8), (7, 7), (7, 9), (8, 7), (8, 9), (9, 7), (10, 8)], [(6, 7),
+             (6, 9), (7, 8), (8, 6), (8, 8), (9, 5), (9, 8)], 1, {(8, 10)}),
+    Position("stop forcing win 9", [(5, 8), (6, 6), (6, 7), (6, 11), (7, 7), (7, 9), (8, 7), (8, 9),
+             (9, 8)], [(5, 7), (5, 12), (6, 8), (6, 9), (6, 10), (7, 6), (7, 8), (8, 8)], 1, {(7, 10), (9, 7),
+             (10, 7)}),
+    Position("stop forcing win 10", [(3, 5), (4, 5), (4, 7), (5, 6), (5, 8), (6, 5), (6, 6), (6, 7), (6, 9),
+             (7, 7), (7, 9), (8, 7), (8, 10), (9, 8)], [(3, 6), (4, 6), (5, 5), (5, 7), (6, 8), (7, 6), (7, 8),
+             (7, 10), (8, 6), (8, 8), (8, 9), (9, 7), (9, 9)], 1, {(3, 8), (7, 4)}),
+    Position("stop forcing win 11", [(2, 8), (3, 7), (3, 9), (3, 10), (4, 7), (4, 11), (5, 7), (5, 8), (5, 9),
+             (5, 10), (6, 6), (6, 10), (7, 7), (7, 8), (8, 7)], [(2, 7), (2, 9), (3, 6), (3, 8), (4, 6), (4, 8),
+             (4, 9), (4, 10), (5, 6), (5, 11), (6, 7), (6, 8), (6, 9), (7, 6), (7, 9)], 0, {(0, 5), (1, 6),
+             (2, 6)}),
+    Position("stop forcing win 12", [(5, 6), (5, 8), (6, 7), (6, 8), (7, 5), (7, 7), (8, 5), (8, 7), (8, 8),
+             (8, 9), (9, 5), (9, 9), (10, 6), (10, 8), (11, 6), (11, 7)], [(5, 7), (6, 5), (6, 6), (6, 9),
+             (7, 6), (7, 8), (7, 9), (8, 6), (8, 10), (9, 6), (9, 7), (9, 8), (10, 5), (10, 7),
+             (11, 5)], 1, {(12, 8)}),
+    Position("stop forcing win 13", [(4, 5), (4, 6), (4, 8), (5, 3), (5, 4), (5, 8), (6, 5), (6, 6), (6, 7),
+             (7, 4), (7, 7), (7, 8), (7, 9), (8, 5), (8, 7), (8, 10), (9, 4), (9, 7), (9, 8), (9, 10), (10, 6),
+             (10, 10), (11, 7), (11, 8), (11, 9), (12, 6), (13, 5)], [(4, 4), (4, 7), (5, 5), (5, 6), (5, 7),
+             (6, 3), (6, 4), (6, 8), (6, 9), (6, 10), (7, 5), (7, 6), (7, 10), (8, 6), (8, 8), (8, 9), (8, 11),
+             (9, 5), (9, 6), (9, 9), (9, 11), (10, 7), (10, 8), (10, 9), (11, 6), (11, 10),
+             (12, 8)], 0, {(7, 11), (10, 11)}),
+]
+
+
+def setup(position: Position, size: int = 15) -> GameContext:
+    """按局面摆好棋子的对局（无录像，不记战绩）"""
+    game = GameFactory.create_game("Gomoku", size)
+    game.record_results = False
+    game.start()
+    for stones, piece in ((position.black, game.players[0]), (position.white, game.players[1])):
+        for x, y in stones:
+            game.board.place_piece(x, y, piece)
+    game.current_player_idx = position.to_move
+    return game
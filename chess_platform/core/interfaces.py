@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 from .patterns import Subject, PieceType, PieceFactory
 
 class Board(Subject):
@@ -7,6 +7,10 @@ class Board(Subject):
     棋盘基类
     继承 Subject 是为了让 UI (Observer) 能监听到棋盘变化
     """
+    __slots__ = ("size", "_grid", "last_move", "_journal")
+    # 稀疏棋盘（SparseBoard）为 True：只能按棋子遍历，不能整盘扫描
+    is_sparse = False
+
     def __init__(self, size: int):
         super().__init__()
         self.size = size
@@ -14,6 +18,8 @@ class Board(Subject):
         # None 表示空位
         self._grid: List[List[Optional[PieceType]]] = [[None for _ in range(size)] for _ in range(size)]
         self.last_move: Optional[Tuple[int, int]] = None
+        # 变更记录：非 None 时 place/remove 会记下 (x, y, 原棋子)，用于增量悔棋
+        self._journal: Optional[List[Tuple[int, int, Optional[PieceType]]]] = None
 
     def is_valid_pos(self, x: int, y: int) -> bool:
         return 0 <= x < self.size and 0 <= y < self.size
@@ -25,22 +31,78 @@ class Board(Subject):
 
     def place_piece(self, x: int, y: int, piece: PieceType):
         if self.is_valid_pos(x, y):
-            self._grid[x][y] = piece
+            if self._journal is not None:
+                self._journal.append((x, y, self.get_piece(x, y)))
+            self._put(x, y, piece)
             self.last_move = (x, y)
             # 通知观察者(UI)更新
             self.notify(event="place", pos=(x, y), piece=piece)
 
     def remove_piece(self, x: int, y: int):
         if self.is_valid_pos(x, y):
-            old_piece = self._grid[x][y]
-            self._grid[x][y] = None
+            old_piece = self.get_piece(x, y)
+            if self._journal is not None:
+                self._journal.append((x, y, old_piece))
+            self._put(x, y, None)
             self.notify(event="remove", pos=(x, y), piece=old_piece)
 
+    def _put(self, x: int, y: int, piece: Optional[PieceType]):
+        """不发通知、不记变更地写一个格子（落子/提子/悔棋/回放共用）"""
+        self._grid[x][y] = piece
+
+    def stones(self) -> Iterator[Tuple[int, int, PieceType]]:
+        """遍历盘上所有棋子 (x, y, 棋子)"""
+        for x, row in enumerate(self._grid):
+            for y, p in enumerate(row):
+                if p is not None:
+                    yield x, y, p
+
+    def stone_count(self) -> int:
+        return sum(1 for row in self._grid for p in row if p is not None)
+
+    def is_full(self) -> bool:
+        return all(p is not None for row in self._grid for p in row)
+
+    def bounds(self) -> Optional[Tuple[int, int, int, int]]:
+        """棋子的外接矩形 (min_x, min_y, max_x, max_y)，空盘为 None"""
+        xs = []
+        ys = []
+        for x, y, _ in self.stones():
+            xs.append(x)
+            ys.append(y)
+        return (min(xs), min(ys), max(xs), max(ys)) if xs else None
+
+    def copy(self) -> "Board":
+        """局面副本（不含观察者与变更记录），棋子为享元可直接共享"""
+        other = Board(self.size)
+        other._grid = [row[:] for row in self._grid]
+        other.last_move = self.last_move
+        return other
+
     def clear(self):
         self._grid = [[None for _ in range(self.size)] for _ in range(self.size)]
         self.last_move = None
         self.notify(event="clear")
     
+    def begin_changes(self):
+        """开始记录变更（配合 end_changes 使用）"""
+        self._journal = []
+
+    def end_changes(self) -> List[Tuple[int, int, Optional[PieceType]]]:
+        changes = self._journal or []
+        self._journal = None
+        return changes
+
+    def revert_changes(self, changes: List[Tuple[int, int, Optional[PieceType]]],
+                       last_move: Optional[Tuple[int, int]]):
+        """按逆序撤销 end_changes 记录的变更（增量悔棋，代替整盘快照）"""
+        changed = []
+        for x, y, old in reversed(changes):
+            self._put(x, y, old)
+            changed.append((x, y))
+        self.last_move = last_move
+        self.notify(event="undo", changed=changed)
+
     def get_snapshot(self) -> dict:
         """用于 Memento 模式，获取当前状态快照"""
         # 只需要保存有棋子的位置，或者直接保存grid的副本
@@ -59,6 +121,124 @@ class Board(Subject):
         self.notify(event="restore")
 
 
+class SparseBoard(Board):
+    """
+    稀疏棋盘：只记录有子的格子（坐标 -> 棋子）与外接矩形，内存和遍历开销与棋子数成正比
+    用于超大或近似无限的五子棋棋盘，size 只是坐标上限，不会按 size x size 分配
+    同时维护 NEAR_RADIUS 范围内有子的空位（candidates），AI 只在这些点上选点
+    """
+    __slots__ = ("_stones", "_near", "_bounds", "_bounds_dirty")
+    is_sparse = True
+    NEAR_RADIUS = 2
+
+    def __init__(self, size: int):
+        # 不调用 Board.__init__：不分配稠密网格
+        Subject.__init__(self)
+        self.size = size
+        self._stones: Dict[Tuple[int, int], PieceType] = {}
+        # 格子 -> 周围 NEAR_RADIUS 内的棋子数（含有子的格子，取候选点时再排除）
+        self._near: Dict[Tuple[int, int], int] = {}
+        self._bounds: Optional[Tuple[int, int, int, int]] = None
+        self._bounds_dirty = False
+        self.last_move: Optional[Tuple[int, int]] = None
+        self._journal: Optional[List[Tuple[int, int, Optional[PieceType]]]] = None
+
+    def get_piece(self, x: int, y: int) -> Optional[PieceType]:
+        return self._stones.get((x, y))
+
+    def _put(self, x: int, y: int, piece: Optional[PieceType]):
+        pos = (x, y)
+        had = pos in self._stones
+        if piece is None:
+            if not had:
+                return
+            del self._stones[pos]
+            self._touch(x, y, -1)
+            b = self._bounds
+            if b is not None and (x in (b[0], b[2]) or y in (b[1], b[3])):
+                # 删的是边界上的子，外接矩形可能收缩，下次查询时重算
+                self._bounds_dirty = True
+            return
+        self._stones[pos] = piece
+        if had:
+            return
+        self._touch(x, y, 1)
+        b = self._bounds
+        if not self._bounds_dirty:
+            self._bounds = (x, y, x, y) if b is None else (min(b[0], x), min(b[1], y),
+                                                           max(b[2], x), max(b[3], y))
+
+    def _touch(self, x: int, y: int, delta: int):
+        near = self._near
+        r = self.NEAR_RADIUS
+        for nx in range(max(0, x - r), min(self.size, x + r + 1)):
+            for ny in range(max(0, y - r), min(self.size, y + r + 1)):
+                n = near.get((nx, ny), 0) + delta
+                if n:
+                    near[(nx, ny)] = n
+                else:
+                    del near[(nx, ny)]
+
+    def stones(self) -> Iterator[Tuple[int, int, PieceType]]:
+        for (x, y), p in self._stones.items():
+            yield x, y, p
+
+    def stone_count(self) -> int:
+        return len(self._stones)
+
+    def is_full(self) -> bool:
+        return len(self._stones) >= self.size * self.size
+
+    def bounds(self) -> Optional[Tuple[int, int, int, int]]:
+        if self._bounds_dirty:
+            self._bounds = super().bounds()
+            self._bounds_dirty = False
+        return self._bounds
+
+    def candidates(self) -> List[Tuple[int, int]]:
+        """距已有棋子 NEAR_RADIUS 以内的空位；空盘时为中心点"""
+        if not self._stones:
+            mid = self.size // 2
+            return [(mid, mid)]
+        stones = self._stones
+        return [pos for pos in self._near if pos not in stones]
+
+    def copy(self) -> "SparseBoard":
+        other = SparseBoard(self.size)
+        other._stones = dict(self._stones)
+        other._near = dict(self._near)
+        other._bounds = self._bounds
+        other._bounds_dirty = self._bounds_dirty
+        other.last_move = self.last_move
+        return other
+
+    def clear(self):
+        self._stones = {}
+        self._near = {}
+        self._bounds = None
+        self._bounds_dirty = False
+        self.last_move = None
+        self.notify(event="clear")
+
+    def get_snapshot(self) -> dict:
+        return {"size": self.size, "stones": dict(self._stones), "last_move": self.last_move}
+
+    def restore_snapshot(self, snapshot: dict):
+        self.size = snapshot["size"]
+        self._stones = {}
+        self._near = {}
+        self._bounds = None
+        self._bounds_dirty = False
+        if "stones" in snapshot:
+            items = snapshot["stones"].items()
+        else:
+            items = (((x, y), p) for x, row in enumerate(snapshot["grid"]) for y, p in enumerate(row) if p)
+        for (x, y), p in items:
+            self._put(x, y, p)
+        self.last_move = snapshot["last_move"]
+        self.notify(event="restore")
+
+
 class RuleStrategy(ABC):
     """
     策略模式接口：定义游戏规则
@@ -88,8 +268,10 @@ class RuleStrategy(ABC):
 
 class Game(ABC):
     """游戏基类"""
-    def __init__(self, size: int, rule: RuleStrategy):
-        self.board = Board(size)
+    __slots__ = ("board", "rule", "current_player_idx", "players", "is_game_over", "winner")
+
+    def __init__(self, size: int, rule: RuleStrategy, board: Optional[Board] = None):
+        self.board = board if board is not None else Board(size)
         self.rule = rule
         self.current_player_idx = 0
         # 定义玩家 (黑先白后)
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from typing import List, Dict, Any
 
 # ==========================================
@@ -14,8 +15,11 @@ class Observer(ABC):
 
 class Subject:
     """被观察者基类"""
+    __slots__ = ("_observers", "_muted")
+
     def __init__(self):
         self._observers: List[Observer] = []
+        self._muted = 0
 
     def attach(self, observer: Observer):
         if observer not in self._observers:
@@ -28,9 +32,25 @@ class Subject:
             pass
 
     def notify(self, *args, **kwargs):
+        if self._muted:
+            return
         for observer in self._observers:
             observer.update(self, *args, **kwargs)
 
+    @contextmanager
+    def batch(self, **final_kwargs):
+        """
+        批量修改：期间不发送任何通知，结束时合并为一次通知
+        例如 with board.batch(event="restore"): ...
+        """
+        self._muted += 1
+        try:
+            yield self
+        finally:
+            self._muted -= 1
+        if not self._muted and final_kwargs:
+            self.notify(**final_kwargs)
+
 
 # ==========================================
 # Pattern 2: Command (命令模式)
@@ -39,6 +59,9 @@ class Subject:
 
 class Command(ABC):
     """命令接口"""
+    # 子类（MoveCommand）用 __slots__ 省掉每条历史记录的 __dict__，基类也不能带 __dict__
+    __slots__ = ()
+
     @abstractmethod
     def execute(self) -> bool:
         """执行命令"""
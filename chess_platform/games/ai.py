@@ -1,45 +1,161 @@
+import json
+import math
 import random
-from typing import Tuple, Optional, List, TYPE_CHECKING
-from chess_platform.games.rules import GomokuRule, OthelloRule
+import threading
+import time
+from typing import Tuple, Optional, List, Iterator, TYPE_CHECKING
+from chess_platform.games.rules import GomokuRule, OthelloRule, PASS
+from chess_platform.games.savefile import pack_board
 
 if TYPE_CHECKING:
+    from chess_platform.games.book import OpeningBook
     from chess_platform.games.logic import GameContext  # type: ignore
 
 
+class MoveInfo:
+    """分析结果中的一个候选着法：score 的含义由引擎决定（MCTS 为胜率，启发式为评分）"""
+    __slots__ = ("move", "score", "visits", "pv")
+
+    def __init__(self, move: Tuple[int, int], score: float, visits: int = 0,
+                 pv: Optional[List[Tuple[int, int]]] = None):
+        self.move = move
+        self.score = score
+        self.visits = visits
+        self.pv = pv if pv is not None else [move]
+
+    def __repr__(self):
+        return f"MoveInfo(move={self.move}, score={self.score:.3f}, visits={self.visits}, pv={self.pv})"
+
+
 class BaseAI:
+    # 与 create_ai 的角色字符串对应（自动存档恢复时据此重建 AI），None 表示不可按角色重建
+    mode: Optional[str] = None
+    # 开局阶段先查开局库（book 未指定时用 games/books 下随包分发的默认库）
+    use_book = False
+    book: Optional["OpeningBook"] = None
+    # 黑白棋剩余空格不超过该值时改用精确残局求解（纯 Python 下 12 空约 0.3s，0 表示关闭）
+    endgame_empties = 12
+    # 五子棋走子前先做 VCF/VCT 威胁空间搜索（games/threats.py）的节点上限，0 表示关闭
+    threat_nodes = 20000
+
     def __init__(self, name: str = "AI"):
         self.name = name
 
     def select_move(self, game: "GameContext") -> Optional[Tuple[int, int]]:
         raise NotImplementedError
 
+    def book_move(self, game: "GameContext") -> Optional[Tuple[int, int]]:
+        if not self.use_book:
+            return None
+        book = self.book
+        if book is None:
+            from chess_platform.games.book import default_book
+            book = default_book(game.game_type, game.board.size)
+        return book.probe(game) if book is not None else None
+
+    def endgame_move(self, game: "GameContext") -> Optional[Tuple[int, int]]:
+        solver = self._endgame_solver(game)
+        return solver.solve(game)[0] if solver is not None else None
+
+    def threat_move(self, game: "GameContext") -> Optional[Tuple[int, int]]:
+        """成五、挡五、己方 VCF/VCT 必胜的第一手或化解对方必胜的着法；没有则为 None"""
+        if not self.threat_nodes or not isinstance(game.rule, GomokuRule):
+            return None
+        from chess_platform.games.threats import solver_for
+        return solver_for(self.threat_nodes).solve(game)[0]
+
+    def _endgame_solver(self, game: "GameContext"):
+        if not self.endgame_empties or game.game_type != "Othello":
+            return None
+        from chess_platform.games.endgame import solver_for
+        solver = solver_for(self.endgame_empties)
+        return solver if solver.applicable(game) else None
+
+    # ---------- 分析接口 ----------
+    def analyze_iter(self, game: "GameContext", top_k: int = 5, stop: Optional[threading.Event] = None,
+                     budget: Optional[int] = None) -> Iterator[List[MoveInfo]]:
+        """
+        逐步产出当前最好的 top_k 个着法（按分数降序），搜索每加深一次产出一次
+        stop 被设置后在下一个检查点结束；budget 为搜索预算（模拟次数等），None 用引擎默认值
+        默认实现：对每个合法着法做一层试走，按吃子/翻子数评分，只产出一次；
+        黑白棋进入残局阈值后改为精确终局子数差
+        """
+        solver = self._endgame_solver(game)
+        if solver is not None:
+            yield _top([MoveInfo(mv, float(v)) for mv, v in solver.evaluate_moves(game)], top_k)
+            return
+        infos = [MoveInfo(mv, self._evaluate_move(game, mv)) for mv in legal_moves(game)]
+        yield _top(infos, top_k)
+
+    def analyze(self, game: "GameContext", top_k: int = 5, stop: Optional[threading.Event] = None,
+                budget: Optional[int] = None, on_update=None) -> List[MoveInfo]:
+        """运行分析直到预算用完或 stop 被设置，每次更新回调 on_update(infos)，返回最后一次结果"""
+        result: List[MoveInfo] = []
+        for result in self.analyze_iter(game, top_k, stop, budget):
+            if on_update:
+                on_update(result)
+            if stop is not None and stop.is_set():
+                break
+        return result
+
+    def reset(self):
+        """丢弃搜索状态（树复用等），子类按需覆盖"""
+        pass
+
+    def _evaluate_move(self, game: "GameContext", move: Tuple[int, int]) -> float:
+        board = copy_board(game.board)
+        me = game.current_player
+        x, y = move
+        board.place_piece(x, y, me)
+        changed = game.rule.post_move_action(board, x, y, me) or []
+        if game.rule.check_win(board, x, y) == me.color_name:
+            return 1000.0
+        return float(len(changed))
+
+
+def _top(infos: List[MoveInfo], top_k: int) -> List[MoveInfo]:
+    infos.sort(key=lambda info: (info.score, info.visits), reverse=True)
+    return infos[:top_k]
+
 
 class RandomAI(BaseAI):
-    """一级 AI：合法位置随机落子"""
+    """一级 AI：合法位置随机落子（只做很浅的威胁搜索：成五、挡五与短的连续冲四）"""
+    mode = "ai-rand"
+    threat_nodes = 500
+
     def select_move(self, game: "GameContext") -> Optional[Tuple[int, int]]:
+        move = self.book_move(game) or self.endgame_move(game) or self.threat_move(game)
+        if move is not None:
+            return move
         moves = legal_moves(game)
         return random.choice(moves) if moves else None
 
 
 class GomokuHeuristicAI(BaseAI):
     """二级 AI：基于简单评分（进攻+防守）的启发式"""
+    mode = "ai-pro"
+    use_book = True
+    threat_nodes = 5000
+
     def __init__(self, attack_weight: int = 2, defend_weight: int = 3, name: str = "AI-Pro"):
         super().__init__(name)
         self.attack_weight = attack_weight
         self.defend_weight = defend_weight
 
     def select_move(self, game: "GameContext") -> Optional[Tuple[int, int]]:
+        move = self.book_move(game) or self.threat_move(game)
+        if move is not None:
+            return move
         moves = legal_moves(game)
         if not moves:
             return None
         best_score = -1
         best_moves: List[Tuple[int, int]] = []
-        rule: GomokuRule = game.rule  # type: ignore
         me = game.current_player
         opponent = game.players[1 - game.current_player_idx]
 
         for x, y in moves:
-            score = self._score_position(game, rule, x, y, me, opponent)
+            score = self._score_position(game.board, x, y, me, opponent)
             if score > best_score:
                 best_score = score
                 best_moves = [(x, y)]
@@ -47,8 +163,29 @@ class GomokuHeuristicAI(BaseAI):
                 best_moves.append((x, y))
         return random.choice(best_moves) if best_moves else None
 
-    def _score_position(self, game: "GameContext", rule: GomokuRule, x: int, y: int, me, opp) -> int:
-        board = game.board
+    def analyze_iter(self, game: "GameContext", top_k: int = 5, stop: Optional[threading.Event] = None,
+                     budget: Optional[int] = None) -> Iterator[List[MoveInfo]]:
+        """第一轮：所有空位打分；第二轮：为前 top_k 个着法补上对手的最佳应手作为主变"""
+        moves = legal_moves(game)
+        me = game.current_player
+        opponent = game.players[1 - game.current_player_idx]
+        infos = _top([MoveInfo(mv, self._score_position(game.board, mv[0], mv[1], me, opponent))
+                      for mv in moves], top_k)
+        yield infos
+        if stop is not None and stop.is_set():
+            return
+        for info in infos:
+            board = copy_board(game.board)
+            board.place_piece(info.move[0], info.move[1], me)
+            if game.rule.check_win(board, info.move[0], info.move[1]):
+                continue
+            replies = [(self._score_position(board, r, c, opponent, me), (r, c))
+                       for r, c in board_moves(board, game.rule, opponent)]
+            if replies:
+                info.pv = [info.move, max(replies)[1]]
+        yield infos
+
+    def _score_position(self, board, x: int, y: int, me, opp) -> int:
         # 简单打分：以落点为中心，统计四个方向连续棋子数，进攻+防守
         directions = [(1, 0), (0, 1), (1, 1), (1, -1)]
         score = 0
@@ -81,95 +218,361 @@ class GomokuHeuristicAI(BaseAI):
         return score
 
 
+# ---------- 着法先验（PUCT 用） ----------
+# 线性策略：候选点在四个方向上分别按"己方落此处 / 对方落此处"能连成的形状计特征，
+# logit 为特征权重之和，softmax 后即先验概率。权重可用 load_policy 从 JSON 读入
+# （例如在 selfplay 导出的数据上拟合），键与 DEFAULT_POLICY 相同。
+PATTERNS = ("five", "open4", "four", "open3", "three", "open2", "two")
+DEFAULT_POLICY = {
+    "attack": [12.0, 8.0, 4.0, 3.5, 1.5, 1.0, 0.4],
+    "defend": [10.0, 6.0, 3.5, 2.5, 1.0, 0.6, 0.2],
+    # 8 邻域内有棋子 / 两格内有棋子；两格内都没有棋子的点为 far
+    "near": [1.5, 0.5],
+    "far": -3.0,
+}
+_DIRECTIONS = ((1, 0), (0, 1), (1, 1), (1, -1))
+
+
+def load_policy(path: str) -> dict:
+    """读取 JSON 格式的先验权重，缺省项取 DEFAULT_POLICY"""
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    policy = dict(DEFAULT_POLICY)
+    policy.update(raw)
+    for key in ("attack", "defend"):
+        if len(policy[key]) != len(PATTERNS):
+            raise ValueError(f"policy '{key}' needs {len(PATTERNS)} weights")
+    return policy
+
+
+def _line_shape(board, x: int, y: int, dx: int, dy: int, piece) -> Optional[int]:
+    """piece 落在 (x, y) 后该方向上的连子形状（PATTERNS 下标），不成形返回 None"""
+    count = 1
+    open_ends = 0
+    for sx, sy in ((dx, dy), (-dx, -dy)):
+        cx, cy = x + sx, y + sy
+        while board.get_piece(cx, cy) == piece:
+            count += 1
+            cx += sx
+            cy += sy
+        if board.is_valid_pos(cx, cy) and board.get_piece(cx, cy) is None:
+            open_ends += 1
+    if count >= 5:
+        return 0
+    if count == 1 or open_ends == 0:
+        return None
+    return (4 - count) * 2 + (1 if open_ends == 2 else 2)
+
+
+def pattern_priors(board, moves: List[Tuple[int, int]], me, opp, policy: Optional[dict] = None) -> List[float]:
+    """与 moves 一一对应的先验概率（和为 1）"""
+    policy = policy or DEFAULT_POLICY
+    attack, defend = policy["attack"], policy["defend"]
+    near1, near2 = policy["near"]
+    # 各空位到最近棋子的切比雪夫距离（只记 1、2），远处的点不必逐方向扫描
+    dist = {}
+    for sx, sy, _ in board.stones():
+        for ddx in range(-2, 3):
+            for ddy in range(-2, 3):
+                d = 1 if abs(ddx) <= 1 and abs(ddy) <= 1 else 2
+                if dist.get((sx + ddx, sy + ddy), 3) > d:
+                    dist[(sx + ddx, sy + ddy)] = d
+    logits = []
+    for x, y in moves:
+        d = dist.get((x, y))
+        if d is None:
+            logits.append(policy["far"])
+            continue
+        logit = near1 if d == 1 else near2
+        if d == 1:
+            # 成形至少要和某颗棋子相邻
+            for dx, dy in _DIRECTIONS:
+                shape = _line_shape(board, x, y, dx, dy, me)
+                if shape is not None:
+                    logit += attack[shape]
+                shape = _line_shape(board, x, y, dx, dy, opp)
+                if shape is not None:
+                    logit += defend[shape]
+        logits.append(logit)
+    top = max(logits)
+    exps = [math.exp(v - top) for v in logits]
+    total = sum(exps)
+    return [e / total for e in exps]
+
+
+class _Node:
+    """MCTS 节点"""
+    __slots__ = ("parent", "move", "wins", "visits", "children", "player_idx", "prior",
+                 "amaf_wins", "amaf_visits")
+
+    def __init__(self, parent, move, player_idx, prior: float = 0.0):
+        self.parent = parent
+        self.move = move
+        self.wins = 0
+        self.visits = 0
+        self.children: List["_Node"] = []
+        self.player_idx = player_idx  # 谁在该节点落子
+        self.prior = prior  # PUCT 先验概率
+        # RAVE：本节点着法在任一经过父节点的模拟中（由同一方）稍后下出时的统计
+        self.amaf_wins = 0.0
+        self.amaf_visits = 0
+
+
 class GomokuMCTS(BaseAI):
     """
     三级 AI：简化版 MCTS，适用于五子棋。
-    - 使用 UCT 选点
-    - 限定模拟次数以保证实时性
+    - 默认 PUCT 选点：展开时用 pattern_priors 给子节点先验，未访问的子节点按先验排序，
+      其估值取已访问兄弟节点的平均胜率减去 fpu_reduction（first-play urgency）；
+      puct=False 时为经典 UCT（未访问子节点估值无穷大，按列表顺序逐个试一遍）
+    - rave=True 时记录 AMAF（all-moves-as-first）统计：一次模拟中某方稍后下出的每个着法
+      都计入树中对应兄弟节点，选点时按 beta = sqrt(k / (3n + k))（k 为 rave_equiv）
+      与节点自身胜率混合，访问越多越信自身统计。UCT 下未访问但已有 AMAF 统计的节点直接用
+      AMAF 估值（不再是无穷大），AMAF 本身已起到探索作用，探索系数改用较小的 rave_c；
+      PUCT 下未访问节点仍按先验 + FPU
+    - 限定模拟次数（或每步思考时间 time_limit 秒）以保证实时性
     - rollout 随机落子
+    - 搜索树在相邻的请求之间复用：同一局面继续累积，走了一两步后沿对应子树下行
+    - 稀疏（超大）棋盘上只在已有棋子附近选点，rollout 超过 sparse_rollout 步按和棋计
     """
-    def __init__(self, simulations: int = 400, c_param: float = 1.4, name: str = "AI-MCTS"):
+    mode = "ai-mcts"
+    use_book = True
+    sparse_rollout = 60
+
+    def __init__(self, simulations: int = 400, c_param: float = 1.4, name: str = "AI-MCTS",
+                 analysis_simulations: int = 2000, puct: bool = True, c_puct: float = 1.5,
+                 fpu_reduction: float = 0.2, policy: Optional[dict] = None,
+                 time_limit: Optional[float] = None, rave: bool = False, rave_equiv: float = 200.0,
+                 rave_c: float = 0.1):
         super().__init__(name)
         self.simulations = simulations
         self.c = c_param
+        self.analysis_simulations = analysis_simulations
+        self.puct = puct
+        self.c_puct = c_puct
+        self.fpu_reduction = fpu_reduction
+        self.policy = policy
+        self.rave = rave
+        self.rave_equiv = rave_equiv
+        self.rave_c = rave_c
+        # 设置后 select_move 按时间而非模拟次数停止
+        self.time_limit = time_limit
+        # 累计完成的模拟次数（基准统计用）
+        self.simulations_done = 0
+        self._root: Optional[_Node] = None
+        self._root_key: Optional[bytes] = None
+        self._root_board = None
+        self._root_moves = 0
+
+    def reset(self):
+        self._root = None
+        self._root_key = None
+        self._root_board = None
+        self._root_moves = 0
 
     def select_move(self, game: "GameContext") -> Optional[Tuple[int, int]]:
         if not isinstance(game.rule, GomokuRule):
-            # 仅在五子棋启用，其他规则退化为随机
-            return RandomAI(name=self.name + "-Fallback").select_move(game)
+            # 仅在五子棋启用，其他规则退化为随机（黑白棋残局仍按本实例的阈值精确求解）
+            return self.endgame_move(game) or RandomAI(name=self.name + "-Fallback").select_move(game)
+        move = self.book_move(game) or self.threat_move(game)
+        if move is not None:
+            # 库内着法与威胁搜索的着法不经 MCTS，旧树与本局面无关
+            self.reset()
+            return move
         moves = legal_moves(game)
         if not moves:
             return None
-        # 节点结构
-        class Node:
-            __slots__ = ("parent","move","wins","visits","children","player_idx")
-            def __init__(self, parent, move, player_idx):
-                self.parent = parent
-                self.move = move
-                self.wins = 0
-                self.visits = 0
-                self.children: List["Node"] = []
-                self.player_idx = player_idx  # 谁在该节点落子
-
-        root = Node(None, None, game.current_player_idx)
-
-        import math, copy
+        root = self._prepare_root(game)
+        if self.time_limit:
+            self._search(game, root, None, time.perf_counter() + self.time_limit)
+        else:
+            self._search(game, root, self.simulations)
+
+        # 选择访问最多的子节点
+        if not root.children:
+            return random.choice(moves)
+        best = max(root.children, key=lambda ch: ch.visits)
+        return best.move
+
+    def analyze_iter(self, game: "GameContext", top_k: int = 5, stop: Optional[threading.Event] = None,
+                     budget: Optional[int] = None, chunk: int = 50) -> Iterator[List[MoveInfo]]:
+        """每完成 chunk 次模拟产出一次：score 为胜率，visits 为访问次数，pv 沿访问最多的子节点展开"""
+        if not isinstance(game.rule, GomokuRule):
+            yield from super().analyze_iter(game, top_k, stop, budget)
+            return
+        if not legal_moves(game):
+            return
+        root = self._prepare_root(game)
+        budget = self.analysis_simulations if budget is None else budget
+        done = 0
+        while done < budget:
+            if stop is not None and stop.is_set():
+                return
+            n = min(chunk, budget - done)
+            self._search(game, root, n)
+            done += n
+            yield self._top_moves(root, top_k)
+
+    def visit_counts(self) -> List[Tuple[Tuple[int, int], int]]:
+        """最近一次搜索根节点下各着法的访问次数（自对弈导出训练数据用）"""
+        if self._root is None:
+            return []
+        return [(ch.move, ch.visits) for ch in self._root.children if ch.visits]
+
+    def _top_moves(self, root: _Node, top_k: int) -> List[MoveInfo]:
+        infos = []
+        for ch in root.children:
+            if ch.visits == 0:
+                continue
+            pv = [ch.move]
+            node = ch
+            while node.children and len(pv) < 8:
+                node = max(node.children, key=lambda n: n.visits)
+                if node.visits == 0:
+                    break
+                pv.append(node.move)
+            infos.append(MoveInfo(ch.move, ch.wins / ch.visits, ch.visits, pv))
+        infos.sort(key=lambda info: (info.visits, info.score), reverse=True)
+        return infos[:top_k]
+
+    # ---------- 搜索树复用 ----------
+    def _prepare_root(self, game: "GameContext") -> _Node:
+        key = _position_key(game.board, game.current_player_idx)
+        if self._root is not None and key != self._root_key:
+            node = self._descend(game, key)
+            if node is not None:
+                node.parent = None
+                node.player_idx = game.current_player_idx
+                self._root = node
+            else:
+                self._root = None
+        if self._root is None:
+            self._root = _Node(None, None, game.current_player_idx)
+        self._root_key = key
+        self._root_board = game.board.copy()
+        self._root_moves = len(game.move_log)
+        return self._root
+
+    def _descend(self, game: "GameContext", key: bytes) -> Optional[_Node]:
+        """上次的根局面之后又走了一两步：沿录像找到对应子树，并核对局面一致"""
+        played = game.move_log[self._root_moves:]
+        if not 0 < len(played) <= 2:
+            return None
+        board = self._root_board.copy()
+        node = self._root
+        for step in played:
+            mv = (step["x"], step["y"])
+            node = next((ch for ch in node.children if ch.move == mv), None)
+            if node is None:
+                return None
+            board.place_piece(mv[0], mv[1], game.players[0] if step["color"] == "Black" else game.players[1])
+        return node if _position_key(board, game.current_player_idx) == key else None
+
+    # ---------- 搜索 ----------
+    def _search(self, game: "GameContext", root: _Node, simulations: Optional[int],
+                deadline: Optional[float] = None):
+        """simulations 为 None 时一直搜索到 deadline（perf_counter 时刻）"""
         board0 = game.board
+        c_puct = self.c_puct
+        fpu_reduction = self.fpu_reduction
+        rave = self.rave
+        rave_equiv = self.rave_equiv
+        c_uct = self.rave_c if rave else self.c
+        # PUCT 下未访问节点仍按先验 + FPU：随机 rollout 的 AMAF 不如形状先验可靠
+        amaf_first = not self.puct
 
-        def uct(child: Node, total_visits: int):
-            if child.visits == 0:
+        def value(child: _Node, unvisited: float) -> float:
+            if rave and child.amaf_visits:
+                amaf = child.amaf_wins / child.amaf_visits
+                if not child.visits:
+                    return amaf if amaf_first else unvisited
+                beta = math.sqrt(rave_equiv / (3 * child.visits + rave_equiv))
+                return (1 - beta) * child.wins / child.visits + beta * amaf
+            return child.wins / child.visits if child.visits else unvisited
+
+        def uct(child: _Node, total_visits: int):
+            if child.visits == 0 and not (rave and child.amaf_visits):
                 return float("inf")
-            return child.wins / child.visits + self.c * (math.sqrt(math.log(total_visits) / child.visits))
+            return value(child, 0.0) + c_uct * (math.sqrt(math.log(total_visits) / max(child.visits, 1)))
+
+        def select_uct(node: _Node) -> _Node:
+            total = sum(ch.visits for ch in node.children)
+            return max(node.children, key=lambda ch: uct(ch, total if total > 0 else 1))
+
+        def select_puct(node: _Node) -> _Node:
+            total = 0
+            wins = 0.0
+            seen_prior = 0.0
+            for ch in node.children:
+                if ch.visits:
+                    total += ch.visits
+                    wins += ch.wins
+                    seen_prior += ch.prior
+            # FPU：未访问的着法按已访问兄弟的平均胜率估值，已探索的先验越多扣得越多
+            fpu = (wins / total if total else 0.5) - fpu_reduction * math.sqrt(seen_prior)
+            scale = c_puct * math.sqrt(max(total, 1))
+            return max(node.children, key=lambda ch: value(ch, fpu) + scale * ch.prior / (1 + ch.visits))
 
-        def expand(node: Node, board_copy, player_idx):
-            avail = []
+        select = select_puct if self.puct else select_uct
+
+        def expand(node: _Node, board_copy, player_idx):
             me = game.players[player_idx]
-            for x,y in legal_moves_board(board_copy, game.rule, me):
-                avail.append((x,y))
-            for mv in avail:
-                node.children.append(Node(node, mv, player_idx))
-
-        def legal_moves_board(board, rule, me):
-            res=[]
-            for r in range(board.size):
-                for c in range(board.size):
-                    if board.get_piece(r,c) is None:
-                        ok,_ = rule.is_valid_move(board,r,c,me)
-                        if ok:
-                            res.append((r,c))
-            return res
-
-        def simulate(board_copy, next_player_idx):
-            # 随机落子直到胜负或无空
+            avail = board_moves(board_copy, game.rule, me)
+            if not self.puct or not avail:
+                for mv in avail:
+                    node.children.append(_Node(node, mv, player_idx))
+                return
+            priors = pattern_priors(board_copy, avail, me, game.players[1 - player_idx], self.policy)
+            # 按先验降序排列：先验相同时 max 取靠前者
+            for p, mv in sorted(zip(priors, avail), key=lambda item: -item[0]):
+                node.children.append(_Node(node, mv, player_idx, p))
+
+        def simulate(board_copy, next_player_idx, played):
+            # 随机落子直到胜负或无空；着法依次记入 played（RAVE 用）
             rule: GomokuRule = game.rule  # type: ignore
             cur_idx = next_player_idx
-            last_move = (-1,-1)
+            sparse = board_copy.is_sparse
+            limit = self.sparse_rollout if sparse else None
+            # 稠密棋盘上五子棋的空位都合法：空位表只取一次，之后随机抽取并交换删除，不再每步扫描整盘
+            avail = None if sparse else board_moves(board_copy, rule, game.players[cur_idx])
+            steps = 0
             while True:
                 me = game.players[cur_idx]
-                avail = legal_moves_board(board_copy, rule, me)
-                if not avail:
+                if sparse:
+                    avail = board_moves(board_copy, rule, me)
+                if not avail or steps == limit:
                     return "Draw"
-                mv = random.choice(avail)
+                steps += 1
+                i = random.randrange(len(avail))
+                mv = avail[i]
+                if not sparse:
+                    avail[i] = avail[-1]
+                    avail.pop()
                 board_copy.place_piece(mv[0], mv[1], me)
-                last_move = mv
+                played.append((mv, cur_idx))
                 winner = rule.check_win(board_copy, mv[0], mv[1])
                 if winner:
                     return winner
                 cur_idx = 1 - cur_idx
 
-        for _ in range(self.simulations):
+        done = 0
+        while simulations is None or done < simulations:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            done += 1
             # 拷贝棋盘
             bcopy = copy_board(board0)
             path = [root]
+            # 本次模拟的全部着法 (move, 落子方)：played[d] 为 path[d] 之后的第一手
+            played: List[Tuple[Tuple[int, int], int]] = []
             node = root
             cur_player_idx = game.current_player_idx
             # selection
             while node.children:
-                total = sum(ch.visits for ch in node.children)
-                node = max(node.children, key=lambda ch: uct(ch, total if total>0 else 1))
+                node = select(node)
                 # 落子
                 me = game.players[cur_player_idx]
                 bcopy.place_piece(node.move[0], node.move[1], me)
+                played.append((node.move, cur_player_idx))
                 cur_player_idx = 1 - cur_player_idx
                 path.append(node)
                 winner = game.rule.check_win(bcopy, node.move[0], node.move[1])
@@ -180,7 +583,7 @@ class GomokuMCTS(BaseAI):
                 # expand
                 expand(node, bcopy, cur_player_idx)
                 # rollout
-                result = simulate(bcopy, cur_player_idx)
+                result = simulate(bcopy, cur_player_idx, played)
 
             # backprop
             for n in path:
@@ -191,32 +594,125 @@ class GomokuMCTS(BaseAI):
                     win_color = result
                     if game.players[n.player_idx].color_name == win_color:
                         n.wins += 1
+            if rave:
+                self._update_amaf(game, path, played, result)
+        self.simulations_done += done
 
-        # 选择访问最多的子节点
-        if not root.children:
-            return random.choice(moves)
-        best = max(root.children, key=lambda ch: ch.visits)
-        return best.move
+    @staticmethod
+    def _update_amaf(game: "GameContext", path: List[_Node], played, result: str):
+        """path[d] 的每个子节点：若其落子方在 path[d] 之后下过该着法，则按本次结果计一次 AMAF"""
+        first = {}
+        for i, step in enumerate(played):
+            first.setdefault(step, i)
+        score = [0.5, 0.5] if result == "Draw" else \
+            [1.0 if p.color_name == result else 0.0 for p in game.players]
+        for d, n in enumerate(path):
+            for ch in n.children:
+                i = first.get((ch.move, ch.player_idx))
+                if i is not None and i >= d:
+                    ch.amaf_visits += 1
+                    ch.amaf_wins += score[ch.player_idx]
+
+
+class GoMonteCarloAI(BaseAI):
+    """
+    三级 AI（围棋）：平坦蒙特卡洛 + AMAF。
+    - 模拟走 games/goplayout.py 的数组棋盘与走子策略（提子 / 逃跑 / 3x3 模式 / 不填眼），按面积法判胜负
+    - 根节点的每个可下点按 UCB 挑选，胜率与 AMAF 统计（该点在模拟中被己方下过即计一次）按
+      beta = sqrt(k / (3n + k)) 混合；未试过但已有 AMAF 统计的点直接用 AMAF 估值
+    - 模拟 simulations 次或思考 time_limit 秒（先到为准），选模拟次数最多的点；
+      无处可下（只剩己方眼位与自杀点）、或对方刚虚着且按面积法己方已经领先时虚着（返回 PASS）
+    """
+    mode = "ai-mcts"
+
+    def __init__(self, simulations: int = 3000, time_limit: Optional[float] = 2.0, name: str = "AI-MCGo",
+                 komi: float = 7.5, c_param: float = 0.3, rave_equiv: float = 300.0):
+        super().__init__(name)
+        self.simulations = simulations
+        self.time_limit = time_limit
+        self.komi = komi
+        self.c = c_param
+        self.rave_equiv = rave_equiv
+        self.simulations_done = 0
+
+    def select_move(self, game: "GameContext") -> Optional[Tuple[int, int]]:
+        if game.game_type != "Go":
+            return RandomAI(name=self.name + "-Fallback").select_move(game)
+        from chess_platform.games.goplayout import GoBoard, BLACK
+        root = GoBoard.from_game(game, self.komi)
+        cands = root.candidates()
+        me_black = root.to_move == BLACK
+        if not cands or game.passes and (root.score() > 0) == me_black:
+            return PASS
+        index = {p: i for i, p in enumerate(cands)}
+        k = len(cands)
+        wins, visits = [0.0] * k, [0] * k
+        amaf_wins, amaf_visits = [0.0] * k, [0] * k
+        deadline = time.perf_counter() + self.time_limit if self.time_limit else None
+        done = 0
+        while done < self.simulations and (deadline is None or time.perf_counter() < deadline):
+            i = self._pick(done, wins, visits, amaf_wins, amaf_visits)
+            board = root.copy()
+            board.play(cands[i])
+            played: List[int] = []
+            win = 1.0 if (board.playout(random, record=played) > 0) == me_black else 0.0
+            visits[i] += 1
+            wins[i] += win
+            # 模拟里第一手是对方的，己方的着法在奇数位置
+            for p in {cands[i], *played[1::2]}:
+                j = index.get(p)
+                if j is not None:
+                    amaf_visits[j] += 1
+                    amaf_wins[j] += win
+            done += 1
+        self.simulations_done += done
+        best = max(range(k), key=lambda j: (visits[j], amaf_visits[j]))
+        return root.xy(cands[best])
+
+    def _pick(self, total: int, wins, visits, amaf_wins, amaf_visits) -> int:
+        log_total = math.log(total + 1)
+        kk = self.rave_equiv
+        best, best_value = 0, -1.0
+        for j, n in enumerate(visits):
+            av = amaf_visits[j]
+            if n == 0:
+                if not av:
+                    return j
+                value = amaf_wins[j] / av + self.c
+            else:
+                beta = math.sqrt(kk / (3 * n + kk)) if av else 0.0
+                value = (1 - beta) * wins[j] / n + (beta * amaf_wins[j] / av if av else 0.0) \
+                    + self.c * math.sqrt(log_total / n)
+            if value > best_value:
+                best, best_value = j, value
+        return best
+
+
+def _position_key(board, player_idx: int) -> bytes:
+    return pack_board(board) + bytes([player_idx])
 
 
 def copy_board(board):
-    from chess_platform.core.interfaces import Board
-    size = board.size
-    new_board = Board(size)
-    new_board._grid = [row[:] for row in board._grid]  # shallow copy ok because flyweight
-    return new_board
+    # 棋子为享元，浅拷贝即可
+    return board.copy()
 
 
 def legal_moves(game: "GameContext") -> List[Tuple[int, int]]:
     """根据当前规则返回合法落子列表"""
-    board = game.board
-    rule = game.rule
-    me = game.current_player
-    moves = []
     # Othello 有专属的合法步计算
-    if isinstance(rule, OthelloRule):
-        return rule.legal_moves(board, me)
-    # 其他规则：遍历空位 + is_valid_move
+    if isinstance(game.rule, OthelloRule):
+        return game.rule.legal_moves(game.board, game.current_player)
+    return board_moves(game.board, game.rule, game.current_player)
+
+
+def board_moves(board, rule, me) -> List[Tuple[int, int]]:
+    """
+    遍历空位 + is_valid_move；稀疏棋盘上枚举全部空位是 O(面积)，
+    只返回已有棋子附近的空位（SparseBoard.candidates），开销与棋子数成正比
+    """
+    if board.is_sparse:
+        return [(r, c) for r, c in board.candidates() if rule.is_valid_move(board, r, c, me)[0]]
+    moves = []
     for r in range(board.size):
         for c in range(board.size):
             if board.get_piece(r, c) is None:
@@ -225,3 +721,30 @@ def legal_moves(game: "GameContext") -> List[Tuple[int, int]]:
                     moves.append((r, c))
     return moves
 
+
+
+def create_ai(mode: str, game_type: str, name: Optional[str] = None) -> Optional[BaseAI]:
+    """
+    按角色字符串创建 AI（与 GUI 角色选项一致）：human / ai-rand / ai-pro / ai-mcts
+    human 返回 None；二级 AI 仅五子棋可用，三级 AI 另有围棋版（平坦蒙特卡洛），其他情况退化为随机 AI
+    """
+    mode = mode.lower()
+    if mode == "human":
+        return None
+    gomoku = game_type.lower() == "gomoku"
+    if mode == "ai-pro" and gomoku:
+        return GomokuHeuristicAI(name=name or "AI-Pro")
+    if mode == "ai-mcts" and gomoku:
+        return GomokuMCTS(name=name or "AI-MCTS")
+    if mode == "ai-mcts" and game_type.lower() == "go":
+        return GoMonteCarloAI(name=name or "AI-MCTS")
+    if mode in ("ai-rand", "ai-pro", "ai-mcts"):
+        return RandomAI(name=name or "AI-Rand")
+    raise ValueError(f"Unknown player mode: {mode}")
+
+
+def create_analyzer(game_type: str) -> BaseAI:
+    """分析/提示使用的引擎：五子棋用 MCTS，其他棋类用一层试走评估"""
+    if game_type.lower() == "gomoku":
+        return GomokuMCTS(name="Analyzer")
+    return BaseAI(name="Analyzer")
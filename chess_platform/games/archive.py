@@ -0,0 +1,450 @@
+"""
+对局档案库：追加写入的分段文件 + 持久化索引，代替散落的单局存档
+运行:
+    python -m chess_platform.games.archive import chess_platform/cundang
+    python -m chess_platform.games.archive list --account alice --type gomoku --limit 20
+    python -m chess_platform.games.archive show 12
+    python -m chess_platform.games.archive info
+
+目录结构（默认 chess_platform/archive/）:
+    seg-00000.cpa ...  段文件: 文件头 8 字节 magic "CPAR" | version u8 | 保留 3 字节
+                       记录:   长度 u32 | crc32 u32 | 结果 u8 | 结束时间 f64 | 紧凑存档（savefile.encode）
+    index.bin          索引: 文件头 8 字节 magic "CPAX" | version u8 | 保留 3 字节，之后每局一个定长条目
+                       （段号、偏移、长度、crc、棋类、路数、结果、手数、双方账户/名称编号、时间）
+    names.txt          账户/玩家名表，每行一个，编号为行号（从 1 开始，0 表示无）
+- 列表与筛选只读 mmap 的索引，不读取任何对局记录；打开时在内存中建立按账户、棋类+路数、结束时间的二级索引，
+  筛选先从二级索引取候选编号，不再逐条扫描；取某一局时按偏移切出该局的字节解码
+- 先写记录再写索引；打开时截掉写了一半的索引条目/名称行，并把段尾已写入但未进索引的记录补进索引
+- 段文件超过 SEGMENT_BYTES 后新开一段
+"""
+import argparse
+import bisect
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+from chess_platform.games import savefile
+
+if TYPE_CHECKING:
+    from chess_platform.games.logic import GameContext  # type: ignore
+
+ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "archive")
+SEGMENT_BYTES = 64 << 20
+
+SEG_MAGIC = b"CPAR"
+INDEX_MAGIC = b"CPAX"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sB3x")
+RECORD = struct.Struct("<IIBd")
+# 段号 | 偏移 | 长度 | crc | 棋类 | 路数 | 结果 | 手数 | 黑账户 | 白账户 | 黑名称 | 白名称 | 结束时间
+ENTRY = struct.Struct("<HIIIBHBIIIIId")
+
+RESULTS = ["Black", "White", "Draw", None]  # None: 未终局
+
+
+def _result_code(winner: Optional[str]) -> int:
+    return RESULTS.index(winner) if winner in RESULTS else RESULTS.index(None)
+
+
+class Archive:
+    """对局档案库（线程安全的追加写入 + 只读 mmap 查询）"""
+    def __init__(self, directory: str = ARCHIVE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._index_map: Optional[mmap.mmap] = None
+        self._index_len = 0
+        self.names: List[str] = [""]
+        self._name_ids: Dict[str, int] = {}
+        self._load_names()
+        self._index = self._open_file("index.bin", INDEX_MAGIC)
+        self._trim_index()
+        # 二级索引：账户编号 -> 对局编号；(棋类, 路数) -> 对局编号；按 (结束时间, 编号) 有序
+        self._by_account: Dict[int, List[int]] = {}
+        self._by_kind: Dict[Tuple[int, int], List[int]] = {}
+        self._by_time: List[Tuple[float, int]] = []
+        self._build_indexes()
+        self._segment = 0
+        self._seg_file = None
+        self._open_last_segment()
+        self._recover()
+
+    # ---------- 打开 / 恢复 ----------
+    def _open_file(self, name: str, magic: bytes):
+        path = os.path.join(self.directory, name)
+        f = open(path, "a+b")
+        f.seek(0)
+        head = f.read(FILE_HEADER.size)
+        if not head:
+            f.write(FILE_HEADER.pack(magic, VERSION))
+            f.flush()
+        elif len(head) < FILE_HEADER.size or FILE_HEADER.unpack(head) != (magic, VERSION):
+            f.close()
+            raise ValueError(f"{path}: not a game archive file")
+        return f
+
+    def _load_names(self):
+        path = os.path.join(self.directory, "names.txt")
+        if os.path.exists(path):
+            with open(path, "r+b") as f:
+                raw = f.read()
+                valid = raw.rfind(b"\n") + 1
+                if valid != len(raw):
+                    f.truncate(valid)
+            for line in raw[:valid].decode("utf-8").split("\n")[:-1]:
+                self._name_ids[line] = len(self.names)
+                self.names.append(line)
+        self._names_file = open(path, "ab")
+
+    def _trim_index(self):
+        self._index.seek(0, os.SEEK_END)
+        size = self._index.tell()
+        valid = FILE_HEADER.size + (size - FILE_HEADER.size) // ENTRY.size * ENTRY.size
+        if valid != size:
+            self._index.truncate(valid)
+
+    def _build_indexes(self):
+        for game_id, e in self.entries():
+            self._add_to_indexes(game_id, e, sort=False)
+        self._by_time.sort()
+
+    def _add_to_indexes(self, game_id: int, e: tuple, sort: bool = True):
+        for acc in {e[8], e[9]} - {0}:
+            self._by_account.setdefault(acc, []).append(game_id)
+        self._by_kind.setdefault((e[4], e[5]), []).append(game_id)
+        if sort:
+            bisect.insort(self._by_time, (e[12], game_id))
+        else:
+            self._by_time.append((e[12], game_id))
+
+    def _segment_path(self, seg: int) -> str:
+        return os.path.join(self.directory, f"seg-{seg:05d}.cpa")
+
+    def _open_last_segment(self):
+        segs = sorted(int(n[4:9]) for n in os.listdir(self.directory) if n.startswith("seg-") and n.endswith(".cpa"))
+        self._segment = segs[-1] if segs else 0
+        self._seg_file = self._open_file(os.path.basename(self._segment_path(self._segment)), SEG_MAGIC)
+
+    def _recover(self):
+        """把段尾已完整写入但索引中没有的记录补进索引，截掉写了一半的记录"""
+        last = self._last_entry()
+        seg, pos = (last[0], last[1] + last[2]) if last else (0, FILE_HEADER.size)
+        while seg <= self._segment:
+            with open(self._segment_path(seg), "r+b") as f:
+                raw = f.read()
+                while pos + RECORD.size <= len(raw):
+                    length, crc, result, finished_at = RECORD.unpack_from(raw, pos)
+                    payload = raw[pos + RECORD.size:pos + RECORD.size + length]
+                    if len(payload) < length or zlib.crc32(payload) != crc:
+                        break
+                    self._index_record(seg, pos + RECORD.size, payload, crc, result, finished_at)
+                    pos += RECORD.size + length
+                if pos < len(raw):
+                    f.truncate(pos)
+            seg += 1
+            pos = FILE_HEADER.size
+
+    # ---------- 写入 ----------
+    def append(self, data: Dict, winner: Optional[str] = None, finished_at: Optional[float] = None,
+               sync: bool = True) -> int:
+        """追加一局（save_game 的数据字典），返回对局编号"""
+        payload = savefile.encode(data)
+        crc = zlib.crc32(payload)
+        result = _result_code(winner)
+        finished_at = time.time() if finished_at is None else finished_at
+        with self._lock:
+            f = self._seg_file
+            f.seek(0, os.SEEK_END)
+            if f.tell() + RECORD.size + len(payload) > SEGMENT_BYTES and f.tell() > FILE_HEADER.size:
+                f.close()
+                self._segment += 1
+                f = self._seg_file = self._open_file(os.path.basename(self._segment_path(self._segment)),
+                                                     SEG_MAGIC)
+            pos = f.tell()
+            f.write(RECORD.pack(len(payload), crc, result, finished_at) + payload)
+            f.flush()
+            if sync:
+                os.fsync(f.fileno())
+            return self._index_record(self._segment, pos + RECORD.size, payload, crc, result, finished_at)
+
+    def append_game(self, game: "GameContext", winner: Optional[str] = None, **kwargs) -> int:
+        return self.append(game.to_save_data(), winner if winner is not None else game.winner, **kwargs)
+
+    def _index_record(self, seg: int, offset: int, payload: bytes, crc: int, result: int,
+                      finished_at: float) -> int:
+        meta = savefile.decode(payload, replay=False)
+        accounts = meta["players_account"]
+        names = meta["players_name"]
+        e = (seg, offset, len(payload), crc, savefile.GAME_TYPES.index(meta["type"]),
+             meta["size"], result, len(meta["move_log"]),
+             self._name_id(accounts[0]), self._name_id(accounts[1]),
+             self._name_id(names[0]), self._name_id(names[1]), finished_at)
+        self._index.seek(0, os.SEEK_END)
+        game_id = (self._index.tell() - FILE_HEADER.size) // ENTRY.size + 1
+        self._index.write(ENTRY.pack(*e))
+        self._index.flush()
+        self._add_to_indexes(game_id, e)
+        return game_id
+
+    def _name_id(self, name: Optional[str]) -> int:
+        if not name:
+            return 0
+        name = name.replace("\n", " ")
+        if name not in self._name_ids:
+            self._names_file.write(name.encode("utf-8") + b"\n")
+            self._names_file.flush()
+            self._name_ids[name] = len(self.names)
+            self.names.append(name)
+        return self._name_ids[name]
+
+    # ---------- 索引查询 ----------
+    def __len__(self) -> int:
+        return (self._index_bytes() - FILE_HEADER.size) // ENTRY.size
+
+    def _index_bytes(self) -> int:
+        self._index.seek(0, os.SEEK_END)
+        return self._index.tell()
+
+    def _index_view(self) -> memoryview:
+        """
+        索引条目区的只读视图（文件变长后重新映射）
+        开局浏览器在后台线程遍历索引，旧映射可能仍有视图在用，不主动关闭，由最后一个视图释放
+        """
+        with self._lock:
+            size = self._index_bytes()
+            if self._index_map is None or self._index_len != size:
+                self._index_map = mmap.mmap(self._index.fileno(), size, access=mmap.ACCESS_READ)
+                self._index_len = size
+            return memoryview(self._index_map)[FILE_HEADER.size:size]
+
+    def _last_entry(self) -> Optional[tuple]:
+        n = len(self)
+        if not n:
+            return None
+        self._index.seek(FILE_HEADER.size + (n - 1) * ENTRY.size)
+        return ENTRY.unpack(self._index.read(ENTRY.size))
+
+    def entries(self, start: int = 1) -> Iterator[Tuple[int, tuple]]:
+        """从编号 start 起按顺序遍历 (编号, 原始索引条目)"""
+        view = self._index_view()
+        try:
+            for i, entry in enumerate(ENTRY.iter_unpack(view[(max(start, 1) - 1) * ENTRY.size:]), max(start, 1)):
+                yield i, entry
+        finally:
+            view.release()
+
+    def find(self, account: Optional[str] = None, game_type: Optional[str] = None, size: Optional[int] = None,
+             result: Optional[str] = None, since: Optional[float] = None, until: Optional[float] = None,
+             limit: Optional[int] = None, newest_first: bool = True) -> List[Dict]:
+        """
+        按索引筛选对局（不读取对局记录）
+        account 匹配任一方账户；result 为 "Black"/"White"/"Draw"/"unfinished"；since/until 为时间戳
+        """
+        acc_id = self._name_ids.get(account, -1) if account else None
+        if acc_id == -1:
+            return []
+        type_code = savefile.GAME_TYPES.index(game_type.capitalize()) if game_type else None
+        result_code = _result_code(None if result == "unfinished" else result) if result else None
+        with self._lock:
+            # 账户、棋类/路数条件各给出一组候选编号（升序）；时间范围在有序的时间索引上二分
+            candidates = []
+            if acc_id is not None:
+                candidates.append(list(self._by_account.get(acc_id, ())))
+            if type_code is not None or size is not None:
+                kinds = [ids for (t, s), ids in self._by_kind.items()
+                         if (type_code is None or t == type_code) and (size is None or s == size)]
+                candidates.append(kinds[0][:] if len(kinds) == 1 else sorted(i for ids in kinds for i in ids))
+            lo = bisect.bisect_left(self._by_time, (since,)) if since is not None else 0
+            hi = bisect.bisect_left(self._by_time, (until,)) if until is not None else len(self._by_time)
+            by_time = self._by_time[lo:hi] if not candidates else None
+        view = self._index_view()
+        try:
+            def entry(game_id: int) -> tuple:
+                return ENTRY.unpack_from(view, (game_id - 1) * ENTRY.size)
+
+            matched = []
+            if by_time is not None:
+                # 只有时间/结果条件：直接按时间索引的顺序取，够 limit 条即停
+                ordered = reversed(by_time) if newest_first else sorted(by_time, key=lambda t: t[1])
+                for _, game_id in ordered:
+                    if limit is not None and len(matched) >= limit:
+                        break
+                    e = entry(game_id)
+                    if result_code is not None and e[6] != result_code:
+                        continue
+                    matched.append((game_id, e))
+            else:
+                candidates.sort(key=len)
+                others = [set(ids) for ids in candidates[1:]]
+                for game_id in candidates[0]:
+                    if any(game_id not in ids for ids in others):
+                        continue
+                    e = entry(game_id)
+                    if result_code is not None and e[6] != result_code:
+                        continue
+                    if (since is not None and e[12] < since) or (until is not None and e[12] >= until):
+                        continue
+                    matched.append((game_id, e))
+                if newest_first:
+                    matched.sort(key=lambda m: (m[1][12], m[0]), reverse=True)
+                if limit is not None:
+                    matched = matched[:limit]
+        finally:
+            view.release()
+        return [self._describe(game_id, e) for game_id, e in matched]
+
+    def get(self, game_id: int) -> Dict:
+        """某一局的索引信息"""
+        return self._describe(game_id, self._entry(game_id))
+
+    def _entry(self, game_id: int) -> tuple:
+        if not 1 <= game_id <= len(self):
+            raise KeyError(f"no game #{game_id} in archive")
+        view = self._index_view()
+        try:
+            return ENTRY.unpack_from(view, (game_id - 1) * ENTRY.size)
+        finally:
+            view.release()
+
+    def _describe(self, game_id: int, e: tuple) -> Dict:
+        names = self.names
+        return {"id": game_id, "game_type": savefile.GAME_TYPES[e[4]], "size": e[5], "result": RESULTS[e[6]],
+                "moves": e[7], "black_account": names[e[8]] or None, "white_account": names[e[9]] or None,
+                "black": names[e[10]] or "Black", "white": names[e[11]] or "White", "finished_at": e[12]}
+
+    # ---------- 随机访问 ----------
+    def _payload(self, game_id: int) -> bytes:
+        seg, offset, length, crc = self._entry(game_id)[:4]
+        with self._lock:
+            mm = self._maps.get(seg)
+            if mm is None or len(mm) < offset + length:
+                if mm is not None:
+                    mm.close()
+                with open(self._segment_path(seg), "rb") as f:
+                    mm = self._maps[seg] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            payload = mm[offset:offset + length]
+        if zlib.crc32(payload) != crc:
+            raise ValueError(f"game #{game_id}: checksum mismatch")
+        return payload
+
+    def load(self, game_id: int, replay: bool = True) -> Dict:
+        """某一局的存档数据字典（与 savefile.read_save 相同结构）"""
+        return savefile.decode(self._payload(game_id), replay)
+
+    def moves(self, game_id: int) -> List[dict]:
+        return self.load(game_id, replay=False)["move_log"]
+
+    # ---------- 导入 ----------
+    def import_saves(self, paths: List[str], skip_duplicates: bool = True) -> Tuple[int, int, int]:
+        """导入 .dat 存档（紧凑格式或旧版 pickle），返回 (导入, 重复跳过, 失败)"""
+        from chess_platform.games.logic import GameFactory
+        seen = {(e[3], e[2]) for _, e in self.entries()} if skip_duplicates else set()
+        imported = skipped = failed = 0
+        for path in paths:
+            try:
+                data = savefile.read_save(path, replay=False)
+                game = GameFactory.create_game(data["type"], data["size"])
+                game.record_results = False
+                game.restore_data(data)
+                payload_data = game.to_save_data()
+                payload = savefile.encode(payload_data)
+            except Exception as e:
+                print(f"{path}: {type(e).__name__}: {e}")
+                failed += 1
+                continue
+            key = (zlib.crc32(payload), len(payload))
+            if key in seen:
+                skipped += 1
+                continue
+            seen.add(key)
+            self.append(payload_data, game.winner, finished_at=os.path.getmtime(path), sync=False)
+            imported += 1
+        os.fsync(self._seg_file.fileno())
+        return imported, skipped, failed
+
+    def close(self):
+        with self._lock:
+            for mm in self._maps.values():
+                mm.close()
+            self._maps.clear()
+            if self._index_map is not None:
+                self._index_map.close()
+                self._index_map = None
+            self._seg_file.close()
+            self._index.close()
+            self._names_file.close()
+
+
+_default: Optional[Archive] = None
+_default_lock = threading.Lock()
+
+
+def default_archive() -> Archive:
+    """进程内共享的默认档案库（ARCHIVE_DIR）"""
+    global _default
+    with _default_lock:
+        if _default is None or _default.directory != ARCHIVE_DIR:
+            _default = Archive(ARCHIVE_DIR)
+        return _default
+
+
+def format_entries(rows: List[Dict]) -> str:
+    lines = []
+    for r in rows:
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(r["finished_at"]))
+        result = r["result"] or "-"
+        lines.append(f"#{r['id']:<6} {when} {r['game_type']:<8} {r['size']:>3}  {r['black']} vs {r['white']}"
+                     f"  {result:<5} {r['moves']:>3} 手")
+    return "\n".join(lines)
+
+
+def main():
+    from chess_platform.games.batch import find_saves
+    parser = argparse.ArgumentParser(description="Game archive")
+    parser.add_argument("--dir", default=ARCHIVE_DIR)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    imp = sub.add_parser("import", help="导入 .dat 存档（文件或目录）")
+    imp.add_argument("inputs", nargs="+")
+    lst = sub.add_parser("list")
+    lst.add_argument("--account", default=None)
+    lst.add_argument("--type", default=None)
+    lst.add_argument("--size", type=int, default=None)
+    lst.add_argument("--result", default=None, help="Black / White / Draw / unfinished")
+    lst.add_argument("--limit", type=int, default=50)
+    show = sub.add_parser("show")
+    show.add_argument("id", type=int)
+    sub.add_parser("info")
+    args = parser.parse_args()
+
+    t = time.perf_counter()
+    archive = Archive(args.dir)
+    opened = time.perf_counter() - t
+    if args.cmd == "import":
+        t = time.perf_counter()
+        imported, skipped, failed = archive.import_saves(find_saves(args.inputs))
+        print(f"imported {imported}, skipped {skipped} duplicates, {failed} failed "
+              f"in {time.perf_counter() - t:.2f}s; archive has {len(archive)} games")
+    elif args.cmd == "list":
+        t = time.perf_counter()
+        rows = archive.find(args.account, args.type, args.size, args.result, limit=args.limit)
+        print(format_entries(rows) or "no games")
+        print(f"({len(rows)} shown, query {(time.perf_counter() - t) * 1e3:.2f}ms over {len(archive)} games)")
+    elif args.cmd == "show":
+        info = archive.get(args.id)
+        print(format_entries([info]))
+        print(" ".join(f"{m['color'][0]}{m['x']},{m['y']}" for m in archive.moves(args.id)))
+    else:
+        segs = sorted(n for n in os.listdir(args.dir) if n.endswith(".cpa"))
+        total = sum(os.path.getsize(os.path.join(args.dir, n)) for n in segs)
+        print(f"{len(archive)} games in {len(segs)} segments ({total} bytes), "
+              f"index {os.path.getsize(os.path.join(args.dir, 'index.bin'))} bytes, open {opened * 1e3:.2f}ms")
+    archive.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+离线批量分析：对一批存档逐局重放，在每个局面上运行分析引擎，输出逐手评估与恶手标记
+运行:
+    python -m chess_platform.games.batch chess_platform/cundang -o report.csv
+    python -m chess_platform.games.batch saves/ -o report.jsonl --engine ai-mcts --budget 1000 --workers 4
+- 多进程并行，每局一个任务；哪局先完成就先写出（流式），写完后记入检查点
+- 检查点 <输出>.ckpt 每行为 "存档路径<TAB>输出文件偏移"；中断后重跑同一命令即从断点继续，
+  并把输出截断到最后一个检查点，避免重复或半截记录；--restart 忽略检查点从头开始
+- 恶手：按该局面所有候选的分数区间归一化后的损失 >= --blunder（默认 0.5）
+- 每个局面默认 DEFAULT_BUDGET 次模拟（交互分析默认 2000 次，批量时太慢）；--budget 调整
+- 出错的存档不写输出也不记入检查点，重跑时会再试
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import sys
+import time
+from multiprocessing import Pool
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from chess_platform.games import savefile
+from chess_platform.games.logic import GameFactory
+
+FIELDS = ["game", "type", "size", "move", "color", "x", "y", "best_x", "best_y", "best_score",
+          "played_score", "loss", "norm_loss", "blunder", "candidates", "pv"]
+
+# 批量分析每个局面的默认搜索预算（MCTS 模拟次数）
+DEFAULT_BUDGET = 200
+
+# 每个工作进程按 (引擎, 棋类) 缓存分析器
+_analyzers: Dict[Tuple[str, str], object] = {}
+
+
+def _get_analyzer(engine: str, game_type: str):
+    from chess_platform.games.ai import create_ai, create_analyzer
+    key = (engine, game_type)
+    if key not in _analyzers:
+        if engine == "auto":
+            _analyzers[key] = create_analyzer(game_type)
+        else:
+            _analyzers[key] = create_ai(engine, game_type, name="Analyzer")
+    return _analyzers[key]
+
+
+def analyze_game(path: str, engine: str = "auto", budget: Optional[int] = DEFAULT_BUDGET,
+                 blunder: float = 0.5) -> List[Dict]:
+    """分析一个存档中的每一手，返回逐手记录"""
+    data = savefile.read_save(path, replay=False)
+    game_type, size = data["type"], data["size"]
+    analyzer = _get_analyzer(engine, game_type)
+    analyzer.reset()
+    # 以路径作种子：同一存档重复分析（包括断点续跑）结果一致
+    random.seed(path)
+    game = GameFactory.create_game(game_type, size)
+    game.record_results = False
+    game.start()
+    records = []
+    for step in data.get("move_log", []):
+        game.current_player_idx = 0 if step["color"] == "Black" else 1
+        infos = analyzer.analyze(game, top_k=size * size, budget=budget)
+        move = (step["x"], step["y"])
+        record = {"game": path, "type": game_type, "size": size, "move": step["move_idx"],
+                  "color": step["color"], "x": move[0], "y": move[1], "best_x": None, "best_y": None,
+                  "best_score": None, "played_score": None, "loss": None, "norm_loss": None,
+                  "blunder": None, "candidates": len(infos), "pv": ""}
+        if infos:
+            best = infos[0]
+            record.update(best_x=best.move[0], best_y=best.move[1], best_score=round(best.score, 4),
+                          pv=" ".join(f"{r},{c}" for r, c in best.pv))
+            played = next((info for info in infos if info.move == move), None)
+            if played is not None:
+                # infos 不一定按分数排序（MCTS 按访问数），区间取全体候选
+                hi = max(info.score for info in infos)
+                lo = min(info.score for info in infos)
+                loss = max(0.0, best.score - played.score)
+                norm = loss / (hi - lo) if hi > lo else 0.0
+                record.update(played_score=round(played.score, 4), loss=round(loss, 4),
+                              norm_loss=round(norm, 4), blunder=norm >= blunder)
+        records.append(record)
+        if not game.apply_logged_move(step):
+            # 录像中的非法步：之后的局面无意义
+            break
+    return records
+
+
+def _worker(task: Tuple[str, str, Optional[int], float]) -> Tuple[str, List[Dict], Optional[str]]:
+    path = task[0]
+    try:
+        return path, analyze_game(*task), None
+    except Exception as e:
+        return path, [], f"{type(e).__name__}: {e}"
+
+
+def find_saves(inputs: Iterable[str], pattern: str = ".dat") -> List[str]:
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for dirpath, _, files in os.walk(item):
+                paths.extend(os.path.join(dirpath, f) for f in files if f.endswith(pattern))
+        else:
+            paths.append(item)
+    return sorted(paths)
+
+
+# ---------- 输出 / 检查点 ----------
+def _load_checkpoint(ckpt_path: str) -> Tuple[set, int]:
+    """返回 (已完成的存档, 输出文件的有效长度)；中断时写了一半的末行会被截掉"""
+    done = set()
+    offset = 0
+    if not os.path.exists(ckpt_path):
+        return done, offset
+    with open(ckpt_path, "r+b") as f:
+        raw = f.read()
+        valid = raw.rfind(b"\n") + 1
+        if valid != len(raw):
+            f.truncate(valid)
+    for line in raw[:valid].decode("utf-8").splitlines():
+        path, end = line.rsplit("\t", 1)
+        done.add(path)
+        offset = int(end)
+    return done, offset
+
+
+def _format_records(records: List[Dict], fmt: str, header: bool) -> str:
+    buf = io.StringIO()
+    if fmt == "jsonl":
+        for r in records:
+            buf.write(json.dumps(r, ensure_ascii=False) + "\n")
+    else:
+        writer = csv.DictWriter(buf, fieldnames=FIELDS, lineterminator="\n")
+        if header:
+            writer.writeheader()
+        writer.writerows(records)
+    return buf.getvalue()
+
+
+def run(inputs: List[str], output: str, engine: str = "auto", budget: Optional[int] = DEFAULT_BUDGET,
+        blunder: float = 0.5, workers: Optional[int] = None, restart: bool = False,
+        quiet: bool = False) -> Dict:
+    fmt = "jsonl" if output.endswith((".jsonl", ".json")) else "csv"
+    ckpt_path = output + ".ckpt"
+    if restart:
+        for p in (output, ckpt_path):
+            if os.path.exists(p):
+                os.remove(p)
+    done, offset = _load_checkpoint(ckpt_path)
+    paths = [p for p in find_saves(inputs) if p not in done]
+
+    # 截断到最后一个检查点：丢弃中断时写了一半或未记入检查点的记录
+    out = open(output, "a+b")
+    out.truncate(offset)
+    out.seek(offset)
+    ckpt = open(ckpt_path, "a", encoding="utf-8")
+    header = offset == 0
+
+    stats = {"games": 0, "positions": 0, "blunders": 0, "errors": 0, "skipped": len(done)}
+    start = time.perf_counter()
+    tasks = [(p, engine, budget, blunder) for p in paths]
+    pool = Pool(workers)
+    try:
+        for path, records, error in pool.imap_unordered(_worker, tasks, chunksize=1):
+            if error:
+                # 不记检查点：修好存档或环境后重跑同一命令会再分析它
+                stats["errors"] += 1
+                print(f"{path}: {error}", file=sys.stderr)
+                continue
+            out.write(_format_records(records, fmt, header).encode("utf-8"))
+            header = False
+            out.flush()
+            os.fsync(out.fileno())
+            ckpt.write(f"{path}\t{out.tell()}\n")
+            ckpt.flush()
+            stats["games"] += 1
+            stats["positions"] += len(records)
+            stats["blunders"] += sum(1 for r in records if r["blunder"])
+            if not quiet:
+                elapsed = time.perf_counter() - start
+                print(f"[{stats['games']}/{len(tasks)}] {path}: {len(records)} moves "
+                      f"({stats['positions'] / elapsed:.1f} positions/s)")
+        pool.close()
+    except KeyboardInterrupt:
+        pool.terminate()
+        print("Interrupted; rerun the same command to resume.", file=sys.stderr)
+    finally:
+        pool.join()
+        out.close()
+        ckpt.close()
+    stats["elapsed"] = time.perf_counter() - start
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch-analyze saved games")
+    parser.add_argument("inputs", nargs="+", help="存档文件或目录（递归查找 .dat）")
+    parser.add_argument("-o", "--output", default="analysis.csv", help=".csv 或 .jsonl")
+    parser.add_argument("--engine", default="auto", help="auto / ai-rand / ai-pro / ai-mcts")
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET,
+                        help=f"每个局面的搜索预算（MCTS 模拟次数），默认 {DEFAULT_BUDGET}")
+    parser.add_argument("--blunder", type=float, default=0.5, help="恶手阈值（归一化损失）")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认 CPU 核数")
+    parser.add_argument("--restart", action="store_true", help="忽略检查点，从头开始")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+    stats = run(args.inputs, args.output, args.engine, args.budget, args.blunder, args.workers,
+                args.restart, args.quiet)
+    rate = stats["positions"] / stats["elapsed"] if stats["elapsed"] else 0.0
+    print(f"games={stats['games']} (skipped {stats['skipped']} already done) positions={stats['positions']} "
+          f"blunders={stats['blunders']} errors={stats['errors']} elapsed={stats['elapsed']:.1f}s "
+          f"({rate:.1f} positions/s)")
+
+
+if __name__ == "__main__":
+    main()
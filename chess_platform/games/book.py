@@ -0,0 +1,237 @@
+"""
+开局库：按对称规范化后的局面哈希记录开局阶段各着法的出现次数与得分
+运行:
+    python -m chess_platform.games.book build --game gomoku --size 15 --self-play 200 --black ai-pro --white ai-pro
+    python -m chess_platform.games.book build --game gomoku --size 15 --from-saves chess_platform/cundang
+    python -m chess_platform.games.book info chess_platform/games/books/gomoku-15.book
+
+文件格式（按 (hash, move) 升序的定长条目，查找时 mmap + 二分，无需整体载入）:
+    文件头 12 字节: magic "CPBK" | version u8 | game_type u8 | size u8 | max_ply u8 | 条目数 u32
+    条目 16 字节:   hash u64 | move u16（规范形下的格子下标）| count u16 | score u32（胜 2 / 平 1 / 负 0 累加）
+局面先在 8 种旋转/翻转中取打包字节最小者为规范形，着法随之变换；查询时再变换回实际方向。
+"""
+import argparse
+import mmap
+import os
+import struct
+import time
+from multiprocessing import Pool
+from typing import Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+from chess_platform.games import savefile
+from chess_platform.games.symmetry import (board_cells, canonical, inverse_symmetries, position_hash,
+                                           symmetries)
+
+if TYPE_CHECKING:
+    from chess_platform.games.logic import GameContext  # type: ignore
+
+MAGIC = b"CPBK"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBBI")
+ENTRY = struct.Struct("<QHHI")
+
+BOOK_DIR = os.path.join(os.path.dirname(__file__), "books")
+
+
+def default_path(game_type: str, size: int) -> str:
+    return os.path.join(BOOK_DIR, f"{game_type.lower()}-{size}.book")
+
+
+class OpeningBook:
+    """只读开局库（mmap）"""
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, type_code, self.size, self.max_ply, self.count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path}: not an opening book")
+        self.game_type = savefile.GAME_TYPES[type_code]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self):
+        self._mm.close()
+
+    def _hash_at(self, i: int) -> int:
+        return struct.unpack_from("<Q", self._mm, HEADER.size + i * ENTRY.size)[0]
+
+    def lookup_hash(self, h: int) -> List[Tuple[int, int, int]]:
+        """二分查找某个规范局面的全部条目 [(规范着法, count, score)]"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._hash_at(mid) < h:
+                lo = mid + 1
+            else:
+                hi = mid
+        result = []
+        pos = HEADER.size + lo * ENTRY.size
+        for _ in range(lo, self.count):
+            eh, move, count, score = ENTRY.unpack_from(self._mm, pos)
+            if eh != h:
+                break
+            result.append((move, count, score))
+            pos += ENTRY.size
+        return result
+
+    def candidates(self, game: "GameContext") -> List[Tuple[Tuple[int, int], int, float]]:
+        """当前局面的库内着法 [((x, y), 次数, 平均得分 0~1)]，按次数降序"""
+        size = game.board.size
+        if size != self.size or game.game_type != self.game_type or len(game.move_log) >= self.max_ply:
+            return []
+        packed, k = canonical(board_cells(game.board), size)
+        entries = self.lookup_hash(position_hash(packed, game.current_player_idx))
+        inverse = inverse_symmetries(size)[k]
+        me = game.current_player
+        result = []
+        for move, count, score in entries:
+            x, y = divmod(inverse[move], size)
+            if game.board.get_piece(x, y) is None and game.rule.is_valid_move(game.board, x, y, me)[0]:
+                result.append(((x, y), count, score / (2.0 * count)))
+        result.sort(key=lambda e: (e[1], e[2]), reverse=True)
+        return result
+
+    def probe(self, game: "GameContext", min_count: int = 2) -> Optional[Tuple[int, int]]:
+        """库内出现次数最多（其次得分最高）的着法；不在库中返回 None"""
+        cands = self.candidates(game)
+        if cands and cands[0][1] >= min_count:
+            return cands[0][0]
+        return None
+
+
+_default_books: Dict[Tuple[str, int], Optional[OpeningBook]] = {}
+
+
+def default_book(game_type: str, size: int) -> Optional[OpeningBook]:
+    """随包分发的开局库（books/<棋类>-<路数>.book），不存在时返回 None；每进程只打开一次"""
+    key = (game_type.lower(), size)
+    if key not in _default_books:
+        path = default_path(game_type, size)
+        _default_books[key] = OpeningBook(path) if os.path.exists(path) else None
+    return _default_books[key]
+
+
+# ---------- 构建 ----------
+def collect(games: Iterable[Tuple[List[dict], str]], game_type: str, size: int,
+            max_ply: int) -> Dict[Tuple[int, int], List[int]]:
+    """统计 (规范局面哈希, 规范着法) -> [次数, 得分]；games 为 (录像, 胜方) 序列"""
+    from chess_platform.games.logic import GameFactory
+    perms = symmetries(size)
+    stats: Dict[Tuple[int, int], List[int]] = {}
+    for move_log, winner in games:
+        game = GameFactory.create_game(game_type, size)
+        game.record_results = False
+        game.start()
+        for step in move_log[:max_ply]:
+            idx = 0 if step["color"] == "Black" else 1
+            packed, k = canonical(board_cells(game.board), size)
+            key = (position_hash(packed, idx), perms[k][step["x"] * size + step["y"]])
+            entry = stats.setdefault(key, [0, 0])
+            entry[0] += 1
+            entry[1] += 1 if winner == "Draw" else (2 if winner == step["color"] else 0)
+            if not game.apply_logged_move(step):
+                break
+    return stats
+
+
+def _capped(count: int, score: int) -> Tuple[int, int]:
+    """count 超出 u16 时封顶，score 按同一比例缩放，平均得分 score / (2 * count) 不变"""
+    if count <= 0xFFFF:
+        return count, score
+    return 0xFFFF, round(score * 0xFFFF / count)
+
+
+def write_book(path: str, game_type: str, size: int, max_ply: int,
+               stats: Dict[Tuple[int, int], List[int]], min_count: int = 1) -> int:
+    entries = sorted((h, move) + _capped(count, score) for (h, move), (count, score) in stats.items()
+                     if count >= min_count)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, savefile.GAME_TYPES.index(game_type), size, max_ply, len(entries)))
+        for e in entries:
+            f.write(ENTRY.pack(*e))
+    os.replace(tmp, path)
+    return len(entries)
+
+
+def _saved_games(directory: str, game_type: str, size: int) -> Iterable[Tuple[List[dict], str]]:
+    from chess_platform.games.batch import find_saves
+    from chess_platform.games.logic import GameFactory
+    from chess_platform.games.selfplay import final_winner
+    for path in find_saves([directory]):
+        try:
+            data = savefile.read_save(path, replay=False)
+        except Exception:
+            continue
+        if data["type"] != game_type or data["size"] != size or not data["move_log"]:
+            continue
+        game = GameFactory.create_game(game_type, size)
+        game.record_results = False
+        if game.rebuild_history(data["move_log"]):
+            yield data["move_log"], final_winner(game)
+
+
+def _self_play_worker(task) -> Tuple[List[dict], str]:
+    from chess_platform.games.selfplay import play_game
+    _, winner, moves = play_game(*task)
+    return moves, winner
+
+
+def _self_play_games(game_type: str, size: int, black: str, white: str, games: int,
+                     simulations: Optional[int], workers: Optional[int]):
+    # 构建时不查已有的库，避免结果只是旧库的重复
+    tasks = [(game_type, size, black, white, simulations, size * size, seed, False) for seed in range(games)]
+    with Pool(workers) as pool:
+        yield from pool.imap_unordered(_self_play_worker, tasks, chunksize=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Opening book builder")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build")
+    b.add_argument("--game", default="gomoku")
+    b.add_argument("--size", type=int, default=15)
+    b.add_argument("--max-ply", type=int, default=10)
+    b.add_argument("--min-count", type=int, default=1, help="少于该次数的条目不入库")
+    b.add_argument("--from-saves", default=None, help="从存档目录统计")
+    b.add_argument("--self-play", type=int, default=0, help="自对弈局数")
+    b.add_argument("--black", default="ai-pro")
+    b.add_argument("--white", default="ai-pro")
+    b.add_argument("--simulations", type=int, default=None)
+    b.add_argument("--workers", type=int, default=None)
+    b.add_argument("-o", "--output", default=None, help="默认 books/<棋类>-<路数>.book")
+    i = sub.add_parser("info")
+    i.add_argument("path")
+    args = parser.parse_args()
+
+    if args.cmd == "info":
+        t = time.perf_counter()
+        book = OpeningBook(args.path)
+        print(f"{book.game_type} {book.size}x{book.size} max_ply={book.max_ply} entries={len(book)} "
+              f"bytes={os.path.getsize(args.path)} open={(time.perf_counter() - t) * 1e3:.2f}ms")
+        return
+
+    from chess_platform.games.logic import GameFactory
+    game_type = GameFactory.create_game(args.game, args.size).game_type
+    sources = []
+    if args.from_saves:
+        sources.append(_saved_games(args.from_saves, game_type, args.size))
+    if args.self_play:
+        sources.append(_self_play_games(game_type, args.size, args.black, args.white, args.self_play,
+                                        args.simulations, args.workers))
+    if not sources:
+        parser.error("need --from-saves and/or --self-play")
+    games = (g for src in sources for g in src)
+    t = time.perf_counter()
+    stats = collect(games, game_type, args.size, args.max_ply)
+    path = args.output or default_path(game_type, args.size)
+    n = write_book(path, game_type, args.size, args.max_ply, stats, args.min_count)
+    print(f"wrote {n} entries to {path} ({os.path.getsize(path)} bytes) in {time.perf_counter() - t:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Othello 精确残局求解
+剩余空格不多时直接搜索到终局，返回最佳着法与终局子数差（己方 - 对方）。
+- 位棋盘：N×N 棋盘用一个 Python 整数表示一方棋子，第 r*N+c 位对应 (r, c)
+- negamax + alpha-beta；置换表按 (己方, 对方) 记录上下界与最佳着法
+- 着法排序：置换表着法优先；空格较多时按对手行动力（少者优先，即 fastest-first），
+  其次按奇偶性（所在象限空格数为奇数者优先）
+"""
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from chess_platform.games.logic import GameContext  # type: ignore
+
+EXACT, LOWER, UPPER = 0, 1, 2
+# 空格数低于该值时不再做行动力排序（排序本身比节省的节点更贵），也不存置换表
+_ORDER_MIN_EMPTIES = 7
+_TT_MIN_EMPTIES = 5
+_TT_LIMIT = 2_000_000
+
+
+class _Geometry:
+    """某一路数下的位移掩码与象限划分"""
+    def __init__(self, size: int):
+        n = size
+        self.size = n
+        self.full = (1 << (n * n)) - 1
+        col0 = sum(1 << (r * n) for r in range(n))
+        colN = sum(1 << (r * n + n - 1) for r in range(n))
+        not_col0 = self.full & ~col0
+        not_colN = self.full & ~colN
+        full = self.full
+        # (左移位数或负数表示右移, 结果掩码)
+        self.dirs = [
+            (1, not_col0), (-1, not_colN),
+            (n, full), (-n, full),
+            (n + 1, not_col0), (n - 1, not_colN),
+            (-(n - 1), not_col0), (-(n + 1), not_colN),
+        ]
+        half = n // 2
+        quads = [0, 0, 0, 0]
+        for r in range(n):
+            for c in range(n):
+                quads[(r >= half) * 2 + (c >= half)] |= 1 << (r * n + c)
+        self.quadrants = quads
+
+    def moves(self, P: int, O: int) -> int:
+        empty = ~(P | O) & self.full
+        result = 0
+        for d, mask in self.dirs:
+            if d > 0:
+                x = ((P << d) & mask) & O
+                while x:
+                    nxt = (x << d) & mask
+                    result |= nxt & empty
+                    x = nxt & O
+            else:
+                d = -d
+                x = ((P >> d) & mask) & O
+                while x:
+                    nxt = (x >> d) & mask
+                    result |= nxt & empty
+                    x = nxt & O
+        return result
+
+    def flips(self, P: int, O: int, mv: int) -> int:
+        result = 0
+        for d, mask in self.dirs:
+            line = 0
+            if d > 0:
+                y = (mv << d) & mask
+                while y & O:
+                    line |= y
+                    y = (y << d) & mask
+            else:
+                y = (mv >> -d) & mask
+                while y & O:
+                    line |= y
+                    y = (y >> -d) & mask
+            if y & P:
+                result |= line
+        return result
+
+
+_geometries: Dict[int, _Geometry] = {}
+
+
+def _geometry(size: int) -> _Geometry:
+    if size not in _geometries:
+        _geometries[size] = _Geometry(size)
+    return _geometries[size]
+
+
+# int.bit_count 需要 Python 3.10+；旧版本退回按二进制串计数
+_popcount = getattr(int, "bit_count", None) or (lambda x: bin(x).count("1"))
+
+
+def _bits(x: int) -> List[int]:
+    out = []
+    while x:
+        low = x & -x
+        out.append(low)
+        x ^= low
+    return out
+
+
+class EndgameSolver:
+    """
+    精确残局求解器；同一实例在相邻的求解之间保留置换表（同一局后续几手可直接命中）
+    """
+    def __init__(self, max_empties: int = 14):
+        self.max_empties = max_empties
+        self.tt: Dict[Tuple[int, int], Tuple[int, int, int]] = {}
+        self.nodes = 0
+        self.last_time = 0.0
+
+    def applicable(self, game: "GameContext") -> bool:
+        if game.game_type != "Othello":
+            return False
+        empties = sum(1 for row in game.board._grid for p in row if p is None)
+        return empties <= self.max_empties
+
+    def solve(self, game: "GameContext") -> Tuple[Optional[Tuple[int, int]], int]:
+        """返回 (最佳着法, 终局子数差)；当前方无子可下时着法为 None"""
+        geo, P, O = self._position(game)
+        start = time.perf_counter()
+        self.nodes = 0
+        value = self._search(geo, P, O, -geo.size * geo.size - 1, geo.size * geo.size + 1, False)
+        self.last_time = time.perf_counter() - start
+        entry = self.tt.get((P, O))
+        move = None
+        if entry is not None and entry[2]:
+            move = divmod(entry[2].bit_length() - 1, geo.size)
+        elif geo.moves(P, O):
+            # 空格太少未进置换表：直接比较各着法
+            move = max(self.evaluate_moves(game), key=lambda e: e[1])[0]
+        return move, value
+
+    def evaluate_moves(self, game: "GameContext") -> List[Tuple[Tuple[int, int], int]]:
+        """每个合法着法的精确终局子数差（分析模式使用）"""
+        geo, P, O = self._position(game)
+        bound = geo.size * geo.size + 1
+        result = []
+        for mv in _bits(geo.moves(P, O)):
+            f = geo.flips(P, O, mv)
+            value = -self._search(geo, O ^ f, P | mv | f, -bound, bound, False)
+            result.append((divmod(mv.bit_length() - 1, geo.size), value))
+        return result
+
+    def clear(self):
+        self.tt.clear()
+
+    def _position(self, game: "GameContext"):
+        geo = _geometry(game.board.size)
+        me = game.current_player.color_name
+        P = O = 0
+        bit = 1
+        for row in game.board._grid:
+            for p in row:
+                if p is not None:
+                    if p.color_name == me:
+                        P |= bit
+                    else:
+                        O |= bit
+                bit <<= 1
+        if len(self.tt) > _TT_LIMIT:
+            self.tt.clear()
+        return geo, P, O
+
+    def _search(self, geo: _Geometry, P: int, O: int, alpha: int, beta: int, passed: bool) -> int:
+        self.nodes += 1
+        empty = ~(P | O) & geo.full
+        n_empty = _popcount(empty)
+        key = (P, O)
+        tt_move = 0
+        use_tt = n_empty >= _TT_MIN_EMPTIES
+        if use_tt:
+            entry = self.tt.get(key)
+            if entry is not None:
+                value, flag, tt_move = entry
+                if flag == EXACT:
+                    return value
+                if flag == LOWER and value >= beta:
+                    return value
+                if flag == UPPER and value <= alpha:
+                    return value
+
+        if n_empty == 1:
+            return self._last_move(geo, P, O, empty)
+
+        moves = geo.moves(P, O)
+        if not moves:
+            if passed or not empty:
+                return _popcount(P) - _popcount(O)
+            return -self._search(geo, O, P, -beta, -alpha, True)
+
+        ordered = self._order(geo, P, O, moves, empty, n_empty, tt_move)
+        alpha0 = alpha
+        best = -geo.size * geo.size - 1
+        best_move = 0
+        for i, mv in enumerate(ordered):
+            f = geo.flips(P, O, mv)
+            if i == 0:
+                value = -self._search(geo, O ^ f, P | mv | f, -beta, -alpha, False)
+            else:
+                # 主变搜索：后续着法先用零窗口证明不优于当前最好，失败再全窗口重搜
+                value = -self._search(geo, O ^ f, P | mv | f, -alpha - 1, -alpha, False)
+                if alpha < value < beta:
+                    value = -self._search(geo, O ^ f, P | mv | f, -beta, -value, False)
+            if value > best:
+                best, best_move = value, mv
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+        if use_tt:
+            flag = UPPER if best <= alpha0 else (LOWER if best >= beta else EXACT)
+            self.tt[key] = (best, flag, best_move)
+        return best
+
+    def _last_move(self, geo: _Geometry, P: int, O: int, empty: int) -> int:
+        """只剩一个空格：己方能下则下，否则对方下，都不能下则直接计数"""
+        f = geo.flips(P, O, empty)
+        if f:
+            return _popcount(P | empty | f) - _popcount(O ^ f)
+        f = geo.flips(O, P, empty)
+        if f:
+            return _popcount(P ^ f) - _popcount(O | empty | f)
+        return _popcount(P) - _popcount(O)
+
+    def _order(self, geo: _Geometry, P: int, O: int, moves: int, empty: int, n_empty: int,
+               tt_move: int) -> List[int]:
+        bits = _bits(moves)
+        if len(bits) == 1:
+            return bits
+        odd = 0
+        for q in geo.quadrants:
+            if _popcount(q & empty) & 1:
+                odd |= q
+        if n_empty >= _ORDER_MIN_EMPTIES:
+            scored = []
+            for mv in bits:
+                f = geo.flips(P, O, mv)
+                mobility = _popcount(geo.moves(O ^ f, P | mv | f))
+                scored.append((mv != tt_move, mobility, not (mv & odd), mv))
+            scored.sort()
+            return [s[3] for s in scored]
+        bits.sort(key=lambda mv: (mv != tt_move, not (mv & odd)))
+        return bits
+
+
+# 求解器带可变的置换表与计数，不能跨线程共享：每个线程各有一组
+_local = threading.local()
+
+
+def solver_for(max_empties: int) -> EndgameSolver:
+    """当前线程内按阈值共享的求解器实例（置换表在同一线程的相邻求解间复用）"""
+    solvers: Optional[Dict[int, EndgameSolver]] = getattr(_local, "solvers", None)
+    if solvers is None:
+        solvers = _local.solvers = {}
+    if max_empties not in solvers:
+        solvers[max_empties] = EndgameSolver(max_empties)
+    return solvers[max_empties]
@@ -0,0 +1,591 @@
+"""
+开局浏览器：在对局档案库的全部对局中查询"这个局面下走过哪些着法、战绩如何"
+运行:
+    python -m chess_platform.games.explorer build --game gomoku --size 15
+    python -m chess_platform.games.explorer sync
+    python -m chess_platform.games.explorer compact --game gomoku --size 15
+    python -m chess_platform.games.explorer query --game gomoku --size 15 --moves 7,7 7,8 8,8
+    python -m chess_platform.games.explorer info --game gomoku --size 15
+
+每个 (棋类, 路数) 一组文件，放在档案库目录的 explorer/ 下:
+    <棋类>-<路数>.idx  按 (哈希, 着法) 升序的定长条目，查询时 mmap + 二分
+        文件头 16 字节: magic "CPEX" | version u8 | game_type u8 | size u8 | 保留 u8 | 条目数 u32 | 已收录的档案编号 u32
+        条目 26 字节:   hash u64 | move u16（规范方向下的格子下标）| games u32 | wins u32 | draws u32 | losses u32
+    <棋类>-<路数>.log  增量日志：每局终局后追加该局的条目（同上格式，计数为增量），
+        以一个 move=0xFFFF 的标记条目结束（games 字段为档案编号；空盘的哈希就是 0，不能用哈希作标记）；打开时载入内存，
+        攒够 COMPACT_ENTRIES 条后由后台线程与 .idx 归并成新的 .idx（也可用 compact 子命令显式归并）：
+        先把日志改名为 .log.compacting、新开空日志，收录与查询照常进行，归并写完、原子替换 .idx 后再删除旧日志；
+        中途崩溃时打开会把 .log.compacting 并回日志（已归并的对局按档案编号跳过）
+局面按 SymmetricZobrist 的规范哈希（8 种旋转/翻转取最小）加执子方索引，不同步序到达的同一局面
+（换序）与对称局面合并统计；胜/平/负均以走这步的一方计。全量构建时内存中的计数攒满
+RUN_ENTRIES 条即排序写出为临时段，最后多路归并，内存占用与对局数无关。
+"""
+import argparse
+import heapq
+import mmap
+import os
+import queue
+import struct
+import tempfile
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+from chess_platform.games import savefile
+from chess_platform.games.archive import RESULTS
+from chess_platform.games.symmetry import SymmetricZobrist, board_cells, inverse_symmetries
+
+if TYPE_CHECKING:
+    from chess_platform.core.interfaces import Board  # type: ignore
+    from chess_platform.games.archive import Archive  # type: ignore
+    from chess_platform.games.logic import GameContext  # type: ignore
+
+MAGIC = b"CPEX"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBxII")
+ENTRY = struct.Struct("<QHIIII")
+# 规范着法下标存为 u16，且对称表需要整盘展开，只支持到该路数
+MAX_SIZE = 25
+RUN_ENTRIES = 500_000
+COMPACT_ENTRIES = 50_000
+_MARKER = 0xFFFF
+
+# 内存中的计数打包为一个整数（每项 32 位），一次加法同时累加
+_GAME, _WIN, _DRAW, _LOSS = 1 << 96, 1 << 64, 1 << 32, 1
+_FIELD = (1 << 32) - 1
+
+
+def _unpack_counts(v: int) -> Tuple[int, int, int, int]:
+    return v >> 96, (v >> 64) & _FIELD, (v >> 32) & _FIELD, v & _FIELD
+
+
+def _pack_counts(games: int, wins: int, draws: int, losses: int) -> int:
+    return (games << 96) | (wins << 64) | (draws << 32) | losses
+
+
+def supported(game_type: str, size: int) -> bool:
+    return 0 < size <= MAX_SIZE
+
+
+_zobrists: Dict[int, SymmetricZobrist] = {}
+
+
+def zobrist_for(size: int) -> SymmetricZobrist:
+    if size not in _zobrists:
+        _zobrists[size] = SymmetricZobrist(size)
+    return _zobrists[size]
+
+
+def game_positions(game_type: str, size: int, move_log: List[dict],
+                   winner: Optional[str]) -> Iterator[Tuple[int, int, int]]:
+    """
+    重放一局，逐手给出 (规范局面哈希, 规范着法, 打包计数增量)
+    只按规则落子/提子，遇到非法步序即停止；哈希按每步改动的格子增量更新
+    """
+    from chess_platform.games.logic import GameFactory
+    zob = zobrist_for(size)
+    keys = zob.keys
+    game = GameFactory.create_game(game_type, size)
+    game.record_results = False
+    game.start()
+    board, rule = game.board, game.rule
+    packed = zob.full(board_cells(board))  # 围棋/五子棋为 0；黑白棋有初始四子
+    for step in move_log:
+        x, y = step["x"], step["y"]
+        to_move = 0 if step["color"] == "Black" else 1
+        piece = game.players[to_move]
+        if not rule.is_valid_move(board, x, y, piece)[0]:
+            return
+        h, ks = zob.canonical(packed, to_move)
+        if winner is None:
+            inc = _GAME
+        elif winner == "Draw":
+            inc = _GAME | _DRAW
+        else:
+            inc = _GAME | (_WIN if winner == step["color"] else _LOSS)
+        yield h, zob.canonical_move(x * size + y, ks), inc
+        board.begin_changes()
+        board.place_piece(x, y, piece)
+        rule.post_move_action(board, x, y, piece)
+        seen = set()
+        for cx, cy, old in board.end_changes():
+            if (cx, cy) in seen:
+                continue
+            seen.add((cx, cy))
+            cell = cx * size + cy
+            if old is not None:
+                packed ^= keys[old.color_name != "Black"][cell]
+            new = board.get_piece(cx, cy)
+            if new is not None:
+                packed ^= keys[new.color_name != "Black"][cell]
+
+
+class Explorer:
+    """某一 (棋类, 路数) 的局面索引：mmap 的有序主文件 + 内存中的增量日志"""
+    def __init__(self, directory: str, game_type: str, size: int):
+        if not supported(game_type, size):
+            raise ValueError(f"explorer supports boards up to {MAX_SIZE}x{MAX_SIZE}")
+        self.directory = directory
+        self.game_type = game_type
+        self.size = size
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"{game_type.lower()}-{size}")
+        self.idx_path = base + ".idx"
+        self.log_path = base + ".log"
+        self.compacting_path = self.log_path + ".compacting"
+        self._lock = threading.Lock()
+        self._mm: Optional[mmap.mmap] = None
+        self.count = 0
+        self.last_game_id = 0
+        # 本进程中 sync 已检查到的档案编号（其他棋类/路数的对局不写日志，只在内存中跳过）
+        self._scanned = 0
+        self._open_index()
+        # 日志中的增量：hash -> {规范着法: 打包计数}
+        self.pending: Dict[int, Dict[int, int]] = {}
+        self.pending_entries = 0
+        # 正在后台归并的那部分增量（查询时同样计入）与归并线程
+        self._frozen: Dict[int, Dict[int, int]] = {}
+        self._compactor: Optional[threading.Thread] = None
+        self._recover_compacting()
+        self._load_log()
+        self._log = open(self.log_path, "ab")
+
+    # ---------- 文件 ----------
+    def _open_index(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self.count = 0
+        if not os.path.exists(self.idx_path):
+            return
+        with open(self.idx_path, "rb") as f:
+            head = f.read(HEADER.size)
+            magic, version, type_code, size, self.count, self.last_game_id = HEADER.unpack(head)
+            if magic != MAGIC or version != VERSION or size != self.size:
+                raise ValueError(f"{self.idx_path}: not an explorer index for this board")
+            if self.count:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _recover_compacting(self):
+        """上次归并中途退出：把 .log.compacting 接回日志前面（写临时文件后原子替换）"""
+        if not os.path.exists(self.compacting_path):
+            return
+        with open(self.compacting_path, "rb") as f:
+            raw = f.read()
+        raw = raw[:len(raw) - len(raw) % ENTRY.size]
+        if os.path.exists(self.log_path):
+            with open(self.log_path, "rb") as f:
+                raw += f.read()
+        tmp = self.log_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(raw)
+        os.replace(tmp, self.log_path)
+        os.remove(self.compacting_path)
+
+    def _load_log(self):
+        """载入增量日志；最后一个完整对局（标记条目）之后的残留截掉"""
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, "r+b") as f:
+            raw = f.read()
+            valid = 0
+            group = []
+            for pos in range(0, len(raw) - len(raw) % ENTRY.size, ENTRY.size):
+                entry = ENTRY.unpack_from(raw, pos)
+                if entry[1] == _MARKER:
+                    if entry[2] > self.last_game_id:
+                        for h, move, games, wins, draws, losses in group:
+                            self._add_pending(h, move, _pack_counts(games, wins, draws, losses))
+                        self.last_game_id = entry[2]
+                    group = []
+                    valid = pos + ENTRY.size
+                else:
+                    group.append(entry)
+            if valid != len(raw):
+                f.truncate(valid)
+
+    def _add_pending(self, h: int, move: int, inc: int):
+        moves = self.pending.setdefault(h, {})
+        if move not in moves:
+            self.pending_entries += 1
+        moves[move] = moves.get(move, 0) + inc
+
+    # ---------- 查询 ----------
+    def _lookup_hash(self, h: int) -> Dict[int, int]:
+        """某个规范局面的 {规范着法: 打包计数}（主文件 + 日志）"""
+        result: Dict[int, int] = {}
+        mm, count = self._mm, self.count
+        if mm is not None:
+            lo, hi = 0, count
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if struct.unpack_from("<Q", mm, HEADER.size + mid * ENTRY.size)[0] < h:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            pos = HEADER.size + lo * ENTRY.size
+            for _ in range(lo, count):
+                eh, move, games, wins, draws, losses = ENTRY.unpack_from(mm, pos)
+                if eh != h:
+                    break
+                result[move] = _pack_counts(games, wins, draws, losses)
+                pos += ENTRY.size
+        for pending in (self._frozen, self.pending):
+            for move, v in pending.get(h, {}).items():
+                result[move] = result.get(move, 0) + v
+        return result
+
+    def lookup(self, board: "Board", to_move: int) -> List[Dict]:
+        """
+        某个局面下走过的着法统计，按局数降序：
+        [{"move": (x, y), "games", "wins", "draws", "losses", "score"}]，score 为走这步一方的平均得分 0~1
+        """
+        size = self.size
+        if board.size != size:
+            return []
+        zob = zobrist_for(size)
+        h, ks = zob.canonical(zob.full(board_cells(board)), to_move)
+        with self._lock:
+            stats = self._lookup_hash(h)
+        inverse = inverse_symmetries(size)[ks[0]]
+        rows = []
+        for move, v in stats.items():
+            games, wins, draws, losses = _unpack_counts(v)
+            decided = wins + draws + losses
+            rows.append({"move": divmod(inverse[move], size), "games": games, "wins": wins, "draws": draws,
+                         "losses": losses, "score": (wins + 0.5 * draws) / decided if decided else 0.5})
+        rows.sort(key=lambda r: (r["games"], r["score"]), reverse=True)
+        return rows
+
+    def lookup_game(self, game: "GameContext") -> List[Dict]:
+        if game.game_type != self.game_type:
+            return []
+        return self.lookup(game.board, game.current_player_idx)
+
+    # ---------- 增量更新 ----------
+    def add_game(self, game_id: int, move_log: List[dict], winner: Optional[str]):
+        """收录一局（game_id 为档案编号，已收录过的忽略）"""
+        with self._lock:
+            if game_id <= self.last_game_id:
+                return
+            merged: Dict[Tuple[int, int], int] = {}
+            for h, move, inc in game_positions(self.game_type, self.size, move_log, winner):
+                merged[(h, move)] = merged.get((h, move), 0) + inc
+            buf = bytearray()
+            for (h, move), v in merged.items():
+                buf += ENTRY.pack(h, move, *_unpack_counts(v))
+                self._add_pending(h, move, v)
+            buf += ENTRY.pack(0, _MARKER, game_id, 0, 0, 0)
+            # 一局的条目与标记一次写入；中途崩溃时打开时截掉不完整的一局
+            self._log.write(buf)
+            self._log.flush()
+            self.last_game_id = game_id
+            if self.pending_entries >= COMPACT_ENTRIES and self._compactor is None:
+                # 归并放到后台线程，收录这一局的调用方（如终局时的界面线程）不等待
+                self._begin_compact()
+
+    def sync(self, archive: "Archive") -> int:
+        """收录档案库中尚未收录的本棋类/路数对局，返回新收录的局数"""
+        added = 0
+        type_code = savefile.GAME_TYPES.index(self.game_type)
+        for game_id, e in archive.entries(max(self.last_game_id, self._scanned) + 1):
+            if e[4] == type_code and e[5] == self.size:
+                self.add_game(game_id, archive.moves(game_id), RESULTS[e[6]])
+                added += 1
+            self._scanned = game_id
+        return added
+
+    @property
+    def compacting(self) -> bool:
+        """是否有后台归并在进行"""
+        return self._compactor is not None
+
+    def compact(self, wait: bool = True):
+        """
+        把日志归并进主文件。wait=True 时先等正在进行的归并，再把其余增量也归并完；
+        wait=False 只在没有归并进行时启动一次后台归并
+        """
+        compactor = self._compactor
+        if compactor is not None:
+            if not wait:
+                return
+            compactor.join()
+        with self._lock:
+            if self._compactor is None and self.pending_entries:
+                self._begin_compact()
+            compactor = self._compactor
+        if compactor is not None and wait:
+            compactor.join()
+
+    def _begin_compact(self):
+        """（持锁调用）冻结当前增量并换新日志，启动后台归并线程"""
+        self._log.close()
+        os.replace(self.log_path, self.compacting_path)
+        self._log = open(self.log_path, "ab")
+        self._frozen = self.pending
+        self.pending = {}
+        self.pending_entries = 0
+        self._compactor = threading.Thread(target=self._run_compact, args=(self._frozen, self.last_game_id),
+                                           name="explorer-compact", daemon=True)
+        self._compactor.start()
+
+    def _run_compact(self, frozen: Dict[int, Dict[int, int]], last_game_id: int):
+        # 主文件只在本线程结束前（持锁）替换，归并期间读它无需加锁
+        tmp = None
+        try:
+            pending = ((h, move, v) for h in sorted(frozen) for move, v in sorted(frozen[h].items()))
+            tmp = self._write_merged([self._index_entries(), pending], last_game_id)
+        except Exception as e:
+            print(f"explorer compaction failed: {e}")
+            if tmp is not None and os.path.exists(tmp):
+                os.remove(tmp)
+            tmp = None
+        with self._lock:
+            if tmp is not None:
+                self._install(tmp)
+                os.remove(self.compacting_path)
+            else:
+                # 归并失败：冻结的增量并回当前日志与内存，下次再归并
+                self._log.close()
+                self._recover_compacting()
+                self._log = open(self.log_path, "ab")
+                for h, moves in frozen.items():
+                    for move, v in moves.items():
+                        self._add_pending(h, move, v)
+            self._frozen = {}
+            self._compactor = None
+
+    def _index_entries(self) -> Iterator[Tuple[int, int, int]]:
+        mm = self._mm
+        if mm is None:
+            return
+        step = ENTRY.size * 8192
+        for pos in range(HEADER.size, HEADER.size + self.count * ENTRY.size, step):
+            for h, move, games, wins, draws, losses in ENTRY.iter_unpack(mm[pos:min(pos + step, len(mm))]):
+                yield h, move, _pack_counts(games, wins, draws, losses)
+
+    def _write_merged(self, sources: List[Iterable[Tuple[int, int, int]]], last_game_id: int) -> str:
+        """多路归并有序的 (hash, move, 计数) 序列（相同键累加）写入临时主文件，返回其路径（由 _install 替换）"""
+        tmp = self.idx_path + ".tmp"
+        count = 0
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, savefile.GAME_TYPES.index(self.game_type), self.size, 0, 0))
+            buf = bytearray()
+            cur_key, cur_v = None, 0
+            for h, move, v in heapq.merge(*sources):
+                if (h, move) == cur_key:
+                    cur_v += v
+                    continue
+                if cur_key is not None:
+                    buf += ENTRY.pack(*cur_key, *_unpack_counts(cur_v))
+                    count += 1
+                    if len(buf) >= 1 << 20:
+                        f.write(buf)
+                        buf = bytearray()
+                cur_key, cur_v = (h, move), v
+            if cur_key is not None:
+                buf += ENTRY.pack(*cur_key, *_unpack_counts(cur_v))
+                count += 1
+            f.write(buf)
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, savefile.GAME_TYPES.index(self.game_type), self.size,
+                                count, last_game_id))
+        return tmp
+
+    def _install(self, tmp: str):
+        """（持锁调用）原子替换主文件并重新映射；归并期间新收录的对局不受影响"""
+        last = self.last_game_id
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        os.replace(tmp, self.idx_path)
+        self._open_index()
+        self.last_game_id = max(last, self.last_game_id)
+
+    # ---------- 全量构建 ----------
+    def rebuild(self, archive: "Archive", progress=None) -> Dict:
+        """按档案库重建索引（丢弃现有索引与日志），返回统计"""
+        type_code = savefile.GAME_TYPES.index(self.game_type)
+        start = time.perf_counter()
+        stats = {"games": 0, "positions": 0, "runs": 0}
+        counts: Dict[int, int] = {}
+        last = 0
+        self.compact()
+        with self._lock, tempfile.TemporaryDirectory(dir=self.directory) as tmp:
+            runs: List[str] = []
+            for game_id, e in archive.entries():
+                last = game_id
+                if e[4] != type_code or e[5] != self.size:
+                    continue
+                for h, move, inc in game_positions(self.game_type, self.size, archive.moves(game_id),
+                                                   RESULTS[e[6]]):
+                    key = (h << 16) | move
+                    counts[key] = counts.get(key, 0) + inc
+                    stats["positions"] += 1
+                stats["games"] += 1
+                if len(counts) >= RUN_ENTRIES:
+                    runs.append(_write_run(tmp, len(runs), counts))
+                    counts = {}
+                if progress and stats["games"] % 10000 == 0:
+                    progress(stats["games"], time.perf_counter() - start)
+            sources: List[Iterable[Tuple[int, int, int]]] = [_read_run(path) for path in runs]
+            sources.append((key >> 16, key & 0xFFFF, v) for key, v in sorted(counts.items()))
+            stats["runs"] = len(runs)
+            self._install(self._write_merged(sources, last))
+            self.last_game_id = last
+        self._log.truncate(0)
+        self.pending.clear()
+        self.pending_entries = 0
+        stats["entries"] = self.count
+        stats["elapsed"] = time.perf_counter() - start
+        return stats
+
+    def close(self):
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        with self._lock:
+            if self._mm is not None:
+                self._mm.close()
+                self._mm = None
+            self._log.close()
+
+
+def _write_run(directory: str, n: int, counts: Dict[int, int]) -> str:
+    path = os.path.join(directory, f"run-{n:04d}.bin")
+    with open(path, "wb") as f:
+        buf = bytearray()
+        for key in sorted(counts):
+            buf += ENTRY.pack(key >> 16, key & 0xFFFF, *_unpack_counts(counts[key]))
+        f.write(buf)
+    return path
+
+
+def _read_run(path: str) -> Iterator[Tuple[int, int, int]]:
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(ENTRY.size * 8192)
+            if not chunk:
+                return
+            for h, move, games, wins, draws, losses in ENTRY.iter_unpack(chunk):
+                yield h, move, _pack_counts(games, wins, draws, losses)
+
+
+_explorers: Dict[Tuple[str, int], Explorer] = {}
+_explorers_lock = threading.Lock()
+
+
+def explorer_dir() -> str:
+    from chess_platform.games import archive
+    return os.path.join(archive.ARCHIVE_DIR, "explorer")
+
+
+def default_explorer(game_type: str, size: int) -> Optional[Explorer]:
+    """默认档案库对应的浏览器（首次打开时补收录档案库中的新对局）；不支持的棋盘返回 None"""
+    from chess_platform.games.archive import default_archive
+    if not supported(game_type, size):
+        return None
+    key = (game_type, size)
+    with _explorers_lock:
+        explorer = _explorers.get(key)
+        opened = explorer is None or explorer.directory != explorer_dir()
+        if opened:
+            explorer = _explorers[key] = Explorer(explorer_dir(), game_type, size)
+    # 补收录不占全局锁：其他线程此时可以拿到这个浏览器查询（结果随收录进度补全）
+    if opened:
+        explorer.sync(default_archive())
+    return explorer
+
+
+_sync_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+_sync_thread: Optional[threading.Thread] = None
+
+
+def sync_in_background(game_type: str, size: int):
+    """
+    在后台线程中打开默认浏览器并补收录默认档案库的新对局（含可能触发的归并），调用方不等待；
+    终局归档后由对局调用，界面线程只负责档案库追加
+    """
+    global _sync_thread
+    if not supported(game_type, size):
+        return
+    _sync_queue.put((game_type, size))
+    with _explorers_lock:
+        if _sync_thread is None:
+            _sync_thread = threading.Thread(target=_sync_worker, name="explorer-sync", daemon=True)
+            _sync_thread.start()
+
+
+def _sync_worker():
+    from chess_platform.games.archive import default_archive
+    while True:
+        game_type, size = _sync_queue.get()
+        try:
+            explorer = default_explorer(game_type, size)
+            if explorer is not None:
+                explorer.sync(default_archive())
+        except Exception as e:
+            print(f"Explorer sync failed: {e}")
+
+
+def format_rows(rows: List[Dict], limit: int = 10) -> str:
+    lines = []
+    for r in rows[:limit]:
+        lines.append(f"({r['move'][0]:>2},{r['move'][1]:>2})  {r['games']:>6} games  "
+                     f"+{r['wins']} ={r['draws']} -{r['losses']}  {r['score'] * 100:5.1f}%")
+    return "\n".join(lines)
+
+
+def main():
+    from chess_platform.games.archive import ARCHIVE_DIR, Archive
+    from chess_platform.games.logic import GameFactory
+    parser = argparse.ArgumentParser(description="Opening explorer over the game archive")
+    parser.add_argument("--archive", default=ARCHIVE_DIR)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    for name in ("build", "sync", "compact", "query", "info"):
+        p = sub.add_parser(name)
+        p.add_argument("--game", default="gomoku")
+        p.add_argument("--size", type=int, default=15)
+        if name == "query":
+            p.add_argument("--moves", nargs="*", default=[], help="从空盘开始的步序，如 7,7 7,8")
+    args = parser.parse_args()
+
+    game = GameFactory.create_game(args.game, args.size)
+    archive = Archive(args.archive)
+    explorer = Explorer(os.path.join(args.archive, "explorer"), game.game_type, args.size)
+    if args.cmd == "build":
+        stats = explorer.rebuild(archive, progress=lambda n, t: print(f"  {n} games, {n / t:.0f} games/s"))
+        print(f"indexed {stats['games']} games / {stats['positions']} positions into {stats['entries']} entries "
+              f"({stats['runs']} spill runs) in {stats['elapsed']:.2f}s: "
+              f"{stats['games'] / max(stats['elapsed'], 1e-9):.0f} games/s")
+    elif args.cmd == "sync":
+        t = time.perf_counter()
+        added = explorer.sync(archive)
+        print(f"added {added} games in {time.perf_counter() - t:.2f}s")
+    elif args.cmd == "compact":
+        t = time.perf_counter()
+        pending = explorer.pending_entries
+        explorer.compact()
+        print(f"merged {pending} pending entries into {explorer.count} indexed entries "
+              f"in {time.perf_counter() - t:.2f}s")
+    elif args.cmd == "query":
+        game.record_results = False
+        game.start()
+        for mv in args.moves:
+            x, y = (int(v) for v in mv.split(","))
+            if not game.make_move(x, y):
+                return
+        t = time.perf_counter()
+        rows = explorer.lookup_game(game)
+        elapsed = time.perf_counter() - t
+        print(format_rows(rows, 20) or "position not in archive")
+        print(f"({elapsed * 1e3:.2f}ms)")
+    else:
+        print(f"{explorer.game_type} {explorer.size}x{explorer.size}: {explorer.count} indexed entries, "
+              f"{explorer.pending_entries} pending, archive games up to #{explorer.last_game_id}")
+    explorer.close()
+    archive.close()
+
+
+if __name__ == "__main__":
+    main()
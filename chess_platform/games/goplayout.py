@@ -0,0 +1,477 @@
+"""
+围棋蒙特卡洛 playout 引擎
+GoRule.is_valid_move / post_move_action 每步都要洪水填充数气，供蒙特卡洛模拟一秒下几十万步时太慢，
+这里另用一套紧凑的数组棋盘，只服务于模拟：
+- 一维列表存棋盘，四周加一圈边框（EDGE），邻点为 p±1、p±stride，无需越界判断
+- 棋块用环形链表串起全部棋子，块根记伪气数、伪气坐标和与平方和：
+  sum^2 == n * sum_sq 时所有伪气是同一点，即叫吃（只剩一气），该气为 sum / n；
+  落子、合并、提子都只做增量更新，不做洪水填充
+- 禁自杀、简单劫（提一子且落下的单子只剩一气时，被提点下一手不能立即回提）
+- 走子策略（Mogo 风格）：上一手附近有可提的叫吃块则提；己方块被叫吃则先看能否提掉相邻的
+  叫吃块，再看长出后是否多于一气；再在上一手的八邻域里找匹配 3x3 模式表的点；
+  都没有则随机落子。任何时候都不填己方的单点真眼（眼位的对角最多一个对方子，在边上则不能有）
+- 连续两次停一手（无处可下时停）或手数达到上限即终局，按面积法（子 + 只被一方围住的空）计分
+"""
+import random
+from typing import List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from chess_platform.games.logic import GameContext  # type: ignore
+
+EMPTY, BLACK, WHITE, EDGE = 0, 1, 2, 3
+# 下标 0 一定落在边框上，用来表示停一手
+PASS = 0
+
+# 3x3 模式（Mogo / michi 的着法模式，中心为待下的空点）：
+# X / O 为双方（两种着色都算），x 为"非 X"（空、O 或边外），o 为"非 O"，? 为任意，空格为棋盘外
+_PATTERN_SOURCE = [
+    ["XOX",   # 扳：包住的扳
+     "...",
+     "???"],
+    ["XO.",   # 扳：不被切断的扳
+     "...",
+     "?.?"],
+    ["XO?",   # 扳：拐
+     "X..",
+     "x.?"],
+    [".O.",   # 碰 / 斜碰
+     "X..",
+     "..."],
+    ["XO?",   # 切：无保护的断点
+     "O.o",
+     "?o?"],
+    ["XO?",   # 切：已被窥视的断点
+     "O.X",
+     "???"],
+    ["?X?",   # 切：冲断
+     "O.O",
+     "ooo"],
+    ["OX?",   # 切：小飞断
+     "o.O",
+     "???"],
+    ["X.?",   # 边：追
+     "O.?",
+     "   "],
+    ["OX?",   # 边：挡住边上的断
+     "X.O",
+     "   "],
+    ["?X?",   # 边：挡住边上的连
+     "x.O",
+     "   "],
+    ["?XO",   # 边：立
+     "x.x",
+     "   "],
+    ["?OX",   # 边：断
+     "X.O",
+     "   "],
+]
+_CELL_VALUES = {".": (EMPTY,), "X": (BLACK,), "O": (WHITE,), " ": (EDGE,),
+                "x": (EMPTY, WHITE, EDGE), "o": (EMPTY, BLACK, EDGE), "?": (EMPTY, BLACK, WHITE, EDGE)}
+
+
+def _pattern_variants(rows: List[str]) -> List[List[str]]:
+    """一个模式的 8 种旋转 / 翻转及黑白互换"""
+    variants = []
+    grid = rows
+    for _ in range(4):
+        grid = ["".join(grid[2 - c][r] for c in range(3)) for r in range(3)]  # 顺时针转 90 度
+        for g in (grid, [row[::-1] for row in grid]):
+            variants.append(g)
+            variants.append([row.translate(str.maketrans("XOxo", "OXox")) for row in g])
+    return variants
+
+
+def _build_pattern_table() -> bytearray:
+    """
+    以八邻域编码为下标的查找表：按 NW N NE W E SW S SE 的顺序每格 2 位（空 0 黑 1 白 2 边 3），
+    表中为 1 的编码匹配某个模式
+    """
+    table = bytearray(1 << 16)
+    for source in _PATTERN_SOURCE:
+        for grid in _pattern_variants(source):
+            cells = [grid[r][c] for r in range(3) for c in range(3) if (r, c) != (1, 1)]
+            codes = [0]
+            for i, ch in enumerate(cells):
+                codes = [code | (v << (2 * i)) for code in codes for v in _CELL_VALUES[ch]]
+            for code in codes:
+                table[code] = 1
+    return table
+
+
+PATTERNS_3X3 = _build_pattern_table()
+
+
+class GoBoard:
+    """
+    模拟用的围棋盘：坐标 (x, y) 对应下标 (x + 1) * stride + y + 1，stride = size + 2
+    to_move 为 BLACK / WHITE，play(PASS) 为停一手
+    """
+    __slots__ = ("size", "stride", "komi", "color", "gid", "nxt", "gsize", "libs", "lsum", "lsq",
+                 "empties", "epos", "ko", "to_move", "passes", "moves", "last")
+
+    def __init__(self, size: int = 9, komi: float = 7.5):
+        w = size + 2
+        n = w * w
+        self.size = size
+        self.stride = w
+        self.komi = komi
+        self.color = [EDGE] * n
+        # 以下按下标存放：gid 为所在块的根，nxt 为块内环形链表；gsize/libs/lsum/lsq 只在块根上有效
+        self.gid = [0] * n
+        self.nxt = [0] * n
+        self.gsize = [0] * n
+        self.libs = [0] * n
+        self.lsum = [0] * n
+        self.lsq = [0] * n
+        # 空点列表与各空点在列表中的位置（交换删除，O(1)）
+        self.empties: List[int] = []
+        self.epos = [-1] * n
+        for x in range(size):
+            for y in range(size):
+                p = (x + 1) * w + y + 1
+                self.color[p] = EMPTY
+                self.epos[p] = len(self.empties)
+                self.empties.append(p)
+        self.ko = 0
+        self.to_move = BLACK
+        self.passes = 0
+        self.moves = 0
+        self.last = PASS
+
+    @classmethod
+    def from_game(cls, game: "GameContext", komi: float = 7.5) -> "GoBoard":
+        """由对局当前局面构造（对局不记劫，劫点未知时按无劫处理）"""
+        board = game.board
+        gb = cls(board.size, komi)
+        black = game.players[0]
+        for x in range(board.size):
+            for y in range(board.size):
+                piece = board.get_piece(x, y)
+                if piece is not None:
+                    # 合法局面里每块棋最终至少一气，按任意顺序摆放时伪气只减不增，不会误提
+                    gb._place(gb.point(x, y), BLACK if piece == black else WHITE)
+        gb.ko = 0
+        gb.to_move = BLACK if game.current_player_idx == 0 else WHITE
+        return gb
+
+    def copy(self) -> "GoBoard":
+        gb = GoBoard.__new__(GoBoard)
+        gb.size = self.size
+        gb.stride = self.stride
+        gb.komi = self.komi
+        gb.color = self.color[:]
+        gb.gid = self.gid[:]
+        gb.nxt = self.nxt[:]
+        gb.gsize = self.gsize[:]
+        gb.libs = self.libs[:]
+        gb.lsum = self.lsum[:]
+        gb.lsq = self.lsq[:]
+        gb.empties = self.empties[:]
+        gb.epos = self.epos[:]
+        gb.ko = self.ko
+        gb.to_move = self.to_move
+        gb.passes = self.passes
+        gb.moves = self.moves
+        gb.last = self.last
+        return gb
+
+    def point(self, x: int, y: int) -> int:
+        return (x + 1) * self.stride + y + 1
+
+    def xy(self, p: int) -> Tuple[int, int]:
+        return p // self.stride - 1, p % self.stride - 1
+
+    # ---------- 规则 ----------
+    def in_atari(self, g: int) -> bool:
+        """块根 g 所在块是否只剩一气"""
+        n = self.libs[g]
+        s = self.lsum[g]
+        return n > 0 and s * s == n * self.lsq[g]
+
+    def is_legal(self, p: int, c: int) -> bool:
+        """空点、非劫点、非自杀"""
+        color = self.color
+        if color[p] != EMPTY or p == self.ko:
+            return False
+        w = self.stride
+        for n in (p - w, p - 1, p + 1, p + w):
+            cn = color[n]
+            if cn == EMPTY:
+                return True
+            if cn == EDGE:
+                continue
+            # 己方块不止一气则连上后仍有气；对方块只剩一气（就是 p）则能提子
+            if (cn == c) != self.in_atari(self.gid[n]):
+                return True
+        return False
+
+    def is_eye(self, p: int, c: int) -> bool:
+        """p 是否为 c 方的单点真眼：四邻都是己方或边外，对角的对方子在中腹最多一个、在边角不能有"""
+        color = self.color
+        w = self.stride
+        for n in (p - w, p - 1, p + 1, p + w):
+            cn = color[n]
+            if cn != c and cn != EDGE:
+                return False
+        opp = 3 - c
+        bad = edge = 0
+        for d in (p - w - 1, p - w + 1, p + w - 1, p + w + 1):
+            cd = color[d]
+            if cd == opp:
+                bad += 1
+            elif cd == EDGE:
+                edge = 1
+        return bad == 0 if edge else bad < 2
+
+    def play(self, p: int):
+        """当前方在 p 落子（调用方保证合法）或停一手，然后换手"""
+        if p == PASS:
+            self.passes += 1
+            self.ko = 0
+        else:
+            self._place(p, self.to_move)
+            self.passes = 0
+        self.last = p
+        self.to_move = 3 - self.to_move
+        self.moves += 1
+
+    def _place(self, p: int, c: int):
+        color = self.color
+        gid = self.gid
+        libs = self.libs
+        lsum = self.lsum
+        lsq = self.lsq
+        w = self.stride
+        color[p] = c
+        gid[p] = p
+        self.nxt[p] = p
+        self.gsize[p] = 1
+        libs[p] = lsum[p] = lsq[p] = 0
+        self._take_empty(p)
+        pp = p * p
+        nbrs = (p - w, p - 1, p + 1, p + w)
+        for n in nbrs:
+            cn = color[n]
+            if cn == EMPTY:
+                libs[p] += 1
+                lsum[p] += n
+                lsq[p] += n * n
+            elif cn != EDGE:
+                g = gid[n]
+                libs[g] -= 1
+                lsum[g] -= p
+                lsq[g] -= pp
+        for n in nbrs:
+            if color[n] == c and gid[n] != gid[p]:
+                self._merge(gid[p], gid[n])
+        opp = 3 - c
+        captured = 0
+        ko = 0
+        for n in nbrs:
+            if color[n] == opp and libs[gid[n]] == 0:
+                g = gid[n]
+                captured += self.gsize[g]
+                ko = n
+                self._remove(g)
+        g = gid[p]
+        self.ko = ko if captured == 1 and self.gsize[g] == 1 and libs[g] == 1 else 0
+
+    def _merge(self, a: int, b: int):
+        """合并两块：小块的棋子改挂到大块根下，两个环拼成一个"""
+        gsize = self.gsize
+        if gsize[a] < gsize[b]:
+            a, b = b, a
+        gid = self.gid
+        nxt = self.nxt
+        s = b
+        while True:
+            gid[s] = a
+            s = nxt[s]
+            if s == b:
+                break
+        nxt[a], nxt[b] = nxt[b], nxt[a]
+        gsize[a] += gsize[b]
+        self.libs[a] += self.libs[b]
+        self.lsum[a] += self.lsum[b]
+        self.lsq[a] += self.lsq[b]
+
+    def _remove(self, g: int):
+        """提掉块 g：每个提掉的点给四邻的棋块各加一口伪气"""
+        color = self.color
+        gid = self.gid
+        nxt = self.nxt
+        libs = self.libs
+        lsum = self.lsum
+        lsq = self.lsq
+        w = self.stride
+        s = g
+        while True:
+            color[s] = EMPTY
+            self._give_empty(s)
+            ss = s * s
+            for n in (s - w, s - 1, s + 1, s + w):
+                if color[n] == BLACK or color[n] == WHITE:
+                    h = gid[n]
+                    libs[h] += 1
+                    lsum[h] += s
+                    lsq[h] += ss
+            s = nxt[s]
+            if s == g:
+                break
+
+    def _take_empty(self, p: int):
+        empties = self.empties
+        i = self.epos[p]
+        last = empties.pop()
+        if last != p:
+            empties[i] = last
+            self.epos[last] = i
+        self.epos[p] = -1
+
+    def _give_empty(self, p: int):
+        self.epos[p] = len(self.empties)
+        self.empties.append(p)
+
+    # ---------- 走子策略 ----------
+    def playable(self, p: int, c: int) -> bool:
+        """模拟中允许下的点：合法且不填己方眼"""
+        return self.is_legal(p, c) and not self.is_eye(p, c)
+
+    def candidates(self) -> List[int]:
+        """当前方所有可下的点（合法且不填己方眼）"""
+        c = self.to_move
+        return [p for p in self.empties if self.playable(p, c)]
+
+    def _tactical_moves(self, last: int, c: int) -> List[int]:
+        """上一手周围的提子点与己方叫吃块的逃跑点"""
+        color = self.color
+        gid = self.gid
+        libs = self.libs
+        lsum = self.lsum
+        w = self.stride
+        opp = 3 - c
+        moves = []
+        for n in (last, last - w, last - 1, last + 1, last + w):
+            cn = color[n]
+            if cn != BLACK and cn != WHITE:
+                continue
+            g = gid[n]
+            if not self.in_atari(g):
+                continue
+            lib = lsum[g] // libs[g]
+            if cn == opp:
+                moves.append(lib)
+                continue
+            # 己方被叫吃：先看能否提掉与之相邻、同样只剩一气的对方块
+            s = g
+            while True:
+                for m in (s - w, s - 1, s + 1, s + w):
+                    if color[m] == opp and self.in_atari(gid[m]):
+                        h = gid[m]
+                        moves.append(lsum[h] // libs[h])
+                s = self.nxt[s]
+                if s == g:
+                    break
+            if self._escapes(lib, c, g):
+                moves.append(lib)
+        return moves
+
+    def _escapes(self, lib: int, c: int, g: int) -> bool:
+        """长到 lib 后（粗略估计）是否多于一气：lib 至少两个空邻点，或能连上另一块不被叫吃的己方棋"""
+        color = self.color
+        w = self.stride
+        free = 0
+        for n in (lib - w, lib - 1, lib + 1, lib + w):
+            cn = color[n]
+            if cn == EMPTY:
+                free += 1
+            elif cn == c and self.gid[n] != g and not self.in_atari(self.gid[n]):
+                return True
+        return free >= 2
+
+    def _pattern_moves(self, last: int) -> List[int]:
+        """上一手八邻域中匹配 3x3 模式的空点"""
+        color = self.color
+        w = self.stride
+        moves = []
+        for p in (last - w - 1, last - w, last - w + 1, last - 1, last + 1, last + w - 1, last + w, last + w + 1):
+            if color[p] != EMPTY:
+                continue
+            code = (color[p - w - 1] | color[p - w] << 2 | color[p - w + 1] << 4 | color[p - 1] << 6
+                    | color[p + 1] << 8 | color[p + w - 1] << 10 | color[p + w] << 12 | color[p + w + 1] << 14)
+            if PATTERNS_3X3[code]:
+                moves.append(p)
+        return moves
+
+    def policy_move(self, rng: random.Random, heavy: bool = True) -> int:
+        """
+        按策略选下一手；heavy=False 时只做"随机 + 不填眼"（对照用）
+        没有可下的点时返回 PASS
+        """
+        c = self.to_move
+        last = self.last
+        if heavy and last != PASS:
+            for moves in (self._tactical_moves(last, c), self._pattern_moves(last)):
+                rng.shuffle(moves)
+                for p in moves:
+                    if self.playable(p, c):
+                        return p
+        empties = self.empties
+        n = len(empties)
+        if n:
+            start = rng.randrange(n)
+            for i in range(start, start + n):
+                p = empties[i % n]
+                if self.playable(p, c):
+                    return p
+        return PASS
+
+    def playout(self, rng: random.Random, max_moves: Optional[int] = None, heavy: bool = True,
+                record: Optional[List[int]] = None) -> float:
+        """
+        就地把棋下完并返回 score()：连续两次停一手或再下 max_moves 手（默认 3 * size^2）结束
+        record 不为 None 时依次追加模拟中下出的每一手（含 PASS），供 AMAF 统计
+        """
+        limit = self.moves + (max_moves if max_moves is not None else 3 * self.size * self.size)
+        while self.passes < 2 and self.moves < limit:
+            p = self.policy_move(rng, heavy)
+            if record is not None:
+                record.append(p)
+            self.play(p)
+        return self.score()
+
+    # ---------- 计分 ----------
+    def score(self) -> float:
+        """面积法：黑方（子 + 只与黑子相邻的空）减白方，再减贴目；正数黑胜"""
+        color = self.color
+        w = self.stride
+        total = color.count(BLACK) - color.count(WHITE)
+        seen = set()
+        for p in self.empties:
+            if p in seen:
+                continue
+            region = [p]
+            seen.add(p)
+            touch = 0
+            i = 0
+            while i < len(region):
+                q = region[i]
+                i += 1
+                for n in (q - w, q - 1, q + 1, q + w):
+                    cn = color[n]
+                    if cn == EMPTY:
+                        if n not in seen:
+                            seen.add(n)
+                            region.append(n)
+                    elif cn != EDGE:
+                        touch |= cn
+            if touch == BLACK:
+                total += len(region)
+            elif touch == WHITE:
+                total -= len(region)
+        return total - self.komi
+
+    def __str__(self):
+        chars = ".XO"
+        return "\n".join("".join(chars[self.color[self.point(x, y)]] for y in range(self.size))
+                         for x in range(self.size))
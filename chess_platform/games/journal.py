@@ -0,0 +1,363 @@
+"""
+自动存档日志：每局一个只追加的日志文件，崩溃后启动时据此恢复对局
+运行:
+    python -m chess_platform.games.journal list
+    python -m chess_platform.games.journal show <path>
+
+文件格式:
+    文件头: magic "CPJN" | version u8 | 保留 u8 | 元数据长度 u16 | 元数据 JSON（棋类、路数、玩家、AI 角色）
+    记录 8 字节: op u8 | color u8 (0 黑 / 1 白) | x u16 | y u16 | seq u16（记录序号低 16 位）
+        op: 1 落子 / 2 悔棋 / 3 虚着 / 4 重新开局
+- 界面线程只打包 8 字节放进队列（微秒级），由后台写线程落盘
+- 写线程组提交：取出队列中积压的全部记录一起写入，每个文件只 fsync 一次；
+  fsync 期间新到的记录进入下一批，负载越高每批越大
+- 尾部写了一半的记录、或序号对不上的残留（崩溃时的垃圾数据）在读取时丢弃
+- 正常退出时删除日志；读档等整体恢复（restore_data）时原子地重写整个文件
+- 文件名带进程号，仍在运行的其他进程的日志不作为待恢复对局
+"""
+import argparse
+import atexit
+import json
+import os
+import queue
+import struct
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from chess_platform.games.logic import GameContext  # type: ignore
+
+AUTOSAVE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "autosave")
+
+MAGIC = b"CPJN"
+VERSION = 1
+HEADER = struct.Struct("<4sBxH")
+RECORD = struct.Struct("<BBHHH")
+OP_MOVE, OP_UNDO, OP_PASS, OP_RESTART = 1, 2, 3, 4
+COLORS = ["Black", "White"]
+
+# 写线程的队列项类型
+_WRITE, _REWRITE, _CLOSE, _DELETE, _FLUSH = range(5)
+
+
+class JournalWriter:
+    """后台写线程：按提交顺序写入各日志文件，组提交 + fsync"""
+    def __init__(self, sync: bool = True):
+        self.sync = sync
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._files: Dict[str, object] = {}
+        # 统计：提交批数、记录字节数、fsync 次数
+        self.commits = 0
+        self.bytes = 0
+        self.fsyncs = 0
+        # 最近一次写入失败的异常（None 表示没有失败过）
+        self.error: Optional[Exception] = None
+        self._thread = threading.Thread(target=self._run, name="journal-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, path: str, data: bytes = b"", kind: int = _WRITE):
+        self._queue.put((kind, path, data))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待此前提交的全部内容落盘；超时或同一批写入失败时返回 False（异常见 error）"""
+        done = threading.Event()
+        failed: List[Exception] = []
+        self._queue.put((_FLUSH, None, (done, failed)))
+        return done.wait(timeout) and not failed
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # 组提交：把上一次 fsync 期间积压的全部取出
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._commit(batch)
+            except Exception as e:
+                print(f"Autosave failed: {e}")
+
+    def _commit(self, batch):
+        waiters = [data for kind, _, data in batch if kind == _FLUSH]
+        try:
+            self._write_batch(batch)
+        except Exception as e:
+            self.error = e
+            for _, failed in waiters:
+                failed.append(e)
+            raise
+        finally:
+            # 写入或改名失败也要唤醒 flush 的等待方
+            for done, _ in waiters:
+                done.set()
+
+    def _write_batch(self, batch):
+        touched = {}
+        for kind, path, data in batch:
+            if kind == _FLUSH:
+                continue
+            if kind == _WRITE:
+                f = self._files.get(path)
+                if f is None:
+                    f = self._files[path] = open(path, "ab")
+                f.write(data)
+                self.bytes += len(data)
+                touched[path] = f
+                continue
+            f = self._files.pop(path, None)
+            touched.pop(path, None)
+            if f is not None:
+                f.close()
+            if kind == _REWRITE:
+                tmp = path + ".tmp"
+                with open(tmp, "wb") as t:
+                    t.write(data)
+                    t.flush()
+                    if self.sync:
+                        os.fsync(t.fileno())
+                os.replace(tmp, path)
+                self.bytes += len(data)
+            elif kind == _DELETE and os.path.exists(path):
+                os.remove(path)
+        for f in touched.values():
+            f.flush()
+            if self.sync:
+                os.fsync(f.fileno())
+                self.fsyncs += 1
+        self.commits += 1
+
+
+_writer: Optional[JournalWriter] = None
+_writer_lock = threading.Lock()
+
+
+def default_writer() -> JournalWriter:
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = JournalWriter()
+            # 解释器退出前把队列里的记录写完（写线程是守护线程）
+            atexit.register(_writer.flush, 5.0)
+        return _writer
+
+
+class Journal:
+    """一局的自动存档日志；记录方法只打包并入队，不做任何 IO"""
+    __slots__ = ("path", "writer", "seq")
+
+    def __init__(self, path: str, writer: Optional[JournalWriter] = None):
+        self.path = path
+        self.writer = writer or default_writer()
+        self.seq = 0
+
+    @classmethod
+    def create(cls, game: "GameContext", directory: str = AUTOSAVE_DIR,
+               writer: Optional[JournalWriter] = None) -> "Journal":
+        """为对局新建日志（写入当前全部步序），并挂到 game.journal 上"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{int(time.time() * 1000)}-{os.getpid()}-{id(game):x}.jnl")
+        journal = cls(path, writer)
+        journal.reset(game)
+        game.journal = journal
+        return journal
+
+    def _append(self, op: int, color: int = 0, x: int = 0, y: int = 0):
+        self.writer.submit(self.path, RECORD.pack(op, color, x, y, self.seq & 0xFFFF))
+        self.seq += 1
+
+    def move(self, x: int, y: int, color: str):
+        self._append(OP_MOVE, COLORS.index(color), x, y)
+
+    def undo(self):
+        self._append(OP_UNDO)
+
+    def pass_turn(self, color: str):
+        self._append(OP_PASS, COLORS.index(color))
+
+    def restart(self):
+        self._append(OP_RESTART)
+
+    def reset(self, game: "GameContext"):
+        """按对局当前的玩家与步序整体重写日志（原子替换）"""
+        meta = {
+            "type": game.game_type,
+            "size": game.board.size,
+            "sparse": game.board.is_sparse,
+            "players_name": list(game.players_name or [None, None]),
+            "players_role": list(game.players_role or ["human", "human"]),
+            "players_account": list(game.players_account or [None, None]),
+            "controllers": [getattr(c, "mode", None) if c is not None else None for c in game.controllers],
+            "current_player": game.current_player_idx,
+            "started_at": game.started_at,
+        }
+        raw = json.dumps(meta).encode("utf-8")
+        buf = bytearray(HEADER.pack(MAGIC, VERSION, len(raw)) + raw)
+        self.seq = 0
+        for step in game.move_log:
+            buf += RECORD.pack(OP_MOVE, COLORS.index(step["color"]), step["x"], step["y"], self.seq & 0xFFFF)
+            self.seq += 1
+        self.writer.submit(self.path, bytes(buf), _REWRITE)
+
+    def close(self, discard: bool = False):
+        """关闭日志；discard=True 时删除文件（正常结束）"""
+        self.writer.submit(self.path, kind=_DELETE if discard else _CLOSE)
+
+
+# ---------- 恢复 ----------
+def read_journal(path: str) -> Tuple[Dict, List[Tuple[int, int, int, int]]]:
+    """返回 (元数据, [(op, color, x, y)])；遇到残缺或序号不符的记录即停止"""
+    with open(path, "rb") as f:
+        raw = f.read()
+    if len(raw) < HEADER.size:
+        raise ValueError(f"{path}: truncated journal header")
+    magic, version, meta_len = HEADER.unpack_from(raw, 0)
+    if magic != MAGIC or version != VERSION or len(raw) < HEADER.size + meta_len:
+        raise ValueError(f"{path}: not an autosave journal")
+    meta = json.loads(raw[HEADER.size:HEADER.size + meta_len].decode("utf-8"))
+    records = []
+    pos = HEADER.size + meta_len
+    while pos + RECORD.size <= len(raw):
+        op, color, x, y, seq = RECORD.unpack_from(raw, pos)
+        if seq != len(records) & 0xFFFF or not OP_MOVE <= op <= OP_RESTART:
+            break
+        records.append((op, color, x, y))
+        pos += RECORD.size
+    return meta, records
+
+
+def replay_records(meta: Dict, records: List[Tuple[int, int, int, int]]) -> Tuple[List[dict], int]:
+    """把日志记录归约为 (步序, 当前执子方)"""
+    moves: List[dict] = []
+    to_move: Optional[int] = None
+    for op, color, x, y in records:
+        if op == OP_MOVE:
+            moves.append({"x": x, "y": y, "color": COLORS[color]})
+            to_move = None
+        elif op == OP_UNDO:
+            # 悔棋后轮到被悔那一手的执子方（中间可能隔着虚着，不能按上一手颜色推算）
+            if moves:
+                to_move = COLORS.index(moves.pop()["color"])
+            else:
+                to_move = None
+        elif op == OP_PASS:
+            to_move = 1 - color
+        else:
+            moves = []
+            to_move = None
+    if to_move is None:
+        if moves:
+            to_move = 1 - COLORS.index(moves[-1]["color"])
+        elif records:
+            to_move = 0
+        else:
+            to_move = meta.get("current_player", 0)
+    return moves, to_move
+
+
+def recover(path: str) -> "GameContext":
+    """按日志重建对局（含悔棋历史与 AI 控制器），无法重放时抛出 ValueError"""
+    from chess_platform.games.ai import create_ai
+    from chess_platform.games.logic import GameFactory
+    meta, records = read_journal(path)
+    moves, to_move = replay_records(meta, records)
+    game = GameFactory.create_game(meta["type"], meta["size"], sparse=meta.get("sparse"))
+    for idx, mode in enumerate(meta.get("controllers") or [None, None]):
+        if mode:
+            game.controllers[idx] = create_ai(mode, game.game_type, meta["players_name"][idx])
+    game.restore_data({
+        "type": game.game_type, "size": game.board.size, "snapshot": None, "current_player": to_move,
+        "move_log": moves, "players_name": meta["players_name"], "players_role": meta["players_role"],
+        "players_account": meta["players_account"],
+    })
+    game.started_at = meta.get("started_at", game.started_at)
+    return game
+
+
+def resume(path: str, directory: str = AUTOSAVE_DIR) -> "GameContext":
+    """恢复对局并改用新日志；旧日志经写线程在新日志写完后删除，中途崩溃也不会两头落空"""
+    game = recover(path)
+    journal = Journal.create(game, directory)
+    discard(path, journal.writer)
+    return game
+
+
+def discard(path: str, writer: Optional[JournalWriter] = None):
+    """删除一个日志文件（排在此前提交的写入之后）"""
+    (writer or default_writer()).submit(path, kind=_DELETE)
+
+
+def _owner_alive(path: str) -> bool:
+    """日志所属进程是否仍在运行（本进程的日志也算）；无法判断时按已退出处理"""
+    try:
+        pid = int(os.path.basename(path).split("-")[1])
+    except (IndexError, ValueError):
+        return False
+    if pid == os.getpid():
+        return True
+    if os.name != "posix":
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def pending(directory: str = AUTOSAVE_DIR) -> List[str]:
+    """未正常结束（所属进程已不在）的对局日志，最新的在前"""
+    if not os.path.isdir(directory):
+        return []
+    paths = [os.path.join(directory, n) for n in os.listdir(directory)
+             if n.endswith(".jnl") and not _owner_alive(os.path.join(directory, n))]
+    return sorted(paths, key=os.path.getmtime, reverse=True)
+
+
+def describe(path: str) -> str:
+    meta, records = read_journal(path)
+    moves, _ = replay_records(meta, records)
+    when = time.strftime("%Y-%m-%d %H:%M", time.localtime(os.path.getmtime(path)))
+    return (f"{meta['type']} {meta['size']}x{meta['size']}, {len(moves)} moves, "
+            f"{meta['players_name'][0]} vs {meta['players_name'][1]} ({when})")
+
+
+def find_recoverable(directory: str = AUTOSAVE_DIR) -> List[Tuple[str, str]]:
+    """可恢复的日志 [(路径, 描述)]；损坏的日志直接删除"""
+    result = []
+    for path in pending(directory):
+        try:
+            result.append((path, describe(path)))
+        except (ValueError, KeyError, OSError) as e:
+            print(f"Discarding unreadable autosave {os.path.basename(path)}: {e}")
+            os.remove(path)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Autosave journals")
+    parser.add_argument("--dir", default=AUTOSAVE_DIR)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list")
+    show = sub.add_parser("show")
+    show.add_argument("path")
+    args = parser.parse_args()
+    if args.cmd == "list":
+        for path in pending(args.dir):
+            try:
+                print(f"{path}: {describe(path)}")
+            except ValueError as e:
+                print(f"{path}: {e}")
+    else:
+        meta, records = read_journal(args.path)
+        moves, to_move = replay_records(meta, records)
+        print(json.dumps(meta, ensure_ascii=False))
+        print(f"{len(records)} records -> {len(moves)} moves, {COLORS[to_move]} to move")
+        print(" ".join(f"{m['color'][0]}{m['x']},{m['y']}" for m in moves))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,29 @@
-import pickle
-from typing import List, Optional, Tuple, Callable
-from chess_platform.core.interfaces import Game, RuleStrategy, Board
+import time
+from typing import List, Optional, Tuple, Callable, TYPE_CHECKING
+from chess_platform.core.interfaces import Game, RuleStrategy, Board, SparseBoard
 from chess_platform.core.patterns import Command, PieceType
-from chess_platform.games.rules import GomokuRule, GoRule, OthelloRule
-import random
-from chess_platform.games import ai
+from chess_platform.games.rules import GomokuRule, GoRule, OthelloRule, PASS
+from chess_platform.games.movelog import MoveLog
+
+if TYPE_CHECKING:
+    from chess_platform.games.journal import Journal  # type: ignore
 
 class MoveCommand(Command):
     """
     落子命令
-    包含了 Memento (备忘录) 的应用：在执行前保存快照，用于 Undo
+    悔棋只记录本步改动的格子 (x, y, 原棋子) 与原最后一手，而不是整盘快照
     """
+    __slots__ = ("game", "x", "y", "player", "player_idx", "captured_stones", "_changes", "_prev_last_move")
+
     def __init__(self, game: 'GameContext', x: int, y: int):
         self.game = game
         self.x = x
         self.y = y
         self.player = game.current_player
+        self.player_idx = game.current_player_idx
         self.captured_stones: List[Tuple[int, int]] = []
-        self._backup_snapshot = None
+        self._changes = None
+        self._prev_last_move = None
 
     def execute(self) -> bool:
         # 1. 校验合法性
@@ -26,14 +32,19 @@ class MoveCommand(Command):
             print(f"Invalid move: {msg}") # 简单反馈，实际应抛出异常或返回状态
             return False
 
-        # 2. 保存状态 (Memento) 用于悔棋
-        self._backup_snapshot = self.game.board.get_snapshot()
+        # 2. 开始记录改动，用于悔棋
+        board = self.game.board
+        self._prev_last_move = board.last_move
+        board.begin_changes()
 
         # 3. 执行落子
-        self.game.board.place_piece(self.x, self.y, self.player)
+        board.place_piece(self.x, self.y, self.player)
 
         # 4. 执行落子后的规则动作 (如围棋提子)
-        self.captured_stones = self.game.rule.post_move_action(self.game.board, self.x, self.y, self.player)
+        try:
+            self.captured_stones = self.game.rule.post_move_action(board, self.x, self.y, self.player)
+        finally:
+            self._changes = board.end_changes()
         self.game.log_move(self.x, self.y, self.player.color_name)
 
         # 5. 检查胜负
@@ -42,7 +53,9 @@ class MoveCommand(Command):
             self.game.winner = winner
             self.game.is_game_over = True
             # 先更新战绩，再通知 UI（保证 UI 刷新到最新战绩）
-            self.game.on_game_over(winner)
+            # 读档重建/回放时棋局早已结算过，不重复记录
+            if self.game.record_results:
+                self.game.on_game_over(winner)
             # 显式通知 UI 游戏结束，以便弹出提示
             self.game.board.notify(event="game_over", winner=winner)
         
@@ -51,26 +64,43 @@ class MoveCommand(Command):
         return True
 
     def undo(self):
-        if self._backup_snapshot:
-            self.game.board.restore_snapshot(self._backup_snapshot)
-            # 恢复当前执子者 (因为 execute 里切换了)
-            self.game.switch_player() 
+        if self._changes is not None:
+            self.game.board.revert_changes(self._changes, self._prev_last_move)
+            # 录像与 history 一一对应，悔棋时同步去掉最后一步，保证存档可按步序重放
+            if len(self.game.move_log):
+                self.game.move_log.pop()
+            if self.game.journal is not None:
+                self.game.journal.undo()
+            # 恢复当前执子者 (因为 execute 里切换了；中间可能有虚着，直接恢复落子方)
+            self.game.current_player_idx = self.player_idx
+            self.game.passes = 0
             self.game.is_game_over = False
             self.game.winner = None
 
 
 class GameContext(Game):
     """具体游戏控制类"""
-    def __init__(self, size: int, rule: RuleStrategy, game_type: str):
-        super().__init__(size, rule)
+    __slots__ = ("game_type", "history", "controllers", "players_name", "players_role",
+                 "players_account", "move_log", "started_at", "record_results", "journal", "passes")
+
+    def __init__(self, size: int, rule: RuleStrategy, game_type: str, board: Optional[Board] = None):
+        super().__init__(size, rule, board)
         self.game_type = game_type
         self.history: List[Command] = []
-        # 控制器：None 表示人工输入；否则应提供 select_move(game)->(x,y)
+        # 控制器：None 表示人工输入；否则应提供 select_move(game)->(x,y)，返回 rules.PASS 表示虚着
         self.controllers: List[Optional[Callable]] = [None, None]
         self.players_name: List[str] = ["Player1", "Player2"]
         self.players_role: List[str] = ["human", "human"]  # human / ai / visitor / login
         self.players_account: List[Optional[str]] = [None, None]
-        self.move_log: List[dict] = []
+        # 录像：紧凑数组存储，读取时仍按 dict 列表使用
+        self.move_log: MoveLog = MoveLog(size)
+        self.started_at: float = time.time()
+        # False 时终局不结算战绩（读档重建历史、回放时使用）
+        self.record_results: bool = True
+        # 自动存档日志（games/journal.py），由界面在开局时挂上；None 表示不记录
+        self.journal: Optional["Journal"] = None
+        # 连续虚着次数（落子时清零）；双方接连虚着后 AI 对局不再继续
+        self.passes = 0
         
     def start(self):
         self.board.clear()
@@ -87,22 +117,28 @@ class GameContext(Game):
         self.is_game_over = False
         self.winner = None
         self.current_player_idx = 0 # 黑棋先
+        self.passes = 0
         self.move_log.clear()
+        self.started_at = time.time()
+        if self.journal is not None:
+            self.journal.restart()
 
-    def make_move(self, x: int, y: int) -> bool:
+    def make_move(self, x: int, y: int, auto_play: bool = True) -> bool:
+        """落子；auto_play=False 时不接着执行 AI 回合（GUI 在后台线程里自己驱动 AI）"""
         if self.is_game_over:
             print("Game is over.")
             return False
         # Othello 场景：如果当前无合法步，自动换手
-        if self.game_type.lower() == "othello" and not ai.legal_moves(self):
-            self.switch_player()
+        if self.game_type.lower() == "othello" and not self._has_legal_move():
+            self.pass_turn()
             return False
             
         cmd = MoveCommand(self, x, y)
         if cmd.execute():
             self.history.append(cmd)
             # 自动触发 AI 回合
-            self._auto_play_if_ai()
+            if auto_play:
+                self._auto_play_if_ai()
             return True
         return False
 
@@ -115,12 +151,17 @@ class GameContext(Game):
             if ctrl is None:
                 break
             # 若无合法步，自动跳过
-            if self.game_type.lower() == "othello" and not ai.legal_moves(self):
-                self.switch_player()
+            if self.game_type.lower() == "othello" and not self._has_legal_move():
+                self.pass_turn()
                 continue
             move = ctrl.select_move(self)
             if move is None:
                 break
+            if move == PASS:
+                self.pass_turn()
+                if self.passes >= 2:
+                    break
+                continue
             x,y = move
             cmd = MoveCommand(self, x, y)
             if cmd.execute():
@@ -129,6 +170,10 @@ class GameContext(Game):
             else:
                 break
 
+    def _has_legal_move(self) -> bool:
+        # 直接使用规则计算，避免为此加载 AI 模块
+        return bool(self.rule.legal_moves(self.board, self.current_player))
+
     def undo_move(self) -> bool:
         if not self.history:
             return False
@@ -137,60 +182,146 @@ class GameContext(Game):
         return True
 
     def pass_turn(self):
-        """围棋虚着"""
+        """虚着：围棋主动虚着，或黑白棋无子可下时的自动跳过；记入自动存档日志，恢复时才能得到正确的执子方"""
+        if self.journal is not None:
+            self.journal.pass_turn(self.current_player.color_name)
+        self.passes += 1
         self.switch_player()
         # 也可以记录一个 PassCommand 进历史，以便悔棋
 
-    def save_game(self, filepath: str):
-        """序列化保存"""
+    def save_game(self, filepath: str, keyframe_interval: int = 0):
+        """序列化保存（紧凑二进制格式，见 games/savefile.py）"""
+        from chess_platform.games import savefile
         try:
-            data = {
-                "type": self.game_type,
-                "size": self.board.size,
-                "snapshot": self.board.get_snapshot(),
-                "current_player": self.current_player_idx,
-                "history_len": len(self.history),
-                "players_name": self.players_name,
-                "players_role": self.players_role,
-                "players_account": self.players_account,
-                "move_log": self.move_log
-                # 完整保存 history 比较复杂因为包含对象引用，简化版只保存棋盘状态
-                # 作业要求若需完整还原步骤，需要 pickle 整个 history，或者只保存 board 状态
-            }
-            with open(filepath, 'wb') as f:
-                pickle.dump(data, f)
+            savefile.write_save(filepath, self.to_save_data(), keyframe_interval)
             return True
         except Exception as e:
             print(f"Save failed: {e}")
             return False
 
+    def to_save_data(self) -> dict:
+        """存档数据字典（save_game 与会话换出共用）"""
+        return {
+            "type": self.game_type,
+            "size": self.board.size,
+            "snapshot": self.board.get_snapshot(),
+            "current_player": self.current_player_idx,
+            "history_len": len(self.history),
+            "players_name": self.players_name,
+            "players_role": self.players_role,
+            "players_account": self.players_account,
+            "move_log": self.move_log
+        }
+
     def load_game(self, filepath: str) -> bool:
+        from chess_platform.games import savefile
+        try:
+            # 自动识别紧凑格式与旧版 pickle 存档；紧凑格式的棋盘由 restore_data 重建
+            data = savefile.read_save(filepath, replay=False)
+        except Exception as e:
+            print(f"Load failed: {e}")
+            return False
+        return self.load_data(data)
+
+    def load_data(self, data: dict) -> bool:
+        """载入存档数据字典（read_save / Archive.load 的结果），棋类或路数不符时返回 False"""
         try:
-            with open(filepath, 'rb') as f:
-                data = pickle.load(f)
-            
             # 简单校验
             if data["type"] != self.game_type:
                 print("Game type mismatch")
                 return False
-            
-            self.board.restore_snapshot(data["snapshot"])
-            self.current_player_idx = data["current_player"]
-            self.players_name = data.get("players_name", self.players_name)
-            self.players_role = data.get("players_role", self.players_role)
-            self.players_account = data.get("players_account", self.players_account)
-            self.move_log = data.get("move_log", [])
-            self.history.clear() # 读档后清空历史，或需要更复杂的逻辑恢复历史
-            self.is_game_over = False # 假设读档后游戏未结束
+            if data["size"] != self.board.size:
+                print("Board size mismatch")
+                return False
+            self.restore_data(data)
             return True
         except Exception as e:
             print(f"Load failed: {e}")
             return False
 
+    def clone_position(self) -> "GameContext":
+        """当前局面的副本（不含悔棋历史、控制器和观察者），供后台分析线程使用"""
+        other = GameFactory.create_game(self.game_type, self.board.size, sparse=self.board.is_sparse)
+        other.board = self.board.copy()
+        other.current_player_idx = self.current_player_idx
+        other.passes = self.passes
+        other.is_game_over = self.is_game_over
+        other.winner = self.winner
+        other.move_log = MoveLog(self.board.size, self.move_log)
+        other.record_results = False
+        return other
+
+    def restore_data(self, data: dict):
+        """从存档数据字典恢复对局（含悔棋历史），无法还原时抛出 ValueError"""
+        move_log = data.get("move_log", [])
+        snapshot = data["snapshot"]
+        # 通过 MoveCommand 重放步序重建 history，使读档后仍可悔棋；
+        # 整个过程静默，结束时只通知一次
+        with self.board.batch(event="restore"):
+            rebuilt = self.rebuild_history(move_log)
+            if snapshot is not None and not (rebuilt and self._same_position(snapshot)):
+                # 步序无法还原存档局面（旧存档/残缺步序）：退回为直接恢复快照
+                self.board.restore_snapshot(snapshot)
+                self.history.clear()
+                self.move_log = MoveLog(self.board.size, move_log)
+                self.is_game_over = False
+                self.winner = None
+            elif not rebuilt:
+                raise ValueError("move log cannot be replayed")
+        self.current_player_idx = data["current_player"]
+        self.players_name = data.get("players_name", self.players_name)
+        self.players_role = data.get("players_role", self.players_role)
+        self.players_account = data.get("players_account", self.players_account)
+        if self.journal is not None:
+            # 重建过程逐步写入的记录由整体重写取代（含新的玩家信息）
+            self.journal.reset(self)
+
+    def rebuild_history(self, move_log: List[dict]) -> bool:
+        """从空盘逐步执行 move_log 重建 history（逐步校验合法性），失败返回 False"""
+        move_log = list(move_log)  # start() 会清空 self.move_log，先复制
+        with self.board.batch():
+            self.start()
+            for step in move_log:
+                if not self.apply_logged_move(step):
+                    return False
+        return True
+
+    def apply_logged_move(self, step: dict) -> bool:
+        """按录像中的一步执行 MoveCommand（指定落子方，不结算战绩），用于读档与回放"""
+        self.current_player_idx = 0 if step["color"] == "Black" else 1
+        cmd = MoveCommand(self, step["x"], step["y"])
+        # 临时关闭战绩结算，结束后恢复原值（服务器对局、分析副本等本来就不记录）
+        record_results = self.record_results
+        self.record_results = False
+        try:
+            ok = cmd.execute()
+        finally:
+            self.record_results = record_results
+        if ok:
+            self.history.append(cmd)
+        return ok
+
+    def _same_position(self, snapshot: dict) -> bool:
+        if self.board.is_sparse or "stones" in snapshot:
+            if "stones" in snapshot:
+                other = {pos: p.color_name for pos, p in snapshot["stones"].items()}
+            else:
+                other = {(x, y): p.color_name for x, row in enumerate(snapshot["grid"])
+                         for y, p in enumerate(row) if p is not None}
+            return other == {(x, y): p.color_name for x, y, p in self.board.stones()}
+        grid = self.board._grid
+        other = snapshot["grid"]
+        return all(
+            (a is None) == (b is None) and (a is None or a.color_name == b.color_name)
+            for row_a, row_b in zip(grid, other) for a, b in zip(row_a, row_b)
+        )
+
     # --------- 结果记录 ---------
     def on_game_over(self, winner: str):
         from chess_platform.utils import account
         # winner: "Black"/"White"/"Draw"
+        self._record_result(winner)
+        self._archive_game(winner)
         if winner == "Draw":
             for acc in self.players_account:
                 if acc:
@@ -203,18 +334,55 @@ class GameContext(Game):
         if self.players_account[lose_idx]:
             account.update_result(self.players_account[lose_idx], "loss")
 
+    def _record_result(self, winner: str):
+        """写入对局账本并更新等级分；账本异常不影响对局流程"""
+        from chess_platform.utils import ledger
+        try:
+            ledger.record_game(self.game_type, self.board.size, self.players_name,
+                               self.players_account, winner, len(self.move_log),
+                               time.time() - self.started_at)
+        except Exception as e:
+            print(f"Ledger record failed: {e}")
+
+    def _archive_game(self, winner: str):
+        """终局对局追加进对局档案库并通知开局浏览器；档案库异常不影响对局流程"""
+        from chess_platform.games.archive import default_archive
+        from chess_platform.games.explorer import sync_in_background
+        try:
+            default_archive().append_game(self, winner)
+        except Exception as e:
+            print(f"Archive failed: {e}")
+            return
+        # 开局浏览器的收录（首次打开时补收录整个档案库、攒够后归并）在后台线程进行，终局时不等待
+        sync_in_background(self.game_type, self.board.size)
+
     # --------- 录像数据 ---------
     def log_move(self, x:int, y:int, color:str):
-        self.move_log.append({"x":x,"y":y,"color":color,"move_idx":len(self.move_log)+1})
+        self.passes = 0
+        self.move_log.add(x, y, color)
+        if self.journal is not None:
+            self.journal.move(x, y, color)
+
+
+# 五子棋路数达到该值时默认使用稀疏棋盘；size <= 0 表示"无限"棋盘（坐标上限 UNBOUNDED_SIZE）
+SPARSE_MIN_SIZE = 32
+UNBOUNDED_SIZE = 1 << 15
 
 
 class GameFactory:
     """工厂模式：创建游戏"""
     @staticmethod
-    def create_game(game_type: str, size: int = 15) -> GameContext:
+    def create_game(game_type: str, size: int = 15, sparse: Optional[bool] = None) -> GameContext:
+        """sparse: None 按路数自动选择，True/False 强制稀疏/稠密棋盘（稀疏棋盘仅支持五子棋）"""
         if game_type.lower() == "gomoku":
-            return GameContext(size, GomokuRule(), "Gomoku")
-        elif game_type.lower() == "go":
+            if size <= 0:
+                size = UNBOUNDED_SIZE
+            if sparse is None:
+                sparse = size >= SPARSE_MIN_SIZE
+            return GameContext(size, GomokuRule(), "Gomoku", SparseBoard(size) if sparse else None)
+        if sparse:
+            raise ValueError("Sparse board is only supported for Gomoku")
+        if game_type.lower() == "go":
             return GameContext(size, GoRule(), "Go")
         elif game_type.lower() == "othello":
             return GameContext(size, OthelloRule(), "Othello")
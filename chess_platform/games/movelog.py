@@ -0,0 +1,63 @@
+from array import array
+from typing import Iterable, Iterator, List, Union
+
+COLORS = ("Black", "White")
+
+
+class MoveLog:
+    """
+    紧凑录像：每步只存一个整数 (x*size+y) << 1 | color，底层为 array
+    对外仍表现为 dict 列表（{"x","y","color","move_idx"}），兼容原有 move_log 的读取方式
+    """
+    __slots__ = ("size", "_data")
+
+    def __init__(self, size: int, moves: Iterable[dict] = ()):
+        self.size = size
+        # 19 路以内 2 字节足够；超大棋盘使用 4 字节
+        self._data = array("H" if (size * size) << 1 < 0x10000 else "I")
+        for step in moves:
+            self.append(step)
+
+    def append(self, step: dict):
+        self.add(step["x"], step["y"], step["color"])
+
+    def add(self, x: int, y: int, color: str):
+        self._data.append(((x * self.size + y) << 1) | COLORS.index(color))
+
+    def pop(self) -> dict:
+        step = self[len(self) - 1]
+        self._data.pop()
+        return step
+
+    def clear(self):
+        del self._data[:]
+
+    def _decode(self, i: int) -> dict:
+        v = self._data[i]
+        x, y = divmod(v >> 1, self.size)
+        return {"x": x, "y": y, "color": COLORS[v & 1], "move_idx": i + 1}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getitem__(self, i: Union[int, slice]):
+        if isinstance(i, slice):
+            return [self._decode(k) for k in range(*i.indices(len(self._data)))]
+        if i < 0:
+            i += len(self._data)
+        if not 0 <= i < len(self._data):
+            raise IndexError("move index out of range")
+        return self._decode(i)
+
+    def __iter__(self) -> Iterator[dict]:
+        for i in range(len(self._data)):
+            yield self._decode(i)
+
+    def __eq__(self, other) -> bool:
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return f"MoveLog(size={self.size}, moves={len(self)})"
+
+    def to_list(self) -> List[dict]:
+        return list(self)
@@ -0,0 +1,151 @@
+from typing import List, Optional, Tuple
+
+from chess_platform.core.interfaces import Board, SparseBoard
+from chess_platform.core.patterns import Observer, PieceFactory
+
+# 单元格编码：0 空 / 1 黑 / 2 白
+_PIECES = [None,
+           PieceFactory.get_piece_type("Black", "X"),
+           PieceFactory.get_piece_type("White", "O")]
+
+
+def _code(piece) -> int:
+    if piece is None:
+        return 0
+    return 1 if piece.color_name == "Black" else 2
+
+
+class _SparseCells(dict):
+    """稀疏棋盘的格子编码：下标 -> 编码，缺省为 0（空），与 bytearray 同样按下标读写"""
+    def __missing__(self, idx: int) -> int:
+        return 0
+
+
+class _ChangeCollector(Observer):
+    """收集一步棋中被改动的格子（落子、提子、翻转）"""
+    def __init__(self):
+        self.changed = set()
+
+    def update(self, subject, *args, **kwargs):
+        pos = kwargs.get("pos")
+        if pos is not None:
+            self.changed.add(pos)
+
+
+class ReplayEngine:
+    """
+    随机访问回放引擎（CLI 与 GUI 共用）
+    - 构建时按规则重放一次 move_log，记录每步的增量 (格子, 旧值, 新值)
+    - 每 keyframe_interval 步保存一帧完整棋盘
+    - seek(i) 只需从最近关键帧或当前位置应用不超过一个间隔的增量
+    回放局面保存在独立的 self.board 上，每次跳转只通知一次 event="replay"，
+    并携带 changed（发生变化的坐标列表），界面据此只重绘变化的交叉点。
+    稀疏棋盘的局面与关键帧只记录有子的格子（_SparseCells），不按 size x size 展开。
+    """
+    def __init__(self, game_type: str, size: int, move_log: List[dict], keyframe_interval: int = 16):
+        from chess_platform.games.logic import GameFactory
+        self.game_type = game_type
+        self.size = size
+        self.move_log = list(move_log)
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.deltas: List[List[Tuple[int, int, int]]] = []
+        self.keyframes: List[bytearray] = []
+
+        # 按规则重放，记录增量与关键帧
+        game = GameFactory.create_game(game_type, size)
+        game.start()
+        self.sparse = game.board.is_sparse
+        if self.sparse:
+            cells = _SparseCells((x * size + y, _code(p)) for x, y, p in game.board.stones())
+        else:
+            cells = bytearray(_code(p) for row in game.board._grid for p in row)
+        self.keyframes.append(self._copy(cells))
+        collector = _ChangeCollector()
+        game.board.attach(collector)
+        for i, step in enumerate(self.move_log):
+            collector.changed.clear()
+            if not game.apply_logged_move(step):
+                # 非法步之后的录像无意义，截断
+                self.move_log = self.move_log[:i]
+                break
+            delta = []
+            for x, y in collector.changed:
+                idx = x * size + y
+                after = _code(game.board.get_piece(x, y))
+                if after != cells[idx]:
+                    delta.append((idx, cells[idx], after))
+                    cells[idx] = after
+            self.deltas.append(delta)
+            if (i + 1) % self.keyframe_interval == 0:
+                self.keyframes.append(self._copy(cells))
+        game.board.detach(collector)
+
+        self.index = 0
+        self.cells = self._copy(self.keyframes[0])
+        self.board = SparseBoard(size) if self.sparse else Board(size)
+        self._sync_board(list(self.cells) if self.sparse else range(size * size))
+
+    @property
+    def total(self) -> int:
+        return len(self.move_log)
+
+    def last_move(self) -> Optional[Tuple[int, int]]:
+        if self.index == 0:
+            return None
+        step = self.move_log[self.index - 1]
+        return step["x"], step["y"]
+
+    # ---------- 跳转 ----------
+    def seek(self, target: int) -> List[Tuple[int, int]]:
+        """跳到第 target 步之后的局面，返回发生变化的坐标"""
+        target = max(0, min(self.total, target))
+        if target == self.index:
+            return []
+        k = self.keyframe_interval
+        changed = set()
+        if 0 < target - self.index <= k:
+            for i in range(self.index, target):
+                for idx, _, after in self.deltas[i]:
+                    self.cells[idx] = after
+                    changed.add(idx)
+        elif 0 < self.index - target <= k:
+            for i in range(self.index - 1, target - 1, -1):
+                for idx, before, _ in self.deltas[i]:
+                    self.cells[idx] = before
+                    changed.add(idx)
+        else:
+            old = self.cells
+            base = target // k
+            self.cells = self._copy(self.keyframes[base])
+            for i in range(base * k, target):
+                for idx, _, after in self.deltas[i]:
+                    self.cells[idx] = after
+            indices = old.keys() | self.cells.keys() if self.sparse else range(len(old))
+            changed = {i for i in indices if old[i] != self.cells[i]}
+        old_last = self.last_move()
+        self.index = target
+        positions = [divmod(idx, self.size) for idx in changed]
+        self._sync_board(changed)
+        self.board.last_move = self.last_move()
+        for pos in (old_last, self.board.last_move):
+            if pos is not None and pos not in positions:
+                positions.append(pos)
+        self.board.notify(event="replay", changed=positions, index=self.index)
+        return positions
+
+    def step_forward(self) -> List[Tuple[int, int]]:
+        return self.seek(self.index + 1)
+
+    def step_back(self) -> List[Tuple[int, int]]:
+        return self.seek(self.index - 1)
+
+    def at_end(self) -> bool:
+        return self.index >= self.total
+
+    def _copy(self, cells):
+        return _SparseCells(cells) if self.sparse else bytearray(cells)
+
+    def _sync_board(self, indices):
+        for idx in indices:
+            x, y = divmod(idx, self.size)
+            self.board._put(x, y, _PIECES[self.cells[idx]])
@@ -2,6 +2,9 @@ from typing import Tuple, List, Optional, Set
 from chess_platform.core.interfaces import RuleStrategy, Board
 from chess_platform.core.patterns import PieceType
 
+# 控制器的 select_move 返回 PASS 表示虚着（围棋中无处可下，或对方已虚着且己方领先时）
+PASS: Tuple[int, int] = (-1, -1)
+
 class OthelloRule(RuleStrategy):
     """
     黑白棋规则：
@@ -120,14 +123,8 @@ class GomokuRule(RuleStrategy):
             if count >= 5:
                 return piece.color_name
         
-        # 检查平局 (满盘)
-        is_full = True
-        for r in range(board.size):
-            for c in range(board.size):
-                if board.get_piece(r, c) is None:
-                    is_full = False
-                    break
-        if is_full:
+        # 检查平局 (满盘)；稀疏棋盘按棋子数判断，不扫描整盘
+        if board.is_full():
             return "Draw"
             
         return None
@@ -141,19 +138,11 @@ class GoRule(RuleStrategy):
         if board.get_piece(x, y) is not None:
             return False, "Position already occupied"
         
-        # 2. 围棋特殊规则：自杀手检测 (简单版：如果落子后没有气且不能提对方子，则禁入)
-        # 注意：完整的规则比较复杂，需要模拟落子后是否提子。
-        # 这里为了性能，我们可以在 post_move_action 之后如果发现自己没气且没提子，则回滚（或者在 Command 中处理）。
-        # 简单的预判：
-        # 模拟落子
-        board._grid[x][y] = player_piece # 临时落子
-        captured = self._get_captured_stones(board, x, y, player_piece)
-        liberties = self._count_liberties(board, x, y)
-        board._grid[x][y] = None # 恢复
-
-        # 如果落子后没有气，且没有提掉对方的子 -> 禁止 (自杀)
-        if liberties == 0 and len(captured) == 0:
-             return False, "Suicide move is forbidden"
+        # 2. 围棋特殊规则：自杀手检测
+        # 只读判断，不在棋盘上试落子（AI 搜索与其他线程的读取可能同时进行）：
+        # 落点旁有空位、或相邻己方块在落点之外还有气、或能提掉相邻对方块（其唯一的气就是落点）时不是自杀
+        if not self._has_liberty_after(board, x, y, player_piece):
+            return False, "Suicide move is forbidden"
 
         return True, ""
 
@@ -208,21 +197,38 @@ class GoRule(RuleStrategy):
                     stack.append((nx, ny))
         return group
 
-    def _count_group_liberties(self, board: Board, x: int, y: int) -> int:
-        """计算一块棋的气"""
-        group = self._get_group(board, x, y)
-        liberties = 0
-        visited_empty = set()
-        
-        for (gx, gy) in group:
+    def _group_liberties(self, board: Board, x: int, y: int) -> Set[Tuple[int, int]]:
+        """一块棋的所有气（空位坐标）"""
+        liberties = set()
+        for (gx, gy) in self._get_group(board, x, y):
             for dx, dy in [(1, 0), (0, 1), (-1, 0), (0, -1)]:
                 nx, ny = gx + dx, gy + dy
-                if board.is_valid_pos(nx, ny):
-                    if board.get_piece(nx, ny) is None and (nx, ny) not in visited_empty:
-                        liberties += 1
-                        visited_empty.add((nx, ny))
+                if board.is_valid_pos(nx, ny) and board.get_piece(nx, ny) is None:
+                    liberties.add((nx, ny))
         return liberties
 
+    def _count_group_liberties(self, board: Board, x: int, y: int) -> int:
+        """计算一块棋的气"""
+        return len(self._group_liberties(board, x, y))
+
+    def _has_liberty_after(self, board: Board, x: int, y: int, player_piece: PieceType) -> bool:
+        """在空点 (x, y) 落 player_piece 后，落下的这块棋是否有气（含提子后得到的气），不修改棋盘"""
+        for dx, dy in [(1, 0), (0, 1), (-1, 0), (0, -1)]:
+            nx, ny = x + dx, y + dy
+            if not board.is_valid_pos(nx, ny):
+                continue
+            neighbor = board.get_piece(nx, ny)
+            if neighbor is None:
+                return True
+            liberties = self._group_liberties(board, nx, ny)
+            if neighbor == player_piece:
+                if len(liberties) > 1:
+                    return True
+            elif len(liberties) == 1:
+                # 对方这块棋只剩落点一口气，落子即提
+                return True
+        return False
+
     def _count_liberties(self, board: Board, x: int, y: int) -> int:
         """计算单个位置所在块的气"""
         return self._count_group_liberties(board, x, y)
@@ -0,0 +1,332 @@
+"""
+紧凑存档格式 (版本 1)
+
+    magic "CPSV" | version u8 | game_type u8 | size u8 | current_player u8 | flags u8
+    players_name[2] / players_role[2] / players_account[2]   (varint 长度 + utf-8；账户 0 表示 None)
+    move_count varint | moves: varint((x*size+y) << 1 | color)
+    [flags & KEYFRAMES]      interval varint | count varint | 每帧 2bit/格 打包的棋盘
+    [flags & FINAL_POSITION] last_move varint(+1, 0 表示无) | 打包的终局棋盘
+    [flags & SPARSE]         header 中 size 为 0，真实路数以 varint 紧跟在 header 之后；
+                             关键帧与终局棋盘改为棋子列表: count varint | varint(cell << 1 | color)（cell 升序）
+
+棋盘默认由规则重放 moves 得到；只有当步序无法还原当前局面时（例如旧存档没有步序）
+才写入 FINAL_POSITION。读取时兼容旧版 pickle 存档（受限反序列化，只允许棋子类型）。
+"""
+
+import io
+import pickle
+import struct
+from typing import Dict, List, Optional, Tuple
+
+from chess_platform.core.patterns import PieceFactory, PieceType
+
+MAGIC = b"CPSV"
+VERSION = 1
+
+FLAG_KEYFRAMES = 0x01
+FLAG_FINAL_POSITION = 0x02
+FLAG_SPARSE = 0x04
+
+GAME_TYPES = ["Gomoku", "Go", "Othello"]
+COLORS = ["Black", "White"]
+
+
+# ---------- varint / 字符串 ----------
+def _write_varint(buf: bytearray, value: int):
+    while value >= 0x80:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if b < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _write_str(buf: bytearray, s: Optional[str]):
+    if s is None:
+        _write_varint(buf, 0)
+        return
+    raw = s.encode("utf-8")
+    _write_varint(buf, len(raw) + 1)
+    buf += raw
+
+
+def _read_str(data: bytes, pos: int) -> Tuple[Optional[str], int]:
+    n, pos = _read_varint(data, pos)
+    if n == 0:
+        return None, pos
+    return data[pos:pos + n - 1].decode("utf-8"), pos + n - 1
+
+
+# ---------- 棋盘打包 (2bit/格) ----------
+def pack_grid(grid: List[List[Optional[PieceType]]]) -> bytes:
+    size = len(grid)
+    out = bytearray((size * size + 3) // 4)
+    i = 0
+    for row in grid:
+        for p in row:
+            if p is not None:
+                code = 1 if p.color_name == "Black" else 2
+                out[i >> 2] |= code << ((i & 3) << 1)
+            i += 1
+    return bytes(out)
+
+
+def pack_cells(cells: bytes) -> bytes:
+    """按行展开的格子编码 (0 空 / 1 黑 / 2 白) 打包为 2bit/格"""
+    out = bytearray((len(cells) + 3) // 4)
+    for i, code in enumerate(cells):
+        if code:
+            out[i >> 2] |= code << ((i & 3) << 1)
+    return bytes(out)
+
+
+def unpack_grid(data: bytes, size: int) -> List[List[Optional[PieceType]]]:
+    pieces = [None, _piece("Black"), _piece("White")]
+    grid: List[List[Optional[PieceType]]] = []
+    i = 0
+    for _ in range(size):
+        row = []
+        for _ in range(size):
+            row.append(pieces[(data[i >> 2] >> ((i & 3) << 1)) & 3])
+            i += 1
+        grid.append(row)
+    return grid
+
+
+def pack_stones(stones, size: int) -> bytes:
+    """棋子列表编码（稀疏棋盘用）：stones 为 (x, y, 棋子) 序列，长度与棋子数成正比"""
+    cells = sorted(((x * size + y) << 1) | (0 if p.color_name == "Black" else 1) for x, y, p in stones)
+    buf = bytearray()
+    _write_varint(buf, len(cells))
+    for v in cells:
+        _write_varint(buf, v)
+    return bytes(buf)
+
+
+def unpack_stones(data: bytes, pos: int, size: int) -> Tuple[Dict[Tuple[int, int], PieceType], int]:
+    pieces = [_piece("Black"), _piece("White")]
+    count, pos = _read_varint(data, pos)
+    stones = {}
+    for _ in range(count):
+        v, pos = _read_varint(data, pos)
+        stones[divmod(v >> 1, size)] = pieces[v & 1]
+    return stones, pos
+
+
+def pack_board(board) -> bytes:
+    """棋盘的紧凑编码：稠密棋盘 2bit/格，稀疏棋盘为棋子列表"""
+    if board.is_sparse:
+        return pack_stones(board.stones(), board.size)
+    return pack_grid(board._grid)
+
+
+def _snapshot_stones(snapshot: Dict):
+    if "stones" in snapshot:
+        return [(x, y, p) for (x, y), p in snapshot["stones"].items()]
+    return [(x, y, p) for x, row in enumerate(snapshot["grid"]) for y, p in enumerate(row) if p is not None]
+
+
+def _piece(color: str) -> PieceType:
+    return PieceFactory.get_piece_type(color, "X" if color == "Black" else "O")
+
+
+# ---------- 重放 ----------
+def replay_moves(game_type: str, size: int, move_log: List[dict], keyframe_interval: int = 0,
+                 validate: bool = True):
+    """
+    在空白对局上按规则重放步序，返回 (game, keyframes)
+    keyframes: [(已落子数, 打包棋盘)]，interval 为 0 时为空
+    """
+    from chess_platform.games.logic import GameFactory
+    game = GameFactory.create_game(game_type, size)
+    game.start()
+    board, rule = game.board, game.rule
+    keyframes: List[Tuple[int, bytes]] = []
+    for i, step in enumerate(move_log):
+        x, y = step["x"], step["y"]
+        piece = game.players[0] if step["color"] == "Black" else game.players[1]
+        if validate:
+            ok, msg = rule.is_valid_move(board, x, y, piece)
+            if not ok:
+                raise ValueError(f"move {i + 1} ({x},{y}) invalid: {msg}")
+        board.place_piece(x, y, piece)
+        rule.post_move_action(board, x, y, piece)
+        if keyframe_interval and (i + 1) % keyframe_interval == 0:
+            keyframes.append((i + 1, pack_board(board)))
+    return game, keyframes
+
+
+# ---------- 编码 ----------
+def encode(data: Dict, keyframe_interval: int = 0) -> bytes:
+    """把 save_game 产生的数据字典编码为紧凑二进制"""
+    game_type = data["type"]
+    size = data["size"]
+    snapshot = data["snapshot"]
+    move_log = data.get("move_log", [])
+
+    # 稀疏棋盘或超出 u8 的路数：棋盘按棋子列表编码，不按格子数展开
+    sparse = size > 0xFF or "stones" in snapshot
+    flags = FLAG_SPARSE if sparse else 0
+    final_position = False
+    keyframes: List[Tuple[int, bytes]] = []
+    try:
+        replayed, keyframes = replay_moves(game_type, size, move_log, keyframe_interval)
+        if sparse:
+            final_position = (pack_stones(replayed.board.stones(), size)
+                              != pack_stones(_snapshot_stones(snapshot), size))
+            if not replayed.board.is_sparse:
+                # 小路数强制稀疏时重放得到的是稠密棋盘，关键帧格式不符，不写关键帧
+                keyframes = []
+        elif replayed.board.is_sparse:
+            # 强制稠密的大路数棋盘重放得到的是稀疏棋盘：按棋子比较，关键帧格式不符，不写关键帧
+            final_position = (pack_stones(replayed.board.stones(), size)
+                              != pack_stones(_snapshot_stones(snapshot), size))
+            keyframes = []
+        elif pack_grid(replayed.board._grid) != pack_grid(snapshot["grid"]):
+            final_position = True
+    except ValueError:
+        final_position = True
+        keyframes = []
+    if keyframes:
+        flags |= FLAG_KEYFRAMES
+    if final_position:
+        flags |= FLAG_FINAL_POSITION
+
+    buf = bytearray(MAGIC)
+    buf += struct.pack("BBBBB", VERSION, GAME_TYPES.index(game_type), 0 if sparse else size,
+                       data.get("current_player", 0), flags)
+    if sparse:
+        _write_varint(buf, size)
+    for key in ("players_name", "players_role", "players_account"):
+        values = data.get(key) or [None, None]
+        for v in values[:2]:
+            _write_str(buf, v)
+    _write_varint(buf, len(move_log))
+    for step in move_log:
+        _write_varint(buf, ((step["x"] * size + step["y"]) << 1) | COLORS.index(step["color"]))
+    if flags & FLAG_KEYFRAMES:
+        _write_varint(buf, keyframe_interval)
+        _write_varint(buf, len(keyframes))
+        for _, packed in keyframes:
+            buf += packed
+    if flags & FLAG_FINAL_POSITION:
+        last = snapshot.get("last_move")
+        _write_varint(buf, 0 if last is None else last[0] * size + last[1] + 1)
+        buf += pack_stones(_snapshot_stones(snapshot), size) if sparse else pack_grid(snapshot["grid"])
+    return bytes(buf)
+
+
+# ---------- 解码 ----------
+def decode(raw: bytes, replay: bool = True) -> Dict:
+    """
+    解码紧凑存档，返回与旧版 pickle 存档相同结构的字典
+    replay=False 时不重放（snapshot 为 None），用于只需要元数据/步序的场景
+    """
+    if raw[:4] != MAGIC:
+        raise ValueError("not a compact save file")
+    version, type_code, size, current_player, flags = struct.unpack_from("BBBBB", raw, 4)
+    if version != VERSION:
+        raise ValueError(f"unsupported save version {version}")
+    game_type = GAME_TYPES[type_code]
+    pos = 9
+    sparse = bool(flags & FLAG_SPARSE)
+    if sparse:
+        size, pos = _read_varint(raw, pos)
+    fields: Dict[str, list] = {}
+    for key in ("players_name", "players_role", "players_account"):
+        a, pos = _read_str(raw, pos)
+        b, pos = _read_str(raw, pos)
+        fields[key] = [a, b]
+    count, pos = _read_varint(raw, pos)
+    move_log = []
+    for i in range(count):
+        v, pos = _read_varint(raw, pos)
+        cell = v >> 1
+        move_log.append({"x": cell // size, "y": cell % size, "color": COLORS[v & 1], "move_idx": i + 1})
+
+    grid_bytes = (size * size + 3) // 4
+    keyframes: List[Tuple[int, bytes]] = []
+    if flags & FLAG_KEYFRAMES:
+        interval, pos = _read_varint(raw, pos)
+        kcount, pos = _read_varint(raw, pos)
+        for k in range(kcount):
+            start = pos
+            if sparse:
+                _, pos = unpack_stones(raw, pos, size)
+            else:
+                pos += grid_bytes
+            keyframes.append(((k + 1) * interval, raw[start:pos]))
+
+    snapshot = None
+    if flags & FLAG_FINAL_POSITION:
+        last, pos = _read_varint(raw, pos)
+        snapshot = {"size": size, "last_move": None if last == 0 else divmod(last - 1, size)}
+        if sparse:
+            snapshot["stones"] = unpack_stones(raw, pos, size)[0]
+        else:
+            snapshot["grid"] = unpack_grid(raw[pos:pos + grid_bytes], size)
+    elif replay:
+        game, _ = replay_moves(game_type, size, move_log)
+        snapshot = game.board.get_snapshot()
+        if move_log:
+            snapshot["last_move"] = (move_log[-1]["x"], move_log[-1]["y"])
+
+    return {
+        "type": game_type,
+        "size": size,
+        "snapshot": snapshot,
+        "current_player": current_player,
+        "history_len": count,
+        "players_name": fields["players_name"],
+        "players_role": fields["players_role"],
+        "players_account": fields["players_account"],
+        "move_log": move_log,
+        "keyframes": keyframes,
+        "final_position": bool(flags & FLAG_FINAL_POSITION),
+    }
+
+
+# ---------- 旧版 pickle ----------
+class _LegacyUnpickler(pickle.Unpickler):
+    """旧存档只包含基础类型与棋子类型，禁止反序列化其他任何类"""
+    def find_class(self, module, name):
+        if module == "chess_platform.core.patterns" and name == "PieceType":
+            return PieceType
+        raise pickle.UnpicklingError(f"forbidden class {module}.{name}")
+
+
+def _load_legacy(raw: bytes) -> Dict:
+    data = _LegacyUnpickler(io.BytesIO(raw)).load()
+    # pickle 会新建 PieceType 实例，需映射回享元对象，否则规则中的 == 比较失效
+    snap = data.get("snapshot")
+    if snap:
+        snap["grid"] = [[_piece(p.color_name) if p is not None else None for p in row]
+                        for row in snap["grid"]]
+    data.setdefault("move_log", [])
+    data.setdefault("keyframes", [])
+    return data
+
+
+# ---------- 文件接口 ----------
+def write_save(filepath: str, data: Dict, keyframe_interval: int = 0):
+    with open(filepath, "wb") as f:
+        f.write(encode(data, keyframe_interval))
+
+
+def read_save(filepath: str, replay: bool = True) -> Dict:
+    """读取存档：自动识别紧凑格式与旧版 pickle"""
+    with open(filepath, "rb") as f:
+        raw = f.read()
+    if raw[:4] == MAGIC:
+        return decode(raw, replay)
+    return _load_legacy(raw)
@@ -0,0 +1,290 @@
+"""
+自对弈训练数据导出
+运行:
+    python -m chess_platform.games.selfplay --game gomoku --size 9 --black ai-mcts --white ai-mcts \
+        --games 200 --workers 4 -o selfplay_out
+每局由进程池中的一个进程无界面对弈，记录每个局面（走子前）的棋盘、执子方、
+策略目标（MCTS 根节点访问次数；非 MCTS 玩家为所走着法的 one-hot）和终局结果，
+再按棋盘的 8 种对称变换扩增，由主进程按固定记录数切分写入分片文件。
+
+分片格式（packed records，定长，便于 mmap / numpy.fromfile 直接读取）:
+    文件头 16 字节: magic "CPSP" | version u8 | size u8 | flags u8 | 保留 u8 | record_size u32 | 保留 u32
+    记录: 棋盘 2bit/格 (同 savefile.pack_cells) | to_move u8 (0 黑 / 1 白) | outcome i8 (对执子方 +1/0/-1)
+          | move_number u16 | policy u16 × size²（小端，按行展开）
+--format npz 时改为每个分片一个 numpy .npz（需要安装 numpy）。
+"""
+import argparse
+import os
+import random
+import struct
+import sys
+import time
+from array import array
+from multiprocessing import Pool
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from chess_platform.games.logic import GameFactory
+from chess_platform.games.rules import PASS
+from chess_platform.games.savefile import pack_cells
+from chess_platform.games.symmetry import board_cells, symmetries, transform
+
+MAGIC = b"CPSP"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBBII")
+
+
+def record_size(size: int) -> int:
+    return (size * size + 3) // 4 + 4 + 2 * size * size
+
+
+# ---------- 对弈 ----------
+def final_winner(game) -> str:
+    if game.is_game_over:
+        return game.winner or "Draw"
+    if game.game_type == "Gomoku":
+        return "Draw"
+    # 未分胜负的围棋/黑白棋按盘面子数判定（围棋为简化的数子，不计空）
+    cells = board_cells(game.board)
+    black, white = cells.count(1), cells.count(2)
+    if black == white:
+        return "Draw"
+    return "Black" if black > white else "White"
+
+
+def play_game(game_type: str, size: int, black: str, white: str, simulations: Optional[int],
+              max_moves: int, seed: int, use_book: bool = True) -> Tuple[List[Tuple[bytes, int, int, array]], str, List[dict]]:
+    """自对弈一局，返回 ([(棋盘编码, 执子方, 手数, 策略)], 胜方, 录像)"""
+    from chess_platform.games.ai import GomokuMCTS, create_ai, legal_moves
+    random.seed(seed)
+    game = GameFactory.create_game(game_type, size)
+    game.record_results = False
+    game.start()
+    players = []
+    for mode in (black, white):
+        ai = create_ai(mode, game_type)
+        if ai is None:
+            raise ValueError("self-play needs AI players on both sides")
+        if simulations and isinstance(ai, GomokuMCTS):
+            ai.simulations = simulations
+        ai.use_book = use_book
+        players.append(ai)
+    positions = []
+    passes = 0
+    while not game.is_game_over and len(positions) < max_moves:
+        idx = game.current_player_idx
+        if not legal_moves(game):
+            passes += 1
+            if passes >= 2:
+                break
+            game.switch_player()
+            continue
+        passes = 0
+        ai = players[idx]
+        move = ai.select_move(game)
+        if move is None:
+            break
+        if move == PASS:
+            passes += 1
+            if passes >= 2:
+                break
+            game.pass_turn()
+            continue
+        policy = array("H", bytes(2 * size * size))
+        visits = ai.visit_counts() if isinstance(ai, GomokuMCTS) else []
+        if visits:
+            for (r, c), n in visits:
+                policy[r * size + c] = min(n, 0xFFFF)
+        else:
+            policy[move[0] * size + move[1]] = 1
+        positions.append((board_cells(game.board), idx, len(game.move_log), policy))
+        if not game.make_move(*move):
+            break
+    return positions, final_winner(game), game.move_log.to_list()
+
+
+def encode_records(size: int, positions, winner: str, augment: bool = True) -> Tuple[bytes, int]:
+    """把一局的局面编码为定长记录（可选 8 倍对称扩增），返回 (字节, 记录数)"""
+    perms = symmetries(size) if augment else symmetries(size)[:1]
+    buf = bytearray()
+    count = 0
+    for cells, to_move, move_number, policy in positions:
+        color = "Black" if to_move == 0 else "White"
+        outcome = 0 if winner == "Draw" else (1 if winner == color else -1)
+        for perm in perms:
+            t_cells = transform(cells, perm, "B")
+            t_policy = transform(policy, perm, "H")
+            if sys.byteorder != "little":
+                t_policy.byteswap()
+            buf += pack_cells(t_cells.tobytes())
+            buf += struct.pack("<BbH", to_move, outcome, move_number)
+            buf += t_policy.tobytes()
+            count += 1
+    return bytes(buf), count
+
+
+def _worker(task) -> Tuple[bytes, int, int, str]:
+    game_type, size, black, white, simulations, max_moves, seed, augment = task
+    positions, winner, _ = play_game(game_type, size, black, white, simulations, max_moves, seed)
+    data, count = encode_records(size, positions, winner, augment)
+    return data, count, len(positions), winner
+
+
+# ---------- 分片读写 ----------
+class ShardWriter:
+    """按记录数切分写入分片；packed 格式直接追加，npz 格式攒满一个分片后一次写出"""
+    def __init__(self, out_dir: str, size: int, shard_records: int = 65536, fmt: str = "packed"):
+        self.out_dir = out_dir
+        self.size = size
+        self.shard_records = shard_records
+        self.fmt = fmt
+        self.rec_size = record_size(size)
+        self.shards: List[str] = []
+        self._file = None
+        self._pending = bytearray()
+        self._in_shard = 0
+        os.makedirs(out_dir, exist_ok=True)
+
+    def write(self, data: bytes):
+        rs = self.rec_size
+        pos = 0
+        while pos < len(data):
+            n = min(self.shard_records - self._in_shard, (len(data) - pos) // rs)
+            chunk = data[pos:pos + n * rs]
+            pos += n * rs
+            if self.fmt == "npz":
+                self._pending += chunk
+            else:
+                if self._file is None:
+                    path = self._next_path(".bin")
+                    self._file = open(path, "wb")
+                    self._file.write(HEADER.pack(MAGIC, VERSION, self.size, 0, 0, rs, 0))
+                self._file.write(chunk)
+            self._in_shard += n
+            if self._in_shard >= self.shard_records:
+                self._finish_shard()
+
+    def close(self):
+        if self._in_shard:
+            self._finish_shard()
+
+    def _next_path(self, ext: str) -> str:
+        path = os.path.join(self.out_dir, f"shard-{len(self.shards):05d}{ext}")
+        self.shards.append(path)
+        return path
+
+    def _finish_shard(self):
+        if self.fmt == "npz":
+            _write_npz(self._next_path(".npz"), self.size, bytes(self._pending))
+            self._pending = bytearray()
+        else:
+            self._file.close()
+            self._file = None
+        self._in_shard = 0
+
+
+def record_dtype(size: int):
+    """numpy 结构化类型：np.fromfile(path, dtype=record_dtype(size), offset=HEADER.size)"""
+    import numpy as np
+    return np.dtype([("board", np.uint8, ((size * size + 3) // 4,)), ("to_move", np.uint8),
+                     ("outcome", np.int8), ("move_number", "<u2"), ("policy", "<u2", (size * size,))])
+
+
+def _write_npz(path: str, size: int, data: bytes):
+    import numpy as np
+    recs = np.frombuffer(data, dtype=record_dtype(size))
+    # 棋盘展开为 size×size 的 0/1/2 编码，便于直接喂给训练代码
+    packed = recs["board"]
+    cells = np.stack([(packed >> (2 * k)) & 3 for k in range(4)], axis=-1).reshape(len(recs), -1)
+    np.savez_compressed(path, board=cells[:, :size * size].reshape(-1, size, size),
+                        to_move=recs["to_move"], outcome=recs["outcome"], move_number=recs["move_number"],
+                        policy=recs["policy"].reshape(-1, size, size))
+
+
+def read_shard(path: str) -> Iterator[Dict]:
+    """逐条读取 packed 分片（不依赖 numpy）"""
+    from chess_platform.games.savefile import unpack_grid
+    with open(path, "rb") as f:
+        magic, version, size, _, _, rs, _ = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a self-play shard")
+        grid_bytes = (size * size + 3) // 4
+        while True:
+            rec = f.read(rs)
+            if len(rec) < rs:
+                return
+            to_move, outcome, move_number = struct.unpack_from("<BbH", rec, grid_bytes)
+            policy = array("H")
+            policy.frombytes(rec[grid_bytes + 4:])
+            if sys.byteorder != "little":
+                policy.byteswap()
+            yield {"size": size, "grid": unpack_grid(rec[:grid_bytes], size), "to_move": to_move,
+                   "outcome": outcome, "move_number": move_number, "policy": policy}
+
+
+# ---------- 命令行 ----------
+def run(game_type: str, size: int, black: str, white: str, games: int, out_dir: str,
+        workers: Optional[int] = None, simulations: Optional[int] = None, max_moves: Optional[int] = None,
+        augment: bool = True, shard_records: int = 65536, fmt: str = "packed", seed: int = 0,
+        quiet: bool = False) -> Dict:
+    if fmt == "npz":
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            raise RuntimeError("--format npz requires numpy") from None
+    workers = workers or os.cpu_count() or 1
+    max_moves = max_moves or size * size
+    writer = ShardWriter(out_dir, size, shard_records, fmt)
+    tasks = [(game_type, size, black, white, simulations, max_moves, seed + i, augment) for i in range(games)]
+    stats = {"games": 0, "positions": 0, "records": 0, "bytes": 0,
+             "results": {"Black": 0, "White": 0, "Draw": 0}}
+    start = time.perf_counter()
+    with Pool(workers) as pool:
+        for data, count, positions, winner in pool.imap_unordered(_worker, tasks, chunksize=1):
+            writer.write(data)
+            stats["games"] += 1
+            stats["positions"] += positions
+            stats["records"] += count
+            stats["bytes"] += len(data)
+            stats["results"][winner] += 1
+            if not quiet:
+                elapsed = time.perf_counter() - start
+                print(f"[{stats['games']}/{games}] {positions} positions, winner {winner} "
+                      f"({stats['positions'] / elapsed / workers:.1f} positions/s/core)")
+    writer.close()
+    stats["elapsed"] = time.perf_counter() - start
+    stats["workers"] = workers
+    stats["shards"] = writer.shards
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Self-play training data exporter")
+    parser.add_argument("--game", default="gomoku")
+    parser.add_argument("--size", type=int, default=15)
+    parser.add_argument("--black", default="ai-mcts", help="ai-rand / ai-pro / ai-mcts")
+    parser.add_argument("--white", default="ai-mcts")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认 CPU 核数")
+    parser.add_argument("--simulations", type=int, default=None, help="MCTS 每步模拟次数")
+    parser.add_argument("--max-moves", type=int, default=None)
+    parser.add_argument("--no-augment", action="store_true", help="不做 8 倍对称扩增")
+    parser.add_argument("--shard-records", type=int, default=65536)
+    parser.add_argument("--format", choices=["packed", "npz"], default="packed")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="selfplay_out")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+    game_type = GameFactory.create_game(args.game, args.size).game_type
+    stats = run(game_type, args.size, args.black, args.white, args.games, args.output, args.workers,
+                args.simulations, args.max_moves, not args.no_augment, args.shard_records, args.format,
+                args.seed, args.quiet)
+    elapsed = stats["elapsed"]
+    print(f"games={stats['games']} positions={stats['positions']} records={stats['records']} "
+          f"shards={len(stats['shards'])} bytes={stats['bytes']} results={stats['results']}")
+    print(f"elapsed {elapsed:.1f}s: {stats['positions'] / elapsed:.1f} positions/s, "
+          f"{stats['positions'] / elapsed / stats['workers']:.1f} positions/s/core "
+          f"({stats['workers']} workers), {stats['records'] / elapsed:.0f} records/s written")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from chess_platform.games.logic import GameContext, GameFactory
+
+
+class _Entry:
+    """一个会话：活跃时持有 GameContext，被换出后只保留紧凑存档（内存或磁盘）"""
+    __slots__ = ("game_type", "size", "modes", "game", "blob", "path", "last_access")
+
+    def __init__(self, game_type: str, size: int, modes: List[str]):
+        self.game_type = game_type
+        self.size = size
+        self.modes = modes
+        self.game: Optional[GameContext] = None
+        self.blob: Optional[bytes] = None
+        self.path: Optional[str] = None
+        self.last_access = time.monotonic()
+
+
+class SessionManager:
+    """
+    单进程内管理大量对局
+    - 活跃对局按 LRU 排列，超过 max_active 或空闲超过 idle_seconds 时换出
+    - 换出格式为 games/savefile.py 的紧凑存档：指定 spool_dir 时写盘，否则保存在内存
+    - 再次访问时通过 GameContext.load_game 重建（含悔棋历史），对调用方透明
+    """
+    def __init__(self, max_active: int = 1000, idle_seconds: float = 300.0,
+                 spool_dir: Optional[str] = None):
+        self.max_active = max_active
+        self.idle_seconds = idle_seconds
+        self.spool_dir = spool_dir
+        if spool_dir:
+            os.makedirs(spool_dir, exist_ok=True)
+        self._entries: Dict[int, _Entry] = {}
+        self._active: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._next_id = 1
+        self.evictions = 0
+        self.rehydrations = 0
+
+    def create(self, game_type: str, size: int = 15, black: str = "human", white: str = "human") -> int:
+        game = GameFactory.create_game(game_type, size)
+        entry = _Entry(game.game_type, size, [black, white])
+        entry.game = game
+        self._attach_players(entry)
+        game.start()
+        sid = self._next_id
+        self._next_id += 1
+        self._entries[sid] = entry
+        self._active[sid] = entry
+        self._enforce_limit()
+        return sid
+
+    def get(self, sid: int) -> GameContext:
+        """取得对局（必要时从紧凑存档重建），并标记为最近使用"""
+        entry = self._entries[sid]
+        if entry.game is None:
+            self._rehydrate(entry)
+            self._active[sid] = entry
+            self._enforce_limit(keep=sid)
+        self._active.move_to_end(sid)
+        entry.last_access = time.monotonic()
+        return entry.game
+
+    def close(self, sid: int):
+        entry = self._entries.pop(sid)
+        self._active.pop(sid, None)
+        if entry.path and os.path.exists(entry.path):
+            os.remove(entry.path)
+
+    def is_active(self, sid: int) -> bool:
+        return sid in self._active
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def active_count(self) -> int:
+        return len(self._active)
+
+    # ---------- 换出 / 重建 ----------
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """换出空闲超时的对局，返回换出数量"""
+        now = time.monotonic() if now is None else now
+        idle = [sid for sid, e in self._active.items() if now - e.last_access >= self.idle_seconds]
+        for sid in idle:
+            self.evict(sid)
+        return len(idle)
+
+    def evict(self, sid: int):
+        from chess_platform.games import savefile
+        entry = self._active.pop(sid)
+        blob = savefile.encode(entry.game.to_save_data())
+        if self.spool_dir:
+            entry.path = os.path.join(self.spool_dir, f"session-{sid}.dat")
+            with open(entry.path, "wb") as f:
+                f.write(blob)
+        else:
+            entry.blob = blob
+        entry.game = None
+        self.evictions += 1
+
+    def _rehydrate(self, entry: _Entry):
+        from chess_platform.games import savefile
+        if entry.path:
+            data = savefile.read_save(entry.path, replay=False)
+            os.remove(entry.path)
+            entry.path = None
+        else:
+            data = savefile.decode(entry.blob, replay=False)
+            entry.blob = None
+        game = GameFactory.create_game(entry.game_type, entry.size)
+        game.restore_data(data)
+        entry.game = game
+        self._attach_players(entry)
+        self.rehydrations += 1
+
+    def evicted_bytes(self) -> int:
+        """换出的对局在内存中占用的存档字节数（写盘的不计）"""
+        return sum(len(e.blob) for e in self._entries.values() if e.blob is not None)
+
+    def _attach_players(self, entry: _Entry):
+        from chess_platform.games.ai import create_ai
+        game = entry.game
+        for idx, mode in enumerate(entry.modes):
+            ai = create_ai(mode, game.game_type)
+            game.controllers[idx] = ai
+            if ai is not None:
+                game.players_role[idx] = "ai"
+                game.players_name[idx] = ai.name
+
+    def _enforce_limit(self, keep: Optional[int] = None):
+        while len(self._active) > self.max_active:
+            sid = next(iter(self._active))
+            if sid == keep:
+                self._active.move_to_end(sid)
+                continue
+            self.evict(sid)
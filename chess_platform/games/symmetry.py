@@ -0,0 +1,124 @@
+import random
+from array import array
+from hashlib import blake2b
+from typing import Dict, List, Tuple
+
+from chess_platform.games.savefile import pack_cells
+
+# 棋盘的 8 种二面体对称（旋转/翻转）。格子按行展开为下标 r*size+c，
+# cells 为按行展开的格子编码 (0 空 / 1 黑 / 2 白)。
+
+_perm_cache: Dict[int, List[List[int]]] = {}
+_inverse_cache: Dict[int, List[List[int]]] = {}
+
+
+def symmetries(size: int) -> List[List[int]]:
+    """8 种二面体变换，perm[k][i] 为格子 i 变换后的下标（k=0 为恒等）"""
+    if size not in _perm_cache:
+        n = size - 1
+        maps = [
+            lambda r, c: (r, c),
+            lambda r, c: (c, n - r),
+            lambda r, c: (n - r, n - c),
+            lambda r, c: (n - c, r),
+            lambda r, c: (r, n - c),
+            lambda r, c: (n - r, c),
+            lambda r, c: (c, r),
+            lambda r, c: (n - c, n - r),
+        ]
+        perms = []
+        for f in maps:
+            perm = [0] * (size * size)
+            for r in range(size):
+                for c in range(size):
+                    nr, nc = f(r, c)
+                    perm[r * size + c] = nr * size + nc
+            perms.append(perm)
+        _perm_cache[size] = perms
+    return _perm_cache[size]
+
+
+def inverse_symmetries(size: int) -> List[List[int]]:
+    if size not in _inverse_cache:
+        inverses = []
+        for perm in symmetries(size):
+            inv = [0] * len(perm)
+            for i, j in enumerate(perm):
+                inv[j] = i
+            inverses.append(inv)
+        _inverse_cache[size] = inverses
+    return _inverse_cache[size]
+
+
+def transform(values, perm: List[int], typecode: str = "B") -> array:
+    out = array(typecode, bytes(len(values) * array(typecode).itemsize))
+    for i, v in enumerate(values):
+        out[perm[i]] = v
+    return out
+
+
+def canonical(cells: bytes, size: int) -> Tuple[bytes, int]:
+    """返回 (规范形打包字节, 变换下标 k)：8 种变换中打包结果字典序最小者"""
+    best = None
+    best_k = 0
+    for k, perm in enumerate(symmetries(size)):
+        packed = pack_cells(transform(cells, perm).tobytes())
+        if best is None or packed < best:
+            best, best_k = packed, k
+    return best, best_k
+
+
+def position_hash(canonical_packed: bytes, to_move: int) -> int:
+    """规范局面 + 执子方的 64 位哈希"""
+    return int.from_bytes(blake2b(canonical_packed + bytes([to_move]), digest_size=8).digest(), "little")
+
+
+def board_cells(board) -> bytes:
+    if board.is_sparse:
+        cells = bytearray(board.size * board.size)
+        for x, y, p in board.stones():
+            cells[x * board.size + y] = 1 if p.color_name == "Black" else 2
+        return bytes(cells)
+    return bytes(0 if p is None else (1 if p.color_name == "Black" else 2)
+                 for row in board._grid for p in row)
+
+
+class SymmetricZobrist:
+    """
+    8 个对称方向同时维护的 Zobrist 哈希，可按格子增量更新
+    第 k 个方向的哈希即变换 k 后局面的 Zobrist 值，8 个值按 64 位一段打包在一个整数里，
+    一次异或即可同时更新；取最小值为规范哈希，互为旋转/翻转的局面得到同一值。
+    随机数按路数固定种子生成，哈希可写入磁盘跨进程使用。
+    """
+    MASK = (1 << 64) - 1
+
+    def __init__(self, size: int):
+        self.size = size
+        rnd = random.Random(f"zobrist-{size}")
+        base = [[rnd.getrandbits(64) for _ in range(size * size)] for _ in range(2)]
+        self.side = rnd.getrandbits(64)
+        perms = symmetries(size)
+        # keys[v][i]: 颜色 v（0 黑 / 1 白）的棋子在格子 i 时 8 个方向的打包键
+        self.keys = [[sum(base[v][perm[i]] << (64 * k) for k, perm in enumerate(perms))
+                      for i in range(size * size)] for v in range(2)]
+
+    def full(self, cells: bytes) -> int:
+        """整盘计算打包哈希（cells 同 board_cells）"""
+        h = 0
+        keys = self.keys
+        for i, v in enumerate(cells):
+            if v:
+                h ^= keys[v - 1][i]
+        return h
+
+    def canonical(self, packed: int, to_move: int) -> Tuple[int, List[int]]:
+        """返回 (规范哈希, 取到最小值的变换下标列表)；局面自身对称时列表多于一个"""
+        mask = self.MASK
+        hashes = [(packed >> (64 * k)) & mask for k in range(8)]
+        best = min(hashes)
+        return best ^ (self.side if to_move else 0), [k for k, h in enumerate(hashes) if h == best]
+
+    def canonical_move(self, cell: int, ks: List[int]) -> int:
+        """着法在规范方向下的格子下标；对称局面中等价的着法归并为同一下标"""
+        perms = symmetries(self.size)
+        return min(perms[k][cell] for k in ks)
@@ -0,0 +1,461 @@
+"""
+五子棋威胁空间搜索（VCF / VCT）
+只沿"连续冲四"（VCF）或"冲四 + 活三"（VCT）的着法搜索必胜序列，分支很少，可以搜得很深。
+- 局面按"五连窗口"增量维护：每个窗口记黑白子数，落子只更新经过该点的至多 20 个窗口；
+  某方在窗口内 4 子且对方 0 子即成五点，3 子即冲四点（另一个空位为成五点）
+- 攻方节点（OR）：有成五点即胜；对方有成五点时只能去挡；否则试冲四点，VCT 再试活三点
+  （落下后能一步成活四/双四的点）
+- 守方节点（AND）：攻方单一成五点必须挡；攻方活三时候选为能拦住所有活四的点与守方自己的冲四，
+  每种应对下攻方都能继续取胜才算胜
+- 置换表按 Zobrist 哈希记录已证明的胜与失败深度；超出节点数或时间上限时放弃（结果未知）
+自由规则：长连（>= 5）同样算胜，与 GomokuRule.check_win 一致。
+"""
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from chess_platform.games.logic import GameContext  # type: ignore
+
+Cell = Tuple[int, int]
+_DIRECTIONS = ((1, 0), (0, 1), (1, 1), (1, -1))
+WIN, FAIL = 1, 0
+_TT_LIMIT = 200_000
+# VCT 中攻方后续的活三只在上一个威胁着法的这一距离（切比雪夫）内找
+_LOCAL = 3
+
+
+class _Abort(Exception):
+    """节点数或时间用完"""
+
+
+class _Position:
+    """
+    威胁搜索用的局面：格子按 x * size + y 编号；五连窗口编号为 起点格 * 4 + 方向，
+    窗口计数打包为 黑子数 + 8 * 白子数；cats[color][k] 为该色 k 子且无对方棋子的窗口
+    """
+    def __init__(self, size: int, zobrist: Dict[Tuple[int, int], int], rng: random.Random):
+        self.size = size
+        self.stones: Dict[int, int] = {}
+        self.counts: Dict[int, int] = {}
+        self.cats: List[List[Set[int]]] = [[set() for _ in range(6)], [set() for _ in range(6)]]
+        self.hash = 0
+        self._zobrist = zobrist
+        self._rng = rng
+        self._windows: Dict[int, List[int]] = {}
+        self._steps = (size, 1, size + 1, size - 1)
+
+    def windows(self, cell: int) -> List[int]:
+        """经过 cell 的全部盘内五连窗口"""
+        result = self._windows.get(cell)
+        if result is None:
+            result = []
+            n = self.size
+            x, y = divmod(cell, n)
+            for d, (dx, dy) in enumerate(_DIRECTIONS):
+                for back in range(5):
+                    x0, y0 = x - back * dx, y - back * dy
+                    x4, y4 = x0 + 4 * dx, y0 + 4 * dy
+                    if 0 <= x0 < n and 0 <= y0 < n and 0 <= x4 < n and 0 <= y4 < n:
+                        result.append((x0 * n + y0) * 4 + d)
+            self._windows[cell] = result
+        return result
+
+    def key(self, cell: int, color: int) -> int:
+        k = self._zobrist.get((cell, color))
+        if k is None:
+            k = self._zobrist[(cell, color)] = self._rng.getrandbits(64)
+        return k
+
+    def place(self, cell: int, color: int):
+        self._update(cell, color, 1)
+        self.stones[cell] = color
+
+    def remove(self, cell: int):
+        color = self.stones.pop(cell)
+        self._update(cell, color, -1)
+
+    def _update(self, cell: int, color: int, delta: int):
+        self.hash ^= self.key(cell, color)
+        counts = self.counts
+        black, white = self.cats
+        delta <<= 3 * color
+        for w in self.windows(cell):
+            v = counts.get(w, 0)
+            a, b = v & 7, v >> 3
+            if not b:
+                if a >= 2:
+                    black[a].discard(w)
+            elif not a and b >= 2:
+                white[b].discard(w)
+            v += delta
+            counts[w] = v
+            a, b = v & 7, v >> 3
+            if not b:
+                if a >= 2:
+                    black[a].add(w)
+            elif not a and b >= 2:
+                white[b].add(w)
+
+    def empties(self, window: int) -> List[int]:
+        start = window >> 2
+        step = self._steps[window & 3]
+        stones = self.stones
+        return [c for c in range(start, start + 5 * step, step) if c not in stones]
+
+    def five_moves(self, color: int) -> Set[int]:
+        """color 落下即成五的点"""
+        return {self.empties(w)[0] for w in self.cats[color][4]}
+
+    def four_moves(self, color: int) -> Dict[int, Set[int]]:
+        """冲四点 -> 落下后的成五点集合（两个以上即活四或双四）"""
+        result: Dict[int, Set[int]] = {}
+        for w in self.cats[color][3]:
+            a, b = self.empties(w)
+            result.setdefault(a, set()).add(b)
+            result.setdefault(b, set()).add(a)
+        return result
+
+    def three_moves(self, color: int, fours: Dict[int, Set[int]]) -> List[int]:
+        """活三点：落下后出现能一步成活四/双四的冲四点（不含本身已是冲四的点）"""
+        candidates = set()
+        for w in self.cats[color][2]:
+            candidates.update(self.empties(w))
+        result = []
+        for cell in candidates:
+            if cell in fours:
+                continue
+            self.place(cell, color)
+            if any(len(g) >= 2 for g in self.four_moves(color).values()):
+                result.append(cell)
+            self.remove(cell)
+        return result
+
+    def near(self, a: int, b: int) -> bool:
+        ax, ay = divmod(a, self.size)
+        bx, by = divmod(b, self.size)
+        return max(abs(ax - bx), abs(ay - by)) <= _LOCAL
+
+    def xy(self, cell: Optional[int]) -> Optional[int]:
+        return None if cell is None else divmod(cell, self.size)
+
+
+class ThreatSolver:
+    """
+    VCF/VCT 求解器；置换表在同一实例的相邻求解之间保留
+    nodes / elapsed 为最近一次 solve 的统计
+    """
+    def __init__(self, max_nodes: int = 20000, time_limit: float = 0.3, vcf_depth: int = 30,
+                 vct_depth: int = 8):
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.vcf_depth = vcf_depth
+        self.vct_depth = vct_depth
+        # (哈希, 是否攻方节点, 是否 VCT, 攻方) -> (结果, 搜索深度, 攻方着法)
+        self.tt: Dict[Tuple[int, bool, bool, int], Tuple[int, int, Optional[int]]] = {}
+        # 独立的随机源：不扰动调用方（MCTS、基准）的全局随机序列
+        self._rng = random.Random(0x7A7)
+        self._zobrist: Dict[Tuple[int, int], int] = {}
+        self._size = 0
+        self.nodes = 0
+        self.elapsed = 0.0
+        self._started = 0.0
+        self._deadline = 0.0
+        self._budget = 0
+
+    # ---------- 对外接口 ----------
+    def solve(self, game: "GameContext", vct: bool = True) -> Tuple[Optional[Cell], str]:
+        """
+        返回 (着法, 类别)：five 直接成五 / block 挡对方成五 / vcf、vct 己方必胜序列的第一手 /
+        defend-vcf、defend-vct 化解对方必胜序列；都没有时为 (None, "")
+        """
+        pos, me = self._position(game)
+        self._start()
+        try:
+            move, kind = self._solve(pos, me, vct)
+        finally:
+            self.elapsed = time.perf_counter() - self._started
+        return pos.xy(move), kind
+
+    def _solve(self, pos: _Position, me: int, vct: bool) -> Tuple[Optional[int], str]:
+        opp = 1 - me
+        five = pos.five_moves(me)
+        if five:
+            return min(five), "five"
+        threat = pos.five_moves(opp)
+        if threat:
+            return min(threat), "block"
+        # 各阶段分摊剩余节点数：前一阶段超限不影响后面的检查
+        move = self._phase(lambda: self.prove(pos, me, False), 4)
+        if move is not None:
+            return move, "vcf"
+        if self._phase(lambda: self.prove(pos, opp, False), 3) is not None:
+            move = self._phase(lambda: self.defend(pos, me, False), 1)
+            return (move, "defend-vcf") if move is not None else (None, "")
+        if not vct:
+            return None, ""
+        move = self._phase(lambda: self.prove(pos, me, True), 3)
+        if move is not None:
+            return move, "vct"
+        # 化解对方 VCT 代价最高（每个候选都要重新证明），只给剩余预算的一半
+        if self._phase(lambda: self.prove(pos, opp, True), 3) is not None:
+            move = self._phase(lambda: self.defend(pos, me, True), 2)
+            if move is not None:
+                return move, "defend-vct"
+        return None, ""
+
+    def find_win(self, game: "GameContext", vct: bool = True) -> Optional[List[Cell]]:
+        """当前方的必胜主变（攻方着法与守方应对交替），未找到或超限时为 None"""
+        pos, me = self._position(game)
+        self._start()
+        for use_vct in ((False, True) if vct else (False,)):
+            if self._phase(lambda: self.prove(pos, me, use_vct), 2 if use_vct else 1) is not None:
+                return [pos.xy(c) for c in self._pv(pos, me, use_vct)]
+        return None
+
+    def clear(self):
+        self.tt.clear()
+
+    # ---------- 搜索 ----------
+    def prove(self, pos: _Position, attacker: int, vct: bool) -> Optional[int]:
+        """attacker 先走时能否在威胁序列内取胜，能则返回第一手；VCT 逐步加深，浅的胜法先找到"""
+        depths = range(2, self.vct_depth + 1, 2) if vct else (self.vcf_depth,)
+        for depth in depths:
+            if self._attack(pos, attacker, vct, depth) == WIN:
+                entry = self.tt.get((pos.hash, True, vct, attacker))
+                return entry[2] if entry is not None else None
+        return None
+
+    def defend(self, pos: _Position, me: int, vct: bool, forcing: int = 2) -> Optional[int]:
+        """
+        对方（若轮到其走）有必胜序列：找一手使对方不再有该类必胜的着法
+        先试直接拦截的点；都不行再试己方冲四抢先（对方被迫挡后仍轮到己方，递归再找，至多 forcing 层）
+        """
+        opp = 1 - me
+        fours = pos.four_moves(opp)
+        candidates: Set[int] = set(fours)
+        for gains in fours.values():
+            candidates.update(gains)
+        if vct:
+            for cell in pos.three_moves(opp, fours):
+                candidates.add(cell)
+                # 挡活三的点：对方落子后能成活四的冲四点及其成五点
+                pos.place(cell, opp)
+                for m, gains in pos.four_moves(opp).items():
+                    if len(gains) >= 2:
+                        candidates.add(m)
+                        candidates.update(gains)
+                pos.remove(cell)
+        my_fours = pos.four_moves(me)
+        for cell in sorted(candidates - set(my_fours)):
+            pos.place(cell, me)
+            try:
+                if not self._opponent_wins(pos, opp, vct):
+                    return cell
+            finally:
+                pos.remove(cell)
+        if not forcing:
+            return None
+        for cell in sorted(my_fours):
+            block = next(iter(my_fours[cell]))
+            pos.place(cell, me)
+            pos.place(block, opp)
+            try:
+                if pos.five_moves(opp):
+                    continue
+                if not self._opponent_wins(pos, opp, vct) or self.defend(pos, me, vct, forcing - 1):
+                    return cell
+            finally:
+                pos.remove(block)
+                pos.remove(cell)
+        return None
+
+    def _opponent_wins(self, pos: _Position, opp: int, vct: bool) -> bool:
+        """轮到 opp 走时是否仍有 VCF（vct=True 时再查 VCT）"""
+        if pos.five_moves(opp):
+            return True
+        if self._attack(pos, opp, False, self.vcf_depth) == WIN:
+            return True
+        return vct and self._attack(pos, opp, True, self.vct_depth) == WIN
+
+    def _attack(self, pos: _Position, a: int, vct: bool, depth: int, last: Optional[int] = None) -> int:
+        """攻方 a 走（OR 节点）；last 为攻方上一个威胁着法，VCT 的活三只在其附近找"""
+        self._tick()
+        key = (pos.hash, True, vct, a)
+        entry = self.tt.get(key)
+        if entry is not None and (entry[0] == WIN or entry[1] >= depth):
+            return entry[0]
+        d = 1 - a
+        result, best = FAIL, None
+        if pos.five_moves(a):
+            result, best = WIN, min(pos.five_moves(a))
+        else:
+            threats = pos.five_moves(d)
+            if len(threats) == 1:
+                # 对方冲四：只能去挡，挡住后仍是对方应对（不消耗深度）
+                cell = next(iter(threats))
+                pos.place(cell, a)
+                try:
+                    if self._defend(pos, a, vct, depth, last) == WIN:
+                        result, best = WIN, cell
+                finally:
+                    pos.remove(cell)
+            elif not threats and depth > 0:
+                fours = pos.four_moves(a)
+                winning = [m for m, g in fours.items() if len(g) >= 2]
+                if winning:
+                    result, best = WIN, min(winning)
+                else:
+                    moves = sorted(fours)
+                    if vct:
+                        threes = pos.three_moves(a, fours)
+                        if last is not None:
+                            threes = [c for c in threes if pos.near(c, last)]
+                        moves += sorted(threes)
+                    for cell in moves:
+                        pos.place(cell, a)
+                        try:
+                            ok = self._defend(pos, a, vct, depth - 1, cell) == WIN
+                        finally:
+                            pos.remove(cell)
+                        if ok:
+                            result, best = WIN, cell
+                            break
+        self._store(key, result, depth, best)
+        return result
+
+    def _defend(self, pos: _Position, a: int, vct: bool, depth: int, last: Optional[int]) -> int:
+        """守方 d 走（AND 节点）：每种应对下攻方都胜才算胜"""
+        self._tick()
+        key = (pos.hash, False, vct, a)
+        entry = self.tt.get(key)
+        if entry is not None and (entry[0] == WIN or entry[1] >= depth):
+            return entry[0]
+        d = 1 - a
+        result = FAIL
+        if not pos.five_moves(d):
+            gains = pos.five_moves(a)
+            if len(gains) >= 2:
+                result = WIN
+            elif gains:
+                result = self._reply(pos, a, vct, depth, last, next(iter(gains)))
+            elif vct:
+                result = self._defend_three(pos, a, vct, depth, last)
+        self._store(key, result, depth, None)
+        return result
+
+    def _defend_three(self, pos: _Position, a: int, vct: bool, depth: int, last: Optional[int]) -> int:
+        fours = pos.four_moves(a)
+        open_fours = [m for m, g in fours.items() if len(g) >= 2]
+        if not open_fours:
+            return FAIL
+        d = 1 - a
+        defences: Set[int] = set(open_fours)
+        for m in open_fours:
+            defences.update(fours[m])
+        defences.update(pos.four_moves(d))
+        for cell in sorted(defences):
+            if self._reply(pos, a, vct, depth, last, cell) != WIN:
+                return FAIL
+        return WIN
+
+    def _reply(self, pos: _Position, a: int, vct: bool, depth: int, last: Optional[int], cell: int) -> int:
+        pos.place(cell, 1 - a)
+        try:
+            return self._attack(pos, a, vct, depth, last)
+        finally:
+            pos.remove(cell)
+
+    def _pv(self, pos: _Position, a: int, vct: bool) -> List[int]:
+        """沿置换表展开主变：攻方取表中着法，守方取被迫的挡点（活三时取第一个拦截点）"""
+        pv: List[int] = []
+        placed = []
+        try:
+            for _ in range(2 * (self.vcf_depth + 1)):
+                fives = pos.five_moves(a)
+                if fives:
+                    pv.append(min(fives))
+                    break
+                entry = self.tt.get((pos.hash, True, vct, a))
+                if entry is None or entry[0] != WIN or entry[2] is None:
+                    break
+                for cell, color in ((entry[2], a), (None, 1 - a)):
+                    if cell is None:
+                        cell = self._first_reply(pos, a)
+                        if cell is None:
+                            return pv
+                    pos.place(cell, color)
+                    placed.append(cell)
+                    pv.append(cell)
+        finally:
+            for cell in reversed(placed):
+                pos.remove(cell)
+        return pv
+
+    def _first_reply(self, pos: _Position, a: int) -> Optional[int]:
+        gains = pos.five_moves(a) or pos.five_moves(1 - a)
+        if gains:
+            return min(gains)
+        fours = pos.four_moves(a)
+        defences = set()
+        for m, g in fours.items():
+            if len(g) >= 2:
+                defences.add(m)
+                defences.update(g)
+        return min(defences) if defences else None
+
+    # ---------- 内部 ----------
+    def _position(self, game: "GameContext") -> Tuple[_Position, int]:
+        size = game.board.size
+        if size != self._size or len(self.tt) > _TT_LIMIT:
+            # 格子编号随路数变化，换路数时哈希键与置换表一并作废
+            self.tt.clear()
+            self._zobrist.clear()
+            self._size = size
+        pos = _Position(size, self._zobrist, self._rng)
+        for x, y, p in game.board.stones():
+            pos.place(x * size + y, 0 if p.color_name == "Black" else 1)
+        return pos, 0 if game.current_player.color_name == "Black" else 1
+
+    def _phase(self, search, share: int):
+        """在剩余节点数的 1/share 内运行一次搜索，超限或超时返回 None"""
+        if time.perf_counter() > self._deadline:
+            return None
+        self._budget = self.nodes + max(1, (self.max_nodes - self.nodes) // share)
+        try:
+            return search()
+        except _Abort:
+            return None
+
+    def _start(self):
+        self.nodes = 0
+        self._budget = self.max_nodes
+        self._started = time.perf_counter()
+        self._deadline = self._started + self.time_limit
+
+    def _tick(self):
+        self.nodes += 1
+        if self.nodes >= self._budget:
+            raise _Abort()
+        if not self.nodes & 255 and time.perf_counter() > self._deadline:
+            raise _Abort()
+
+    def _store(self, key, result: int, depth: int, move: Optional[int]):
+        old = self.tt.get(key)
+        if old is None or result == WIN or old[0] != WIN and depth >= old[1]:
+            self.tt[key] = (result, depth, move)
+
+
+# 求解器带可变的置换表、节点计数与截止时间，不能跨线程共享：每个线程各有一组
+_local = threading.local()
+
+
+def solver_for(max_nodes: int) -> ThreatSolver:
+    """当前线程内按节点上限共享的求解器实例（置换表在同一线程的相邻求解间复用）"""
+    solvers: Optional[Dict[int, ThreatSolver]] = getattr(_local, "solvers", None)
+    if solvers is None:
+        solvers = _local.solvers = {}
+    if max_nodes not in solvers:
+        solvers[max_nodes] = ThreatSolver(max_nodes)
+    return solvers[max_nodes]
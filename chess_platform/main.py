@@ -1,12 +1,14 @@
 import sys
-import tkinter as tk
-from chess_platform.ui.cli import ConsoleUI
-from chess_platform.ui.gui import ChessGUI
+
+# 按启动模式延迟导入：CLI / 无界面环境下不加载 tkinter 与 GUI 模块
+
 
 def main():
     # 可以通过命令行参数控制启动模式，这里默认启动 GUI
     # 如果想用 CLI: python -m chess_platform.main --cli
+    # GUI 中 AI 每步前的停顿（毫秒，人机对弈时）: python -m chess_platform.main --ai-delay 300
     if len(sys.argv) > 1 and sys.argv[1] == "--cli":
+        from chess_platform.ui.cli import ConsoleUI
         try:
             app = ConsoleUI()
             app.start()
@@ -15,8 +17,13 @@ def main():
             sys.exit(0)
     else:
         # GUI 模式
+        import tkinter as tk
+        from chess_platform.ui.gui import ChessGUI
+        delay = 1000
+        if "--ai-delay" in sys.argv[1:-1]:
+            delay = int(sys.argv[sys.argv.index("--ai-delay") + 1])
         root = tk.Tk()
-        app = ChessGUI(root)
+        app = ChessGUI(root, ai_delay_ms=delay)
         root.mainloop()
 
 if __name__ == "__main__":
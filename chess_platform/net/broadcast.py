@@ -0,0 +1,208 @@
+"""
+观战广播：一局棋面向大量观战连接的事件分发
+- 每个棋盘事件只编码一次（带递增序号 seq 的一行 JSON 帧），追加到本局的帧日志；
+  日志只保留最近 max_queue 帧，观战者各自记一个游标（下一帧的 seq），
+  日志窗口即每个观战者的有界队列，发布事件时不逐个观战者做任何事
+- 一批事件（同一轮事件循环内，如黑白棋一手的多次翻子；flush_delay > 0 时为该时间窗内）之后
+  只安排一次 flush：对每个落后的观战者用一次 writelines 把缺的帧写出。每个观战者每次 flush
+  一次系统调用是分发的主要开销，事件密集时加大 flush_delay 即可用延迟换 CPU
+- 慢消费者：传输层缓冲（已写出、无法再丢弃的部分）超过 max_buffer 字节时暂不写，等下一次 flush（有落后者时定时重试）；
+  落后超出日志窗口即丢弃其队列，等可写后用关键帧重新同步
+- 关键帧：每 keyframe_interval 帧缓存一次整盘快照（op "snapshot"，与 op_state 相同的棋盘字段）；
+  新观战者与重新同步的观战者收到"最近关键帧 + 其后的增量帧"。clear / restore / undo / replay
+  等不带完整信息的事件直接以新关键帧代替增量帧发出
+观战端按 seq 应用：snapshot 整盘替换，event 增量修改；seq 不连续说明被丢弃过，等下一个 snapshot
+"""
+import asyncio
+import socket
+import time
+from collections import deque
+from itertools import islice
+from typing import Any, Deque, Dict, Optional, Tuple, TYPE_CHECKING
+
+from chess_platform.net import protocol
+
+if TYPE_CHECKING:
+    from chess_platform.games.logic import GameContext  # type: ignore
+    from chess_platform.net.server import Connection
+
+# 这些事件只带位置不带颜色（或根本没有变化列表），观战端无法增量应用
+SNAPSHOT_EVENTS = ("clear", "restore", "undo", "replay")
+# 观战连接的内核发送缓冲：观战只需少量缓冲，慢消费者尽早进入应用层的有界队列
+SPECTATOR_SNDBUF = 4 * 1024
+
+
+class _Spectator:
+    __slots__ = ("conn", "next_seq", "behind")
+
+    def __init__(self, conn: "Connection", next_seq: int):
+        self.conn = conn
+        # 下一个要发给它的帧序号；0 表示需要从关键帧开始（新加入或被丢弃后）
+        self.next_seq = next_seq
+        self.behind = False
+
+
+class Broadcaster:
+    """一局的观战分发，由 GameSession 在每个棋盘事件上调用 publish"""
+    def __init__(self, game_id: int, game: "GameContext", keyframe_interval: int = 32,
+                 max_queue: int = 128, max_buffer: int = 8 * 1024, retry_interval: float = 0.02,
+                 flush_delay: float = 0.0):
+        self.game_id = game_id
+        self.game = game
+        self.keyframe_interval = keyframe_interval
+        self.max_queue = max(max_queue, keyframe_interval)
+        self.max_buffer = max_buffer
+        self.retry_interval = retry_interval
+        self.flush_delay = flush_delay
+        self.seq = 0
+        self.log: Deque[bytes] = deque(maxlen=self.max_queue)
+        self.keyframe = b""
+        self.keyframe_seq = 0
+        self.spectators: Dict["Connection", _Spectator] = {}
+        self._flush_handle: Optional[asyncio.Handle] = None
+        # 统计
+        self.events = 0
+        self.keyframes = 0
+        self.joins = 0
+        self.drops = 0
+        self.resyncs = 0
+        self.encode_time = 0.0
+        self.flushes = 0
+        self._take_keyframe()
+
+    # ---------- 发布 ----------
+    def publish(self, msg: Dict[str, Any]) -> bytes:
+        """追加一个事件帧（msg 为 protocol.event_message 的结果），返回编码后的增量帧供直接订阅者复用"""
+        t = time.perf_counter()
+        self.seq += 1
+        self.events += 1
+        msg["seq"] = self.seq
+        data = protocol.encode(msg)
+        if msg["event"] in SNAPSHOT_EVENTS:
+            self._take_keyframe()
+            self.log.append(self.keyframe)
+        else:
+            self.log.append(data)
+            if self.seq - self.keyframe_seq >= self.keyframe_interval:
+                self._take_keyframe()
+        self.encode_time += time.perf_counter() - t
+        if self.spectators:
+            self._schedule()
+        return data
+
+    def _schedule(self):
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self.flush_delay, self.flush) if self.flush_delay \
+                else loop.call_soon(self.flush)
+
+    def _take_keyframe(self):
+        game = self.game
+        self.keyframe = protocol.encode({
+            "op": "snapshot", "game_id": self.game_id, "seq": self.seq, "type": game.game_type,
+            "size": game.board.size, **protocol.board_state(game.board), "current": game.current_player_idx,
+            "over": game.is_game_over, "winner": game.winner, "moves": len(game.move_log)})
+        self.keyframe_seq = self.seq
+        self.keyframes += 1
+
+    # ---------- 观战者 ----------
+    def add(self, conn: "Connection"):
+        """新观战者：下一次 flush 时收到关键帧 + 增量帧"""
+        if conn in self.spectators:
+            return
+        sock = conn.writer.get_extra_info("socket")
+        if sock is not None:
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SPECTATOR_SNDBUF)
+            except OSError:
+                pass
+        self.spectators[conn] = _Spectator(conn, 0)
+        self.joins += 1
+        self._schedule()
+
+    def remove(self, conn: "Connection"):
+        self.spectators.pop(conn, None)
+
+    def flush(self):
+        """把每个观战者缺的帧写出；写不动的留到下一次，落后超出日志窗口的丢弃后重新同步"""
+        self._flush_handle = None
+        self.flushes += 1
+        seq = self.seq
+        log = self.log
+        first = seq - len(log) + 1
+        lagging = False
+        for conn, sp in list(self.spectators.items()):
+            if sp.next_seq > seq:
+                continue
+            transport = conn.writer.transport
+            if transport.is_closing():
+                del self.spectators[conn]
+                continue
+            if sp.next_seq and sp.next_seq < first:
+                # 缺的帧已滑出窗口：丢弃其队列，改为关键帧同步
+                sp.next_seq = 0
+                self.drops += 1
+            if transport.get_write_buffer_size() > self.max_buffer:
+                lagging = True
+                sp.behind = True
+                continue
+            if sp.next_seq == 0:
+                if sp.behind:
+                    self.resyncs += 1
+                transport.writelines(self._since_keyframe(first))
+            else:
+                transport.writelines(islice(log, sp.next_seq - first, None))
+            sp.next_seq = seq + 1
+            sp.behind = False
+        if lagging and self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.retry_interval, self.flush)
+
+    def _since_keyframe(self, first: int):
+        yield self.keyframe
+        yield from islice(self.log, self.keyframe_seq + 1 - first, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"spectators": len(self.spectators), "seq": self.seq, "events": self.events,
+                "keyframes": self.keyframes, "joins": self.joins, "drops": self.drops,
+                "resyncs": self.resyncs, "flushes": self.flushes, "encode_ms": self.encode_time * 1e3}
+
+
+class SpectatorView:
+    """观战端：按序号应用 snapshot / event 帧，维护棋盘 {(x, y): 1 黑 / 2 白}"""
+    def __init__(self):
+        self.stones: Dict[Tuple[int, int], int] = {}
+        self.size = 0
+        self.seq = -1
+        self.winner: Optional[str] = None
+        self.snapshots = 0
+        self.gaps = 0
+
+    def apply(self, msg: Dict[str, Any]) -> bool:
+        """应用一帧，返回 False 表示本帧被忽略（发现序号缺口后等待下一个 snapshot）"""
+        if msg["op"] == "snapshot":
+            self.size = msg["size"]
+            if "cells" in msg:
+                size = self.size
+                self.stones = {(i // size, i % size): int(ch) for i, ch in enumerate(msg["cells"]) if ch != "0"}
+            else:
+                self.stones = {(x, y): color for x, y, color in msg["stones"]}
+            self.winner = msg.get("winner")
+            self.seq = msg["seq"]
+            self.snapshots += 1
+            return True
+        if msg["op"] != "event" or self.seq < 0:
+            return False
+        if msg["seq"] != self.seq + 1:
+            if msg["seq"] > self.seq + 1:
+                self.gaps += 1
+                self.seq = -1
+            return False
+        self.seq = msg["seq"]
+        event = msg["event"]
+        if event == "place":
+            self.stones[tuple(msg["pos"])] = 1 if msg["color"] == "Black" else 2
+        elif event == "remove":
+            self.stones.pop(tuple(msg["pos"]), None)
+        elif event == "game_over":
+            self.winner = msg.get("winner")
+        return True
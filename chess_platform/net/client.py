@@ -0,0 +1,69 @@
+import asyncio
+import itertools
+from typing import Any, Callable, Dict, Optional
+
+from chess_platform.net import protocol
+
+
+class GameClient:
+    """
+    异步客户端：请求按 "req" 编号与回复配对，推送事件（含观战关键帧 snapshot、AI 出错的 error 推送）交给 on_event 回调
+    一个连接上可以同时进行多局
+    """
+    def __init__(self, on_event: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.on_event = on_event
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._read_task: Optional[asyncio.Task] = None
+        self.events = 0
+
+    async def connect(self, host: str = "127.0.0.1", port: int = 8765):
+        self.reader, self.writer = await asyncio.open_connection(host, port, limit=protocol.MAX_LINE)
+        self._read_task = asyncio.ensure_future(self._read_loop())
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+        if self._read_task is not None:
+            self._read_task.cancel()
+
+    async def request(self, op: str, **fields) -> Dict[str, Any]:
+        """发送请求并等待回复；服务器返回 error 时抛出 RuntimeError"""
+        req = next(self._ids)
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[req] = fut
+        self.writer.write(protocol.encode({"op": op, "req": req, **fields}))
+        await self.writer.drain()
+        reply = await fut
+        if reply.get("op") == "error":
+            raise RuntimeError(reply.get("msg"))
+        return reply
+
+    async def _read_loop(self):
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                msg = protocol.decode(line)
+                if msg["op"] in ("event", "snapshot") or (msg["op"] == "error" and "req" not in msg):
+                    self.events += 1
+                    if self.on_event:
+                        self.on_event(msg)
+                    continue
+                fut = self._pending.pop(msg.get("req"), None)
+                if fut is not None and not fut.done():
+                    fut.set_result(msg)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            for fut in self._pending.values():
+                if not fut.done():
+                    fut.set_exception(ConnectionError("connection closed"))
+            self._pending.clear()
@@ -0,0 +1,108 @@
+"""
+本地压测客户端：同时进行大量对局，统计 moves/sec 与落子延迟分位数
+运行:
+    python -m chess_platform.net.loadgen --spawn --games 1000 --moves 20
+    python -m chess_platform.net.loadgen --port 8765 --games 1000 --conns 100
+--spawn 在同一进程内启动服务器（便于一键测量）；否则连接已运行的服务器。
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import List
+
+from chess_platform.net.client import GameClient
+
+
+async def play_game(client: GameClient, game: str, size: int, moves: int, opponent: str,
+                    latencies: List[float], rnd: random.Random):
+    reply = await client.request("new", game=game, size=size, black="human", white=opponent,
+                                 subscribe=False)
+    game_id = reply["game_id"]
+    empties = [(r, c) for r in range(size) for c in range(size)]
+    rnd.shuffle(empties)
+    played = 0
+    while played < moves and empties:
+        x, y = empties.pop()
+        t = time.perf_counter()
+        try:
+            reply = await client.request("move", game_id=game_id, x=x, y=y)
+        except RuntimeError:
+            # 被对手占用/非法，换一个点
+            continue
+        latencies.append(time.perf_counter() - t)
+        played += 1
+        if reply.get("over"):
+            break
+        if opponent != "human":
+            # 等待 AI 回应后再走下一步
+            while True:
+                state = await client.request("state", game_id=game_id)
+                if state["current"] == 0 or state["over"]:
+                    break
+                await asyncio.sleep(0.005)
+            cells = state["cells"]
+            empties = [(r, c) for (r, c) in empties if cells[r * size + c] == "0"]
+            if state["over"]:
+                break
+    await client.request("close", game_id=game_id)
+    return played
+
+
+async def run(host: str, port: int, games: int, conns: int, moves: int, game: str, size: int,
+              opponent: str, spawn: bool, seed: int):
+    server = None
+    if spawn:
+        from chess_platform.net.server import GameServer
+        server = GameServer()
+        await server.start(host, 0)
+        port = server.port
+    clients = []
+    for _ in range(min(conns, games)):
+        c = GameClient()
+        await c.connect(host, port)
+        clients.append(c)
+    latencies: List[float] = []
+    rnd = random.Random(seed)
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*[
+        play_game(clients[i % len(clients)], game, size, moves, opponent, latencies,
+                  random.Random(rnd.random())) for i in range(games)])
+    elapsed = time.perf_counter() - t0
+    server_stats = server.stats() if server is not None else await clients[0].request("stats")
+    for c in clients:
+        await c.close()
+    if server is not None:
+        await server.close()
+
+    total = sum(results)
+    lat = sorted(latencies)
+
+    def pct(p: float) -> float:
+        return lat[min(len(lat) - 1, int(p * len(lat)))] * 1e3 if lat else 0.0
+
+    print(f"games={games} conns={len(clients)} moves={total} elapsed={elapsed:.2f}s")
+    print(f"throughput: {total / elapsed:.0f} moves/sec")
+    print(f"client latency (incl. queueing): p50 {pct(0.5):.2f}ms  p99 {pct(0.99):.2f}ms  max {pct(1.0):.2f}ms")
+    print(f"server move handling: p50 {server_stats['p50_ms']:.3f}ms  p99 {server_stats['p99_ms']:.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the game server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--conns", type=int, default=100, help="TCP 连接数（多局复用一个连接）")
+    parser.add_argument("--moves", type=int, default=20, help="每局人工方落子数")
+    parser.add_argument("--game", default="gomoku")
+    parser.add_argument("--size", type=int, default=15)
+    parser.add_argument("--opponent", default="human", help="白方角色：human / ai-rand / ai-pro / ai-mcts")
+    parser.add_argument("--spawn", action="store_true", help="在本进程内启动服务器")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(run(args.host, args.port, args.games, args.conns, args.moves, args.game, args.size,
+                    args.opponent, args.spawn, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+行协议：每条消息为一行 UTF-8 JSON，以 \\n 结尾
+
+客户端请求（均可带 "req" 编号，服务器在回复中原样带回）：
+    {"op": "new", "game": "gomoku", "size": 15, "black": "human", "white": "ai-pro"}
+    {"op": "subscribe" / "unsubscribe", "game_id": 1}
+    {"op": "watch" / "unwatch", "game_id": 1}      观战（见 net/broadcast.py）
+    {"op": "move", "game_id": 1, "x": 7, "y": 7}
+    {"op": "undo" / "pass" / "state" / "close", "game_id": 1}
+服务器回复：
+    {"op": "ok", "req": n, ...} 或 {"op": "error", "req": n, "msg": "..."}
+服务器推送（订阅者）：
+    {"op": "event", "game_id": 1, "seq": 5, "event": "place", "pos": [x, y], "color": "Black"}
+服务器推送（观战者）：先收到关键帧，之后为事件帧；seq 连续递增
+    {"op": "snapshot", "game_id": 1, "seq": 4, "type": ..., "size": 15, "cells": "...", "current": 0, ...}
+服务器推送（订阅者与观战者，AI 回合出错时，不带 req）：
+    {"op": "error", "game_id": 1, "msg": "AI failed: ..."}
+"""
+
+import json
+from typing import Any, Dict, Optional
+
+MAX_LINE = 64 * 1024
+
+
+def encode(msg: Dict[str, Any]) -> bytes:
+    return (json.dumps(msg, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def decode(line: bytes) -> Dict[str, Any]:
+    msg = json.loads(line)
+    if not isinstance(msg, dict) or "op" not in msg:
+        raise ValueError("message must be an object with 'op'")
+    return msg
+
+
+def event_message(game_id: int, kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """把 Board.notify 的参数转换为可序列化的推送消息"""
+    event = kwargs.get("event")
+    if event is None:
+        return None
+    msg: Dict[str, Any] = {"op": "event", "game_id": game_id, "event": event}
+    pos = kwargs.get("pos")
+    if pos is not None:
+        msg["pos"] = list(pos)
+    piece = kwargs.get("piece")
+    if piece is not None:
+        msg["color"] = piece.color_name
+    changed = kwargs.get("changed")
+    if changed is not None:
+        msg["changed"] = [list(p) for p in changed]
+    if "winner" in kwargs:
+        msg["winner"] = kwargs["winner"]
+    return msg
+
+
+def board_cells(board) -> str:
+    """棋盘编码为 size*size 长度的字符串：0 空 / 1 黑 / 2 白"""
+    return "".join("0" if p is None else ("1" if p.color_name == "Black" else "2")
+                   for row in board._grid for p in row)
+
+
+def board_state(board) -> Dict[str, Any]:
+    """状态消息中的棋盘：稠密棋盘为 cells 字符串，稀疏棋盘为棋子列表 stones [[x, y, 1/2], ...]"""
+    if board.is_sparse:
+        return {"stones": [[x, y, 1 if p.color_name == "Black" else 2] for x, y, p in board.stones()]}
+    return {"cells": board_cells(board)}
@@ -0,0 +1,374 @@
+"""
+asyncio 对局服务器：单进程托管大量并发对局
+运行: python -m chess_platform.net.server --port 8765
+
+- 每局一个 GameSession，作为 Observer 挂在棋盘上，把棋盘事件推送给订阅的连接；
+  观战连接（watch）走 net/broadcast.py：事件只编码一次，有界队列、慢消费者丢弃后以关键帧重新同步
+- AI 回合在线程池中计算，搜索的是局面副本（clone_position），事件循环不被阻塞，
+  state / 关键帧等读取不会看到搜索中的中间局面；计算期间该局加锁，落子仍在事件循环线程中执行
+- AI 回合的任务由服务器持有；任务异常时打印到 stderr 并向该局订阅者与观战者推送 error 消息
+"""
+import argparse
+import asyncio
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from chess_platform.core.patterns import Observer
+from chess_platform.games.logic import GameContext, GameFactory, UNBOUNDED_SIZE
+from chess_platform.games.rules import PASS
+from chess_platform.net import protocol
+from chess_platform.net.broadcast import Broadcaster
+
+# 对局路数范围（与 CLI / GUI 一致）；五子棋另可为 0（无界）或更大的稀疏棋盘
+MIN_SIZE = 8
+MAX_SIZE = 19
+
+
+def clamp_size(game_type: str, size: int) -> int:
+    """把客户端请求的路数限制在工厂支持的范围内，避免超大稠密棋盘耗尽内存"""
+    if game_type.lower() == "gomoku":
+        return 0 if size <= 0 else min(max(size, MIN_SIZE), UNBOUNDED_SIZE)
+    return min(max(size, MIN_SIZE), MAX_SIZE)
+
+
+class Connection:
+    """一个客户端连接"""
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.subscriptions: Set[int] = set()
+        self.watching: Set[int] = set()
+
+    def send(self, msg: Dict[str, Any]):
+        self.send_raw(protocol.encode(msg))
+
+    def send_raw(self, data: bytes):
+        if not self.writer.is_closing():
+            self.writer.write(data)
+
+
+class GameSession(Observer):
+    """服务器上的一局：持有 GameContext、AI 控制器和订阅者"""
+    def __init__(self, game_id: int, game: GameContext, ais: List, flush_delay: float = 0.0):
+        self.game_id = game_id
+        self.game = game
+        # AI 不挂在 game.controllers 上（那会在 make_move 中同步计算），由服务器异步驱动
+        self.ais = ais
+        self.subscribers: Set[Connection] = set()
+        self.broadcast = Broadcaster(game_id, game, flush_delay=flush_delay)
+        self.lock = asyncio.Lock()
+        self.last_active = time.monotonic()
+        # 该局尚未结束的 AI 回合；关局时取消，closed 之后不再走子
+        self.ai_tasks: Set[asyncio.Task] = set()
+        self.closed = False
+        game.board.attach(self)
+
+    def update(self, subject: Any, *args, **kwargs):
+        msg = protocol.event_message(self.game_id, kwargs)
+        if msg is None:
+            return
+        # 每个事件只编码一次：进观战帧日志，同一份字节再写给所有订阅者
+        data = self.broadcast.publish(msg)
+        for conn in self.subscribers:
+            conn.send_raw(data)
+
+
+class GameServer:
+    def __init__(self, ai_workers: int = 4, latency_window: int = 100000, flush_ms: float = 0.0):
+        self.sessions: Dict[int, GameSession] = {}
+        self.next_id = 1
+        # 观战帧的合并发送窗口（毫秒），0 为每轮事件循环发送一次
+        self.flush_delay = flush_ms / 1000
+        self.executor = ThreadPoolExecutor(max_workers=ai_workers, thread_name_prefix="ai")
+        self.moves = 0
+        self.latencies: Deque[float] = deque(maxlen=latency_window)
+        self.started_at = time.monotonic()
+        self.connections: Set[Connection] = set()
+        self._handlers: Set[asyncio.Task] = set()
+        self._ai_tasks: Set[asyncio.Task] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    # ---------- 生命周期 ----------
+    async def start(self, host: str = "127.0.0.1", port: int = 8765):
+        self._server = await asyncio.start_server(self.handle_client, host, port,
+                                                  limit=protocol.MAX_LINE)
+        return self._server
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            for conn in list(self.connections):
+                conn.writer.close()
+            # 等待所有连接处理协程退出，避免事件循环关闭时残留任务
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            for task in list(self._ai_tasks):
+                task.cancel()
+            await asyncio.gather(*self._ai_tasks, return_exceptions=True)
+            await self._server.wait_closed()
+        self.executor.shutdown(wait=False)
+
+    # ---------- 连接处理 ----------
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        conn = Connection(writer)
+        self.connections.add(conn)
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                msg = None
+                try:
+                    msg = protocol.decode(line)
+                    reply = await self.dispatch(conn, msg)
+                except Exception as e:
+                    reply = {"op": "error", "msg": str(e)}
+                    if msg is not None and "req" in msg:
+                        reply["req"] = msg["req"]
+                if reply is not None:
+                    conn.send(reply)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            self.connections.discard(conn)
+            self._handlers.discard(task)
+            for gid in conn.subscriptions:
+                session = self.sessions.get(gid)
+                if session:
+                    session.subscribers.discard(conn)
+            for gid in conn.watching:
+                session = self.sessions.get(gid)
+                if session:
+                    session.broadcast.remove(conn)
+            writer.close()
+
+    async def dispatch(self, conn: Connection, msg: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        op = msg["op"]
+        handler = getattr(self, f"op_{op}", None)
+        if handler is None:
+            raise ValueError(f"unknown op {op}")
+        reply = await handler(conn, msg)
+        reply.setdefault("op", "ok")
+        if "req" in msg:
+            reply["req"] = msg["req"]
+        return reply
+
+    def _session(self, msg: Dict[str, Any]) -> GameSession:
+        session = self.sessions.get(int(msg["game_id"]))
+        if session is None:
+            raise ValueError("no such game")
+        session.last_active = time.monotonic()
+        return session
+
+    # ---------- 指令 ----------
+    async def op_new(self, conn: Connection, msg: Dict[str, Any]) -> Dict[str, Any]:
+        from chess_platform.games.ai import create_ai
+        game_type = msg.get("game", "gomoku")
+        game = GameFactory.create_game(game_type, clamp_size(game_type, int(msg.get("size", 15))))
+        # 服务器对局为匿名对局，不写入战绩与账本
+        game.record_results = False
+        ais = [create_ai(msg.get("black", "human"), game.game_type),
+               create_ai(msg.get("white", "human"), game.game_type)]
+        game_id = self.next_id
+        self.next_id += 1
+        session = GameSession(game_id, game, ais, self.flush_delay)
+        self.sessions[game_id] = session
+        if msg.get("subscribe", True):
+            session.subscribers.add(conn)
+            conn.subscriptions.add(game_id)
+        game.start()
+        self._start_ai(session)
+        return {"game_id": game_id, "type": game.game_type, "size": game.board.size}
+
+    async def op_subscribe(self, conn: Connection, msg: Dict[str, Any]) -> Dict[str, Any]:
+        session = self._session(msg)
+        session.subscribers.add(conn)
+        conn.subscriptions.add(session.game_id)
+        return self._state(session)
+
+    async def op_unsubscribe(self, conn: Connection, msg: Dict[str, Any]) -> Dict[str, Any]:
+        session = self._session(msg)
+        session.subscribers.discard(conn)
+        conn.subscriptions.discard(session.game_id)
+        return {}
+
+    async def op_watch(self, conn: Connection, msg: Dict[str, Any]) -> Dict[str, Any]:
+        """观战：回复之后推送关键帧与其后的增量帧，之后持续推送带 seq 的事件帧"""
+        session = self._session(msg)
+        session.broadcast.add(conn)
+        conn.watching.add(session.game_id)
+        return {"game_id": session.game_id}
+
+    async def op_unwatch(self, conn: Connection, msg: Dict[str, Any]) -> Dict[str, Any]:
+        session = self._session(msg)
+        session.broadcast.remove(conn)
+        conn.watching.discard(session.game_id)
+        return {}
+
+    async def op_state(self, conn: Connection, msg: Dict[str, Any]) -> Dict[str, Any]:
+        return self._state(self._session(msg))
+
+    async def op_move(self, conn: Connection, msg: Dict[str, Any]) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        session = self._session(msg)
+        game = session.game
+        x, y = int(msg["x"]), int(msg["y"])
+        async with session.lock:
+            if game.is_game_over:
+                raise ValueError("game is over")
+            if session.ais[game.current_player_idx] is not None:
+                raise ValueError("not your turn")
+            ok, err = game.rule.is_valid_move(game.board, x, y, game.current_player)
+            if not ok:
+                raise ValueError(err)
+            game.make_move(x, y)
+        self.moves += 1
+        self.latencies.append(time.perf_counter() - t0)
+        self._start_ai(session)
+        return {"over": game.is_game_over, "winner": game.winner}
+
+    async def op_undo(self, conn: Connection, msg: Dict[str, Any]) -> Dict[str, Any]:
+        session = self._session(msg)
+        async with session.lock:
+            undone = session.game.undo_move()
+        # 悔棋后可能轮到 AI（例如只悔了人类一步），与 op_move/op_pass 一样交给 AI 回合
+        self._start_ai(session)
+        return {"undone": undone}
+
+    async def op_pass(self, conn: Connection, msg: Dict[str, Any]) -> Dict[str, Any]:
+        session = self._session(msg)
+        async with session.lock:
+            game = session.game
+            # 围棋可随时虚着；黑白棋仅在无合法步时允许
+            if game.game_type == "Go" or game.game_type == "Othello" and not game._has_legal_move():
+                game.pass_turn()
+            else:
+                raise ValueError("pass is not allowed now")
+        self._start_ai(session)
+        return {}
+
+    async def op_close(self, conn: Connection, msg: Dict[str, Any]) -> Dict[str, Any]:
+        session = self._session(msg)
+        session.closed = True
+        for task in list(session.ai_tasks):
+            task.cancel()
+        session.game.board.detach(session)
+        for sub in session.subscribers:
+            sub.subscriptions.discard(session.game_id)
+        for spectator in session.broadcast.spectators:
+            spectator.watching.discard(session.game_id)
+        del self.sessions[session.game_id]
+        return {}
+
+    async def op_stats(self, conn: Connection, msg: Dict[str, Any]) -> Dict[str, Any]:
+        return self.stats()
+
+    # ---------- AI 回合 ----------
+    def _start_ai(self, session: GameSession):
+        """启动该局的 AI 回合；持有任务句柄，结束时检查异常"""
+        if session.closed:
+            return
+        task = asyncio.ensure_future(self._run_ai(session))
+        self._ai_tasks.add(task)
+        session.ai_tasks.add(task)
+        task.add_done_callback(lambda t: self._ai_done(session, t))
+
+    def _ai_done(self, session: GameSession, task: asyncio.Task):
+        self._ai_tasks.discard(task)
+        session.ai_tasks.discard(task)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is None:
+            return
+        print(f"game {session.game_id}: AI turn failed: {error!r}", file=sys.stderr)
+        data = protocol.encode({"op": "error", "game_id": session.game_id, "msg": f"AI failed: {error}"})
+        for conn in session.subscribers | set(session.broadcast.spectators):
+            conn.send_raw(data)
+
+    async def _run_ai(self, session: GameSession):
+        loop = asyncio.get_running_loop()
+        game = session.game
+        async with session.lock:
+            while not session.closed and not game.is_game_over:
+                ai = session.ais[game.current_player_idx]
+                if ai is None:
+                    break
+                if game.game_type == "Othello" and not game._has_legal_move():
+                    game.pass_turn()
+                    if not game._has_legal_move():
+                        break
+                    continue
+                # 搜索放到线程池，事件循环继续服务其他对局；
+                # 线程里只碰局面副本，事件循环线程上的读取（state、关键帧）与之互不干扰
+                move = await loop.run_in_executor(self.executor, ai.select_move, game.clone_position())
+                if session.closed:
+                    break
+                if move == PASS:
+                    game.pass_turn()
+                    if game.passes >= 2:
+                        break
+                    continue
+                if move is None or not game.make_move(*move):
+                    break
+                self.moves += 1
+
+    # ---------- 统计 ----------
+    def _state(self, session: GameSession) -> Dict[str, Any]:
+        game = session.game
+        return {"game_id": session.game_id, "type": game.game_type, "size": game.board.size,
+                **protocol.board_state(game.board), "current": game.current_player_idx,
+                "over": game.is_game_over, "winner": game.winner, "moves": len(game.move_log),
+                "seq": session.broadcast.seq}
+
+    def stats(self) -> Dict[str, Any]:
+        lat = sorted(self.latencies)
+
+        def pct(p: float) -> float:
+            return lat[min(len(lat) - 1, int(p * len(lat)))] * 1e3 if lat else 0.0
+
+        elapsed = time.monotonic() - self.started_at
+        broadcast: Dict[str, Any] = {}
+        for session in self.sessions.values():
+            for key, value in session.broadcast.stats().items():
+                if key != "seq":
+                    broadcast[key] = broadcast.get(key, 0) + value
+        return {"games": len(self.sessions), "moves": self.moves,
+                "moves_per_sec": self.moves / elapsed if elapsed else 0.0,
+                "p50_ms": pct(0.50), "p99_ms": pct(0.99), "cpu_s": time.process_time(),
+                "broadcast": broadcast}
+
+
+async def _serve(host: str, port: int, ai_workers: int, flush_ms: float):
+    server = GameServer(ai_workers=ai_workers, flush_ms=flush_ms)
+    await server.start(host, port)
+    print(f"Game server listening on {host}:{server.port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chess platform asyncio game server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ai-workers", type=int, default=4)
+    parser.add_argument("--flush-ms", type=float, default=0.0, help="观战帧合并发送窗口（毫秒）")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args.host, args.port, args.ai_workers, args.flush_ms))
+    except KeyboardInterrupt:
+        print("\nBye!")
+
+
+if __name__ == "__main__":
+    main()
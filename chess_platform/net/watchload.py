@@ -0,0 +1,205 @@
+"""
+观战压测：一局由驱动客户端随机落子（默认 19 路围棋，双方人工），大量观战连接同时观看；
+其中一部分是慢消费者（小接收缓冲、每读一帧停一会儿），一部分在对局中途才加入。
+结束后等所有观战者追上，核对每个观战者的棋盘与服务器一致，报告服务器每个事件的 CPU 时间
+运行:
+    python -m chess_platform.net.watchload --spawn --spectators 1000 --moves 500 [--flush-ms 20]
+    python -m chess_platform.net.watchload --spawn --mode subscribe   # 对照：旧的直接订阅推送
+--spawn 在子进程中启动服务器（CPU 时间只算服务器进程）；否则连接 --port 上已运行的服务器
+"""
+import argparse
+import asyncio
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Optional, Tuple
+
+from chess_platform.net import protocol
+from chess_platform.net.broadcast import SpectatorView
+from chess_platform.net.client import GameClient
+
+
+class Watcher:
+    """一个观战连接：watch 模式收关键帧 + 增量帧，subscribe 模式以 state 回复为初始棋盘"""
+    def __init__(self, slow: float = 0.0):
+        self.slow = slow
+        self.view = SpectatorView()
+        self.frames = 0
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.task: Optional[asyncio.Task] = None
+
+    async def start(self, host: str, port: int, game_id: int, mode: str):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        # 慢消费者：小接收缓冲，StreamReader 的缓冲也要小（其默认上限下会替消费者把数据先读走）
+        limit = 4096 if self.slow else protocol.MAX_LINE
+        if self.slow:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        sock.setblocking(False)
+        await asyncio.get_running_loop().sock_connect(sock, (host, port))
+        reader, self.writer = await asyncio.open_connection(sock=sock, limit=limit)
+        self.writer.write(protocol.encode({"op": mode, "game_id": game_id, "req": 1}))
+        self.task = asyncio.ensure_future(self._read(reader))
+
+    async def _read(self, reader: asyncio.StreamReader):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                msg = protocol.decode(line)
+                if msg["op"] == "ok":
+                    if "cells" in msg or "stones" in msg:
+                        self.view.apply({**msg, "op": "snapshot"})
+                    continue
+                self.frames += 1
+                self.view.apply(msg)
+                if self.slow:
+                    await asyncio.sleep(self.slow)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+
+    async def close(self):
+        if self.task is not None:
+            self.task.cancel()
+        if self.writer is not None:
+            self.writer.close()
+
+
+def spawn_server(host: str, flush_ms: float) -> Tuple[subprocess.Popen, int]:
+    proc = subprocess.Popen([sys.executable, "-u", "-m", "chess_platform.net.server", "--host", host,
+                             "--port", "0", "--flush-ms", str(flush_ms)], stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline()
+    if "listening on" not in line:
+        proc.kill()
+        raise RuntimeError(f"server failed to start: {line!r}")
+    return proc, int(line.rsplit(":", 1)[1])
+
+
+async def drive(client: GameClient, game_id: int, size: int, moves: int, rate: float,
+                rnd: random.Random, halfway: asyncio.Event) -> int:
+    """随机落子 moves 手（非法点换一个），rate > 0 时限速"""
+    played = attempts = 0
+    t0 = time.perf_counter()
+    while played < moves and attempts < moves * 20:
+        attempts += 1
+        x, y = rnd.randrange(size), rnd.randrange(size)
+        try:
+            reply = await client.request("move", game_id=game_id, x=x, y=y)
+        except RuntimeError:
+            continue
+        played += 1
+        if played == moves // 2:
+            halfway.set()
+        if reply.get("over"):
+            break
+        if rate:
+            delay = t0 + played / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+    halfway.set()
+    return played
+
+
+async def run(args):
+    proc = None
+    port = args.port
+    if args.spawn:
+        proc, port = spawn_server(args.host, args.flush_ms)
+    try:
+        await _run(args, port)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+
+async def _run(args, port: int):
+    host = args.host
+    rnd = random.Random(args.seed)
+    driver = GameClient()
+    await driver.connect(host, port)
+    reply = await driver.request("new", game=args.game, size=args.size, black="human", white="human",
+                                 subscribe=False)
+    game_id = reply["game_id"]
+
+    late = int(args.spectators * args.late)
+    slow = set(rnd.sample(range(args.spectators), int(args.spectators * args.slow)))
+    watchers = [Watcher(args.slow_delay if i in slow else 0.0) for i in range(args.spectators)]
+    for w in watchers[:args.spectators - late]:
+        await w.start(host, port, game_id, args.mode)
+    while any(w.view.seq < 0 for w in watchers[:args.spectators - late]):
+        await asyncio.sleep(0.05)
+
+    before = await driver.request("stats")
+    halfway = asyncio.Event()
+
+    async def join_late():
+        await halfway.wait()
+        for w in watchers[args.spectators - late:]:
+            await w.start(host, port, game_id, args.mode)
+
+    t0 = time.perf_counter()
+    played, _ = await asyncio.gather(drive(driver, game_id, args.size, args.moves, args.rate, rnd, halfway),
+                                     join_late())
+    drive_time = time.perf_counter() - t0
+
+    # 慢消费者不再拖延，等所有观战者追上最终局面
+    for w in watchers:
+        w.slow = 0.0
+    final = await driver.request("state", game_id=game_id)
+    deadline = time.perf_counter() + args.timeout
+    while time.perf_counter() < deadline and any(w.view.seq != final["seq"] for w in watchers):
+        await asyncio.sleep(0.05)
+    caught_up = time.perf_counter() - t0
+    # 追赶期间的重新同步与补发也计入服务器 CPU
+    after = await driver.request("stats")
+    expected = SpectatorView()
+    expected.apply({**final, "op": "snapshot"})
+    consistent = sum(w.view.seq == final["seq"] and w.view.stones == expected.stones for w in watchers)
+
+    for w in watchers:
+        await w.close()
+    await driver.request("close", game_id=game_id)
+    await driver.close()
+
+    b0, b1 = before["broadcast"], after["broadcast"]
+    events = b1["events"] - b0["events"]
+    cpu = after["cpu_s"] - before["cpu_s"]
+    frames = sum(w.frames for w in watchers)
+    print(f"mode={args.mode} spectators={args.spectators} (slow {len(slow)}, late {late}) "
+          f"{args.game} {args.size}x{args.size}" + (f", flush window {args.flush_ms}ms" if args.spawn else ""))
+    print(f"moves={played} events={events} drive {drive_time:.2f}s, all caught up after {caught_up:.2f}s")
+    print(f"server CPU {cpu:.2f}s: {cpu / max(events, 1) * 1e3:.3f} ms/event, "
+          f"{cpu / max(events * args.spectators, 1) * 1e6:.2f} us per event per spectator")
+    print(f"frames received {frames}; joins {b1['joins'] - b0['joins']}, drops {b1['drops'] - b0['drops']}, "
+          f"resyncs {b1['resyncs'] - b0['resyncs']}, keyframes {b1['keyframes'] - b0['keyframes']}, "
+          f"flushes {b1['flushes'] - b0['flushes']}, "
+          f"encode {b1['encode_ms'] - b0['encode_ms']:.1f}ms")
+    print(f"consistent with server: {consistent}/{args.spectators}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Spectator broadcast load test")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--spawn", action="store_true", help="在子进程中启动服务器")
+    parser.add_argument("--mode", choices=("watch", "subscribe"), default="watch")
+    parser.add_argument("--spectators", type=int, default=1000)
+    parser.add_argument("--slow", type=float, default=0.05, help="慢消费者比例")
+    parser.add_argument("--slow-delay", type=float, default=0.2, help="慢消费者每读一帧停顿的秒数")
+    parser.add_argument("--late", type=float, default=0.1, help="对局中途加入的比例")
+    parser.add_argument("--game", default="go")
+    parser.add_argument("--size", type=int, default=19)
+    parser.add_argument("--moves", type=int, default=500)
+    parser.add_argument("--rate", type=float, default=0.0, help="每秒落子数上限，0 为不限")
+    parser.add_argument("--timeout", type=float, default=60.0, help="结束后等待观战者追上的秒数")
+    parser.add_argument("--flush-ms", type=float, default=0.0, help="--spawn 时服务器的观战帧合并发送窗口")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
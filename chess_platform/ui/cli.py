@@ -1,11 +1,20 @@
 import sys
 import os
-from typing import Any
+import io
+from contextlib import redirect_stdout
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
 from chess_platform.core.interfaces import Board
 from chess_platform.core.patterns import Observer
-from chess_platform.games.logic import GameContext, GameFactory
-from chess_platform.games.ai import RandomAI, GomokuHeuristicAI, GomokuMCTS
-from chess_platform.utils import account
+from chess_platform.games.logic import GameContext, GameFactory, UNBOUNDED_SIZE
+from chess_platform.ui.term import TerminalRenderer
+
+# AI / 账户 / 账本 / 回放模块按需在方法内导入，保证 CLI 冷启动只加载必需模块
+if TYPE_CHECKING:
+    from chess_platform.games.ai import BaseAI, MoveInfo
+    from chess_platform.games.replay import ReplayEngine
+
+# 超过 VIEW_SIZE 路的棋盘（稀疏五子棋）只显示 VIEW_SIZE x VIEW_SIZE 的视口
+VIEW_SIZE = 19
 
 class ScreenBuilder:
     """
@@ -23,16 +32,29 @@ class ScreenBuilder:
             self.parts.append(f"\n!!! GAME OVER - Winner: {winner} !!!\n")
         self.parts.append("-" * 30)
     
-    def add_board(self, board: Board):
-        # 构建坐标轴
+    def add_replay_header(self, engine: "ReplayEngine"):
+        self.parts.append(f"=== Replay {engine.game_type} - move {engine.index}/{engine.total} ===")
+        if engine.index:
+            step = engine.move_log[engine.index - 1]
+            self.parts.append(f"Last: {step['color']} ({step['x']}, {step['y']})")
+        self.parts.append("n [k] 前进 | b [k] 后退 | g <idx> 跳转 | play [speed] 自动播放 | q 退出")
+        self.parts.append("-" * 30)
+
+    def add_board(self, board: Board, origin: Tuple[int, int] = (0, 0), view: Optional[int] = None):
+        # 构建坐标轴；view 为视口路数（None 为整盘），origin 为视口左上角
         size = board.size
-        # 列号 (0-9, A-Z...)
-        col_header = "   " + " ".join([f"{i:<2}" for i in range(size)])
+        view = min(view or size, size)
+        r0, c0 = origin
+        width = max(2, len(str(r0 + view - 1)))
+        if view < size:
+            self.parts.append(f"View rows {r0}-{r0 + view - 1}, cols {c0}-{c0 + view - 1} of {size}x{size}")
+        # 列号 (0-9, A-Z...)；视口内列号超过两位时只显示后两位
+        col_header = " " * (width + 1) + " ".join([f"{i % 100:<2}" for i in range(c0, c0 + view)])
         self.parts.append(col_header)
         
-        for r in range(size):
-            row_str = f"{r:<2} "
-            for c in range(size):
+        for r in range(r0, r0 + view):
+            row_str = f"{r:<{width}} "
+            for c in range(c0, c0 + view):
                 piece = board.get_piece(r, c)
                 symbol = piece.symbol if piece else "."
                 
@@ -50,13 +72,27 @@ class ScreenBuilder:
             self.parts.append("  place <row> <col>  : Place a piece (e.g., place 3 4)")
             self.parts.append("  pass               : Pass turn (Go only)")
             self.parts.append("  undo               : Undo last move")
+            self.parts.append("  hint               : Suggest a move")
+            self.parts.append("  analyze [k] [sims] : Show top-k moves (Ctrl+C to stop)")
+            self.parts.append("  view <row> <col>   : Center the view (large boards)")
+            self.parts.append("  pan <drow> <dcol>  : Scroll the view (large boards)")
             self.parts.append("  save <filename>    : Save game")
-            self.parts.append("  load <filename>    : Load game")
-            self.parts.append("  replay <filename>  : Replay a saved game")
+            self.parts.append("  load <file|#id>    : Load game (file or archived game)")
+            self.parts.append("  replay <file|#id>  : Replay a saved or archived game")
+            self.parts.append("  games [user] [type=..] [size=..] [result=..] : Browse the archive")
+            self.parts.append("  archive [import <path>] : Archive this game / import .dat files")
+            self.parts.append("  explore [n]        : Archived moves from this position")
+            self.parts.append("  rank [game]        : Show leaderboard")
+            self.parts.append("  history <user>     : Show a user's recent games")
             self.parts.append("  restart            : Restart game")
             self.parts.append("  quit               : Exit")
             self.parts.append("  help               : Toggle help")
     
+    def add_status(self, message: str):
+        # 状态行：上一条命令的输出
+        if message:
+            self.parts.append(message)
+
     def build(self) -> str:
         return "\n".join(self.parts)
 
@@ -69,9 +105,26 @@ class ConsoleUI(Observer):
     def __init__(self):
         self.game: GameContext = None
         self.show_help = True
+        # 差量渲染：棋盘通知只标记 dirty，每条命令结束后合并渲染一次
+        self.renderer = TerminalRenderer()
+        self.dirty = False
+        self.status = ""
+        # 分析引擎按棋类缓存，连续分析同一局面时复用搜索树
+        self.analyzers: Dict[str, "BaseAI"] = {}
+        # 大棋盘视口：左上角坐标，以及上次跟随过的最后一手
+        self.view_origin: Optional[Tuple[int, int]] = None
+        self.view_follow: Optional[Tuple[int, int]] = None
 
     def start(self):
+        from chess_platform.games.journal import Journal
         print("Welcome to Python Chess Platform")
+        if self._offer_recovery():
+            self.game.board.attach(self)
+            self.game._auto_play_if_ai()
+            self.render()
+            self.input_loop()
+            self._close_journal()
+            return
         print("1. Gomoku (五子棋)")
         print("2. Go (围棋)")
         print("3. Othello (黑白棋)")
@@ -89,10 +142,17 @@ class ConsoleUI(Observer):
             game_type = "Othello"
             default_size = 8
 
-        size_str = input(f"Enter board size (8-19, default {default_size}): ").strip()
+        if game_type == "Gomoku":
+            size_str = input(f"Enter board size (8-19, larger = scrolling view, 0 = unbounded, "
+                             f"default {default_size}): ").strip()
+        else:
+            size_str = input(f"Enter board size (8-19, default {default_size}): ").strip()
         try:
             size = int(size_str)
-            if not (8 <= size <= 19): raise ValueError
+            if game_type == "Gomoku":
+                # 五子棋超过 19 路时使用稀疏棋盘，0 表示无限棋盘
+                if not (size == 0 or 8 <= size <= UNBOUNDED_SIZE): raise ValueError
+            elif not (8 <= size <= 19): raise ValueError
         except:
             size = default_size
 
@@ -104,19 +164,49 @@ class ConsoleUI(Observer):
         self.game.board.attach(self)
         
         self.game.start()
+        Journal.create(self.game)
         # 如果先手是 AI，立即执行
         self.game._auto_play_if_ai()
         self.render()
         self.input_loop()
+        self._close_journal()
+
+    def _offer_recovery(self) -> bool:
+        """上次异常退出时有未结束的对局：询问是否恢复"""
+        from chess_platform.games import journal
+        recoverable = journal.find_recoverable()
+        if not recoverable:
+            return False
+        path, desc = recoverable[0]
+        print(f"发现未正常退出的对局：{desc}")
+        if input("恢复该对局? (Y/n): ").strip().lower() == "n":
+            journal.discard(path)
+            return False
+        try:
+            self.game = journal.resume(path)
+        except Exception as e:
+            print(f"Recovery failed: {e}")
+            return False
+        print("对局已恢复")
+        return True
+
+    def _close_journal(self):
+        # 正常退出：自动存档不再需要
+        from chess_platform.games.journal import default_writer
+        if self.game is not None and self.game.journal is not None:
+            self.game.journal.close(discard=True)
+            self.game.journal = None
+            default_writer().flush(2.0)
 
     def _setup_players(self):
+        from chess_platform.games.ai import RandomAI, GomokuHeuristicAI, create_ai
         # 玩家身份与 AI 难度
         for idx, color in enumerate(["Black","White"]):
             print(f"\n配置 {color} 方：")
             print("1. 人类玩家")
             print("2. AI-随机（一级）")
             print("3. AI-规则（五子棋二级，其他随机）")
-            print("4. AI-MCTS（五子棋三级，其他随机）")
+            print("4. AI-MCTS（五子棋 MCTS，围棋蒙特卡洛，其他随机）")
             role = input("选择(1/2/3): ").strip()
             if role == "2":
                 ai = RandomAI(name=f"AI-Random-{color}")
@@ -132,10 +222,7 @@ class ConsoleUI(Observer):
                 self.game.players_name[idx] = ai.name
                 self.game.players_role[idx] = "ai"
             elif role == "4":
-                if self.game.game_type.lower() == "gomoku":
-                    ai = GomokuMCTS(name=f"AI-MCTS-{color}")
-                else:
-                    ai = RandomAI(name=f"AI-Random-{color}")
+                ai = create_ai("ai-mcts", self.game.game_type, f"AI-MCTS-{color}")
                 self.game.controllers[idx] = ai
                 self.game.players_name[idx] = ai.name
                 self.game.players_role[idx] = "ai"
@@ -145,6 +232,7 @@ class ConsoleUI(Observer):
                 self._handle_login(idx)
 
     def _handle_login(self, idx: int):
+        from chess_platform.utils import account
         need_login = input("登录账户? (y/N): ").strip().lower() == "y"
         if not need_login:
             self.game.players_name[idx] = f"Player{idx+1}"
@@ -178,8 +266,8 @@ class ConsoleUI(Observer):
                 self.game.players_account[idx] = None
 
     def update(self, subject: Any, *args, **kwargs):
-        # 收到 Board 通知时重绘
-        self.render()
+        # 收到 Board 通知时只标记，命令执行完后统一重绘（一手 Othello 会产生十余次通知）
+        self.dirty = True
         if kwargs.get("event") == "place":
             # 可以在这里播放音效或打印特定日志
             pass
@@ -190,9 +278,12 @@ class ConsoleUI(Observer):
         
         builder = ScreenBuilder()
         builder.add_header(self.game)
-        builder.add_board(self.game.board)
+        builder.add_board(self.game.board, *self._viewport(self.game.board))
         builder.add_instructions(self.show_help)
-        print(builder.build())
+        if self.renderer.ansi:
+            builder.add_status(self.status)
+        self.renderer.draw(builder.build())
+        self.dirty = False
 
     def input_loop(self):
         while True:
@@ -201,84 +292,307 @@ class ConsoleUI(Observer):
                 parts = cmd_str.split()
                 if not parts: continue
 
-                action = parts[0]
-
-                if action == "quit":
+                if self.renderer.ansi and parts[0] != "replay":
+                    # TTY 模式：命令输出收进状态行，和棋盘一起差量重绘
+                    buf = io.StringIO()
+                    with redirect_stdout(buf):
+                        keep_going = self.handle_command(parts)
+                    self.status = buf.getvalue().strip()
+                else:
+                    keep_going = self.handle_command(parts)
+                if not keep_going:
                     break
-                
-                elif action == "help":
-                    self.show_help = not self.show_help
+                if self.dirty or self.renderer.ansi:
                     self.render()
 
-                elif action == "restart":
-                    self.game.start()
+            except Exception as e:
+                if self.renderer.ansi:
+                    self.status = f"Error: {e}"
                     self.render()
+                else:
+                    print(f"Error: {e}")
 
-                elif action == "undo":
-                    if self.game.undo_move():
-                        print("Undid last move.")
-                    else:
-                        print("Cannot undo.")
-
-                elif action == "place":
-                    if len(parts) < 3:
-                        print("Usage: place <row> <col>")
-                        continue
-                    r, c = int(parts[1]), int(parts[2])
-                    if not self.game.make_move(r, c):
-                        # make_move 内部会打印错误
-                        pass
-
-                elif action == "pass":
-                    if self.game.game_type == "Go":
-                        self.game.pass_turn()
-                        print("Player passed.")
-                        self.render()
-                    else:
-                        print("Pass is only allowed in Go.")
-
-                elif action == "save":
-                    fname = parts[1] if len(parts) > 1 else "savegame.dat"
-                    if self.game.save_game(fname):
-                        print(f"Game saved to {fname}")
-
-                elif action == "load":
-                    fname = parts[1] if len(parts) > 1 else "savegame.dat"
-                    if self.game.load_game(fname):
-                        print(f"Game loaded from {fname}")
-                        self.render()
-
-                elif action == "replay":
-                    fname = parts[1] if len(parts) > 1 else "savegame.dat"
-                    self.replay(fname)
+    def handle_command(self, parts) -> bool:
+        """执行一条命令，返回 False 表示退出"""
+        action = parts[0]
 
-                else:
-                    print("Unknown command.")
+        if action == "quit":
+            return False
+        
+        elif action == "help":
+            self.show_help = not self.show_help
+            self.dirty = True
 
-            except Exception as e:
-                print(f"Error: {e}")
+        elif action == "restart":
+            self.game.start()
+            self.dirty = True
+
+        elif action == "undo":
+            if self.game.undo_move():
+                print("Undid last move.")
+            else:
+                print("Cannot undo.")
+
+        elif action == "hint":
+            infos = self.run_analysis(1, budget=400)
+            if infos:
+                r, c = infos[0].move
+                print(f"Hint: place {r} {c}")
+            else:
+                print("No legal move.")
+
+        elif action == "analyze":
+            top_k = int(parts[1]) if len(parts) > 1 else 3
+            budget = int(parts[2]) if len(parts) > 2 else None
+            infos = self.run_analysis(top_k, budget)
+            print(format_analysis(infos) if infos else "No legal move.")
+
+        elif action == "place":
+            if len(parts) < 3:
+                print("Usage: place <row> <col>")
+                return True
+            r, c = int(parts[1]), int(parts[2])
+            if not self.game.make_move(r, c):
+                # make_move 内部会打印错误
+                pass
+
+        elif action in ("view", "pan"):
+            if len(parts) < 3:
+                print(f"Usage: {action} <row> <col>")
+                return True
+            board = self.game.board
+            a, b = int(parts[1]), int(parts[2])
+            if board.size <= VIEW_SIZE:
+                print("The whole board is already shown.")
+            elif action == "view":
+                self.view_origin = self._clamp_origin(board, a - VIEW_SIZE // 2, b - VIEW_SIZE // 2)
+            else:
+                r0, c0 = self.view_origin or (0, 0)
+                self.view_origin = self._clamp_origin(board, r0 + a, c0 + b)
+            self.dirty = True
+
+        elif action == "pass":
+            if self.game.game_type == "Go":
+                self.game.pass_turn()
+                print("Player passed.")
+                # 与落子一样，轮到 AI 时接着走（AI 也可能虚着）
+                self.game._auto_play_if_ai()
+                self.dirty = True
+            else:
+                print("Pass is only allowed in Go.")
+
+        elif action == "save":
+            fname = parts[1] if len(parts) > 1 else "savegame.dat"
+            if self.game.save_game(fname):
+                print(f"Game saved to {fname}")
+
+        elif action == "load":
+            fname = parts[1] if len(parts) > 1 else "savegame.dat"
+            if fname.startswith("#"):
+                from chess_platform.games.archive import default_archive
+                if self.game.load_data(default_archive().load(int(fname[1:]), replay=False)):
+                    print(f"Game {fname} loaded from archive")
+                    self.dirty = True
+            elif self.game.load_game(fname):
+                print(f"Game loaded from {fname}")
+                self.dirty = True
+
+        elif action == "replay":
+            fname = parts[1] if len(parts) > 1 else "savegame.dat"
+            self.replay(fname)
+            self.dirty = True
+
+        elif action == "games":
+            self.print_archive(parts[1:])
+
+        elif action == "explore":
+            from chess_platform.games.archive import default_archive
+            from chess_platform.games.explorer import default_explorer, format_rows
+            explorer = default_explorer(self.game.game_type, self.game.board.size)
+            rows = []
+            if explorer is not None:
+                explorer.sync(default_archive())
+                rows = explorer.lookup_game(self.game)
+            print(format_rows(rows, int(parts[1]) if len(parts) > 1 else 10) or "Position not in archive.")
+
+        elif action == "archive":
+            from chess_platform.games.archive import default_archive
+            archive = default_archive()
+            if len(parts) > 1 and parts[1] == "import":
+                from chess_platform.games.batch import find_saves
+                imported, skipped, failed = archive.import_saves(find_saves(parts[2:] or ["."]))
+                print(f"Imported {imported} games ({skipped} duplicates, {failed} failed)")
+            else:
+                game_id = archive.append_game(self.game)
+                print(f"Game archived as #{game_id}")
+
+        elif action == "rank":
+            from chess_platform.utils import ledger
+            game_type = parts[1].capitalize() if len(parts) > 1 else self.game.game_type
+            print(ledger.format_leaderboard(game_type))
+
+        elif action == "history":
+            if len(parts) < 2:
+                print("Usage: history <user>")
+                return True
+            self.print_history(parts[1])
+
+        else:
+            print("Unknown command.")
+
+        return True
+
+    def _viewport(self, board: Board) -> Tuple[Tuple[int, int], Optional[int]]:
+        """返回 (视口左上角, 视口路数)；新的一手落在视口外时视口跟随过去"""
+        if board.size <= VIEW_SIZE:
+            return (0, 0), None
+        last = board.last_move
+        if self.view_origin is None or (last != self.view_follow and last is not None
+                                        and not self._in_view(last)):
+            center = last or (board.size // 2, board.size // 2)
+            self.view_origin = self._clamp_origin(board, center[0] - VIEW_SIZE // 2,
+                                                  center[1] - VIEW_SIZE // 2)
+        self.view_follow = last
+        return self.view_origin, VIEW_SIZE
+
+    def _in_view(self, pos: Tuple[int, int]) -> bool:
+        r0, c0 = self.view_origin
+        return 0 <= pos[0] - r0 < VIEW_SIZE and 0 <= pos[1] - c0 < VIEW_SIZE
+
+    @staticmethod
+    def _clamp_origin(board: Board, r: int, c: int) -> Tuple[int, int]:
+        limit = board.size - VIEW_SIZE
+        return max(0, min(limit, r)), max(0, min(limit, c))
+
+    def run_analysis(self, top_k: int, budget: Optional[int] = None) -> List["MoveInfo"]:
+        """分析当前局面，搜索加深时逐次刷新；Ctrl+C 中断并返回已有结果"""
+        from chess_platform.games.ai import create_analyzer
+        if self.game.is_game_over:
+            return []
+        analyzer = self.analyzers.get(self.game.game_type)
+        if analyzer is None:
+            analyzer = self.analyzers[self.game.game_type] = create_analyzer(self.game.game_type)
+        infos: List["MoveInfo"] = []
+        try:
+            for infos in analyzer.analyze_iter(self.game.clone_position(), top_k, budget=budget):
+                if self.renderer.ansi:
+                    self.status = format_analysis(infos)
+                    self.render()
+                elif infos:
+                    best = infos[0]
+                    print(f"  ... best {best.move} score {best.score:.3f} visits {best.visits}")
+        except KeyboardInterrupt:
+            # 中断可能发生在一次模拟中途，丢弃不完整的搜索树
+            analyzer.reset()
+        return infos
+
+    def print_history(self, username: str):
+        from chess_platform.utils import ledger
+        rows = ledger.history(username)
+        if not rows:
+            print(f"{username}: 暂无对局记录")
+            return
+        print(f"=== {username} 最近对局 ===")
+        for r in rows:
+            delta = r["rating_after"] - r["rating_before"]
+            print(f"#{r['id']:<6} {r['game_type']:<8} {r['size']}x{r['size']} {r['color']:<5} "
+                  f"{r['outcome']:<4} {r['moves']:>3} 手  {r['rating_after']:7.1f} ({delta:+.1f})")
+
+    def print_archive(self, args: List[str]):
+        """games 命令：按账户/棋类/路数/结果筛选档案库（只查索引）"""
+        from chess_platform.games.archive import default_archive, format_entries
+        filters = {"account": None, "game_type": None, "size": None, "result": None, "limit": 20}
+        keys = {"user": "account", "type": "game_type", "size": "size", "result": "result", "limit": "limit"}
+        for arg in args:
+            key, sep, value = arg.partition("=")
+            if not sep:
+                filters["account"] = arg
+            elif key in keys:
+                filters[keys[key]] = value
+            else:
+                print(f"Unknown filter: {key}")
+                return
+        for key in ("size", "limit"):
+            if filters[key] is not None:
+                filters[key] = int(filters[key])
+        if filters["result"] and filters["result"] != "unfinished":
+            filters["result"] = filters["result"].capitalize()
+        archive = default_archive()
+        rows = archive.find(**filters)
+        if not rows:
+            print("No archived games.")
+            return
+        print(f"=== {len(rows)} of {len(archive)} archived games ===")
+        print(format_entries(rows))
 
     def replay(self, filepath: str):
-        import pickle, time
+        from chess_platform.games import savefile
+        from chess_platform.games.replay import ReplayEngine
         try:
-            with open(filepath, "rb") as f:
-                data = pickle.load(f)
-            snapshot = data["snapshot"]
+            if filepath.startswith("#"):
+                from chess_platform.games.archive import default_archive
+                data = default_archive().load(int(filepath[1:]), replay=False)
+            else:
+                data = savefile.read_save(filepath, replay=False)
             moves = data.get("move_log", [])
-            size = snapshot["size"]
+            size = data["size"]
             game_type = data.get("type","Gomoku")
-            temp_game = GameFactory.create_game(game_type, size)
-            temp_game.board.restore_snapshot({"size":size,"grid":[[None for _ in range(size)] for _ in range(size)],"last_move":None})
-            temp_game.board.attach(self)
-            print(f"Replaying {filepath}, moves={len(moves)}")
-            for step in moves:
-                color = step["color"]
-                piece = temp_game.players[0] if color=="Black" else temp_game.players[1]
-                temp_game.board.place_piece(step["x"], step["y"], piece)
-                temp_game.board.last_move = (step["x"], step["y"])
-                self.render()
-                time.sleep(0.3)
-            print("Replay finished.")
+            engine = ReplayEngine(game_type, size, moves)
         except Exception as e:
             print(f"Replay failed: {e}")
+            return
+        print(f"Replaying {filepath}, moves={engine.total}")
+        self.render_replay(engine)
+        while True:
+            parts = input("replay> ").strip().lower().split()
+            if not parts:
+                parts = ["n"]
+            action = parts[0]
+            try:
+                if action == "q":
+                    break
+                elif action == "n":
+                    engine.seek(engine.index + (int(parts[1]) if len(parts) > 1 else 1))
+                elif action == "b":
+                    engine.seek(engine.index - (int(parts[1]) if len(parts) > 1 else 1))
+                elif action == "g":
+                    engine.seek(int(parts[1]))
+                elif action == "play":
+                    self._autoplay(engine, float(parts[1]) if len(parts) > 1 else 1.0)
+                    continue
+                else:
+                    print("Unknown replay command.")
+                    continue
+            except (ValueError, IndexError):
+                print("Bad argument.")
+                continue
+            self.render_replay(engine)
+        print("Replay finished.")
+
+    def _autoplay(self, engine: "ReplayEngine", speed: float):
+        import time
+        try:
+            while not engine.at_end():
+                engine.step_forward()
+                self.render_replay(engine)
+                time.sleep(0.3 / max(speed, 0.01))
+        except KeyboardInterrupt:
+            # Ctrl+C 暂停自动播放
+            print("\nPaused.")
+
+    def render_replay(self, engine: "ReplayEngine"):
+        builder = ScreenBuilder()
+        builder.add_replay_header(engine)
+        builder.add_board(engine.board, *self._viewport(engine.board))
+        self.renderer.draw(builder.build())
+
 
+def format_analysis(infos: List["MoveInfo"]) -> str:
+    lines = []
+    for rank, info in enumerate(infos, 1):
+        pv = " ".join(f"{r},{c}" for r, c in info.pv)
+        line = f"{rank}. ({info.move[0]}, {info.move[1]})  score {info.score:.3f}"
+        if info.visits:
+            line += f"  visits {info.visits}"
+        lines.append(line + f"  pv {pv}")
+    return "\n".join(lines)
@@ -1,15 +1,31 @@
 import tkinter as tk
 from tkinter import messagebox, filedialog, simpledialog
 import math
+import queue
+import threading
 from typing import Any
 
 from chess_platform.core.patterns import Observer
-from chess_platform.games.logic import GameFactory, GameContext
+from chess_platform.games.logic import GameFactory, GameContext, UNBOUNDED_SIZE
 from chess_platform.games.ai import RandomAI, GomokuHeuristicAI
-from chess_platform.utils import account
+from chess_platform.games.journal import Journal, default_writer
+from chess_platform.games.replay import ReplayEngine
+from chess_platform.games.rules import PASS
+from chess_platform.ui.render import RenderScheduler
+from chess_platform.utils import account, ledger
+
+# 画布最多显示 VIEW_SIZE 路；更大的棋盘（稀疏五子棋）显示一个可滚动的视口
+VIEW_SIZE = 19
+# 开始 AI 搜索后在主线程上最多等这么久（秒），超过则转为轮询，界面不因搜索卡住
+AI_WAIT_S = 0.005
+
 
 class ChessGUI(Observer):
-    def __init__(self, root: tk.Tk):
+    def __init__(self, root: tk.Tk, ai_delay_ms: int = 1000, ai_vs_ai_delay_ms: int = 0, startup: bool = True):
+        """
+        ai_delay_ms: 人机对弈时 AI 每步前的停顿；ai_vs_ai_delay_ms: 双方都是 AI 时的停顿（0 为全速）
+        startup=False 只搭建界面，不弹登录框、不恢复/开新局，由调用方 set_game（基准测试等）
+        """
         self.root = root
         self.root.title("Python Chess Platform (OOD Assignment)")
         self.root.geometry("800x750")
@@ -32,20 +48,63 @@ class ChessGUI(Observer):
         self.stats_vars = {"Black": tk.StringVar(value="战绩: -"),
                            "White": tk.StringVar(value="战绩: -")}
         self.is_replaying = False
-        self.replay_moves = []
-        self.replay_idx = 0
+        self.replay: ReplayEngine = None
+        self.replay_playing = False
         self.replay_after_id = None
+        self.replay_speed_var = tk.StringVar(value="1x")
+        self._replay_scale_busy = False
         self.ai_after_id = None
-        self.ai_delay_ms = 1000
+        self.ai_delay_ms = ai_delay_ms
+        self.ai_vs_ai_delay_ms = ai_vs_ai_delay_ms
+        # AI 搜索在后台线程的局面副本上进行，结果经队列交回主线程落子；token 用来作废换局/悔棋前的结果
+        self.ai_thread = None
+        self.ai_queue = queue.Queue()
+        self.ai_token = 0
+        self.ai_poll_id = None
+        # 增量渲染：每个交叉点一个持久的画布对象
+        self.piece_items = []
+        self.piece_state = []
+        self.marker_items = ()
+        self.marker_pos = None
+        # 视口左上角在棋盘上的坐标（棋盘不超过 VIEW_SIZE 时恒为 (0, 0)）
+        self.view_origin = (0, 0)
+        # 棋盘通知只标记脏区，每帧至多绘制一次；follow_last 表示绘制时视口跟随到最后一手
+        self.render = RenderScheduler(self.root, self._paint)
+        self.follow_last = False
+        self.analysis_infos = []
+        # 分析模式：后台线程在局面副本上搜索，结果经队列交给主线程画热力图
+        self.analysis_on = False
+        self.analyzers = {}
+        self.analysis_thread = None
+        self.analysis_stop = None
+        self.analysis_queue = queue.Queue()
+        self.analysis_token = 0
+        self.analysis_after_id = None
+        self.analysis_poll_id = None
+        # 开局浏览器叠加层：档案库中当前局面下走过的着法与战绩
+        self.explorer_on = False
+        self.explorer_rows = []
+        self.explorer_after_id = None
+        # 打开浏览器要补收录档案库（首次可能是全量），放到后台线程，完成前显示 indexing…
+        self.explorer = None
+        self.explorer_key = None
+        self.explorer_error = None
+        self.explorer_thread = None
+        self.explorer_queue = queue.Queue()
+        self.explorer_poll_id = None
 
         # 初始化 UI 组件
         self._init_ui()
-        
+        if not startup:
+            return
+
         # 启动时登录/注册
         self.show_login_dialog()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
-        # 默认启动一个五子棋游戏
-        self.start_game("Gomoku", 15)
+        # 上次异常退出留下的对局优先恢复，否则默认启动一个五子棋游戏
+        if not self.offer_recovery():
+            self.start_game("Gomoku", 15)
 
     def _init_ui(self):
         # === 左侧：棋盘区域 ===
@@ -53,6 +112,9 @@ class ChessGUI(Observer):
         self.canvas.pack(side=tk.LEFT, padx=10, pady=10)
         # 绑定鼠标点击事件
         self.canvas.bind("<Button-1>", self.on_board_click)
+        # 方向键滚动视口（仅超大棋盘）
+        for key, delta in (("<Left>", (0, -3)), ("<Right>", (0, 3)), ("<Up>", (-3, 0)), ("<Down>", (3, 0))):
+            self.root.bind(key, lambda e, d=delta: self.scroll_view(*d))
 
         # === 右侧：控制面板 ===
         self.control_panel = tk.Frame(self.root)
@@ -65,6 +127,9 @@ class ChessGUI(Observer):
         self.lbl_player = tk.Label(self.control_panel, text="", font=("Arial", 10))
         self.lbl_player.pack(pady=5)
 
+        self.lbl_view = tk.Label(self.control_panel, text="", font=("Arial", 8))
+        self.lbl_view.pack()
+
         # 按钮群
         btn_width = 15
         
@@ -98,6 +163,18 @@ class ChessGUI(Observer):
         tk.Button(self.control_panel, text="Pass (虚着)", width=btn_width, 
                  command=self.on_pass).pack(pady=5)
 
+        self.btn_analysis = tk.Button(self.control_panel, text="Analyze (分析)", width=btn_width,
+                                      command=self.on_analysis_toggle)
+        self.btn_analysis.pack(pady=5)
+        self.lbl_analysis = tk.Label(self.control_panel, text="", font=("Courier", 8), justify=tk.LEFT)
+        self.lbl_analysis.pack()
+
+        self.btn_explorer = tk.Button(self.control_panel, text="Explorer (棋谱)", width=btn_width,
+                                      command=self.on_explorer_toggle)
+        self.btn_explorer.pack(pady=5)
+        self.lbl_explorer = tk.Label(self.control_panel, text="", font=("Courier", 8), justify=tk.LEFT)
+        self.lbl_explorer.pack()
+
         tk.Frame(self.control_panel, height=20).pack() # Spacer
 
         tk.Button(self.control_panel, text="Save Game", width=btn_width, 
@@ -106,16 +183,46 @@ class ChessGUI(Observer):
         tk.Button(self.control_panel, text="Load Game", width=btn_width, 
                  command=self.on_load).pack(pady=5)
 
+        tk.Button(self.control_panel, text="Leaderboard", width=btn_width, 
+                 command=self.on_leaderboard).pack(pady=5)
+
+        # 回放控制（仅回放时显示）：跳转/单步/拖动/倍速
+        self.replay_frame = tk.Frame(self.control_panel)
+        btn_row = tk.Frame(self.replay_frame)
+        btn_row.pack()
+        tk.Button(btn_row, text="|<", width=2, command=lambda: self.replay_seek(0)).pack(side=tk.LEFT)
+        tk.Button(btn_row, text="<", width=2, command=lambda: self.replay_seek(self.replay.index - 1)).pack(side=tk.LEFT)
+        self.btn_replay_play = tk.Button(btn_row, text="Pause", width=5, command=self.on_replay_toggle)
+        self.btn_replay_play.pack(side=tk.LEFT)
+        tk.Button(btn_row, text=">", width=2, command=lambda: self.replay_seek(self.replay.index + 1)).pack(side=tk.LEFT)
+        tk.Button(btn_row, text=">|", width=2, command=lambda: self.replay_seek(self.replay.total)).pack(side=tk.LEFT)
+        self.replay_scale = tk.Scale(self.replay_frame, from_=0, to=0, orient=tk.HORIZONTAL,
+                                     length=160, command=self.on_replay_scrub)
+        self.replay_scale.pack()
+        speed_row = tk.Frame(self.replay_frame)
+        speed_row.pack()
+        tk.Label(speed_row, text="Speed").pack(side=tk.LEFT)
+        tk.OptionMenu(speed_row, self.replay_speed_var, "0.5x", "1x", "2x", "4x", "8x").pack(side=tk.LEFT)
+        tk.Button(self.replay_frame, text="从此处续下", width=btn_width,
+                  command=self.on_replay_exit).pack(pady=2)
+
     def ask_new_game(self, game_type: str):
-        # 弹窗询问棋盘大小
+        # 弹窗询问棋盘大小；五子棋可选超大棋盘（方向键滚动）或 0 表示无限棋盘
         default_size = 19 if game_type == "Go" else 15
-        size = simpledialog.askinteger("Board Size", f"Enter size for {game_type} (8-19):", 
-                                     parent=self.root, minvalue=8, maxvalue=19, initialvalue=default_size)
-        if size:
+        if game_type == "Gomoku":
+            size = simpledialog.askinteger("Board Size", "Enter size for Gomoku (8-19, larger = scrolling, "
+                                           "0 = unbounded):", parent=self.root, minvalue=0,
+                                           maxvalue=UNBOUNDED_SIZE, initialvalue=default_size)
+        else:
+            size = simpledialog.askinteger("Board Size", f"Enter size for {game_type} (8-19):",
+                                           parent=self.root, minvalue=8, maxvalue=19, initialvalue=default_size)
+        if size is not None and (size == 0 or size >= 8):
             self.start_game(game_type, size)
 
     def start_game(self, game_type: str, size: int):
+        self._stop_replay()
         # 工厂模式创建游戏
+        self._close_journal()
         self.game = GameFactory.create_game(game_type, size)
         # 观察者模式：注册自己监听棋盘变化
         self.game.board.attach(self)
@@ -152,11 +259,8 @@ class ChessGUI(Observer):
                 self.game.players_name[idx] = "AI"
                 self.game.players_account[idx] = None
             elif mode == "ai-mcts":
-                from chess_platform.games.ai import GomokuMCTS
-                if game_type.lower() == "gomoku":
-                    ai = GomokuMCTS(name=f"AI-MCTS-{color}")
-                else:
-                    ai = RandomAI(name=f"AI-Rand-{color}")
+                from chess_platform.games.ai import create_ai
+                ai = create_ai("ai-mcts", game_type, f"AI-MCTS-{color}")
                 self.game.controllers[idx] = ai
                 self.game.players_role[idx] = "ai"
                 self.game.players_name[idx] = "AI"
@@ -168,27 +272,103 @@ class ChessGUI(Observer):
                 self.game.controllers[idx] = None
                 self.game.players_role[idx] = "visitor"
         self.game.start()
+        Journal.create(self.game)
         
-        # 初始绘制
+        # 初始绘制；若先手为 AI，立即执行
+        self.set_game(self.game)
+
+    def set_game(self, game: GameContext):
+        """显示并接管一局（已配置好控制器）：监听棋盘、整盘绘制，轮到 AI 时开始走子"""
+        if self.game is not None and self.game is not game:
+            self.game.board.detach(self)
+        self.game = game
+        game.board.attach(self)
+        self.view_origin = None
         self.update_status()
         self.draw_board()
-        # 若先手为 AI，立即执行
+        self.schedule_analysis()
+        self.schedule_explorer()
         self.schedule_ai()
 
     # ==========================================
     # Observer 接口实现
     # ==========================================
     def update(self, subject: Any, *args, **kwargs):
-        """当后端 Board 发生变化时，此方法被自动调用"""
-        self.draw_pieces()
-        self.update_status()
-        
-        # 检查是否收到 game_over 事件
-        if kwargs.get("event") == "game_over":
+        """当后端 Board 发生变化时，此方法被自动调用：只标记脏区，由 render 合并到下一帧绘制"""
+        event = kwargs.get("event")
+        if (event == "place" and kwargs["pos"] == subject.last_move or event == "replay") \
+                and subject.last_move is not None and not self._in_view(*subject.last_move):
+            # 落在视口外：绘制时视口跟随到这一手
+            self.follow_last = True
+            self.render.mark()
+        elif event in ("place", "remove"):
+            # 增量重绘：只更新事件涉及的交叉点
+            self.render.mark([kwargs["pos"]])
+        elif event in ("replay", "undo"):
+            # 回放跳转 / 增量悔棋：只重绘变化的交叉点
+            self.render.mark(kwargs.get("changed", []))
+        elif event == "game_over":
+            self.render.mark()
             # 延迟 100ms 弹窗，确保界面已经重绘（棋子落子动画完成）
             self.root.after(100, self.show_winner_alert)
+        else:
+            # clear / restore 等：整盘同步
+            self.render.mark(full=True)
+
+    def _paint(self, cells, full: bool):
+        """一帧的绘制：同步脏区（或整盘）、状态栏，并重新安排分析与棋谱查询"""
+        board = self._view_board()
+        if self.follow_last:
+            self.follow_last = False
+            if board.last_move is not None and not self._in_view(*board.last_move):
+                # center_view 会整盘同步视口
+                self.center_view(board.last_move)
+                full = False
+        if full:
+            self.draw_pieces()
+        else:
+            self.draw_cells(cells)
+        self.update_status()
+        self.schedule_analysis()
+        self.schedule_explorer()
+
+    # ============ 自动存档 ============
+    def offer_recovery(self) -> bool:
+        """上次异常退出时有未结束的对局：询问是否恢复，恢复成功返回 True"""
+        from chess_platform.games import journal
+        try:
+            recoverable = journal.find_recoverable()
+        except OSError:
+            return False
+        if not recoverable:
+            return False
+        path, desc = recoverable[0]
+        if not messagebox.askyesno("恢复对局", f"检测到未正常退出的对局：\n{desc}\n是否恢复？"):
+            journal.discard(path)
+            return False
+        try:
+            self.game = journal.resume(path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Recovery failed: {e}")
+            return False
+        for idx, color in enumerate(["Black", "White"]):
+            self.name_vars[color].set(self.game.players_name[idx] or color)
+        self.set_game(self.game)
+        return True
+
+    def _close_journal(self):
+        # 换局/退出时当前对局的自动存档不再需要
+        if self.game is not None and self.game.journal is not None:
+            self.game.journal.close(discard=True)
+            self.game.journal = None
+
+    def on_close(self):
+        self._close_journal()
+        default_writer().flush(2.0)
+        self.root.destroy()
 
     def show_winner_alert(self):
+        self.render.flush()
         winner = self.game.winner if self.game.winner else "Draw"
         if messagebox.askyesno("Game Over", f"Game Over! Winner: {winner}\nDo you want to restart?"):
             self.on_restart()
@@ -197,8 +377,12 @@ class ChessGUI(Observer):
     # 绘图逻辑 (View)
     # ==========================================
     def draw_board(self):
+        """整盘重绘：仅在开局/读档/换棋盘时调用，重新创建所有画布对象"""
         self.canvas.delete("all")
-        size = self.game.board.size
+        board = self._view_board()
+        size = self._view_size(board)
+        if self.view_origin is None or size == board.size:
+            self.view_origin = self._origin_around(board, board.last_move)
         
         # 动态计算网格大小以适应 Canvas
         # 预留 margin
@@ -213,11 +397,12 @@ class ChessGUI(Observer):
             # 竖线
             self.canvas.create_line(pos, self.margin, pos, self.margin + available_w)
         
-        # 画星位 (仅针对 19路和15路简单处理，可选)
-        if size in [15, 19]:
+        # 画星位 (仅针对 19路和15路简单处理，可选；滚动视口不画)
+        if size == board.size and size in [15, 19]:
             self._draw_star_points(size)
             
-        # 重绘棋子
+        # 每个交叉点预建一个棋子对象（默认隐藏），之后只改其颜色/可见性
+        self._create_piece_items(size)
         self.draw_pieces()
 
     def _draw_star_points(self, size):
@@ -233,37 +418,151 @@ class ChessGUI(Observer):
             r_dot = 3
             self.canvas.create_oval(x-r_dot, y-r_dot, x+r_dot, y+r_dot, fill="black")
 
+    def _view_board(self):
+        """当前展示的棋盘：回放时为回放引擎的棋盘，否则为对局棋盘"""
+        return self.replay.board if self.is_replaying else self.game.board
+
+    # ---------- 视口 ----------
+    @staticmethod
+    def _view_size(board) -> int:
+        return min(board.size, VIEW_SIZE)
+
+    def _origin_around(self, board, pos):
+        """以 pos（None 时为棋盘中心）为中心的视口左上角，限制在棋盘内"""
+        n = self._view_size(board)
+        if n == board.size:
+            return (0, 0)
+        if pos is None:
+            pos = (board.size // 2, board.size // 2)
+        limit = board.size - n
+        return (max(0, min(limit, pos[0] - n // 2)), max(0, min(limit, pos[1] - n // 2)))
+
+    def _in_view(self, r: int, c: int) -> bool:
+        n = len(self.piece_items)
+        r0, c0 = self.view_origin or (0, 0)
+        return 0 <= r - r0 < n and 0 <= c - c0 < n
+
+    def _cell_xy(self, r: int, c: int):
+        """棋盘坐标 -> 画布坐标"""
+        r0, c0 = self.view_origin
+        return self.margin + (c - c0) * self.cell_size, self.margin + (r - r0) * self.cell_size
+
+    def center_view(self, pos):
+        self.view_origin = self._origin_around(self._view_board(), pos)
+        self._after_scroll()
+
+    def scroll_view(self, dr: int, dc: int):
+        board = self._view_board()
+        n = self._view_size(board)
+        if n == board.size:
+            return
+        limit = board.size - n
+        r0, c0 = self.view_origin
+        origin = (max(0, min(limit, r0 + dr)), max(0, min(limit, c0 + dc)))
+        if origin != self.view_origin:
+            self.view_origin = origin
+            self._after_scroll()
+
+    def _after_scroll(self):
+        # 只同步视口内的交叉点（与画布不一致的才改动），热力图按新视口重画
+        self.draw_pieces()
+        self.draw_analysis(self.analysis_infos)
+        self.draw_explorer(self.explorer_rows)
+
+    def _update_view_label(self, board):
+        n = self._view_size(board)
+        if n == board.size:
+            self.lbl_view.config(text="")
+            return
+        r0, c0 = self.view_origin
+        self.lbl_view.config(text=f"View {r0}-{r0 + n - 1} x {c0}-{c0 + n - 1} of {board.size} (arrow keys)")
+
+    def _create_piece_items(self, size: int):
+        self.piece_items = []
+        self.piece_state = []
+        r0, c0 = self.view_origin
+        for r in range(size):
+            items = []
+            for c in range(size):
+                x, y = self._cell_xy(r0 + r, c0 + c)
+                items.append(self.canvas.create_oval(x - self.piece_radius, y - self.piece_radius,
+                                                     x + self.piece_radius, y + self.piece_radius,
+                                                     outline="black", state="hidden", tags="piece"))
+            self.piece_items.append(items)
+            self.piece_state.append([None] * size)
+        # 最后一手标记（红十字），建在棋子之上
+        self.marker_items = (
+            self.canvas.create_line(0, 0, 0, 0, fill="red", width=2, state="hidden", tags="marker"),
+            self.canvas.create_line(0, 0, 0, 0, fill="red", width=2, state="hidden", tags="marker"),
+        )
+        self.marker_pos = None
+
     def draw_pieces(self):
-        # 清除旧棋子 (为了简单，这里清除所有棋子标签的对象)
-        self.canvas.delete("piece")
-        self.canvas.delete("marker") # 最后一手的高亮标记
-        
-        board = self.game.board
-        for r in range(board.size):
-            for c in range(board.size):
-                piece = board.get_piece(r, c)
-                if piece:
-                    x = self.margin + c * self.cell_size
-                    y = self.margin + r * self.cell_size
-                    
-                    color = "black" if piece.color_name == "Black" else "white"
-                    outline = "black" # 白棋也需要黑边框
-                    
-                    self.canvas.create_oval(x - self.piece_radius, y - self.piece_radius,
-                                          x + self.piece_radius, y + self.piece_radius,
-                                          fill=color, outline=outline, tags="piece")
+        """把所有交叉点同步到棋盘状态（只改动与画布不一致的对象）"""
+        board = self._view_board()
+        n = self._view_size(board)
+        if len(self.piece_items) != n:
+            self.draw_board()
+            return
+        # 只遍历视口内的交叉点：超大棋盘的开销与棋盘尺寸无关
+        r0, c0 = self.view_origin
+        for r in range(r0, r0 + n):
+            for c in range(c0, c0 + n):
+                self._update_piece(board, r, c)
+        self._update_marker(board)
+        self._update_view_label(board)
+
+    def draw_cells(self, cells):
+        """只重绘指定交叉点上的棋子（及最后一手标记）"""
+        board = self._view_board()
+        if len(self.piece_items) != self._view_size(board):
+            self.draw_board()
+            return
+        for r, c in cells:
+            if self._in_view(r, c):
+                self._update_piece(board, r, c)
+        self._update_marker(board)
 
+    def _update_piece(self, board, r: int, c: int):
+        piece = board.get_piece(r, c)
+        color = None
+        if piece:
+            color = "black" if piece.color_name == "Black" else "white"
+        # 画布对象按视口内坐标索引
+        r0, c0 = self.view_origin
+        vr, vc = r - r0, c - c0
+        if self.piece_state[vr][vc] == color:
+            return
+        self.piece_state[vr][vc] = color
+        if color is None:
+            self.canvas.itemconfig(self.piece_items[vr][vc], state="hidden")
+        else:
+            # 白棋也需要黑边框（创建时已设置 outline）
+            self.canvas.itemconfig(self.piece_items[vr][vc], fill=color, state="normal")
+
+    def _update_marker(self, board):
         # 标记最后落子位置
-        if board.last_move:
-            lr, lc = board.last_move
-            x = self.margin + lc * self.cell_size
-            y = self.margin + lr * self.cell_size
-            # 画一个小红点或十字
-            self.canvas.create_line(x-5, y, x+5, y, fill="red", width=2, tags="marker")
-            self.canvas.create_line(x, y-5, x, y+5, fill="red", width=2, tags="marker")
+        pos = board.last_move
+        if pos is not None and not self._in_view(*pos):
+            pos = None
+        if (pos, self.view_origin) == self.marker_pos:
+            return
+        self.marker_pos = (pos, self.view_origin)
+        h, v = self.marker_items
+        if pos is None:
+            self.canvas.itemconfig(h, state="hidden")
+            self.canvas.itemconfig(v, state="hidden")
+            return
+        x, y = self._cell_xy(*pos)
+        self.canvas.coords(h, x-5, y, x+5, y)
+        self.canvas.coords(v, x, y-5, x, y+5)
+        self.canvas.itemconfig(h, state="normal")
+        self.canvas.itemconfig(v, state="normal")
 
     def update_status(self):
-        if self.game.is_game_over:
+        if self.is_replaying:
+            self.lbl_info.config(text=f"Replay: {self.replay.index}/{self.replay.total}", fg="blue")
+        elif self.game.is_game_over:
             self.lbl_info.config(text="Game Over", fg="red")
         else:
             self.lbl_info.config(text=f"Playing: {self.game.game_type}", fg="black")
@@ -284,15 +583,26 @@ class ChessGUI(Observer):
             return
         if self.is_replaying:
             return
+        if self.game.controllers[self.game.current_player_idx] is not None:
+            # 轮到 AI（可能正在后台搜索）
+            return
+        if self.game.game_type == "Othello" and not self.game._has_legal_move():
+            # 黑白棋无子可下只能虚着，把回合交给对方（可能是 AI）
+            messagebox.showinfo("Info", "No legal move, pass.")
+            self.game.pass_turn()
+            self.update_status()
+            self.schedule_ai()
+            return
 
         # 将屏幕坐标转换为网格坐标
         # x = margin + col * cell_size  =>  col = (x - margin) / cell_size
         # 使用 round 来寻找最近的交叉点
-        col = int(round((event.x - self.margin) / self.cell_size))
-        row = int(round((event.y - self.margin) / self.cell_size))
+        r0, c0 = self.view_origin
+        col = int(round((event.x - self.margin) / self.cell_size)) + c0
+        row = int(round((event.y - self.margin) / self.cell_size)) + r0
 
         # 范围检查
-        if 0 <= row < self.game.board.size and 0 <= col < self.game.board.size:
+        if self._in_view(row, col):
             # 调用后端逻辑
             # 注意：如果落子无效（例如已有子），make_move 会返回 False，
             # 但具体的错误提示我们可以让 game 逻辑返回，或者这里简单忽略
@@ -304,7 +614,7 @@ class ChessGUI(Observer):
                  messagebox.showwarning("Invalid Move", "Position already occupied!")
                  return
 
-            success = self.game.make_move(row, col)
+            success = self.game.make_move(row, col, auto_play=False)
             if not success:
                 # 可能是围棋的自杀手或者其他规则限制
                 messagebox.showwarning("Invalid Move", "Move not allowed by rules (e.g. suicide or Ko).")
@@ -314,6 +624,14 @@ class ChessGUI(Observer):
     def on_undo(self):
         if not self.game.undo_move():
             messagebox.showinfo("Info", "Cannot undo.")
+            return
+        # 人机对弈时连同 AI 的应手一起悔，回到人执子
+        controllers = self.game.controllers
+        while controllers[self.game.current_player_idx] is not None and None in controllers:
+            if not self.game.undo_move():
+                break
+        # 作废悔棋前开始的 AI 搜索；轮到 AI（AI 先手悔到开局、AI 对 AI）则重新安排
+        self.schedule_ai()
 
     def on_pass(self):
         if self.game.game_type != "Go":
@@ -321,6 +639,7 @@ class ChessGUI(Observer):
             return
         self.game.pass_turn()
         self.update_status()
+        self.schedule_ai()
 
     def on_save(self):
         filepath = filedialog.asksaveasfilename(defaultextension=".dat")
@@ -331,40 +650,122 @@ class ChessGUI(Observer):
                 messagebox.showerror("Error", "Failed to save game.")
 
     def on_load(self):
+        """从对局档案库选择一局回放；也可直接打开 .dat 存档文件"""
+        from chess_platform.games.archive import default_archive, format_entries
+        try:
+            archive = default_archive()
+        except Exception as e:
+            messagebox.showerror("Error", f"Archive unavailable: {e}")
+            self.load_from_file()
+            return
+        dlg = tk.Toplevel(self.root)
+        dlg.title("对局档案")
+        dlg.geometry("620x420")
+        dlg.grab_set()
+
+        account_var = tk.StringVar(value=self.login_accounts.get("Black") or "")
+        type_var = tk.StringVar(value="All")
+        rows = []
+
+        filter_row = tk.Frame(dlg)
+        filter_row.pack(fill=tk.X, padx=10, pady=6)
+        tk.Label(filter_row, text="账户").pack(side=tk.LEFT)
+        tk.Entry(filter_row, textvariable=account_var, width=14).pack(side=tk.LEFT, padx=5)
+        tk.Label(filter_row, text="棋类").pack(side=tk.LEFT)
+        tk.OptionMenu(filter_row, type_var, "All", "Gomoku", "Go", "Othello").pack(side=tk.LEFT, padx=5)
+        listbox = tk.Listbox(dlg, font=("Courier", 9), width=80, height=16)
+        listbox.pack(fill=tk.BOTH, expand=True, padx=10)
+        lbl_count = tk.Label(dlg, text="")
+        lbl_count.pack()
+
+        def search():
+            # 只查询索引，不读取对局记录
+            game_type = type_var.get()
+            rows[:] = archive.find(account_var.get().strip() or None,
+                                   None if game_type == "All" else game_type, limit=500)
+            listbox.delete(0, tk.END)
+            for line in format_entries(rows).splitlines():
+                listbox.insert(tk.END, line)
+            lbl_count.config(text=f"{len(rows)} / {len(archive)} games")
+
+        def replay_selected(event=None):
+            sel = listbox.curselection()
+            if not sel:
+                return
+            game_id = rows[sel[0]]["id"]
+            dlg.destroy()
+            try:
+                self.start_replay(archive.load(game_id, replay=False))
+            except Exception as e:
+                messagebox.showerror("Error", f"Load/Replay failed: {e}")
+
+        def from_file():
+            dlg.destroy()
+            self.load_from_file()
+
+        tk.Button(filter_row, text="Search", command=search).pack(side=tk.LEFT, padx=5)
+        listbox.bind("<Double-Button-1>", replay_selected)
+        btn_row = tk.Frame(dlg)
+        btn_row.pack(pady=6)
+        tk.Button(btn_row, text="Replay", width=10, command=replay_selected).pack(side=tk.LEFT, padx=6)
+        tk.Button(btn_row, text="From file...", width=12, command=from_file).pack(side=tk.LEFT, padx=6)
+        search()
+        self.root.wait_window(dlg)
+
+    def load_from_file(self):
         filepath = filedialog.askopenfilename()
         if filepath:
-            import pickle
+            from chess_platform.games import savefile
             try:
-                with open(filepath,"rb") as f:
-                    data = pickle.load(f)
-                moves = data.get("move_log", [])
-                game_type = data.get("type","Gomoku")
-                size = data.get("size",15)
-                # 关联账户/名称（用于右侧展示与回放标注）
-                loaded_names = data.get("players_name", ["Black", "White"])
-                loaded_accounts = data.get("players_account", [None, None])
-                # 终止正在进行的 AI/回放
-                if self.ai_after_id:
-                    self.root.after_cancel(self.ai_after_id)
-                    self.ai_after_id = None
-                if self.replay_after_id:
-                    self.root.after_cancel(self.replay_after_id)
-                    self.replay_after_id = None
-                # 使用新实例，空盘开始回放
-                self.game = GameFactory.create_game(game_type, size)
-                self.game.board.attach(self)
-                self.game.players_name = loaded_names
-                self.game.players_account = loaded_accounts
-                self.game.start()
-                self.is_replaying = True
-                self.replay_moves = moves
-                self.replay_idx = 0
-                self.update_status()
-                self.draw_board()
-                self._replay_step()
+                self.start_replay(savefile.read_save(filepath, replay=False))
             except Exception as e:
                 messagebox.showerror("Error", f"Load/Replay failed: {e}")
 
+    def start_replay(self, data: dict):
+        """回放一局存档数据（savefile.read_save / Archive.load 的结果）"""
+        moves = data.get("move_log", [])
+        game_type = data.get("type","Gomoku")
+        size = data.get("size",15)
+        # 关联账户/名称（用于右侧展示与回放标注）
+        loaded_names = data.get("players_name") or ["Black", "White"]
+        loaded_accounts = data.get("players_account") or [None, None]
+        # 终止正在进行的 AI/回放
+        self.cancel_ai()
+        self._stop_replay()
+        # 使用新实例（用于显示玩家信息与回放结束后续下），回放局面由 ReplayEngine 提供
+        self._close_journal()
+        self.game = GameFactory.create_game(game_type, size)
+        self.game.board.attach(self)
+        self.game.players_name = loaded_names
+        self.game.players_account = loaded_accounts
+        self.game.start()
+        Journal.create(self.game)
+        self.replay = ReplayEngine(game_type, size, moves)
+        self.replay.board.attach(self)
+        self.is_replaying = True
+        self.replay_playing = True
+        self.btn_replay_play.config(text="Pause")
+        self._replay_scale_busy = True
+        self.replay_scale.config(to=self.replay.total)
+        self.replay_scale.set(0)
+        self._replay_scale_busy = False
+        self.replay_frame.pack(pady=5)
+        self.view_origin = None
+        self.update_status()
+        self.draw_board()
+        self.schedule_explorer()
+        self.replay_after_id = self.root.after(self._replay_delay(), self._replay_step)
+
+    def on_leaderboard(self):
+        game_type = self.game.game_type if self.game else "Gomoku"
+        text = ledger.format_leaderboard(game_type)
+        # 附带当前登录用户的等级分
+        for color in ["Black", "White"]:
+            acc = self.login_accounts.get(color)
+            if acc:
+                text += f"\n{color} {acc}: {ledger.get_rating(acc, game_type):.1f}"
+        messagebox.showinfo("Leaderboard", text)
+
     # ============ 登录/注册 ============
     def show_login_dialog(self):
         dlg = tk.Toplevel(self.root)
@@ -457,37 +858,94 @@ class ChessGUI(Observer):
         st = account.get_stats(acc) or {}
         return f"战绩: 场次{st.get('games',0)} 胜{st.get('win',0)} 平{st.get('draw',0)} 负{st.get('loss',0)}"
 
+    # ============ 回放控制 ============
+    def _replay_delay(self) -> int:
+        speed = float(self.replay_speed_var.get().rstrip("x"))
+        return max(1, int(1000 / speed))
+
     def _replay_step(self):
+        self.replay_after_id = None
+        if not self.is_replaying or not self.replay_playing:
+            return
+        if self.replay.at_end():
+            self.on_replay_toggle()
+            return
+        self.replay_seek(self.replay.index + 1)
+        # 按倍速调整间隔
+        self.replay_after_id = self.root.after(self._replay_delay(), self._replay_step)
+
+    def replay_seek(self, index: int):
         if not self.is_replaying:
             return
-        if self.replay_idx >= len(self.replay_moves):
-            self.is_replaying = False
+        self.replay.seek(index)
+        self._replay_scale_busy = True
+        self.replay_scale.set(self.replay.index)
+        self._replay_scale_busy = False
+
+    def on_replay_scrub(self, value):
+        if self._replay_scale_busy or not self.is_replaying:
+            return
+        self.replay.seek(int(float(value)))
+
+    def on_replay_toggle(self):
+        if not self.is_replaying:
+            return
+        self.replay_playing = not self.replay_playing
+        self.btn_replay_play.config(text="Pause" if self.replay_playing else "Play")
+        if self.replay_after_id:
+            self.root.after_cancel(self.replay_after_id)
+            self.replay_after_id = None
+        if self.replay_playing:
+            if self.replay.at_end():
+                self.replay_seek(0)
+            self.replay_after_id = self.root.after(self._replay_delay(), self._replay_step)
+
+    def on_replay_exit(self):
+        """结束回放，并从当前回放位置接管对局（重建 history，可悔棋/续下）"""
+        if not self.is_replaying:
             return
-        step = self.replay_moves[self.replay_idx]
-        color = step["color"]
-        piece = self.game.players[0] if color == "Black" else self.game.players[1]
-        x, y = step["x"], step["y"]
-        self.game.board.place_piece(x, y, piece)
-        self.game.board.last_move = (x, y)
-        self.replay_idx += 1
+        moves = self.replay.move_log[:self.replay.index]
+        self._stop_replay()
+        self.game.rebuild_history(moves)
         self.update_status()
-        self.draw_board()
-        # 1s 间隔
-        self.replay_after_id = self.root.after(1000, self._replay_step)
+        self.draw_pieces()
+        self.schedule_ai()
+
+    def _stop_replay(self):
+        if self.replay_after_id:
+            self.root.after_cancel(self.replay_after_id)
+            self.replay_after_id = None
+        if self.replay is not None:
+            self.replay.board.detach(self)
+        self.replay = None
+        self.is_replaying = False
+        self.replay_playing = False
+        self.replay_frame.pack_forget()
 
     # ============ AI 演示（非阻塞） ============
-    def schedule_ai(self):
-        # 若当前轮到 AI，则安排一步后再继续
+    def cancel_ai(self):
+        """取消待执行的 AI 步，并作废正在后台进行的搜索（换局、悔棋、回放时）"""
         if self.ai_after_id:
             self.root.after_cancel(self.ai_after_id)
             self.ai_after_id = None
+        self.ai_token += 1
+
+    def _ai_delay(self) -> int:
+        # 人机对弈留出时间看清 AI 的落子；AI 对 AI 按 ai_vs_ai_delay_ms（默认全速）
+        if all(ctrl is not None for ctrl in self.game.controllers):
+            return self.ai_vs_ai_delay_ms
+        return self.ai_delay_ms
+
+    def schedule_ai(self):
+        # 若当前轮到 AI，则安排一步后再继续
+        self.cancel_ai()
         if self.is_replaying:
             return
         ctrl = self.game.controllers[self.game.current_player_idx]
         if ctrl is None:
             return
         # 安排一步
-        self.ai_after_id = self.root.after(self.ai_delay_ms, self._ai_step)
+        self.ai_after_id = self.root.after(self._ai_delay(), self._ai_step)
 
     def _ai_step(self):
         self.ai_after_id = None
@@ -496,23 +954,260 @@ class ChessGUI(Observer):
         ctrl = self.game.controllers[self.game.current_player_idx]
         if ctrl is None:
             return
+        if self.ai_thread is not None and self.ai_thread.is_alive():
+            # 等作废的上一次搜索结束再开始，同一 AI 实例不能被两个线程同时使用
+            self.ai_after_id = self.root.after(50, self._ai_step)
+            return
         # Othello 无合法步则跳过
         from chess_platform.games import ai as ai_mod
         if self.game.game_type.lower() == "othello" and not ai_mod.legal_moves(self.game):
-            self.game.switch_player()
+            self.game.pass_turn()
             self.update_status()
-            self.draw_board()
             self.schedule_ai()
             return
-        move = ctrl.select_move(self.game)
+        token = self.ai_token
+        position = self.game.clone_position()
+
+        def run():
+            try:
+                move = ctrl.select_move(position)
+            except Exception as e:
+                move = e
+            self.ai_queue.put((token, move))
+
+        self.ai_thread = threading.Thread(target=run, daemon=True)
+        self.ai_thread.start()
+        # 快的 AI（随机、开局库）在这一小段等待内就能走完，当场落子；慢的交给轮询
+        self.ai_thread.join(AI_WAIT_S)
+        if self.ai_poll_id is None:
+            self._poll_ai(1)
+
+    def _poll_ai(self, wait: int):
+        """取回后台搜索的结果；还没有结果时从 1ms 起逐步放宽到 50ms 查一次"""
+        self.ai_poll_id = None
+        # 先看线程是否还在：在它结束前放进队列的结果一定能在下面取到
+        alive = self.ai_thread is not None and self.ai_thread.is_alive()
+        while True:
+            try:
+                token, move = self.ai_queue.get_nowait()
+            except queue.Empty:
+                break
+            if token == self.ai_token:
+                self._play_ai_move(move)
+                return
+        if alive:
+            wait = min(wait * 2, 50)
+            self.ai_poll_id = self.root.after(wait, self._poll_ai, wait)
+
+    def _play_ai_move(self, move):
+        if isinstance(move, Exception):
+            messagebox.showerror("Error", f"AI failed: {move}")
+            return
         if move is None:
             return
+        if move == PASS:
+            self.game.pass_turn()
+            self.update_status()
+            # 双方接连虚着后不再继续
+            if self.game.passes < 2:
+                self.schedule_ai()
+            return
         x,y = move
-        if self.game.make_move(x, y):
+        if self.game.make_move(x, y, auto_play=False):
             self.schedule_ai()
 
+    # ============ 分析模式（热力图） ============
+    def on_analysis_toggle(self):
+        self.analysis_on = not self.analysis_on
+        self.btn_analysis.config(relief=tk.SUNKEN if self.analysis_on else tk.RAISED)
+        self.schedule_analysis()
+
+    def schedule_analysis(self):
+        """局面变化后清掉旧热力图，并在空闲时重新分析（一手棋的多次通知只触发一次）"""
+        self.canvas.delete("analysis")
+        self.analysis_infos = []
+        if self.analysis_after_id is None:
+            self.analysis_after_id = self.root.after_idle(self._start_analysis)
+
+    def _start_analysis(self):
+        self.analysis_after_id = None
+        self.analysis_token += 1
+        if self.analysis_stop is not None:
+            self.analysis_stop.set()
+        if not self.analysis_on or self.is_replaying or self.game.is_game_over:
+            self.canvas.delete("analysis")
+            self.lbl_analysis.config(text="")
+            return
+        if self.analysis_thread is not None and self.analysis_thread.is_alive():
+            # 等上一轮搜索在检查点退出后再开始，同一分析器不能被两个线程同时使用
+            self.analysis_after_id = self.root.after(50, self._start_analysis)
+            return
+        analyzer = self.analyzers.get(self.game.game_type)
+        if analyzer is None:
+            from chess_platform.games.ai import create_analyzer
+            analyzer = self.analyzers[self.game.game_type] = create_analyzer(self.game.game_type)
+        stop = self.analysis_stop = threading.Event()
+        token = self.analysis_token
+        position = self.game.clone_position()
+
+        def run():
+            for infos in analyzer.analyze_iter(position, 8, stop):
+                self.analysis_queue.put((token, infos))
+
+        self.analysis_thread = threading.Thread(target=run, daemon=True)
+        self.analysis_thread.start()
+        if self.analysis_poll_id is None:
+            self.analysis_poll_id = self.root.after(100, self._poll_analysis)
+
+    def _poll_analysis(self):
+        self.analysis_poll_id = None
+        latest = None
+        while True:
+            try:
+                token, infos = self.analysis_queue.get_nowait()
+            except queue.Empty:
+                break
+            if token == self.analysis_token:
+                latest = infos
+        if latest is not None:
+            self.draw_analysis(latest)
+        if self.analysis_thread is not None and self.analysis_thread.is_alive():
+            self.analysis_poll_id = self.root.after(100, self._poll_analysis)
+
+    def draw_analysis(self, infos):
+        """候选着法热力图：越好越红，MCTS 标胜率，其他引擎标名次；主变显示在右侧"""
+        self.canvas.delete("analysis")
+        self.analysis_infos = infos
+        if not infos:
+            return
+        scores = [info.score for info in infos]
+        lo, hi = min(scores), max(scores)
+        half = self.cell_size * 0.45
+        for rank, info in enumerate(infos, 1):
+            t = 1.0 if hi == lo else (info.score - lo) / (hi - lo)
+            color = f"#ff{int(0xdd * (1 - t)):02x}00"
+            if not self._in_view(*info.move):
+                continue
+            x, y = self._cell_xy(*info.move)
+            self.canvas.create_rectangle(x - half, y - half, x + half, y + half, fill=color,
+                                         stipple="gray50", outline="red" if rank == 1 else "",
+                                         width=2, tags="analysis")
+            label = f"{info.score * 100:.0f}" if info.visits else str(rank)
+            self.canvas.create_text(x, y, text=label, font=("Arial", 8, "bold"), tags="analysis")
+        lines = []
+        for rank, info in enumerate(infos[:3], 1):
+            pv = " ".join(f"{r},{c}" for r, c in info.pv[:5])
+            lines.append(f"{rank}. {pv}  ({info.score:.2f}/{info.visits})")
+        self.lbl_analysis.config(text="\n".join(lines))
+
+    # ============ 开局浏览器 ============
+    def on_explorer_toggle(self):
+        self.explorer_on = not self.explorer_on
+        self.btn_explorer.config(relief=tk.SUNKEN if self.explorer_on else tk.RAISED)
+        if self.explorer_on:
+            # 打开时重新补收录档案库中的新对局（如刚导入的存档）
+            self.explorer_key = None
+        self.schedule_explorer()
+
+    def schedule_explorer(self):
+        # 一次事件批量里的多次改动合并为一次查询
+        if self.explorer_after_id is None:
+            self.explorer_after_id = self.root.after_idle(self._update_explorer)
+
+    def _update_explorer(self):
+        """查询当前显示局面（对局或回放）的棋谱统计；索引为 mmap 二分，直接在主线程查，补收录在后台线程"""
+        self.explorer_after_id = None
+        rows = []
+        board = self._view_board()
+        if self.explorer_on and self.game is not None:
+            key = (self.game.game_type, board.size)
+            if key != self.explorer_key:
+                self._sync_explorer(key)
+                return
+            if self.explorer_error is not None:
+                self.lbl_explorer.config(text=f"Explorer: {self.explorer_error}")
+                return
+            try:
+                if self.explorer is not None:
+                    rows = self.explorer.lookup(board, self._displayed_to_move())
+            except Exception as e:
+                self.lbl_explorer.config(text=f"Explorer: {e}")
+                return
+        self.draw_explorer(rows)
+
+    def _sync_explorer(self, key):
+        """后台打开该棋类/路数的浏览器并补收录档案库；完成后重新查询"""
+        self.canvas.delete("explorer")
+        self.lbl_explorer.config(text="Explorer: indexing…")
+        if self.explorer_thread is not None and self.explorer_thread.is_alive():
+            # 上一次收录结束后由 _poll_explorer 重新查询，届时再按新的棋类/路数收录
+            return
+
+        def run():
+            from chess_platform.games.archive import default_archive
+            from chess_platform.games.explorer import default_explorer
+            try:
+                explorer = default_explorer(*key)
+                if explorer is not None:
+                    explorer.sync(default_archive())
+                self.explorer_queue.put((key, explorer, None))
+            except Exception as e:
+                self.explorer_queue.put((key, None, e))
+
+        self.explorer_thread = threading.Thread(target=run, daemon=True)
+        self.explorer_thread.start()
+        if self.explorer_poll_id is None:
+            self.explorer_poll_id = self.root.after(50, self._poll_explorer)
+
+    def _poll_explorer(self):
+        self.explorer_poll_id = None
+        alive = self.explorer_thread is not None and self.explorer_thread.is_alive()
+        try:
+            key, explorer, error = self.explorer_queue.get_nowait()
+        except queue.Empty:
+            if alive:
+                self.explorer_poll_id = self.root.after(50, self._poll_explorer)
+            return
+        self.explorer_key, self.explorer, self.explorer_error = key, explorer, error
+        self.schedule_explorer()
+
+    def _displayed_to_move(self) -> int:
+        if not self.is_replaying:
+            return self.game.current_player_idx
+        log = self.replay.move_log
+        if self.replay.index < len(log):
+            return 0 if log[self.replay.index]["color"] == "Black" else 1
+        return 1 if log and log[-1]["color"] == "Black" else 0
+
+    def draw_explorer(self, rows):
+        """棋谱叠加层：蓝圈标出走过的着法与局数；右侧列出局数最多的几手及得分率"""
+        self.canvas.delete("explorer")
+        self.explorer_rows = rows
+        if not self.explorer_on:
+            self.lbl_explorer.config(text="")
+            return
+        if not rows:
+            self.lbl_explorer.config(text="(no archived games)")
+            return
+        r = self.piece_radius
+        for row in rows[:10]:
+            if not self._in_view(*row["move"]):
+                continue
+            x, y = self._cell_xy(*row["move"])
+            self.canvas.create_oval(x - r, y - r, x + r, y + r, outline="blue", width=2, tags="explorer")
+            self.canvas.create_text(x, y, text=str(row["games"]), fill="blue", font=("Arial", 8, "bold"),
+                                    tags="explorer")
+        lines = [f"{row['move'][0]},{row['move'][1]}  {row['games']}局 {row['score'] * 100:.0f}%"
+                 for row in rows[:5]]
+        self.lbl_explorer.config(text="\n".join(lines))
+
     def on_restart(self):
+        if self.is_replaying:
+            self._stop_replay()
+            self.draw_board()
         self.game.start()
         # start() 内部会调用 board.clear() -> notify() -> update() -> render()
         # 所以界面会自动刷新
+        # 作废重开前的 AI 搜索；先手为 AI 时重新开始走子
+        self.schedule_ai()
 
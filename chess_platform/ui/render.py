@@ -0,0 +1,79 @@
+"""
+GUI 重绘调度：棋盘通知只标记"脏"，一帧内的所有变化合并成至多一次绘制
+- mark(cells) 记下需要重绘的交叉点，mark(full=True) 表示整盘同步（clear / restore 等）；
+  脏点超过 max_cells 个时按整盘处理，逐点更新不比整盘同步省
+- 距上一帧不足 frame_ms 时把绘制推迟到下一帧的时刻，否则尽快（after 0）执行；
+  用定时器而不是 after_idle，AI 对弈连续排入 after 事件时空闲回调会被饿死
+- 已有一帧待绘时再来的通知不另排绘制，计入 skipped（省掉的重绘次数）
+"""
+import time
+from typing import Callable, Iterable, Set, Tuple
+
+Cell = Tuple[int, int]
+
+
+class RenderScheduler:
+    def __init__(self, root, paint: Callable[[Set[Cell], bool], None], fps: int = 60, max_cells: int = 64):
+        """paint(cells, full) 真正执行绘制；root 需提供 tkinter 的 after / after_cancel"""
+        self.root = root
+        self.paint = paint
+        self.frame_ms = max(1, 1000 // fps)
+        self.max_cells = max_cells
+        self.cells: Set[Cell] = set()
+        self.full = False
+        self.after_id = None
+        self.last_paint = 0.0
+        # 统计：收到的通知数、实际绘制帧数、被合并掉的重绘次数
+        self.events = 0
+        self.paints = 0
+        self.skipped = 0
+
+    @property
+    def dirty(self) -> bool:
+        return self.after_id is not None
+
+    def mark(self, cells: Iterable[Cell] = (), full: bool = False):
+        """标记脏区并确保下一帧会绘制"""
+        self.events += 1
+        if full:
+            self.full = True
+        elif not self.full:
+            self.cells.update(cells)
+            if len(self.cells) > self.max_cells:
+                self.full = True
+        if self.cells and self.full:
+            self.cells.clear()
+        if self.after_id is not None:
+            self.skipped += 1
+            return
+        wait = self.last_paint + self.frame_ms / 1000 - time.perf_counter()
+        self.after_id = self.root.after(max(0, int(wait * 1000)), self._frame)
+
+    def flush(self):
+        """立刻绘制尚未绘制的变化（弹窗、切换视图前调用）"""
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self._frame()
+
+    def cancel(self):
+        """丢弃待绘的变化（整盘重建会覆盖它们时）"""
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+        self.cells = set()
+        self.full = False
+
+    def _frame(self):
+        self.after_id = None
+        cells, full = self.cells, self.full
+        self.cells = set()
+        self.full = False
+        self.last_paint = time.perf_counter()
+        self.paints += 1
+        self.paint(cells, full)
+
+    def stats(self) -> str:
+        return f"{self.events} events, {self.paints} paints, {self.skipped} skipped"
+
+    def reset_stats(self):
+        self.events = self.paints = self.skipped = 0
@@ -0,0 +1,73 @@
+import sys
+from typing import List, Optional, TextIO
+
+CSI = "\x1b["
+
+
+class TerminalRenderer:
+    """
+    差量终端渲染器
+    - TTY：首帧清屏整盘输出；之后逐行比较，只把变化的字符区间用光标定位 (CSI row;col H) 重写
+    - 非 TTY（管道/文件）：不输出控制符，只在画面内容变化时整帧打印一次
+    画面固定在屏幕顶部，帧下方的内容（提示符、输入回显）在每次渲染时清除。
+    """
+    def __init__(self, stream: Optional[TextIO] = None, ansi: Optional[bool] = None):
+        self.stream = stream or sys.stdout
+        if ansi is None:
+            ansi = hasattr(self.stream, "isatty") and self.stream.isatty()
+        self.ansi = ansi
+        self.lines: List[str] = []
+        self.frames = 0
+        self.bytes_written = 0
+
+    def reset(self):
+        """下一帧强制整屏重绘（例如外部程序打乱了屏幕）"""
+        self.lines = []
+
+    def draw(self, text: str):
+        new = text.split("\n")
+        if self.ansi:
+            out = self._diff(new)
+        else:
+            out = "" if new == self.lines else text + "\n"
+        self.lines = new
+        if out:
+            self.frames += 1
+            self._write(out)
+
+    def _diff(self, new: List[str]) -> str:
+        parts: List[str] = []
+        if not self.lines:
+            parts.append(f"{CSI}2J{CSI}H")
+            parts.append("\n".join(new))
+        else:
+            old = self.lines
+            for row, line in enumerate(new):
+                prev = old[row] if row < len(old) else None
+                if line == prev:
+                    continue
+                if prev is None or not line.isascii() or not prev.isascii():
+                    # 新增行或含宽字符的行：整行重写
+                    parts.append(f"{CSI}{row + 1};1H{line}{CSI}K")
+                    continue
+                # 只重写首个差异到末个差异之间的字符
+                start = 0
+                limit = min(len(line), len(prev))
+                while start < limit and line[start] == prev[start]:
+                    start += 1
+                if len(line) != len(prev):
+                    # 长度变化时其后字符整体错位，重写到行尾
+                    parts.append(f"{CSI}{row + 1};{start + 1}H{line[start:]}{CSI}K")
+                    continue
+                end = len(line)
+                while end > start and line[end - 1] == prev[end - 1]:
+                    end -= 1
+                parts.append(f"{CSI}{row + 1};{start + 1}H{line[start:end]}")
+        # 光标移到帧下方并清除旧的提示符/多余行
+        parts.append(f"{CSI}{len(new) + 1};1H{CSI}J")
+        return "".join(parts)
+
+    def _write(self, s: str):
+        self.stream.write(s)
+        self.stream.flush()
+        self.bytes_written += len(s.encode("utf-8"))
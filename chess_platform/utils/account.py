@@ -5,20 +5,61 @@ from typing import Dict, Optional
 
 ACCOUNT_FILE = os.path.join(os.path.dirname(__file__), "accounts.json")
 
+# 进程级缓存：以文件 (mtime_ns, size) 作为版本号，文件未变化时直接复用已解析的数据。
+# 本进程内的写操作采用 write-through：写盘后同步刷新缓存，避免下一次读取再解析文件。
+_cache: Dict = {"data": None, "version": None, "hits": 0, "misses": 0}
+
+
+def _file_version():
+    try:
+        st = os.stat(ACCOUNT_FILE)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
 
 def _load() -> Dict:
-    if not os.path.exists(ACCOUNT_FILE):
+    version = _file_version()
+    if version is None:
+        _cache["data"] = None
+        _cache["version"] = None
         return {}
+    if _cache["data"] is not None and _cache["version"] == version:
+        _cache["hits"] += 1
+        return _cache["data"]
+    _cache["misses"] += 1
     with open(ACCOUNT_FILE, "r", encoding="utf-8") as f:
         try:
-            return json.load(f)
+            data = json.load(f)
         except Exception:
-            return {}
+            data = {}
+    _cache["data"] = data
+    _cache["version"] = version
+    return data
 
 
 def _save(data: Dict):
-    with open(ACCOUNT_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    try:
+        with open(ACCOUNT_FILE, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    except Exception:
+        # 写盘失败时缓存中的修改不可信，丢弃
+        invalidate_cache()
+        raise
+    # write-through：写盘后的内容即为最新缓存
+    _cache["data"] = data
+    _cache["version"] = _file_version()
+
+
+def cache_info() -> Dict[str, int]:
+    """返回缓存命中/未命中次数，便于验证状态栏刷新不再读盘"""
+    return {"hits": _cache["hits"], "misses": _cache["misses"]}
+
+
+def invalidate_cache():
+    """丢弃缓存，下次读取时强制重新解析文件"""
+    _cache["data"] = None
+    _cache["version"] = None
 
 
 def _hash(pwd: str) -> str:
@@ -51,7 +92,9 @@ def login(username: str, password: str) -> bool:
 
 def get_stats(username: str) -> Optional[Dict]:
     data = _load()
-    return data.get(username, {}).get("stats")
+    stats = data.get(username, {}).get("stats")
+    # 返回副本，避免调用方修改缓存中的数据
+    return dict(stats) if stats is not None else None
 
 
 def update_result(username: str, result: str):
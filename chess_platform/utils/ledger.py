@@ -0,0 +1,169 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+# 对局结果账本：每局结束记录一行，并维护每个账户在每种棋类下的 Elo 等级分。
+# 使用 sqlite（标准库）存储，排行榜与个人历史均走索引，百万级记录下仍为对数级查询。
+LEDGER_FILE = os.path.join(os.path.dirname(__file__), "ledger.db")
+
+DEFAULT_RATING = 1500.0
+K_FACTOR = 32.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    game_type   TEXT    NOT NULL,
+    size        INTEGER NOT NULL,
+    black       TEXT    NOT NULL,
+    white       TEXT    NOT NULL,
+    black_acc   TEXT,
+    white_acc   TEXT,
+    result      TEXT    NOT NULL,
+    moves       INTEGER NOT NULL,
+    duration    REAL    NOT NULL,
+    finished_at REAL    NOT NULL
+);
+CREATE TABLE IF NOT EXISTS participants (
+    game_id       INTEGER NOT NULL,
+    account       TEXT    NOT NULL,
+    game_type     TEXT    NOT NULL,
+    color         TEXT    NOT NULL,
+    outcome       TEXT    NOT NULL,
+    rating_before REAL    NOT NULL,
+    rating_after  REAL    NOT NULL,
+    finished_at   REAL    NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ratings (
+    account   TEXT    NOT NULL,
+    game_type TEXT    NOT NULL,
+    rating    REAL    NOT NULL,
+    games     INTEGER NOT NULL,
+    PRIMARY KEY (account, game_type)
+);
+CREATE INDEX IF NOT EXISTS idx_participants_account ON participants(account, finished_at DESC);
+CREATE INDEX IF NOT EXISTS idx_participants_type ON participants(account, game_type, finished_at DESC);
+CREATE INDEX IF NOT EXISTS idx_ratings_top ON ratings(game_type, rating DESC);
+"""
+
+_conn: Optional[sqlite3.Connection] = None
+_conn_path: Optional[str] = None
+_lock = threading.Lock()
+
+
+def _connect() -> sqlite3.Connection:
+    global _conn, _conn_path
+    if _conn is None or _conn_path != LEDGER_FILE:
+        if _conn is not None:
+            _conn.close()
+        _conn = sqlite3.connect(LEDGER_FILE, check_same_thread=False)
+        _conn.row_factory = sqlite3.Row
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("PRAGMA synchronous=NORMAL")
+        _conn.executescript(_SCHEMA)
+        _conn_path = LEDGER_FILE
+    return _conn
+
+
+def close():
+    global _conn, _conn_path
+    with _lock:
+        if _conn is not None:
+            _conn.close()
+        _conn = None
+        _conn_path = None
+
+
+def expected_score(rating: float, opp_rating: float) -> float:
+    return 1.0 / (1.0 + 10 ** ((opp_rating - rating) / 400.0))
+
+
+def _get_rating(conn: sqlite3.Connection, acc: Optional[str], game_type: str) -> float:
+    if not acc:
+        # 游客/AI 不参与排名，按基准分作为对手
+        return DEFAULT_RATING
+    row = conn.execute("SELECT rating FROM ratings WHERE account=? AND game_type=?",
+                       (acc, game_type)).fetchone()
+    return row["rating"] if row else DEFAULT_RATING
+
+
+def record_game(game_type: str, size: int, players_name: List[str],
+                players_account: List[Optional[str]], winner: str,
+                moves: int, duration: float, finished_at: Optional[float] = None) -> int:
+    """
+    记录一局结果并更新双方等级分
+    winner: "Black"/"White"/"Draw"
+    返回对局 id
+    """
+    finished_at = time.time() if finished_at is None else finished_at
+    with _lock:
+        conn = _connect()
+        with conn:
+            cur = conn.execute(
+                "INSERT INTO games (game_type, size, black, white, black_acc, white_acc,"
+                " result, moves, duration, finished_at) VALUES (?,?,?,?,?,?,?,?,?,?)",
+                (game_type, size, players_name[0], players_name[1],
+                 players_account[0], players_account[1], winner, moves, duration, finished_at))
+            game_id = cur.lastrowid
+            before = [_get_rating(conn, acc, game_type) for acc in players_account]
+            for idx, color in enumerate(["Black", "White"]):
+                acc = players_account[idx]
+                if not acc:
+                    continue
+                if winner == "Draw":
+                    outcome, score = "draw", 0.5
+                elif winner == color:
+                    outcome, score = "win", 1.0
+                else:
+                    outcome, score = "loss", 0.0
+                after = before[idx] + K_FACTOR * (score - expected_score(before[idx], before[1 - idx]))
+                conn.execute(
+                    "INSERT INTO participants (game_id, account, game_type, color, outcome,"
+                    " rating_before, rating_after, finished_at) VALUES (?,?,?,?,?,?,?,?)",
+                    (game_id, acc, game_type, color, outcome, before[idx], after, finished_at))
+                conn.execute(
+                    "INSERT INTO ratings (account, game_type, rating, games) VALUES (?,?,?,1)"
+                    " ON CONFLICT(account, game_type) DO UPDATE SET rating=excluded.rating, games=games+1",
+                    (acc, game_type, after))
+    return game_id
+
+
+def get_rating(account: str, game_type: str) -> float:
+    with _lock:
+        return _get_rating(_connect(), account, game_type)
+
+
+def top_players(game_type: str, n: int = 10) -> List[Dict]:
+    """排行榜：按等级分降序的前 n 名"""
+    with _lock:
+        rows = _connect().execute(
+            "SELECT account, rating, games FROM ratings WHERE game_type=?"
+            " ORDER BY rating DESC LIMIT ?", (game_type, n)).fetchall()
+    return [dict(r) for r in rows]
+
+
+def history(account: str, game_type: Optional[str] = None, limit: int = 20) -> List[Dict]:
+    """个人对局历史（最近的在前），含每局前后的等级分"""
+    sql = ("SELECT g.id, g.game_type, g.size, g.black, g.white, g.result, g.moves, g.duration,"
+           " p.color, p.outcome, p.rating_before, p.rating_after, p.finished_at"
+           " FROM participants p JOIN games g ON g.id = p.game_id WHERE p.account=?")
+    params: list = [account]
+    if game_type:
+        sql += " AND p.game_type=?"
+        params.append(game_type)
+    sql += " ORDER BY p.finished_at DESC LIMIT ?"
+    params.append(limit)
+    with _lock:
+        rows = _connect().execute(sql, params).fetchall()
+    return [dict(r) for r in rows]
+
+
+def format_leaderboard(game_type: str, n: int = 10) -> str:
+    rows = top_players(game_type, n)
+    if not rows:
+        return f"{game_type} 排行榜：暂无记录"
+    lines = [f"=== {game_type} 排行榜 ==="]
+    for rank, r in enumerate(rows, 1):
+        lines.append(f"{rank:>2}. {r['account']:<12} {r['rating']:7.1f}  ({r['games']} 局)")
+    return "\n".join(lines)